@@ -8,6 +8,16 @@ class Settings(BaseSettings):
     # Configuration NLP
     SPACY_MODEL: str = "fr_core_news_lg"
     CAMEMBERT_MODEL: str = "camembert-base"
+    SPACY_PIPE_BATCH_SIZE: int = 32  # Documents par lot pour nlp.pipe
+    SPACY_PIPE_N_PROCESS: int = 1  # Processus pour nlp.pipe (1 = temps par composant mesuré)
+    SPACY_PROFILE_COMPONENTS: bool = True
+    BERT_EMBED_BATCH_SIZE: int = 16  # Séquences par lot pour le modèle d'embedding
+    BERT_EMBED_MAX_BATCH_TOKENS: int = 8192  # Tokens par lot, padding compris
+    BERT_TORCH_THREADS: int = 0  # Threads PyTorch sur CPU (0 = valeur par défaut de torch)
+    BERT_INFERENCE_BACKEND: str = "pytorch"  # pytorch | onnx | onnx-int8 (ONNX Runtime, CPU)
+    BERT_EMBEDDING_CACHE_MB: int = 64  # Taille du cache mémoire des embeddings
+    BERT_EMBEDDING_STORE_ENABLED: bool = True
+    BERT_EMBEDDING_STORE_PATH: str = ""  # Défaut: <model_dir>/embeddings.sqlite3
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
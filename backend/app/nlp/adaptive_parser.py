@@ -7,7 +7,8 @@ avant d'appliquer la stratégie de parsing appropriée.
 import re
 import os
 import logging
-from typing import Dict, Any, List, Tuple, Optional, Union
+from typing import Dict, Any, List, Tuple, Optional, Union, BinaryIO
+import io
 import importlib.util
 from pathlib import Path
 
@@ -87,6 +88,26 @@ class AdaptiveParser:
         except Exception as e:
             self.logger.error(f"Erreur lors du chargement des parseurs spécifiques: {e}")
 
+    # Correspondance des types MIME courants vers les formats supportés
+    MIME_FORMAT_MAP = {
+        'application/pdf': 'pdf',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+        'application/msword': 'docx',
+        'text/plain': 'text',
+        'text/html': 'html',
+        'application/json': 'json',
+        'application/xml': 'xml',
+        'text/xml': 'xml'
+    }
+
+    def _format_from_extension(self, file_name: Optional[str]) -> str:
+        """Déduit le format à partir de l'extension d'un nom de fichier"""
+        ext = os.path.splitext(file_name or "")[1].lower()
+        for format_name, extensions in self.supported_formats.items():
+            if ext in extensions:
+                return format_name
+        return 'unknown'
+
     def detect_file_format(self, file_path: str) -> str:
         """
         Détecte le format du fichier basé sur son extension et son contenu.
@@ -98,33 +119,40 @@ class AdaptiveParser:
             str: Format détecté ('pdf', 'docx', etc.)
         """
         # 1. Vérifier l'extension du fichier
-        ext = os.path.splitext(file_path)[1].lower()
-        for format_name, extensions in self.supported_formats.items():
-            if ext in extensions:
-                format_guess = format_name
-                break
-        else:
-            format_guess = 'unknown'
+        format_guess = self._format_from_extension(file_path)
             
         # 2. Vérifier le type MIME pour confirmation
         try:
             mime_type = magic.from_file(file_path, mime=True)
+            mime_format = self.MIME_FORMAT_MAP.get(mime_type, None)
             
-            # Mapper les types MIME courants
-            mime_format_map = {
-                'application/pdf': 'pdf',
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
-                'application/msword': 'docx',
-                'text/plain': 'text',
-                'text/html': 'html',
-                'application/json': 'json',
-                'application/xml': 'xml',
-                'text/xml': 'xml'
-            }
+            # Si le MIME type et l'extension ne correspondent pas, se fier au MIME
+            if mime_format and mime_format != format_guess:
+                self.logger.info(f"Extension ({format_guess}) ne correspond pas au MIME ({mime_format}). Utilisation du MIME.")
+                return mime_format
+        except Exception as e:
+            self.logger.warning(f"Impossible de détecter le type MIME: {e}")
+        
+        return format_guess
+
+    def detect_buffer_format(self, content: bytes, file_name: Optional[str] = None) -> str:
+        """
+        Détecte le format d'un contenu en mémoire (extension du nom + type MIME du buffer).
+        
+        Args:
+            content: Contenu binaire du document
+            file_name: Nom du fichier d'origine si connu
             
-            mime_format = mime_format_map.get(mime_type, None)
+        Returns:
+            str: Format détecté ('pdf', 'docx', etc.)
+        """
+        format_guess = self._format_from_extension(file_name)
+        
+        try:
+            # Les premiers Ko suffisent à libmagic pour identifier le type
+            mime_type = magic.from_buffer(content[:8192], mime=True)
+            mime_format = self.MIME_FORMAT_MAP.get(mime_type, None)
             
-            # Si le MIME type et l'extension ne correspondent pas, se fier au MIME
             if mime_format and mime_format != format_guess:
                 self.logger.info(f"Extension ({format_guess}) ne correspond pas au MIME ({mime_format}). Utilisation du MIME.")
                 return mime_format
@@ -151,84 +179,114 @@ class AdaptiveParser:
             self.logger.error(f"Format non supporté: {format_name}")
             raise ValueError(f"Format non supporté: {format_name}")
 
-    def _extract_text_from_pdf(self, file_path: str) -> str:
-        """Extrait le texte d'un PDF"""
+    def extract_text_from_buffer(self, content: bytes, file_name: Optional[str] = None,
+                                 format_name: Optional[str] = None) -> str:
+        """
+        Extrait le texte d'un document en mémoire, sans passer par un fichier temporaire.
+        
+        Args:
+            content: Contenu binaire du document
+            file_name: Nom du fichier d'origine si connu
+            format_name: Format déjà détecté (évite une seconde détection)
+            
+        Returns:
+            str: Texte extrait du document
+        """
+        format_name = format_name or self.detect_buffer_format(content, file_name)
+        
+        if format_name in self.format_extractors:
+            return self.format_extractors[format_name](io.BytesIO(content))
+        else:
+            self.logger.error(f"Format non supporté: {format_name}")
+            raise ValueError(f"Format non supporté: {format_name}")
+
+    def _read_text(self, source: Union[str, BinaryIO]) -> str:
+        """Lit une source texte (chemin ou flux binaire) en utf-8, puis latin-1"""
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                content = file.read()
+        else:
+            content = source.read()
+        
+        try:
+            text = content.decode('utf-8')
+        except UnicodeDecodeError:
+            text = content.decode('latin-1')
+        # Fins de ligne normalisées comme une lecture en mode texte
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def _extract_text_from_pdf(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un PDF (chemin ou flux binaire)"""
         text = ""
         try:
-            with open(file_path, 'rb') as file:
-                reader = PyPDF2.PdfReader(file)
+            if isinstance(source, str):
+                with open(source, 'rb') as file:
+                    reader = PyPDF2.PdfReader(file)
+                    for page in reader.pages:
+                        text += page.extract_text() + "\n"
+            else:
+                reader = PyPDF2.PdfReader(source)
                 for page in reader.pages:
                     text += page.extract_text() + "\n"
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction du texte du PDF: {e}")
         return text
 
-    def _extract_text_from_docx(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier DOCX"""
+    def _extract_text_from_docx(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un fichier DOCX (chemin ou flux binaire)"""
         text = ""
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(source)
             for para in doc.paragraphs:
                 text += para.text + "\n"
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction du texte du DOCX: {e}")
         return text
 
-    def _extract_text_from_txt(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier texte"""
+    def _extract_text_from_txt(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un fichier texte (chemin ou flux binaire)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except UnicodeDecodeError:
-            # Essayer avec une autre encodage si utf-8 échoue
-            try:
-                with open(file_path, 'r', encoding='latin-1') as file:
-                    return file.read()
-            except Exception as e:
-                self.logger.error(f"Erreur lors de l'extraction du texte: {e}")
-                return ""
+            return self._read_text(source)
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction du texte: {e}")
             return ""
 
-    def _extract_text_from_html(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier HTML"""
+    def _extract_text_from_html(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un fichier HTML (chemin ou flux binaire)"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                soup = BeautifulSoup(file.read(), 'html.parser')
-                # Supprimer les scripts, styles, et autres éléments non textuels
-                for script in soup(["script", "style", "meta", "head"]):
-                    script.extract()
-                return soup.get_text()
+            soup = BeautifulSoup(self._read_text(source), 'html.parser')
+            # Supprimer les scripts, styles, et autres éléments non textuels
+            for script in soup(["script", "style", "meta", "head"]):
+                script.extract()
+            return soup.get_text()
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction du texte HTML: {e}")
             return ""
 
-    def _extract_text_from_json(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier JSON"""
+    def _extract_text_from_json(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un fichier JSON (chemin ou flux binaire)"""
         import json
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                # Tenter d'extraire les champs textuels pertinents
-                if isinstance(data, dict):
-                    text_fields = []
-                    for key, value in data.items():
-                        if isinstance(value, str):
-                            text_fields.append(f"{key}: {value}")
-                        elif isinstance(value, (list, dict)):
-                            text_fields.append(f"{key}: {json.dumps(value, ensure_ascii=False)}")
-                    return "\n".join(text_fields)
-                else:
-                    return json.dumps(data, ensure_ascii=False)
+            data = json.loads(self._read_text(source))
+            # Tenter d'extraire les champs textuels pertinents
+            if isinstance(data, dict):
+                text_fields = []
+                for key, value in data.items():
+                    if isinstance(value, str):
+                        text_fields.append(f"{key}: {value}")
+                    elif isinstance(value, (list, dict)):
+                        text_fields.append(f"{key}: {json.dumps(value, ensure_ascii=False)}")
+                return "\n".join(text_fields)
+            else:
+                return json.dumps(data, ensure_ascii=False)
         except Exception as e:
             self.logger.error(f"Erreur lors de l'extraction du texte JSON: {e}")
             return ""
 
-    def _extract_text_from_xml(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier XML"""
+    def _extract_text_from_xml(self, source: Union[str, BinaryIO]) -> str:
+        """Extrait le texte d'un fichier XML (chemin ou flux binaire)"""
         try:
-            tree = ET.parse(file_path)
+            tree = ET.parse(source)
             root = tree.getroot()
             
             # Extraction récursive de texte des éléments XML
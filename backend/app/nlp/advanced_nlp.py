@@ -11,6 +11,12 @@ import re
 import numpy as np
 from pathlib import Path
 
+from app.core.config import settings
+from app.nlp.embedding_store import (
+    DiskEmbeddingStore, EmbeddingLRUCache, embedding_key, split_in_batches
+)
+from app.nlp.onnx_backend import HAS_ONNXRUNTIME, ONNXEncoder
+
 # Initialisation du logging
 logger = logging.getLogger(__name__)
 
@@ -65,19 +71,46 @@ class BERTExtractor:
         self._text_classifier = None
         self._question_answerer = None
         
-        # Caches pour les résultats
-        self.embedding_cache = {}
+        # Caches pour les embeddings : mémoire (LRU borné en octets) puis disque
+        self.embedder_model_name = 'camembert-base'
+        self.embedding_cache = EmbeddingLRUCache(settings.BERT_EMBEDDING_CACHE_MB * 1024 * 1024)
+        self.embedding_store = None
+        if settings.BERT_EMBEDDING_STORE_ENABLED:
+            store_path = settings.BERT_EMBEDDING_STORE_PATH or os.path.join(self.model_dir, "embeddings.sqlite3")
+            try:
+                self.embedding_store = DiskEmbeddingStore(store_path)
+            except Exception as e:
+                logger.warning(f"Magasin d'embeddings {store_path} indisponible: {e}")
         
         logger.info("BERTExtractor initialisé avec succès.")
 
-    def _load_embedder(self, model_name='camembert-base'):
+    def _load_embedder(self, model_name=None):
         """
         Charge le modèle d'embedding français si nécessaire
         """
         if self._embedder is None:
+            model_name = model_name or self.embedder_model_name
+            if settings.BERT_INFERENCE_BACKEND in ("onnx", "onnx-int8") and HAS_ONNXRUNTIME:
+                try:
+                    self._embedder = ONNXEncoder(
+                        model_name,
+                        model_dir=os.path.join(self.model_dir, "onnx"),
+                        quantize=settings.BERT_INFERENCE_BACKEND == "onnx-int8",
+                        pooling="cls",
+                        num_threads=settings.BERT_TORCH_THREADS
+                    )
+                    self.embedder_tokenizer = self._embedder.tokenizer
+                    self.embedder_model_name = model_name
+                    return True
+                except Exception as e:
+                    logger.warning(f"Backend ONNX indisponible pour {model_name} ({e}), utilisation de PyTorch")
             try:
+                if settings.BERT_TORCH_THREADS > 0:
+                    torch.set_num_threads(settings.BERT_TORCH_THREADS)
                 self.embedder_tokenizer = AutoTokenizer.from_pretrained(model_name)
                 self._embedder = AutoModel.from_pretrained(model_name)
+                self._embedder.eval()
+                self.embedder_model_name = model_name
                 logger.info(f"Modèle d'embedding {model_name} chargé avec succès.")
             except Exception as e:
                 logger.error(f"Erreur lors du chargement du modèle d'embedding: {e}")
@@ -159,57 +192,134 @@ class BERTExtractor:
         Returns:
             np.ndarray: Vecteur d'embedding du document
         """
+        return self.get_document_embeddings_batch([text])[0]
+
+    def get_document_embeddings_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Génère les embeddings d'une série de documents.
+        
+        Les embeddings déjà calculés sont lus dans le cache mémoire puis dans le
+        magasin sur disque ; les autres documents sont découpés en séquences, qui
+        sont regroupées par longueur et encodées par lots.
+        
+        Args:
+            texts: Textes des documents
+            
+        Returns:
+            List[np.ndarray]: Vecteurs d'embedding, dans l'ordre des textes
+        """
         if not self.available:
             logger.warning("get_document_embeddings appelé mais transformers n'est pas disponible.")
-            return np.zeros(768)  # Retourner un vecteur de zéros en cas d'erreur
-        
-        # Utiliser le cache si disponible
-        if text in self.embedding_cache:
-            return self.embedding_cache[text]
+            return [np.zeros(768) for _ in texts]  # Retourner des vecteurs de zéros en cas d'erreur
+        
+        # Les vecteurs d'un modèle quantifié diffèrent légèrement : clés distinctes par backend
+        namespace = self.embedder_model_name
+        if settings.BERT_INFERENCE_BACKEND != "pytorch":
+            namespace = f"{namespace}:{settings.BERT_INFERENCE_BACKEND}"
+        keys = [embedding_key(text, namespace) for text in texts]
+        embeddings: Dict[str, np.ndarray] = {}
+        
+        # Cache mémoire
+        for key in dict.fromkeys(keys):
+            cached = self.embedding_cache.get(key)
+            if cached is not None:
+                embeddings[key] = cached
+        
+        # Magasin sur disque
+        missing = [key for key in dict.fromkeys(keys) if key not in embeddings]
+        if missing and self.embedding_store is not None:
+            try:
+                for key, vector in self.embedding_store.get_many(missing).items():
+                    embeddings[key] = vector
+                    self.embedding_cache.put(key, vector)
+            except Exception as e:
+                logger.warning(f"Lecture du magasin d'embeddings impossible: {e}")
         
-        if not self._load_embedder():
-            return np.zeros(768)  # Retourner un vecteur de zéros en cas d'erreur
+        to_compute = {key: text for key, text in zip(keys, texts) if key not in embeddings}
+        if to_compute and self._load_embedder():
+            try:
+                computed = dict(zip(to_compute, self._embed_texts(list(to_compute.values()))))
+            except Exception as e:
+                logger.error(f"Erreur lors de la génération d'embedding: {e}")
+                computed = {}
+            
+            # Les textes vides n'ont pas d'embedding et ne sont pas mis en cache
+            computed = {key: vector for key, vector in computed.items() if vector is not None}
+            for key, vector in computed.items():
+                embeddings[key] = vector
+                self.embedding_cache.put(key, vector)
+            if computed and self.embedding_store is not None:
+                try:
+                    self.embedding_store.put_many(computed)
+                except Exception as e:
+                    logger.warning(f"Écriture dans le magasin d'embeddings impossible: {e}")
+        
+        return [embeddings[key] if key in embeddings else np.zeros(768) for key in keys]
+
+    def _embed_texts(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Encode des documents avec le modèle d'embedding (chargé au préalable).
         
-        try:
-            # Pour les documents longs, découper et moyenner
-            max_length = self.embedder_tokenizer.model_max_length - 10
-            chunks = []
-            
-            # Diviser le texte en chunks de tokens
-            tokens = self.embedder_tokenizer.tokenize(text)
-            
-            for i in range(0, len(tokens), max_length):
-                chunk = tokens[i:i + max_length]
-                chunks.append(self.embedder_tokenizer.convert_tokens_to_string(chunk))
-            
-            # Si pas de chunks (texte vide), retourner un vecteur de zéros
-            if not chunks:
-                return np.zeros(768)
-            
-            # Encoder chaque chunk
-            embeddings = []
-            
-            for chunk in chunks:
-                inputs = self.embedder_tokenizer(chunk, return_tensors="pt", padding=True, truncation=True)
-                
+        Chaque document est découpé en séquences de la taille maximale du modèle ;
+        l'embedding d'un document est la moyenne des représentations [CLS] de ses
+        séquences (None pour un document vide).
+        """
+        tokenizer = self.embedder_tokenizer
+        max_length = tokenizer.model_max_length - 10
+        
+        # Découper chaque document en séquences de tokens
+        sequences: List[List[int]] = []
+        owners: List[int] = []
+        token_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        for index, ids in enumerate(token_ids):
+            for start in range(0, len(ids), max_length):
+                sequences.append(self._with_special_tokens(tokenizer, ids[start:start + max_length]))
+                owners.append(index)
+        
+        sums: List[Optional[np.ndarray]] = [None] * len(texts)
+        counts = [0] * len(texts)
+        
+        batches = split_in_batches(
+            [len(sequence) for sequence in sequences],
+            settings.BERT_EMBED_BATCH_SIZE,
+            settings.BERT_EMBED_MAX_BATCH_TOKENS
+        )
+        for batch in batches:
+            # Padding à la plus longue séquence du lot uniquement
+            if isinstance(self._embedder, ONNXEncoder):
+                inputs = tokenizer.pad({"input_ids": [sequences[i] for i in batch]}, return_tensors="np")
+                hidden_state = self._embedder.run(inputs)
+            else:
+                inputs = tokenizer.pad({"input_ids": [sequences[i] for i in batch]}, return_tensors="pt")
                 with torch.no_grad():
-                    outputs = self._embedder(**inputs)
-                
-                # Utiliser la représentation [CLS] comme embedding du document
-                embedding = outputs.last_hidden_state[:, 0, :].numpy()
-                embeddings.append(embedding)
-            
-            # Moyenner sur tous les chunks
-            avg_embedding = np.mean(embeddings, axis=0).squeeze()
-            
-            # Mettre en cache
-            self.embedding_cache[text] = avg_embedding
-            
-            return avg_embedding
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la génération d'embedding: {e}")
-            return np.zeros(768)  # Retourner un vecteur de zéros en cas d'erreur
+                    hidden_state = self._embedder(**inputs).last_hidden_state.numpy()
+            
+            # Utiliser la représentation [CLS] comme embedding de chaque séquence
+            cls_embeddings = hidden_state[:, 0, :]
+            for row, sequence_index in enumerate(batch):
+                owner = owners[sequence_index]
+                if sums[owner] is None:
+                    sums[owner] = cls_embeddings[row].copy()
+                else:
+                    sums[owner] += cls_embeddings[row]
+                counts[owner] += 1
+        
+        # Moyenner sur toutes les séquences du document
+        return [total / count if total is not None else None for total, count in zip(sums, counts)]
+
+    @staticmethod
+    def _with_special_tokens(tokenizer, ids: List[int]) -> List[int]:
+        """
+        Encadre une séquence par les tokens spéciaux du modèle ([CLS] ... [SEP], <s> ... </s>).
+        
+        Les tokenizers rapides des versions récentes de transformers n'exposent plus
+        build_inputs_with_special_tokens : le format d'une séquence simple est alors
+        reconstruit à partir des tokens de début et de fin.
+        """
+        build = getattr(tokenizer, "build_inputs_with_special_tokens", None)
+        if build is not None:
+            return build(ids)
+        return [tokenizer.cls_token_id, *ids, tokenizer.sep_token_id]
 
     def extract_entities(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -653,14 +763,19 @@ class BERTExtractor:
 
 
 # Fonctions d'interface pour l'utilisation dans d'autres modules
+_bert_extractor: Optional[BERTExtractor] = None
+
 def get_bert_extractor() -> BERTExtractor:
     """
-    Obtient une instance de BERTExtractor.
+    Obtient l'instance partagée de BERTExtractor (modèles et caches communs).
     
     Returns:
         BERTExtractor: Instance de l'extracteur BERT
     """
-    return BERTExtractor()
+    global _bert_extractor
+    if _bert_extractor is None:
+        _bert_extractor = BERTExtractor()
+    return _bert_extractor
 
 def has_advanced_nlp_capabilities() -> bool:
     """
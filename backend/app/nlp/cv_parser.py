@@ -1,16 +1,17 @@
 import re
-import spacy
 from typing import Dict, List, Tuple, Any, Optional, Union
-from app.nlp.document_classifier import preprocess_document
+from app.nlp.document_classifier import preprocess_document, preprocess_documents
+from app.nlp.model_server import get_model_server
 
 class CVExtractor:
+    # Seule la reconnaissance d'entités (PERSON, PROFESSION...) est utilisée
+    SPACY_MODEL = "fr_core_news_lg"
+    SPACY_COMPONENTS = ("ner",)
+    
     def __init__(self):
-        # Chargement du modèle SpaCy
-        try:
-            self.nlp = spacy.load("fr_core_news_lg")
-        except OSError:
-            spacy.cli.download("fr_core_news_lg")
-            self.nlp = spacy.load("fr_core_news_lg")
+        # Modèle spaCy partagé (chargé une seule fois par processus)
+        self.model_server = get_model_server()
+        self.nlp = self.model_server.load(self.SPACY_MODEL, self.SPACY_COMPONENTS)
         
         self.extractors = {
             "nom": self.extract_name,
@@ -33,8 +34,21 @@ class CVExtractor:
             Dict: Informations extraites avec scores de confiance
         """
         # Prétraitement du document
-        processed = preprocess_document(text)
+        return self._parse_processed(preprocess_document(text))
+    
+    def parse_cvs(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse une série de CV, l'analyse spaCy étant faite par lots
         
+        Args:
+            texts: Textes des CV
+            
+        Returns:
+            List[Dict]: Informations extraites pour chaque CV, dans l'ordre
+        """
+        return [self._parse_processed(processed) for processed in preprocess_documents(texts)]
+    
+    def _parse_processed(self, processed: Dict[str, Any]) -> Dict[str, Any]:
         # Découpage en sections (spécifique aux CV)
         sections = self._extract_sections(processed["text"])
         processed["sections"] = sections
@@ -131,7 +145,7 @@ class CVExtractor:
             header_text = " ".join(processed["sections"]["header"])
             
             # Utiliser spaCy pour trouver des entités de type PERSON
-            header_doc = self.nlp(header_text)
+            header_doc = self.model_server.process(header_text, self.SPACY_MODEL)
             for ent in header_doc.ents:
                 if ent.label_ == "PERSON":
                     return ent.text, 0.9
@@ -1,9 +1,10 @@
 import re
-import spacy
 import numpy as np
 from typing import Dict, Any, Tuple, List, Optional
 import os
 
+from app.nlp.model_server import get_model_server
+
 # Importations optionnelles pour ML
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
@@ -15,16 +16,17 @@ except ImportError:
 
 
 class DocumentClassifier:
+    # Le document analysé sert aux extracteurs (entités nommées uniquement)
+    SPACY_MODEL = "fr_core_news_lg"
+    SPACY_COMPONENTS = ("ner",)
+    
     def __init__(self, model_path="models/doc_classifier.joblib"):
         """
         Classificateur de documents utilisant ML avec repli sur règles heuristiques
         """
-        # Initialiser SpaCy
-        try:
-            self.nlp = spacy.load("fr_core_news_lg")
-        except OSError:
-            spacy.cli.download("fr_core_news_lg")
-            self.nlp = spacy.load("fr_core_news_lg")
+        # Modèle spaCy partagé (chargé une seule fois par processus)
+        self.model_server = get_model_server()
+        self.nlp = self.model_server.load(self.SPACY_MODEL, self.SPACY_COMPONENTS)
         
         # Charger le modèle s'il existe et si les dépendances sont installées
         self.model_path = model_path
@@ -151,38 +153,46 @@ class DocumentClassifier:
         Returns:
             Dict: Contient le texte prétraité, le type de document et d'autres informations
         """
-        # Normalisation du texte
-        text = text.replace('\xa0', ' ')
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Détecter la langue (si possible)
-        lang = "fr"  # Par défaut
-        try:
-            sample = text[:1000]  # Échantillon pour efficacité
-            lang_doc = self.nlp(sample)
-            lang = lang_doc.lang_
-        except:
-            pass
-        
-        # Nettoyage avancé
-        text = self._clean_text(text)
+        return self.preprocess_documents([text])[0]
+    
+    def preprocess_documents(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Prétraite une série de documents, l'analyse spaCy étant faite par lots
         
-        # Détecter le type
-        doc_type = self.detect_document_type(text)
+        Args:
+            texts: Textes des documents à analyser
+            
+        Returns:
+            List[Dict]: Pour chaque document, texte prétraité, type, langue et document spaCy
+        """
+        results = []
+        for text in texts:
+            # Normalisation du texte
+            text = text.replace('\xa0', ' ')
+            text = re.sub(r'\s+', ' ', text)
+            
+            # Nettoyage avancé
+            text = self._clean_text(text)
+            
+            results.append({
+                "text": text,
+                "doc_type": self.detect_document_type(text),
+                # Langue du modèle : la détection ne nécessite pas d'analyser le texte
+                "language": self.nlp.lang or "fr",
+                "spacy_doc": None
+            })
         
         # Analyser avec spaCy (limiter la taille pour performance)
-        doc = None
         try:
-            doc = self.nlp(text[:100000])
+            docs = self.model_server.pipe(
+                (result["text"][:100000] for result in results), self.SPACY_MODEL
+            )
+            for result, doc in zip(results, docs):
+                result["spacy_doc"] = doc
         except Exception as e:
             print(f"Erreur lors de l'analyse spaCy: {e}")
         
-        return {
-            "text": text,
-            "doc_type": doc_type,
-            "language": lang,
-            "spacy_doc": doc
-        }
+        return results
     
     def _clean_text(self, text: str) -> str:
         """
@@ -202,16 +212,29 @@ class DocumentClassifier:
 
 
 # Pour maintenir la compatibilité avec le code existant
+_default_classifier = None
+
+def _get_classifier() -> DocumentClassifier:
+    """Classificateur partagé par les fonctions d'interface (évite un rechargement par appel)"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = DocumentClassifier()
+    return _default_classifier
+
 def detect_document_type(text: str) -> str:
     """
     Détecter le type de document (interface compatible avec le code existant)
     """
-    classifier = DocumentClassifier()
-    return classifier.detect_document_type(text)
+    return _get_classifier().detect_document_type(text)
 
 def preprocess_document(text: str) -> Dict[str, Any]:
     """
     Prétraite le document et détermine son type (interface compatible)
     """
-    classifier = DocumentClassifier()
-    return classifier.preprocess_document(text)
+    return _get_classifier().preprocess_document(text)
+
+def preprocess_documents(texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Prétraite une série de documents (analyse spaCy par lots)
+    """
+    return _get_classifier().preprocess_documents(texts)
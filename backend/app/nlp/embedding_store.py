@@ -0,0 +1,188 @@
+"""
+Stockage des embeddings de documents
+
+- EmbeddingLRUCache : cache mémoire borné en octets, indexé par l'empreinte du texte
+  (les textes eux-mêmes ne sont pas conservés) ;
+- DiskEmbeddingStore : magasin SQLite persistant, partagé entre redémarrages et
+  entre les processus d'une même machine.
+
+Les clés portent le nom du modèle : changer de modèle d'embedding n'expose jamais
+des vecteurs calculés par un autre modèle.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def embedding_key(text: str, model_name: str) -> str:
+    """Clé d'un embedding : empreinte SHA-256 du modèle et du texte"""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingLRUCache:
+    """
+    Cache LRU d'embeddings borné par la mémoire occupée par les vecteurs.
+
+    Les entrées les moins récemment utilisées sont évincées dès que la taille
+    cumulée des vecteurs dépasse `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        if vector.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = vector
+            self._bytes += vector.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+class DiskEmbeddingStore:
+    """
+    Magasin persistant d'embeddings (SQLite, vecteurs float32).
+
+    Une connexion est ouverte par thread ; le mode WAL permet les lectures
+    concurrentes pendant qu'un autre processus écrit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " dim INTEGER NOT NULL,"
+                " vector BLOB NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Embeddings présents dans le magasin pour les clés demandées"""
+        keys = list(keys)
+        found: Dict[str, np.ndarray] = {}
+        connection = self._connection()
+        # Limite SQLite sur le nombre de paramètres d'une requête
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            )
+            for key, dim, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if vector.shape[0] == dim:
+                    found[key] = vector
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Enregistre des embeddings (une transaction pour tout le lot)"""
+        if not vectors:
+            return
+        now = time.time()
+        rows = [
+            (key, int(vector.shape[0]), np.asarray(vector, dtype=np.float32).tobytes(), now)
+            for key, vector in vectors.items()
+        ]
+        with self._connection() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, created_at) VALUES (?, ?, ?, ?)",
+                rows
+            )
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+def split_in_batches(lengths: List[int], max_batch_size: int, max_batch_tokens: int) -> List[List[int]]:
+    """
+    Regroupe des séquences par longueur pour limiter le padding
+
+    Les séquences sont triées par longueur puis regroupées tant que le lot
+    rembourré (taille du lot x plus longue séquence) reste sous `max_batch_tokens`.
+
+    Args:
+        lengths: Longueur (en tokens) de chaque séquence
+        max_batch_size: Nombre maximal de séquences par lot
+        max_batch_tokens: Nombre maximal de tokens (padding compris) par lot
+
+    Returns:
+        List[List[int]]: Indices des séquences de chaque lot
+    """
+    order = sorted(range(len(lengths)), key=lambda index: lengths[index])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        # Triées par longueur croissante : la séquence courante est la plus longue du lot
+        padded = (len(current) + 1) * lengths[index]
+        if current and (len(current) >= max_batch_size or padded > max_batch_tokens):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
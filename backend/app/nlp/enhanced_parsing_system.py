@@ -7,13 +7,15 @@ Ce module orchestre tous les composants du système amélioré de parsing:
 - environment_preference_extractor: Déduction des préférences d'environnement/travail
 - parser_feedback_system: Collection et utilisation des feedbacks utilisateurs
 - gpt_parser: Extraction d'informations améliorée via l'API GPT
+- parse_provenance: Provenance des champs et re-parsing incrémental des résultats stockés
 """
 
 import os
+import time
+import datetime
 import logging
 from pathlib import Path
 from typing import Dict, List, Tuple, Any, Optional, Union, BinaryIO
-import tempfile
 import uuid
 
 # Importation des composants
@@ -22,26 +24,37 @@ from app.nlp.advanced_nlp import BERTExtractor, has_advanced_nlp_capabilities
 from app.nlp.environment_preference_extractor import WorkPreferenceExtractor, extract_work_preferences
 from app.nlp.parser_feedback_system import ParserFeedbackSystem, improve_extraction_with_feedback
 from app.nlp.gpt_parser import parse_document_with_gpt, extract_work_preferences_with_gpt
+from app.nlp.parse_provenance import ParseResultStore, ProvenanceTracker
 
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
+# Extracteur principal selon le type de document (sections pour les autres types)
+DOCUMENT_EXTRACTORS = {
+    "cv": "cv_parser",
+    "job_posting": "job_parser",
+    "company_questionnaire": "questionnaire_parser"
+}
+
 class EnhancedParsingSystem:
     """
     Système de parsing amélioré intégrant tous les composants avancés.
     Cette classe fournit une interface unifiée pour le parsing de documents.
     """
     
-    def __init__(self, use_gpt=True):
+    def __init__(self, use_gpt=True, store_results=True, result_store_dir=None):
         """
         Initialise le système de parsing amélioré avec tous ses composants.
         
         Args:
             use_gpt: Indique si le système doit utiliser l'API GPT (défaut: True)
+            store_results: Conserver les résultats et le texte extrait pour le re-parsing incrémental
+            result_store_dir: Répertoire de stockage des résultats (optionnel)
         """
         # Initialiser les composants
         self.adaptive_parser = AdaptiveParser()
         self.feedback_system = ParserFeedbackSystem()
+        self.result_store = ParseResultStore(result_store_dir) if store_results else None
         self.preference_extractor = WorkPreferenceExtractor()
         self.use_gpt = use_gpt
         
@@ -96,136 +109,163 @@ class EnhancedParsingSystem:
         # Récupérer le contenu textuel
         text = None
         file_format = None
-        temp_file = None
         
-        try:
-            # 1. Traitement des fichiers fournis comme binary content
-            if file_content and not text_content:
-                # Créer un fichier temporaire pour le traitement
-                temp_file = tempfile.NamedTemporaryFile(delete=False)
-                temp_file_path = temp_file.name
-                
-                # Si un nom de fichier est fourni, ajouter l'extension
-                if file_name:
-                    extension = os.path.splitext(file_name)[1]
-                    if extension:
-                        temp_file_path += extension
+        # 1. Traitement des fichiers fournis comme binary content (en mémoire, sans fichier temporaire)
+        if file_content and not text_content:
+            try:
+                content = file_content.read() if hasattr(file_content, 'read') else file_content
                 
-                # Écrire le contenu dans le fichier temporaire
-                try:
-                    temp_file.write(file_content.read())
-                    temp_file.close()  # Fermer pour que le contenu soit flushé
-                    
-                    # Détecter le format et extraire le texte
-                    file_format = self.adaptive_parser.detect_file_format(temp_file_path)
-                    text = self.adaptive_parser.extract_text_from_file(temp_file_path)
-                except Exception as e:
-                    logger.error(f"Erreur lors du traitement du contenu binaire: {e}")
-                    raise ValueError(f"Impossible de traiter le contenu du fichier: {str(e)}")
-            
-            # 2. Traitement des fichiers fournis comme chemin
-            elif file_path and not text_content:
-                try:
-                    # Détecter le format et extraire le texte
-                    file_format = self.adaptive_parser.detect_file_format(file_path)
-                    text = self.adaptive_parser.extract_text_from_file(file_path)
-                except Exception as e:
-                    logger.error(f"Erreur lors du traitement du fichier {file_path}: {e}")
-                    raise ValueError(f"Impossible de traiter le fichier: {str(e)}")
-            
-            # 3. Utiliser directement le contenu textuel si fourni
-            else:
-                text = text_content
-                # Essayer de détecter le format à partir du nom de fichier si disponible
-                if file_name:
-                    try:
-                        temp_file = tempfile.NamedTemporaryFile(delete=False)
-                        temp_file_path = temp_file.name
-                        
-                        with open(temp_file_path, 'w', encoding='utf-8') as f:
-                            f.write(str(text))
-                        
-                        file_format = self.adaptive_parser.detect_file_format(temp_file_path)
-                    except Exception as e:
-                        logger.warning(f"Impossible de détecter le format à partir du nom: {e}")
-            
-            # Vérifier que nous avons du texte à traiter
-            if not text or not text.strip():
-                raise ValueError("Aucun contenu textuel extrait pour le parsing.")
-            
-            # 4. Prétraitement du document
-            preprocessed = self.adaptive_parser.preprocess_document(text, file_format, doc_type)
-            
-            # 5. Déterminer le type de document s'il n'est pas fourni
-            if not doc_type and "doc_type" in preprocessed:
-                doc_type = preprocessed["doc_type"]
-            
-            # 6. Créer le résultat de base
-            result = {
-                "id": str(uuid.uuid4()),
-                "original_text": text,
-                "file_format": file_format,
-                "doc_type": doc_type,
-                "preprocessing": {
-                    "paragraph_count": preprocessed.get("paragraph_count", 0),
-                    "token_count": preprocessed.get("token_count", 0),
-                    "language": preprocessed.get("language", "unknown")
-                },
-                "extracted_data": {},
-                "confidence_scores": {}
-            }
-            
-            # 7. Extraction d'informations avec GPT si activé
-            if use_gpt_for_request and doc_type:
-                logger.info(f"Utilisation de GPT pour le parsing du document de type {doc_type}")
+                # Détecter le format et extraire le texte directement depuis le buffer
+                file_format = self.adaptive_parser.detect_buffer_format(content, file_name)
+                text = self.adaptive_parser.extract_text_from_buffer(content, file_name, file_format)
+            except Exception as e:
+                logger.error(f"Erreur lors du traitement du contenu binaire: {e}")
+                raise ValueError(f"Impossible de traiter le contenu du fichier: {str(e)}")
+        
+        # 2. Traitement des fichiers fournis comme chemin
+        elif file_path and not text_content:
+            try:
+                # Détecter le format et extraire le texte
+                file_format = self.adaptive_parser.detect_file_format(file_path)
+                text = self.adaptive_parser.extract_text_from_file(file_path)
+            except Exception as e:
+                logger.error(f"Erreur lors du traitement du fichier {file_path}: {e}")
+                raise ValueError(f"Impossible de traiter le fichier: {str(e)}")
+        
+        # 3. Utiliser directement le contenu textuel si fourni
+        else:
+            text = text_content
+            # Essayer de détecter le format à partir du nom de fichier si disponible
+            if file_name:
                 try:
-                    gpt_result = parse_document_with_gpt(text, doc_type)
-                    
-                    if gpt_result and "extracted_data" in gpt_result:
-                        result["extracted_data"].update(gpt_result.get("extracted_data", {}))
-                        result["confidence_scores"].update(gpt_result.get("confidence_scores", {}))
-                        result["parsing_method"] = "gpt"
-                        
-                        # On peut s'arrêter ici si GPT a fourni un résultat complet
-                        if result["extracted_data"]:
-                            # Mais on continue quand même avec les préférences et le feedback
-                            # pour avoir un traitement complet
-                            logger.info("Parsing GPT réussi, enrichissement avec préférences et feedback")
+                    file_format = self.adaptive_parser.detect_buffer_format(
+                        str(text).encode('utf-8'), file_name
+                    )
                 except Exception as e:
-                    logger.error(f"Erreur lors du parsing avec GPT: {e}")
-                    logger.info("Fallback vers les méthodes de parsing traditionnelles")
-                    # Continue with traditional parsing methods
-            
-            # 8. Extraction d'informations basée sur le type de document (approche traditionnelle)
-            # Toujours exécuté si GPT est désactivé OU si GPT a échoué
-            if not result.get("parsing_method") == "gpt" or not result["extracted_data"]:
-                logger.info(f"Utilisation des méthodes traditionnelles pour le parsing du document")
-                result = self._extract_document_data(result, doc_type)
-                result["parsing_method"] = "traditional"
-            
-            # 9. Enrichir avec des analyses NLP avancées si disponibles
-            if self.has_advanced_nlp and self.bert_extractor:
-                result = self._enrich_with_advanced_nlp(result)
-            
-            # 10. Extraire les préférences d'environnement de travail
-            result = self._extract_work_preferences(result, use_gpt_for_request)
+                    logger.warning(f"Impossible de détecter le format à partir du nom: {e}")
+        
+        # Vérifier que nous avons du texte à traiter
+        if not text or not text.strip():
+            raise ValueError("Aucun contenu textuel extrait pour le parsing.")
+        
+        # 4. Prétraitement du document
+        preprocessed = self.adaptive_parser.preprocess_document(text, file_format, doc_type)
+        
+        # 5. Déterminer le type de document s'il n'est pas fourni
+        if not doc_type and "doc_type" in preprocessed:
+            doc_type = preprocessed["doc_type"]
+        
+        # 6. Créer le résultat de base
+        result = {
+            "id": str(uuid.uuid4()),
+            "original_text": text,
+            "file_format": file_format,
+            "doc_type": doc_type,
+            "preprocessing": {
+                "paragraph_count": preprocessed.get("paragraph_count", 0),
+                "token_count": preprocessed.get("token_count", 0),
+                "language": preprocessed.get("language", "unknown")
+            },
+            "extracted_data": {},
+            "confidence_scores": {},
+            "provenance": {},
+            "extractor_versions": {}
+        }
+        
+        # 7. Extraction d'informations avec GPT si activé
+        if use_gpt_for_request and doc_type:
+            result = self._run_extractor(result, "gpt", self._extract_with_gpt, doc_type)
+        
+        # 8. Extraction d'informations basée sur le type de document (approche traditionnelle)
+        # Toujours exécuté si GPT est désactivé OU si GPT a échoué
+        if not result.get("parsing_method") == "gpt" or not result["extracted_data"]:
+            logger.info(f"Utilisation des méthodes traditionnelles pour le parsing du document")
+            result = self._run_extractor(result, self._document_extractor(doc_type),
+                                         self._extract_document_data, doc_type)
+            result = self._run_extractor(result, "skills", self._extract_skills)
+            result["parsing_method"] = "traditional"
+        
+        # 9. Enrichir avec des analyses NLP avancées si disponibles
+        if self.has_advanced_nlp and self.bert_extractor:
+            result = self._run_extractor(result, "advanced_nlp", self._enrich_with_advanced_nlp)
+        
+        # 10. Extraire les préférences d'environnement de travail
+        result = self._run_extractor(result, "preferences", self._extract_work_preferences, use_gpt_for_request)
+        
+        # 11. Appliquer des corrections basées sur le feedback précédent
+        result = self._run_extractor(result, "feedback", self.feedback_system.update_extraction_with_feedback)
+        
+        # 12. Conserver le résultat et le texte extrait pour un re-parsing incrémental
+        if self.result_store:
+            self.result_store.save(result)
+        
+        return result
+    
+    @staticmethod
+    def _document_extractor(doc_type: Optional[str]) -> str:
+        return DOCUMENT_EXTRACTORS.get(doc_type, "sections")
+    
+    def _run_extractor(self, result: Dict[str, Any], extractor: str, step, *args) -> Dict[str, Any]:
+        """
+        Exécute une étape d'extraction et enregistre la provenance des champs qu'elle produit.
+        
+        Les champs corrigés par un utilisateur sont conservés tels quels.
+        
+        Args:
+            result: Résultat de parsing en cours
+            extractor: Nom de l'extracteur (clé de EXTRACTOR_VERSIONS)
+            step: Méthode d'extraction (result, *args) -> result
             
-            # 11. Appliquer des corrections basées sur le feedback précédent
-            result = self.feedback_system.update_extraction_with_feedback(result)
+        Returns:
+            Dict: Résultat mis à jour
+        """
+        extracted_data = result.setdefault("extracted_data", {})
+        tracker = ProvenanceTracker(result)
+        before = dict(extracted_data)
+        protected = {field: value for field, value in extracted_data.items() if tracker.is_protected(field)}
+        
+        result = step(result, *args)
+        
+        tracker = ProvenanceTracker(result)
+        extracted_data = result.setdefault("extracted_data", {})
+        for field, value in extracted_data.items():
+            if field not in protected and (field not in before or value is not before[field]):
+                tracker.record(field, extractor, value)
+        extracted_data.update(protected)
+        tracker.mark_run(extractor)
+        return result
+    
+    def _extract_with_gpt(self, result: Dict[str, Any], doc_type: str) -> Dict[str, Any]:
+        """
+        Extrait les données du document avec GPT.
+        
+        Args:
+            result: Résultat de parsing en cours
+            doc_type: Type de document
             
-            return result
+        Returns:
+            Dict: Résultat enrichi avec les données extraites
+        """
+        logger.info(f"Utilisation de GPT pour le parsing du document de type {doc_type}")
+        try:
+            gpt_result = parse_document_with_gpt(result["original_text"], doc_type)
             
-        finally:
-            # Nettoyer les fichiers temporaires si nécessaire
-            if temp_file:
-                try:
-                    temp_file.close()
-                except:
-                    pass
-                try:
-                    os.unlink(temp_file.name)
-                except:
-                    pass
+            if gpt_result and "extracted_data" in gpt_result:
+                result["extracted_data"].update(gpt_result.get("extracted_data", {}))
+                result["confidence_scores"].update(gpt_result.get("confidence_scores", {}))
+                result["parsing_method"] = "gpt"
+                
+                # On peut s'arrêter ici si GPT a fourni un résultat complet
+                if result["extracted_data"]:
+                    # Mais on continue quand même avec les préférences et le feedback
+                    # pour avoir un traitement complet
+                    logger.info("Parsing GPT réussi, enrichissement avec préférences et feedback")
+        except Exception as e:
+            logger.error(f"Erreur lors du parsing avec GPT: {e}")
+            logger.info("Fallback vers les méthodes de parsing traditionnelles")
+            # Continue with traditional parsing methods
+        
+        return result
     
     def _extract_document_data(self, result: Dict[str, Any], doc_type: str) -> Dict[str, Any]:
         """
@@ -268,17 +308,31 @@ class EnhancedParsingSystem:
                 result["extracted_data"]["sections"] = sections
                 result["confidence_scores"]["sections"] = 0.5  # Score de confiance moyen
             
-            # Extraire les compétences indépendamment du type de document
-            from app.nlp.skills_extractor import extract_skills
-            skills = extract_skills(result["original_text"])
-            result["extracted_data"]["skills"] = skills
-            
             return result
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction des données pour le type {doc_type}: {e}")
             # Éviter d'échouer complètement, retourner le résultat inchangé
             return result
     
+    def _extract_skills(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extrait les compétences indépendamment du type de document.
+        
+        Args:
+            result: Résultat de parsing en cours
+            
+        Returns:
+            Dict: Résultat enrichi avec les compétences
+        """
+        try:
+            from app.nlp.skills_extractor import extract_skills
+            skills = extract_skills(result["original_text"])
+            result["extracted_data"]["skills"] = skills
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction des compétences: {e}")
+        
+        return result
+    
     def _enrich_with_advanced_nlp(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """
         Enrichit le résultat avec des analyses NLP avancées.
@@ -445,9 +499,14 @@ class EnhancedParsingSystem:
                 corrected_data=corrected_data,
                 doc_type=doc_type,
                 user_id=user_id,
-                original_text=original_text
+                original_text=original_text,
+                metadata={"parse_id": original_result.get("id")}
             )
             
+            # Les champs corrigés du résultat stocké ne seront plus recalculés
+            if correction_id and self.result_store and original_result.get("id"):
+                self.result_store.apply_correction(original_result["id"], corrected_data, correction_id)
+            
             return correction_id
         except Exception as e:
             logger.error(f"Erreur lors de l'enregistrement du feedback: {e}")
@@ -465,6 +524,122 @@ class EnhancedParsingSystem:
             bool: True si l'exportation a réussi
         """
         return self.feedback_system.export_training_dataset(output_dir, doc_type)
+    
+    def reparse_document(self, doc_id: str, extractors: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Re-parse un document stocké en ne ré-exécutant que les extracteurs concernés.
+        
+        Par défaut, seuls les extracteurs dont la version a changé depuis le parsing
+        sont relancés, sur le texte extrait conservé ; les champs corrigés par un
+        utilisateur sont conservés.
+        
+        Args:
+            doc_id: Identifiant du résultat de parsing
+            extractors: Extracteurs à ré-exécuter (défaut: ceux dont la version a changé)
+            
+        Returns:
+            Dict: Résultat mis à jour (dictionnaire vide si le document n'est pas stocké)
+        """
+        if not self.result_store:
+            logger.warning("Re-parsing impossible: le stockage des résultats est désactivé")
+            return {}
+        
+        result = self.result_store.load(doc_id)
+        if not result:
+            return {}
+        
+        updated, _ = self._reparse(result, extractors)
+        return updated
+    
+    def _reparse(self, result: Dict[str, Any], extractors: Optional[List[str]] = None):
+        """Re-parsing incrémental d'un résultat chargé ; retourne (résultat, extracteurs relancés)"""
+        if not result.get("original_text"):
+            logger.warning(f"Texte extrait absent pour {result.get('id')}, re-parsing impossible")
+            return result, []
+        
+        tracker = ProvenanceTracker(result)
+        stale = set(extractors) if extractors else tracker.stale_extractors()
+        if not stale:
+            return result, []
+        
+        # Retirer les champs produits par les anciennes versions des extracteurs (les
+        # corrections automatiques remplacent une valeur sans la recalculer : conservées)
+        for field in tracker.fields_from(stale - {"feedback"}):
+            result["extracted_data"].pop(field, None)
+            tracker.provenance.pop(field, None)
+        
+        # Les corrections automatiques dépendent des valeurs : toujours ré-appliquées
+        stale.add("feedback")
+        
+        doc_type = result.get("doc_type")
+        use_gpt = self.use_gpt and result.get("preference_extraction_method") == "gpt"
+        steps = [
+            ("gpt", self._extract_with_gpt, (doc_type,)),
+            (self._document_extractor(doc_type), self._extract_document_data, (doc_type,)),
+            ("skills", self._extract_skills, ()),
+            ("advanced_nlp", self._enrich_with_advanced_nlp, ()),
+            ("preferences", self._extract_work_preferences, (use_gpt,)),
+            ("feedback", self.feedback_system.update_extraction_with_feedback, ())
+        ]
+        
+        rerun = []
+        for extractor, step, args in steps:
+            if extractor not in stale:
+                continue
+            if extractor == "advanced_nlp" and not (self.has_advanced_nlp and self.bert_extractor):
+                continue
+            result = self._run_extractor(result, extractor, step, *args)
+            rerun.append(extractor)
+        
+        result["reparsed_at"] = datetime.datetime.now().isoformat()
+        result["reparsed_extractors"] = rerun
+        self.result_store.save(result)
+        
+        logger.info(f"Document {result.get('id')} re-parsé (extracteurs: {', '.join(rerun)})")
+        return result, rerun
+    
+    def reparse_archive(self, doc_type: Optional[str] = None,
+                        extractors: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Re-parse les documents stockés dont au moins un extracteur a changé de version.
+        
+        Args:
+            doc_type: Limiter aux documents de ce type (optionnel)
+            extractors: Extracteurs à ré-exécuter sur tous les documents (optionnel)
+            
+        Returns:
+            Dict: Statistiques (documents parcourus, re-parsés, à jour, en erreur, durée)
+        """
+        stats = {"documents": 0, "reparsed": 0, "up_to_date": 0, "errors": 0, "extractors": {}}
+        if not self.result_store:
+            logger.warning("Re-parsing impossible: le stockage des résultats est désactivé")
+            return stats
+        
+        start_time = time.time()
+        for doc_id in self.result_store.iter_ids():
+            result = self.result_store.load(doc_id)
+            if not result or (doc_type and result.get("doc_type") != doc_type):
+                continue
+            
+            stats["documents"] += 1
+            try:
+                _, rerun = self._reparse(result, extractors)
+            except Exception as e:
+                logger.error(f"Erreur lors du re-parsing de {doc_id}: {e}")
+                stats["errors"] += 1
+                continue
+            
+            if rerun:
+                stats["reparsed"] += 1
+                for extractor in rerun:
+                    stats["extractors"][extractor] = stats["extractors"].get(extractor, 0) + 1
+            else:
+                stats["up_to_date"] += 1
+        
+        stats["duration"] = round(time.time() - start_time, 2)
+        logger.info(f"Re-parsing de l'archive: {stats['reparsed']}/{stats['documents']} documents "
+                    f"en {stats['duration']}s")
+        return stats
 
 
 # Fonctions d'interface pour utilisation dans d'autres modules
@@ -528,3 +703,31 @@ def export_training_dataset(output_dir: str, doc_type: Optional[str] = None) ->
     """
     parser = EnhancedParsingSystem()
     return parser.export_training_data(output_dir, doc_type)
+
+def reparse_document(doc_id: str, extractors: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Fonction d'interface pour re-parser un document stocké.
+    
+    Args:
+        doc_id: Identifiant du résultat de parsing
+        extractors: Extracteurs à ré-exécuter (défaut: ceux dont la version a changé)
+        
+    Returns:
+        Dict: Résultat mis à jour
+    """
+    parser = EnhancedParsingSystem()
+    return parser.reparse_document(doc_id, extractors)
+
+def reparse_archive(doc_type: Optional[str] = None, extractors: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Fonction d'interface pour re-parser les documents stockés après une évolution des extracteurs.
+    
+    Args:
+        doc_type: Type de document (optionnel)
+        extractors: Extracteurs à ré-exécuter (optionnel)
+        
+    Returns:
+        Dict: Statistiques du re-parsing
+    """
+    parser = EnhancedParsingSystem()
+    return parser.reparse_archive(doc_type, extractors)
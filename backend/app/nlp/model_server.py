@@ -0,0 +1,210 @@
+"""
+Serveur de modèles spaCy partagé par les composants NLP du backend
+
+Chaque modèle est chargé une seule fois par processus, sans les composants que
+personne n'utilise (parser, lemmatizer... sont exclus au chargement). Les composants
+du backend déclarent ce dont ils ont besoin ; le traitement par lots passe par
+`nlp.pipe` (taille de lot et nombre de processus configurables) et le temps passé
+dans chaque composant est mesuré.
+"""
+
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import spacy
+from spacy.util import minibatch
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Composants des pipelines fr_core_news_* (les noms absents d'un modèle sont ignorés)
+KNOWN_COMPONENTS = (
+    "tok2vec", "morphologizer", "tagger", "parser", "senter",
+    "attribute_ruler", "lemmatizer", "ner"
+)
+
+
+class SpacyModelServer:
+    """
+    Registre des pipelines spaCy chargés dans le processus.
+
+    Un modèle est chargé avec l'union des composants demandés par ses utilisateurs ;
+    si un utilisateur demande plus tard un composant non chargé, le modèle est
+    rechargé une fois avec l'ensemble élargi.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, n_process: Optional[int] = None,
+                 profile: Optional[bool] = None):
+        self.batch_size = batch_size or settings.SPACY_PIPE_BATCH_SIZE
+        self.n_process = n_process or settings.SPACY_PIPE_N_PROCESS
+        self.profile = settings.SPACY_PROFILE_COMPONENTS if profile is None else profile
+
+        self._pipelines: Dict[str, Any] = {}
+        self._components: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._load_times: Dict[str, float] = {}
+        self._docs: Dict[str, int] = defaultdict(int)
+        self._component_times: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def load(self, model_name: str, components: Sequence[str] = ()):
+        """
+        Retourne le pipeline d'un modèle, chargé au besoin
+
+        Args:
+            model_name: Nom du modèle spaCy (ex: "fr_core_news_lg")
+            components: Composants nécessaires à l'appelant (ex: ["ner"]) ;
+                        vide pour le seul tokenizer
+
+        Returns:
+            Language: Pipeline spaCy partagé
+        """
+        needed = set(components)
+        with self._lock:
+            loaded = self._components.get(model_name)
+            if loaded is not None and needed <= loaded:
+                return self._pipelines[model_name]
+
+            wanted = needed | (loaded or set())
+            if loaded is not None:
+                logger.info(f"Rechargement de {model_name} avec les composants {sorted(wanted)}")
+
+            self._pipelines[model_name] = self._load_pipeline(model_name, wanted)
+            self._components[model_name] = wanted
+            return self._pipelines[model_name]
+
+    def _load_pipeline(self, model_name: str, components: set):
+        exclude = [name for name in KNOWN_COMPONENTS if name not in components and name != "tok2vec"]
+        if not components:
+            exclude.append("tok2vec")
+
+        start_time = time.perf_counter()
+        try:
+            nlp = spacy.load(model_name, exclude=exclude)
+        except OSError:
+            logger.warning(f"Modèle {model_name} non trouvé, téléchargement en cours...")
+            try:
+                spacy.cli.download(model_name)
+                nlp = spacy.load(model_name, exclude=exclude)
+            except Exception as e:
+                logger.error(f"Impossible de charger {model_name} ({e}), utilisation d'un pipeline vide")
+                nlp = spacy.blank(model_name.split("_")[0] if "_" in model_name else "fr")
+
+        # Le tok2vec partagé n'est utile que si un composant conservé l'écoute
+        if "tok2vec" in nlp.pipe_names and "tok2vec" not in components:
+            listeners = getattr(nlp.get_pipe("tok2vec"), "listening_components", None)
+            if listeners is not None and not any(name in nlp.pipe_names for name in listeners):
+                nlp.remove_pipe("tok2vec")
+
+        load_time = time.perf_counter() - start_time
+        with self._stats_lock:
+            self._load_times[model_name] = self._load_times.get(model_name, 0.0) + load_time
+        logger.info(f"Modèle {model_name} chargé en {load_time:.1f}s (composants: {nlp.pipe_names})")
+        return nlp
+
+    def process(self, text: str, model_name: str):
+        """Analyse un texte avec le pipeline partagé (composants chronométrés)"""
+        nlp = self._get(model_name)
+        if not self.profile:
+            start_time = time.perf_counter()
+            doc = nlp(text)
+            self._record(model_name, "pipe", time.perf_counter() - start_time, 1)
+            return doc
+        return next(self._run_profiled(nlp, model_name, [text], 1))
+
+    def pipe(self, texts: Iterable[str], model_name: str, batch_size: Optional[int] = None,
+             n_process: Optional[int] = None) -> Iterator[Any]:
+        """
+        Analyse une série de textes par lots
+
+        En mono-processus, chaque composant est appliqué lot par lot et chronométré ;
+        avec plusieurs processus, `nlp.pipe` répartit les lots et seul le temps total
+        est mesuré.
+
+        Args:
+            texts: Textes à analyser
+            model_name: Nom du modèle
+            batch_size: Taille des lots (défaut: SPACY_PIPE_BATCH_SIZE)
+            n_process: Nombre de processus (défaut: SPACY_PIPE_N_PROCESS)
+
+        Returns:
+            Iterator[Doc]: Documents analysés, dans l'ordre
+        """
+        nlp = self._get(model_name)
+        batch_size = batch_size or self.batch_size
+        n_process = n_process or self.n_process
+
+        if n_process > 1 or not self.profile:
+            return self._run_pipe(nlp, model_name, texts, batch_size, n_process)
+        return self._run_profiled(nlp, model_name, texts, batch_size)
+
+    def _get(self, model_name: str):
+        nlp = self._pipelines.get(model_name)
+        return nlp if nlp is not None else self.load(model_name)
+
+    def _record(self, model_name: str, component: str, elapsed: float, docs: int = 0):
+        with self._stats_lock:
+            self._component_times[model_name][component] += elapsed
+            self._docs[model_name] += docs
+
+    def _run_pipe(self, nlp, model_name: str, texts: Iterable[str], batch_size: int,
+                  n_process: int) -> Iterator[Any]:
+        start_time = time.perf_counter()
+        count = 0
+        for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+            count += 1
+            yield doc
+        self._record(model_name, "pipe", time.perf_counter() - start_time, count)
+
+    def _run_profiled(self, nlp, model_name: str, texts: Iterable[str], batch_size: int) -> Iterator[Any]:
+        for batch in minibatch(texts, size=batch_size):
+            start_time = time.perf_counter()
+            docs = [nlp.make_doc(text) for text in batch]
+            self._record(model_name, "tokenizer", time.perf_counter() - start_time, len(docs))
+
+            for name, component in nlp.pipeline:
+                start_time = time.perf_counter()
+                if hasattr(component, "pipe"):
+                    docs = list(component.pipe(docs, batch_size=batch_size))
+                else:
+                    docs = [component(doc) for doc in docs]
+                self._record(model_name, name, time.perf_counter() - start_time)
+
+            yield from docs
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiques par modèle : composants chargés, temps de chargement,
+        documents traités et temps cumulé par composant (secondes)
+        """
+        with self._stats_lock:
+            return {
+                model_name: {
+                    "components": list(nlp.pipe_names),
+                    "load_time": round(self._load_times.get(model_name, 0.0), 3),
+                    "documents": self._docs[model_name],
+                    "component_times": {
+                        name: round(elapsed, 4)
+                        for name, elapsed in self._component_times[model_name].items()
+                    }
+                }
+                for model_name, nlp in self._pipelines.items()
+            }
+
+
+_server: Optional[SpacyModelServer] = None
+_server_lock = threading.Lock()
+
+
+def get_model_server() -> SpacyModelServer:
+    """Serveur de modèles du processus (créé au premier appel)"""
+    global _server
+    if _server is None:
+        with _server_lock:
+            if _server is None:
+                _server = SpacyModelServer()
+    return _server
@@ -0,0 +1,197 @@
+"""
+Provenance des champs extraits et stockage des résultats de parsing.
+
+Chaque champ de `extracted_data` est associé à l'extracteur qui l'a produit, à la
+version de cet extracteur et, lorsque c'est possible, à sa position dans le texte.
+Les résultats sont conservés avec le texte extrait du document : après une
+évolution des règles d'un extracteur (version incrémentée dans EXTRACTOR_VERSIONS),
+seul cet extracteur est ré-exécuté sur le texte en cache, sans ré-extraire le
+fichier ni relancer les autres composants.
+"""
+
+import json
+import logging
+import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Version de chaque extracteur : à incrémenter à chaque changement de règles ou de
+# modèle, pour que les résultats archivés produits par l'ancienne version soient recalculés
+EXTRACTOR_VERSIONS: Dict[str, str] = {
+    "gpt": "1",
+    "cv_parser": "1",
+    "job_parser": "1",
+    "questionnaire_parser": "1",
+    "sections": "1",
+    "skills": "2",  # Automate d'Aho-Corasick
+    "advanced_nlp": "1",
+    "preferences": "1",
+    "feedback": "1",
+}
+
+# Pseudo-extracteur des valeurs corrigées par un utilisateur : jamais recalculées
+USER_CORRECTION = "user_correction"
+
+
+def extractor_version(extractor: str) -> str:
+    """Version courante d'un extracteur ("0" s'il n'est pas déclaré)"""
+    return EXTRACTOR_VERSIONS.get(extractor, "0")
+
+
+class ProvenanceTracker:
+    """
+    Enregistre la provenance des champs d'un résultat de parsing.
+
+    La provenance est stockée dans le résultat lui-même :
+    - result["provenance"][champ] = {"extractor", "version", "span", "timestamp"}
+    - result["extractor_versions"][extracteur] = version utilisée
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        self.result = result
+        self.provenance: Dict[str, Dict[str, Any]] = result.setdefault("provenance", {})
+        self.versions: Dict[str, str] = result.setdefault("extractor_versions", {})
+        self._text_lower: Optional[str] = None
+
+    def _locate(self, value: Any) -> Optional[List[int]]:
+        """Position d'une valeur simple dans le texte (recherche insensible à la casse)"""
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            return None
+        needle = str(value).strip().lower()
+        if len(needle) < 2:
+            return None
+        if self._text_lower is None:
+            self._text_lower = (self.result.get("original_text") or "").lower()
+        start = self._text_lower.find(needle)
+        return [start, start + len(needle)] if start >= 0 else None
+
+    def span_of(self, value: Any) -> Any:
+        """Position d'une valeur, ou de chaque élément d'une liste de valeurs simples"""
+        if isinstance(value, list):
+            spans = [self._locate(item) for item in value]
+            return spans if any(spans) else None
+        return self._locate(value)
+
+    def is_protected(self, field: str) -> bool:
+        """Un champ corrigé par un utilisateur n'est jamais remplacé par un extracteur"""
+        return self.provenance.get(field, {}).get("extractor") == USER_CORRECTION
+
+    def record(self, field: str, extractor: str, value: Any = None, span: Any = None,
+               version: Optional[str] = None):
+        """Enregistre la provenance d'un champ"""
+        self.provenance[field] = {
+            "extractor": extractor,
+            "version": version or extractor_version(extractor),
+            "span": span if span is not None else self.span_of(value),
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def mark_run(self, extractor: str):
+        """Indique qu'un extracteur a été exécuté (même s'il n'a produit aucun champ)"""
+        self.versions[extractor] = extractor_version(extractor)
+
+    def stale_extractors(self) -> Set[str]:
+        """Extracteurs exécutés avec une version différente de la version courante"""
+        return {name for name, version in self.versions.items() if version != extractor_version(name)}
+
+    def fields_from(self, extractors: Set[str]) -> List[str]:
+        """Champs produits par les extracteurs donnés"""
+        return [field for field, origin in self.provenance.items() if origin.get("extractor") in extractors]
+
+
+class ParseResultStore:
+    """
+    Stockage des résultats de parsing (un fichier JSON par document) et du texte
+    extrait correspondant (fichier texte séparé, relu lors d'un re-parsing).
+    """
+
+    def __init__(self, storage_dir=None):
+        """
+        Args:
+            storage_dir: Répertoire de stockage (optionnel)
+        """
+        if storage_dir:
+            self.storage_dir = Path(storage_dir)
+        else:
+            # Par défaut, à côté des données de feedback
+            self.storage_dir = Path(__file__).resolve().parent.parent.parent / "data" / "parse_results"
+
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+
+    def _json_file(self, doc_id: str) -> Path:
+        return self.storage_dir / f"{doc_id}.json"
+
+    def _text_file(self, doc_id: str) -> Path:
+        return self.storage_dir / f"{doc_id}_text.txt"
+
+    def save(self, result: Dict[str, Any]) -> bool:
+        """Enregistre un résultat (le texte n'est écrit que s'il n'est pas déjà en cache)"""
+        doc_id = result.get("id")
+        if not doc_id:
+            return False
+
+        try:
+            text_file = self._text_file(doc_id)
+            original_text = result.get("original_text")
+            if original_text and not text_file.exists():
+                with open(text_file, 'w', encoding='utf-8') as f:
+                    f.write(original_text)
+
+            record = {key: value for key, value in result.items() if key != "original_text"}
+            record["text_file"] = text_file.name
+            record["stored_at"] = datetime.datetime.now().isoformat()
+
+            tmp_file = self._json_file(doc_id).with_suffix(".json.tmp")
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+            tmp_file.replace(self._json_file(doc_id))
+            return True
+        except Exception as e:
+            logger.error(f"Erreur lors de la sauvegarde du résultat de parsing {doc_id}: {e}")
+            return False
+
+    def load(self, doc_id: str) -> Dict[str, Any]:
+        """Charge un résultat avec son texte extrait (dictionnaire vide si absent)"""
+        json_file = self._json_file(doc_id)
+        if not json_file.exists():
+            logger.warning(f"Résultat de parsing non trouvé: {doc_id}")
+            return {}
+
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+
+            text_file = self.storage_dir / result.pop("text_file", self._text_file(doc_id).name)
+            if text_file.exists():
+                with open(text_file, 'r', encoding='utf-8') as f:
+                    result["original_text"] = f.read()
+            return result
+        except Exception as e:
+            logger.error(f"Erreur lors de la lecture du résultat de parsing {doc_id}: {e}")
+            return {}
+
+    def iter_ids(self) -> Iterator[str]:
+        """Identifiants des documents stockés"""
+        for json_file in sorted(self.storage_dir.glob("*.json")):
+            yield json_file.stem
+
+    def apply_correction(self, doc_id: str, corrected_data: Dict[str, Any], correction_id: str) -> bool:
+        """
+        Reporte une correction utilisateur dans le résultat stocké : les champs
+        corrigés prennent la provenance USER_CORRECTION et ne seront plus recalculés.
+        """
+        result = self.load(doc_id)
+        if not result:
+            return False
+
+        tracker = ProvenanceTracker(result)
+        extracted_data = result.setdefault("extracted_data", {})
+        for field, value in corrected_data.items():
+            if extracted_data.get(field) != value:
+                extracted_data[field] = value
+                tracker.record(field, USER_CORRECTION, value, version=correction_id)
+
+        return self.save(result)
@@ -1,8 +1,9 @@
 import re
-import spacy
 from typing import Dict, List, Any, Optional
 import logging
 
+from app.nlp.model_server import get_model_server
+
 class SectionExtractor:
     """
     Extracteur de sections pour documents CV et offres d'emploi
@@ -14,19 +15,9 @@ class SectionExtractor:
         Args:
             nlp: Modèle spaCy préchargé (optionnel)
         """
-        # Initialiser spaCy si nécessaire
-        if nlp is None:
-            try:
-                self.nlp = spacy.load("fr_core_news_lg")
-            except OSError:
-                try:
-                    spacy.cli.download("fr_core_news_lg")
-                    self.nlp = spacy.load("fr_core_news_lg")
-                except:
-                    self.nlp = None
-                    logging.warning("Impossible de charger spaCy, certaines fonctionnalités seront limitées")
-        else:
-            self.nlp = nlp
+        # Le découpage en sections n'utilise que des règles : le modèle spaCy
+        # (tokenizer seul) n'est chargé que s'il est réellement demandé
+        self._nlp = nlp
         
         # Modèles de titres de section par type de document
         self.cv_section_patterns = {
@@ -92,6 +83,16 @@ class SectionExtractor:
             ]
         }
         
+    @property
+    def nlp(self):
+        """Pipeline spaCy partagé, chargé au premier accès"""
+        if self._nlp is None:
+            try:
+                self._nlp = get_model_server().load("fr_core_news_lg")
+            except Exception as e:
+                logging.warning(f"Impossible de charger spaCy, certaines fonctionnalités seront limitées: {e}")
+        return self._nlp
+    
     def extract_sections(self, text: str, doc_type: str) -> Dict[str, List[str]]:
         """
         Extraction améliorée des sections avec analyse structurelle et sémantique
@@ -2,9 +2,20 @@ import re
 import json
 import os
 from pathlib import Path
+from bisect import bisect_right
 from typing import Dict, List, Set, Any, Optional, Tuple
 import logging
 
+from app.nlp.skill_matcher import SkillMatcher
+
+# Patterns de compétences contextualisées (années d'expérience, versions)
+EXPERIENCE_PATTERNS = [
+    (re.compile(r'(\d+)\s+ans?\s+(?:d\'expérience)?\s+(?:en|avec|de)\s+([a-zA-Z0-9\+\#\.]+)'),
+     lambda m: (m.group(2).lower(), f"{m.group(2)} ({m.group(1)} ans)")),
+    (re.compile(r'([a-zA-Z]+)\s+(\d+\.\d+)'),
+     lambda m: (m.group(1).lower(), f"{m.group(1)} {m.group(2)}"))
+]
+
 class SkillsKnowledgeBase:
     """
     Base de connaissances des compétences avec catégorisation
@@ -32,6 +43,9 @@ class SkillsKnowledgeBase:
         # Fallback avec liste minimale si nécessaire
         if not self.all_skills:
             self._load_fallback_skills()
+        
+        # Compiler l'automate de recherche une fois pour toutes
+        self._build_matcher()
     
     def _load_skills(self, skills_file: str) -> None:
         """
@@ -100,6 +114,53 @@ class SkillsKnowledgeBase:
                 self.all_skills.add(skill.lower())
                 self.skill_to_category[skill.lower()] = category
     
+    def _build_matcher(self) -> None:
+        """
+        Construit l'automate de recherche (compétences et synonymes) et l'index
+        utilisé pour rattacher un fragment (ex: "java 8") à une compétence connue
+        """
+        terms = {}
+        for skill in self.all_skills:
+            terms[skill] = skill
+        for synonym, targets in self.synonyms.items():
+            # Les synonymes sont ramenés à leur compétence principale ; une
+            # compétence principale n'est associée qu'à elle-même
+            main_skill = targets[0].lower() if targets else None
+            if synonym not in self.all_skills and main_skill in self.all_skills:
+                terms.setdefault(synonym, main_skill)
+        self.matcher = SkillMatcher(terms)
+        
+        # Toutes les compétences concaténées : une recherche de sous-chaîne sur
+        # l'ensemble de la taxonomie se fait en un seul str.find
+        skills = sorted(self.all_skills)
+        self._skills_blob = "\n".join(skills)
+        self._skills_offsets = []
+        offset = 0
+        for skill in skills:
+            self._skills_offsets.append(offset)
+            offset += len(skill) + 1
+        self._skills_sorted = skills
+        self._fragment_categories = {}
+    
+    def _category_for_fragment(self, fragment: str) -> Optional[str]:
+        """
+        Catégorie de la première compétence contenant le fragment, None si aucune
+        """
+        if fragment in self._fragment_categories:
+            return self._fragment_categories[fragment]
+        
+        category = None
+        if fragment and "\n" not in fragment:
+            position = self._skills_blob.find(fragment)
+            if position >= 0:
+                skill = self._skills_sorted[bisect_right(self._skills_offsets, position) - 1]
+                category = self.skill_to_category.get(skill, "autres")
+        
+        if len(self._fragment_categories) >= 10000:
+            self._fragment_categories.clear()
+        self._fragment_categories[fragment] = category
+        return category
+    
     def extract_skills(self, text: str) -> Dict[str, List[str]]:
         """
         Extrait les compétences du texte avec catégorisation
@@ -110,48 +171,29 @@ class SkillsKnowledgeBase:
         Returns:
             Dict: Compétences par catégorie
         """
-        text_lower = text.lower()
         found_skills = {}
         
-        # Extraction des compétences exactes
-        for skill in self.all_skills:
-            # Recherche de la compétence avec une frontière de mot
-            if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-                category = self.skill_to_category.get(skill, "autres")
-                if category not in found_skills:
-                    found_skills[category] = []
-                
-                # Normaliser vers la compétence principale si c'est un synonyme
-                if skill in self.synonyms and self.synonyms[skill]:
-                    main_skill = self.synonyms[skill][0]
-                    if main_skill not in found_skills[category]:
-                        found_skills[category].append(main_skill)
-                else:
-                    if skill not in found_skills[category]:
-                        found_skills[category].append(skill)
+        def add_skill(category: str, skill: str) -> None:
+            if category not in found_skills:
+                found_skills[category] = []
+            if skill not in found_skills[category]:
+                found_skills[category].append(skill)
         
-        # Recherche de patterns spécifiques (versions, années d'expérience)
-        experience_patterns = [
-            (r'(\d+)\s+ans?\s+(?:d\'expérience)?\s+(?:en|avec|de)\s+([a-zA-Z0-9\+\#\.]+)',
-             lambda m: (m.group(2).lower(), f"{m.group(2)} ({m.group(1)} ans)")),
-            (r'([a-zA-Z]+)\s+(\d+\.\d+)', 
-             lambda m: (m.group(1).lower(), f"{m.group(1)} {m.group(2)}"))
-        ]
+        # Extraction des compétences exactes et synonymes en une seule passe
+        for match in self.matcher.find_all(text):
+            canonical = match.value
+            add_skill(self.skill_to_category.get(canonical, "autres"), canonical)
         
-        for pattern, formatter in experience_patterns:
-            for match in re.finditer(pattern, text_lower):
+        # Recherche de patterns spécifiques (versions, années d'expérience)
+        text_lower = text.lower()
+        for pattern, formatter in EXPERIENCE_PATTERNS:
+            for match in pattern.finditer(text_lower):
                 skill_base, formatted_skill = formatter(match)
                 
-                # Vérifier si c'est une compétence connue
-                if any(skill_base in skill for skill in self.all_skills):
-                    category = next((self.skill_to_category.get(skill) for skill in self.all_skills 
-                                    if skill_base in skill), "autres")
-                    
-                    if category not in found_skills:
-                        found_skills[category] = []
-                    
-                    if formatted_skill not in found_skills[category]:
-                        found_skills[category].append(formatted_skill)
+                # Vérifier si c'est une compétence connue (ou une partie d'une compétence)
+                category = self._category_for_fragment(skill_base)
+                if category is not None:
+                    add_skill(category, formatted_skill)
         
         return found_skills
     
@@ -5,7 +5,6 @@ import logging
 from pathlib import Path
 import json
 import re
-import spacy
 import xgboost as xgb
 from sklearn.preprocessing import StandardScaler
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -13,6 +12,8 @@ from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.model_selection import train_test_split, GridSearchCV
 import shap
 
+from app.nlp.model_server import get_model_server
+
 class XGBoostMatchingEngine:
     """
     Moteur de matching avancé basé sur XGBoost pour la recommandation
@@ -48,17 +49,20 @@ class XGBoostMatchingEngine:
         # Scaler pour normaliser les features numériques
         self.scaler = StandardScaler()
         
-        # Modèle spaCy pour l'analyse linguistique
-        try:
-            self.nlp = spacy.load("fr_core_news_md")
-        except:
-            self.logger.warning("Modèle fr_core_news_md non trouvé, téléchargement en cours...")
-            spacy.cli.download("fr_core_news_md")
-            self.nlp = spacy.load("fr_core_news_md")
+        # Modèle spaCy pour l'analyse linguistique (partagé, chargé au premier accès :
+        # les similarités sont calculées par TF-IDF)
+        self._nlp = None
         
         # Initialisation de l'explainer SHAP
         self.explainer = None
     
+    @property
+    def nlp(self):
+        """Pipeline spaCy partagé (fr_core_news_md, vecteurs et tokenizer uniquement)"""
+        if self._nlp is None:
+            self._nlp = get_model_server().load("fr_core_news_md")
+        return self._nlp
+    
     def load_matching_config(self, config_path=None):
         """
         Charge les paramètres de configuration pour le matching
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark du calcul des embeddings de documents (BERTExtractor) sur CPU :
+une séquence à la fois (ancienne implémentation) contre des lots regroupés par longueur.
+
+Les caches mémoire et disque sont désactivés pour mesurer le seul calcul.
+
+Usage:
+    python scripts/benchmark_embeddings.py [--docs 64] [--batch-sizes 1 8 16 32] [--threads 4]
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import settings
+
+
+def generate_documents(count, rng):
+    """Génère des CV synthétiques de longueurs variées (une à plusieurs séquences)"""
+    vocabulary = ("expérience projet équipe client développement gestion mission analyse "
+                  "conception python java cloud données management agile réalisation").split()
+    return [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(50, 900)))
+        for _ in range(count)
+    ]
+
+
+def run(doc_count, batch_sizes, threads, seed=42):
+    settings.BERT_EMBEDDING_STORE_ENABLED = False
+    settings.BERT_EMBEDDING_CACHE_MB = 0
+    if threads:
+        settings.BERT_TORCH_THREADS = threads
+
+    from app.nlp.advanced_nlp import BERTExtractor
+
+    extractor = BERTExtractor()
+    if not extractor.available or not extractor._load_embedder():
+        print("transformers / PyTorch indisponible")
+        return
+
+    documents = generate_documents(doc_count, random.Random(seed))
+    print(f"{'taille de lot':>14} {'docs/s':>10} {'accélération':>13}")
+    baseline = None
+    for batch_size in batch_sizes:
+        settings.BERT_EMBED_BATCH_SIZE = batch_size
+        start = time.perf_counter()
+        extractor.get_document_embeddings_batch(documents)
+        rate = doc_count / (time.perf_counter() - start)
+        baseline = baseline or rate
+        print(f"{batch_size:>14} {rate:>10.2f} {rate / baseline:>12.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark des embeddings de documents")
+    parser.add_argument("--docs", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16, 32])
+    parser.add_argument("--threads", type=int, default=0)
+    args = parser.parse_args()
+    run(args.docs, args.batch_sizes, args.threads)
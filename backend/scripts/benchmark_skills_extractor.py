@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de l'extraction de compétences : une regex par compétence (ancienne
+implémentation) contre l'automate d'Aho-Corasick, en fonction de la taille de la taxonomie.
+
+Usage:
+    python scripts/benchmark_skills_extractor.py [--sizes 100 1000 5000] [--docs 50]
+"""
+
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.nlp.skills_extractor import SkillsKnowledgeBase
+from app.nlp.skill_matcher import SkillMatcher
+
+
+def generate_taxonomy(base_skills, size, rng):
+    """Complète la taxonomie réelle avec des compétences synthétiques"""
+    skills = list(base_skills)[:size]
+    syllables = ["data", "cloud", "net", "soft", "lab", "flow", "base", "stack", "ops", "script"]
+    while len(skills) < size:
+        words = rng.randint(1, 3)
+        skills.append(" ".join(
+            "".join(rng.choice(syllables) for _ in range(rng.randint(1, 2))) + str(rng.randint(0, 99))
+            for _ in range(words)
+        ))
+    return skills
+
+
+def generate_documents(skills, count, rng, words_per_doc=600):
+    """Génère des CV synthétiques mêlant texte courant et compétences"""
+    filler = ("expérience projet équipe client développement gestion mission analyse "
+              "conception réalisation suivi amélioration performance").split()
+    documents = []
+    for _ in range(count):
+        words = [rng.choice(skills) if rng.random() < 0.08 else rng.choice(filler)
+                 for _ in range(words_per_doc)]
+        documents.append(" ".join(words))
+    return documents
+
+
+def regex_extract(skills, text):
+    """Ancienne implémentation : une regex par compétence"""
+    text_lower = text.lower()
+    return {skill for skill in skills if re.search(r'\b' + re.escape(skill) + r'\b', text_lower)}
+
+
+def run(sizes, doc_count, seed=42):
+    rng = random.Random(seed)
+    base_skills = sorted(SkillsKnowledgeBase().all_skills)
+
+    print(f"{'compétences':>12} {'regex (docs/s)':>16} {'automate (docs/s)':>18} {'accélération':>13} {'construction':>13}")
+    for size in sizes:
+        skills = generate_taxonomy(base_skills, size, rng)
+        documents = generate_documents(skills, doc_count, rng)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher({skill: skill for skill in skills})
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for document in documents:
+            regex_extract(skills, document)
+        regex_rate = doc_count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for document in documents:
+            matcher.find_all(document)
+        matcher_rate = doc_count / (time.perf_counter() - start)
+
+        print(f"{size:>12} {regex_rate:>16.1f} {matcher_rate:>18.1f} "
+              f"{matcher_rate / regex_rate:>12.1f}x {build_time * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de l'extraction de compétences")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 5000])
+    parser.add_argument("--docs", type=int, default=50)
+    args = parser.parse_args()
+    run(args.sizes, args.docs)
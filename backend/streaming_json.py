@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sérialisation JSON en flux pour les gros résultats de matching
+==============================================================
+Les réponses de matching en lot sont produites élément par élément au lieu
+d'être construites entièrement en mémoire puis sérialisées d'un bloc :
+
+- NDJSON (application/x-ndjson) : une ligne d'en-tête, une ligne par élément,
+  une ligne de pied ;
+- tableau JSON par morceaux (application/json) : le document final est
+  identique à la réponse classique, mais le tableau est écrit au fil de l'eau
+  et envoyé par morceaux d'environ `chunk_size` octets, ou plus tôt si
+  `flush_interval` secondes se sont écoulées depuis le dernier envoi.
+
+L'encodage utilise orjson lorsqu'il est installé (json de la bibliothèque
+standard sinon).
+
+Copie de data-adapter/streaming_json.py (les services sont construits séparément).
+"""
+
+import json
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+# Modes de sortie
+MODE_NDJSON = "ndjson"
+MODE_JSON_STREAM = "json-stream"
+
+# Taille cible des morceaux envoyés au client
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Délai maximal (secondes) pendant lequel des éléments restent dans le tampon
+DEFAULT_FLUSH_INTERVAL = 0.05
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode un objet en JSON compact (UTF-8)"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def negotiate_mode(accept: Optional[str] = None, format: Optional[str] = None,
+                   default: Optional[str] = None) -> Optional[str]:
+    """
+    Choisit le mode de sortie à partir du paramètre `format` (prioritaire)
+    ou de l'en-tête Accept.
+
+    Returns:
+        MODE_NDJSON, MODE_JSON_STREAM, ou `default` (None = réponse classique)
+    """
+    if format:
+        format = format.lower()
+        if format in (MODE_NDJSON, "jsonl"):
+            return MODE_NDJSON
+        if format in (MODE_JSON_STREAM, "stream"):
+            return MODE_JSON_STREAM
+        if format == "json":
+            return None
+    if accept and (NDJSON_MEDIA_TYPE in accept or "application/jsonl" in accept):
+        return MODE_NDJSON
+    return default
+
+
+def media_type_for(mode: str) -> str:
+    """Type MIME associé à un mode de sortie"""
+    return NDJSON_MEDIA_TYPE if mode == MODE_NDJSON else JSON_MEDIA_TYPE
+
+
+def iter_ndjson(items: Iterable[Any], header: Optional[Dict[str, Any]] = None,
+                footer: Optional[Callable[[], Dict[str, Any]]] = None) -> Iterator[bytes]:
+    """
+    Sérialise des éléments en NDJSON (une ligne par élément).
+
+    Args:
+        items: Éléments à sérialiser (itérateur consommé au fil de l'eau)
+        header: Métadonnées envoyées en première ligne (optionnel)
+        footer: Fonction appelée après le dernier élément ; son résultat est
+            envoyé en dernière ligne (statistiques calculées pendant le flux)
+    """
+    if header is not None:
+        yield dumps(header) + b"\n"
+    for item in items:
+        yield dumps(item) + b"\n"
+    if footer is not None:
+        yield dumps(footer()) + b"\n"
+
+
+def iter_json_document(envelope: Dict[str, Any], array_path: Sequence[str], items: Iterable[Any],
+                       footer: Optional[Callable[[], Dict[str, Any]]] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       flush_interval: float = DEFAULT_FLUSH_INTERVAL) -> Iterator[bytes]:
+    """
+    Sérialise un document JSON dont un tableau est produit au fil de l'eau.
+
+    Args:
+        envelope: Document sans le tableau (les clés de `array_path` menant au
+            tableau sont créées si besoin)
+        array_path: Chemin du tableau dans le document, ex. ("results",) ou
+            ("matching_results", "matches")
+        items: Éléments du tableau
+        footer: Fonction appelée après le dernier élément ; les clés retournées
+            sont ajoutées à la fin du document (niveau racine)
+        chunk_size: Taille approximative des morceaux produits
+        flush_interval: Délai au-delà duquel le tampon est envoyé sans
+            attendre `chunk_size` octets. Le premier élément est envoyé dès
+            qu'il est produit ; le délai est vérifié à l'arrivée de chaque
+            élément (un producteur lent envoie donc chaque élément aussitôt)
+    """
+    # Le tableau est remplacé par un marqueur unique, puis le document est
+    # coupé en deux autour de ce marqueur
+    marker = f"__stream_{uuid.uuid4().hex}__"
+    document = dict(envelope)
+    node = document
+    for key in array_path[:-1]:
+        node[key] = dict(node.get(key) or {})
+        node = node[key]
+    node[array_path[-1]] = marker
+
+    prefix, suffix = dumps(document).split(dumps(marker), 1)
+
+    buffer = bytearray(prefix)
+    buffer += b"["
+    first = True
+    last_flush = None
+    for item in items:
+        if not first:
+            buffer += b","
+        buffer += dumps(item)
+        first = False
+        now = time.monotonic()
+        if len(buffer) >= chunk_size or last_flush is None or now - last_flush >= flush_interval:
+            yield bytes(buffer)
+            buffer.clear()
+            last_flush = now
+    buffer += b"]"
+
+    if footer is not None:
+        extra = footer()
+        if extra:
+            # La racine contient au moins le tableau : les clés du pied sont
+            # insérées avant son accolade fermante
+            suffix = suffix[:-1] + b"," + dumps(extra)[1:]
+    buffer += suffix
+    yield bytes(buffer)
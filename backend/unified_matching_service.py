@@ -30,7 +30,7 @@ import sys
 import json
 import time
 import logging
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from typing import Dict, List, Any, Optional
 
@@ -59,6 +59,11 @@ except ImportError as e:
     V3_AVAILABLE = False
     logger.warning(f"⚠️ V3 unavailable, using basic fallback: {str(e)}")
 
+try:
+    from backend import streaming_json
+except ImportError:
+    import streaming_json
+
 app = Flask(__name__)
 CORS(app)
 
@@ -365,7 +370,25 @@ def api_match():
         )
         
         status_code = 200 if result.get("success", False) else 500
-        return jsonify(result), status_code
+        
+        # Résultats envoyés en flux (tableau JSON par morceaux, ou NDJSON à la demande)
+        mode = streaming_json.negotiate_mode(
+            accept=request.headers.get('Accept'),
+            format=request.args.get('format'),
+            default=streaming_json.MODE_JSON_STREAM
+        )
+        if mode is None or status_code != 200:
+            return jsonify(result), status_code
+        
+        matching_results = dict(result.get("matching_results") or {})
+        matches = matching_results.pop("matches", [])
+        envelope = {**result, "matching_results": matching_results}
+        
+        if mode == streaming_json.MODE_NDJSON:
+            body = streaming_json.iter_ndjson(matches, header=envelope)
+        else:
+            body = streaming_json.iter_json_document(envelope, ("matching_results", "matches"), matches)
+        return Response(body, status=status_code, mimetype=streaming_json.media_type_for(mode))
         
     except Exception as e:
         logger.error(f"API error: {str(e)}")
@@ -15,7 +15,9 @@ from app.core.config import settings
 from app.core.dependencies import validate_api_key, RateLimiter
 from app.services.storage import save_temp_file, get_file_from_storage, get_result_multi_tier
 from app.utils.validation import validate_cv_file, validate_webhook_url
-from app.workers.tasks import parse_cv_task
+from app.workers.tasks import parse_cv_task, parse_cv_batch_task
+from app.services.batch_parser import chunk_documents
+from app.services.llm_cache import METRICS_KEY
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -186,6 +188,178 @@ async def queue_cv_parsing(
             detail=f"Erreur lors de la mise en queue du job: {str(e)}"
         )
 
+@router.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def queue_cv_batch_parsing(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    job_size: int = Query(None, ge=1, le=200, description="Nombre de documents par job (défaut: BATCH_JOB_SIZE)"),
+    webhook_url: Optional[str] = Query(None, description="URL notifiée à la fin du batch"),
+    webhook_secret: Optional[str] = Query(None, description="Secret pour signer le webhook"),
+    api_key: Optional[str] = Header(None, description="Clé API pour authentification"),
+    rate_limiter: bool = Depends(RateLimiter(limit=2, window=60)),  # 2 batchs/min
+):
+    """File d'attente pour le parsing d'un lot de CV - Regroupe les documents en jobs sur la queue batch"""
+    
+    if settings.REQUIRE_API_KEY:
+        validate_api_key(api_key)
+    
+    if len(files) > settings.BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Trop de fichiers ({len(files)}), maximum: {settings.BATCH_MAX_FILES}"
+        )
+    
+    try:
+        batch_id = str(uuid.uuid4())
+        queue_config = QUEUE_PRIORITIES["batch"]
+        queue = queues["batch"]
+        
+        if webhook_url:
+            webhook_url = validate_webhook_url(webhook_url)
+        
+        # 1. Valider et stocker chaque fichier, un job_id par document
+        documents = []
+        for file in files:
+            await validate_cv_file(file)
+            job_id = str(uuid.uuid4())
+            file_path = await save_temp_file(file, job_id)
+            documents.append({
+                "job_id": job_id,
+                "file_path": file_path,
+                "file_name": file.filename,
+                "file_format": os.path.splitext(file.filename)[1].lower()
+            })
+        
+        # 2. Initialiser la progression avant l'enqueue pour éviter toute course avec les workers
+        redis_conn.hset(
+            f"cv:batch:{batch_id}",
+            mapping={
+                "status": "queued",
+                "total": len(documents),
+                "completed": 0,
+                "failed": 0,
+                "queued_at": time.time(),
+                "client_ip": request.client.host
+            }
+        )
+        redis_conn.expire(f"cv:batch:{batch_id}", settings.BATCH_PROGRESS_TTL)
+        
+        # 3. Regrouper les documents en jobs de N documents
+        groups = chunk_documents(documents, job_size or settings.BATCH_JOB_SIZE)
+        rq_job_ids = []
+        for group in groups:
+            job = queue.enqueue(
+                parse_cv_batch_task,
+                kwargs={
+                    "batch_id": batch_id,
+                    "documents": group,
+                    "webhook_url": webhook_url,
+                    "webhook_secret": webhook_secret
+                },
+                job_timeout=queue_config["timeout"],
+                result_ttl=queue_config["ttl"],
+                failure_ttl=queue_config["ttl"],
+                ttl=queue_config["ttl"]
+            )
+            rq_job_ids.append(job.id)
+        
+        redis_conn.hset(f"cv:batch:{batch_id}", "jobs", ",".join(rq_job_ids))
+        
+        logger.info(f"Batch {batch_id} mis en queue: {len(documents)} documents en {len(groups)} jobs")
+        
+        return {
+            "batch_id": batch_id,
+            "status": "queued",
+            "total": len(documents),
+            "jobs": len(groups),
+            "documents": [
+                {"job_id": document["job_id"], "file_name": document["file_name"]}
+                for document in documents
+            ],
+            "estimated_wait": get_estimated_wait_time("batch"),
+            "webhook_configured": webhook_url is not None
+        }
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.warning(f"Erreur de validation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de la mise en queue du batch: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la mise en queue du batch: {str(e)}"
+        )
+
+@router.get("/batch/{batch_id}", status_code=status.HTTP_200_OK)
+async def get_batch_progress(
+    batch_id: str,
+    api_key: Optional[str] = Header(None, description="Clé API pour authentification"),
+):
+    """Récupérer la progression d'un batch de parsing CV"""
+    
+    if settings.REQUIRE_API_KEY:
+        validate_api_key(api_key)
+    
+    progress = redis_conn.hgetall(f"cv:batch:{batch_id}")
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Aucun batch trouvé pour l'ID: {batch_id}"
+        )
+    
+    progress = {key.decode(): value.decode() for key, value in progress.items()}
+    total = int(progress.get("total", 0))
+    completed = int(progress.get("completed", 0))
+    failed = int(progress.get("failed", 0))
+    
+    if total and completed + failed >= total:
+        batch_status = "done"
+    elif completed + failed > 0:
+        batch_status = "running"
+    else:
+        batch_status = progress.get("status", "queued")
+    
+    return {
+        "batch_id": batch_id,
+        "status": batch_status,
+        "total": total,
+        "completed": completed,
+        "failed": failed,
+        "progress": round((completed + failed) / total * 100, 1) if total else 0.0,
+        "jobs": len(progress["jobs"].split(",")) if progress.get("jobs") else 0
+    }
+
+@router.get("/llm/stats", status_code=status.HTTP_200_OK)
+async def get_llm_stats(
+    api_key: Optional[str] = Header(None, description="Clé API pour authentification"),
+):
+    """Statistiques agrégées des appels LLM (tokens, latence, taux de cache)"""
+    
+    if settings.REQUIRE_API_KEY:
+        validate_api_key(api_key)
+    
+    counters = {key.decode(): int(value) for key, value in redis_conn.hgetall(METRICS_KEY).items()}
+    calls = counters.get("calls", 0)
+    hits = counters.get("cache_hits", 0)
+    
+    return {
+        "backend": settings.LLM_BACKEND,
+        "model": settings.OPENAI_MODEL,
+        "calls": calls,
+        "cache_hits": hits,
+        "cache_hit_rate": round(hits / (calls + hits), 3) if calls + hits else 0.0,
+        "tokens_in": counters.get("tokens_in", 0),
+        "tokens_out": counters.get("tokens_out", 0),
+        "avg_latency_ms": round(counters.get("latency_ms", 0) / calls, 1) if calls else 0.0,
+        "errors": counters.get("errors", 0),
+        "by_namespace": {key: value for key, value in counters.items() if ":" in key}
+    }
+
 @router.get("/result/{job_id}", status_code=status.HTTP_200_OK)
 async def get_parsing_result(
     job_id: str,
@@ -45,6 +45,47 @@ class Settings(BaseSettings):
     JOB_TTL: int = Field(default=3600, env="JOB_TTL")  # 1 heure
     MAX_RETRIES: int = Field(default=3, env="MAX_RETRIES")
     
+    # Parsing batch
+    BATCH_MAX_FILES: int = Field(default=500, env="BATCH_MAX_FILES")  # Fichiers max par requête batch
+    BATCH_JOB_SIZE: int = Field(default=20, env="BATCH_JOB_SIZE")  # Documents par job RQ
+    BATCH_EXTRACTION_WORKERS: int = Field(default=4, env="BATCH_EXTRACTION_WORKERS")  # Threads d'extraction de texte
+    BATCH_LLM_MAX_CHARS: int = Field(default=12000, env="BATCH_LLM_MAX_CHARS")  # Budget de caractères par requête LLM groupée
+    BATCH_LLM_MAX_DOCS: int = Field(default=4, env="BATCH_LLM_MAX_DOCS")  # CV max par requête LLM groupée
+    BATCH_PROGRESS_TTL: int = Field(default=172800, env="BATCH_PROGRESS_TTL")  # 48 heures
+    
+    # Limite de débit globale vers le fournisseur LLM (partagée entre workers)
+    LLM_RATE_LIMIT_ENABLED: bool = Field(default=True, env="LLM_RATE_LIMIT_ENABLED")
+    LLM_RATE_LIMIT_PER_SECOND: float = Field(default=5.0, env="LLM_RATE_LIMIT_PER_SECOND")
+    LLM_RATE_LIMIT_BURST: int = Field(default=10, env="LLM_RATE_LIMIT_BURST")
+    LLM_RATE_LIMIT_RESERVE_STANDARD: float = Field(default=2, env="LLM_RATE_LIMIT_RESERVE_STANDARD")  # Jetons laissés au premium
+    LLM_RATE_LIMIT_RESERVE_BATCH: float = Field(default=5, env="LLM_RATE_LIMIT_RESERVE_BATCH")  # Jetons laissés au premium/standard
+    LLM_RATE_LIMIT_MAX_WAIT: float = Field(default=120.0, env="LLM_RATE_LIMIT_MAX_WAIT")  # secondes
+    
+    # Analyse des CV longs par sections (au lieu d'une troncature à 15 000 caractères)
+    # Désactivée par défaut : le seuil n'a pas encore été validé sur un corpus de CV réels
+    CV_CHUNKED_PARSING: bool = Field(default=False, env="CV_CHUNKED_PARSING")
+    CV_CHUNK_THRESHOLD: int = Field(default=8000, env="CV_CHUNK_THRESHOLD")  # Caractères au-delà desquels le CV est découpé
+    CV_CHUNK_MAX_CHARS: int = Field(default=6000, env="CV_CHUNK_MAX_CHARS")  # Taille maximale d'un morceau
+    CV_CHUNK_MAX_CHUNKS: int = Field(default=8, env="CV_CHUNK_MAX_CHUNKS")
+    CV_CHUNK_WORKERS: int = Field(default=4, env="CV_CHUNK_WORKERS")  # Morceaux analysés en parallèle
+    
+    # Cache des réponses LLM et backend d'analyse
+    LLM_BACKEND: str = Field(default="openai", env="LLM_BACKEND")  # openai | mock (tests, benchmarks)
+    LLM_MOCK_LATENCY: float = Field(default=0.0, env="LLM_MOCK_LATENCY")  # secondes simulées par appel mock
+    LLM_CACHE_ENABLED: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    LLM_CACHE_TTL: int = Field(default=2592000, env="LLM_CACHE_TTL")  # 30 jours
+    
+    # Worker concurrent (WORKER_MODE=concurrent)
+    WORKER_MODE: str = Field(default="classic", env="WORKER_MODE")  # classic | concurrent
+    WORKER_MAX_CONCURRENT_JOBS: int = Field(default=8, env="WORKER_MAX_CONCURRENT_JOBS")
+    WORKER_CPU_PROCESSES: int = Field(default=2, env="WORKER_CPU_PROCESSES")  # Pool d'extraction (0 = désactivé)
+    WORKER_QUEUE_WEIGHTS: Dict[str, int] = Field(
+        default={"cv_parsing_premium": 6, "cv_parsing_standard": 3, "cv_parsing_batch": 1},
+        env="WORKER_QUEUE_WEIGHTS"
+    )
+    WORKER_BATCH_MAX_SHARE: float = Field(default=0.5, env="WORKER_BATCH_MAX_SHARE")  # Part max des slots pour la queue batch
+    WORKER_POLL_INTERVAL: float = Field(default=0.5, env="WORKER_POLL_INTERVAL")  # secondes
+    
     # Circuit breaker settings
     CIRCUIT_BREAKER_ENABLED: bool = Field(default=True, env="CIRCUIT_BREAKER_ENABLED")
     CIRCUIT_BREAKER_THRESHOLD: int = Field(default=5, env="CIRCUIT_BREAKER_THRESHOLD")
@@ -72,6 +113,9 @@ class Settings(BaseSettings):
     
     # Multi-tier storage
     LARGE_RESULT_THRESHOLD: int = Field(default=100 * 1024, env="LARGE_RESULT_THRESHOLD")  # 100KB
+    RESULT_STORAGE_WORKERS: int = Field(default=8, env="RESULT_STORAGE_WORKERS")  # Écritures parallèles Redis/MinIO
+    RESULT_DB_BATCH_SIZE: int = Field(default=50, env="RESULT_DB_BATCH_SIZE")  # Upserts PostgreSQL regroupés (worker concurrent)
+    RESULT_DB_FLUSH_INTERVAL: float = Field(default=0.2, env="RESULT_DB_FLUSH_INTERVAL")  # secondes, attente max d'un job avant l'upsert
     
     # Logging
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
@@ -0,0 +1,149 @@
+# CV Parser Service - Parsing de CV par lots
+
+import time
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+
+from app.core.config import settings
+from app.services.storage import get_file_from_storage
+from app.services.parser import (
+    extract_text_with_io_stats, preprocess_cv_text, postprocess_cv_data,
+    analyze_cv_batch_with_gpt
+)
+from app.services.mock_parser import get_mock_cv_data
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+def chunk_documents(documents: List[Dict[str, Any]], size: int) -> List[List[Dict[str, Any]]]:
+    """Découpe une liste de documents en groupes de `size` documents (un groupe = un job RQ)
+
+    Args:
+        documents: Descripteurs de documents (job_id, file_path, file_name, file_format)
+        size: Nombre de documents par groupe
+
+    Returns:
+        List[List[Dict[str, Any]]]: Groupes de documents
+    """
+    size = max(1, size)
+    return [documents[i:i + size] for i in range(0, len(documents), size)]
+
+def pack_texts_for_llm(texts: List[str], max_chars: Optional[int] = None,
+                       max_docs: Optional[int] = None) -> List[List[int]]:
+    """Regroupe les CV courts pour réduire le nombre d'appels LLM
+
+    Les textes sont ajoutés dans l'ordre à la requête courante tant que le budget
+    de caractères et le nombre maximum de CV le permettent. Un CV qui dépasse à lui
+    seul le budget est analysé seul.
+
+    Args:
+        texts: Textes des CV
+        max_chars: Budget de caractères par requête
+        max_docs: Nombre maximum de CV par requête
+
+    Returns:
+        List[List[int]]: Groupes d'indices dans `texts`
+    """
+    max_chars = max_chars or settings.BATCH_LLM_MAX_CHARS
+    max_docs = max_docs or settings.BATCH_LLM_MAX_DOCS
+
+    groups: List[List[int]] = []
+    current: List[int] = []
+    current_chars = 0
+
+    for index, text in enumerate(texts):
+        length = len(text)
+
+        if length >= max_chars:
+            groups.append([index])
+            continue
+
+        if current and (current_chars + length > max_chars or len(current) >= max_docs):
+            groups.append(current)
+            current, current_chars = [], 0
+
+        current.append(index)
+        current_chars += length
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+def extract_document_text(document: Dict[str, Any]) -> str:
+    """Récupère un document depuis le stockage et en extrait le texte prétraité
+
+    Args:
+        document: Descripteur du document (file_path, file_format)
+
+    Returns:
+        str: Texte prétraité du CV
+    """
+    file_obj = get_file_from_storage(document["file_path"])
+
+    # Extraction directe depuis le contenu en mémoire, sans fichier temporaire
+    try:
+        content = file_obj.read()
+    finally:
+        if hasattr(file_obj, 'close'):
+            file_obj.close()
+        if hasattr(file_obj, 'release_conn'):
+            file_obj.release_conn()
+
+    text, _ = extract_text_with_io_stats(content, document["file_format"])
+    return preprocess_cv_text(text)
+
+def extract_texts_parallel(documents: List[Dict[str, Any]],
+                           max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Extrait le texte de plusieurs documents en parallèle
+
+    L'extraction est dominée par les E/S (MinIO, disque, outils externes), un pool
+    de threads suffit à recouvrir les attentes.
+
+    Args:
+        documents: Descripteurs de documents
+        max_workers: Nombre de threads d'extraction
+
+    Returns:
+        List[Dict[str, Any]]: Pour chaque document (dans l'ordre) : text, error, extraction_time
+    """
+    max_workers = max_workers or settings.BATCH_EXTRACTION_WORKERS
+
+    def _extract(document: Dict[str, Any]) -> Dict[str, Any]:
+        start_time = time.time()
+        try:
+            text = extract_document_text(document)
+            return {"text": text, "error": None, "extraction_time": time.time() - start_time}
+        except Exception as e:
+            logger.error(f"Échec de l'extraction pour {document.get('file_name')}: {str(e)}")
+            logger.debug(traceback.format_exc())
+            return {"text": None, "error": str(e), "extraction_time": time.time() - start_time}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_extract, documents))
+
+def analyze_texts(texts: List[str], file_names: List[str]) -> List[Dict[str, Any]]:
+    """Analyse une série de textes de CV en regroupant les CV courts par requête LLM
+
+    Args:
+        texts: Textes prétraités
+        file_names: Noms des fichiers correspondants (pour le mock parser)
+
+    Returns:
+        List[Dict[str, Any]]: Données structurées, une entrée par texte, dans l'ordre
+    """
+    if settings.USE_MOCK_PARSER:
+        return [get_mock_cv_data(text, name) for text, name in zip(texts, file_names)]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+    groups = pack_texts_for_llm(texts)
+    logger.info(f"{len(texts)} CV regroupés en {len(groups)} requêtes LLM")
+
+    for group in groups:
+        group_results = analyze_cv_batch_with_gpt([texts[i] for i in group])
+        for index, parsed_data in zip(group, group_results):
+            results[index] = postprocess_cv_data(parsed_data, texts[index])
+
+    return results
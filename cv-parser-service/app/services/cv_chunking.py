@@ -0,0 +1,230 @@
+# CV Parser Service - Découpage des CV longs par section et fusion des résultats partiels
+
+import re
+import logging
+from typing import Dict, Any, List, Tuple, Callable
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Titres de section d'un CV (mêmes familles que backend/app/nlp/section_extractor.py)
+CV_SECTION_PATTERNS = {
+    "experience": [
+        r"exp[ée]riences?(\s+professionnelles?)?", r"parcours\s+professionnel",
+        r"carri[èe]re(\s+professionnelle)?", r"emplois?\s+pr[ée]c[ée]dents?",
+        r"work\s+experience", r"professional\s+experience", r"employment"
+    ],
+    "education": [
+        r"[ée]ducation", r"formations?", r"cursus", r"parcours\s+acad[ée]mique",
+        r"dipl[ôo]mes?", r"[ée]tudes", r"scolarit[ée]"
+    ],
+    "skills": [
+        r"comp[ée]tences?", r"aptitudes?", r"savoir[\s-]faire", r"qualifications?",
+        r"connaissances?", r"expertise", r"outils", r"technologies", r"logiciels?", r"skills"
+    ],
+    "languages": [
+        r"langues?", r"comp[ée]tences?\s+linguistiques?", r"niveau\s+de\s+langue", r"languages"
+    ],
+    "interests": [
+        r"centres?\s+d'int[ée]r[êe]ts?", r"loisirs?", r"hobbies?", r"passions?",
+        r"activit[ée]s\s+extra[\s-]professionnelles?"
+    ],
+    "profile": [
+        r"profil", r"[àa]\s+propos(\s+de\s+moi)?", r"r[ée]sum[ée]", r"pr[ée]sentation",
+        r"objectifs?(\s+professionnels?)?", r"projet\s+professionnel", r"summary"
+    ],
+    "contact": [
+        r"coordonn[ée]es?", r"contact", r"informations?\s+personnelles?"
+    ]
+}
+
+_SECTION_RE = [
+    (section, re.compile(r"^\W*(?:" + "|".join(patterns) + r")\b[\s:\-–]*$", re.IGNORECASE))
+    for section, patterns in CV_SECTION_PATTERNS.items()
+]
+
+def _section_of_heading(line: str) -> str:
+    """Retourne le type de section si la ligne est un titre de section, sinon une chaîne vide"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60 or len(stripped.split()) > 6:
+        return ""
+
+    for section, pattern in _SECTION_RE:
+        if pattern.match(stripped):
+            return section
+    return ""
+
+def split_cv_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Découpe le texte d'un CV en sections, dans l'ordre du document
+
+    Les lignes précédant le premier titre reconnu forment la section "header"
+    (identité, coordonnées). Les titres sont conservés en tête de leur section.
+
+    Args:
+        text: Texte prétraité du CV
+
+    Returns:
+        List[Tuple[str, List[str]]]: (type de section, lignes) dans l'ordre
+    """
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+
+    for line in text.split("\n"):
+        section = _section_of_heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+
+    return [(name, lines) for name, lines in sections if any(line.strip() for line in lines)]
+
+def _split_oversized(lines: List[str], max_chars: int, first_chars: int) -> List[str]:
+    """Découpe une section trop longue sur des frontières de lignes
+
+    Le premier morceau tient dans `first_chars` (place restante dans le morceau en
+    cours), les suivants dans `max_chars`. Le titre de la section est répété en
+    tête de chaque morceau pour donner son contexte au modèle.
+    """
+    title = lines[0].strip() if _section_of_heading(lines[0]) else ""
+    body = lines[1:] if title else lines
+    overhead = len(title) + len(" (suite)") + 1
+    budget = max(1, max_chars - overhead)
+
+    groups: List[List[str]] = [[]]
+    group_len = 0
+    group_budget = max(1, first_chars - overhead)
+    for line in body:
+        # Une ligne isolée plus longue que le budget est coupée brutalement
+        parts = [line[i:i + budget] for i in range(0, len(line), budget)] or [""]
+        for part in parts:
+            if group_len + len(part) + 1 > group_budget and (groups[-1] or group_budget < budget):
+                groups.append([])
+                group_len = 0
+                group_budget = budget
+            groups[-1].append(part)
+            group_len += len(part) + 1
+
+    pieces: List[str] = []
+    for group in groups:
+        if not any(line.strip() for line in group):
+            continue
+        heading = [f"{title} (suite)" if pieces else title] if title else []
+        pieces.append("\n".join(heading + group))
+    return pieces
+
+def build_cv_chunks(text: str, max_chars: int) -> List[str]:
+    """Regroupe les sections consécutives d'un CV en morceaux d'au plus `max_chars` caractères
+
+    L'en-tête (identité, coordonnées) est toujours placé dans le premier morceau ;
+    une section plus longue que le budget est découpée sur des frontières de lignes.
+
+    Args:
+        text: Texte prétraité du CV
+        max_chars: Taille maximale d'un morceau
+
+    Returns:
+        List[str]: Morceaux, dans l'ordre du document
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for name, lines in split_cv_sections(text):
+        section_text = "\n".join(lines).strip("\n")
+
+        if len(section_text) > max_chars:
+            pieces = _split_oversized(lines, max_chars, max_chars - current_len - 2)
+        else:
+            pieces = [section_text]
+
+        for piece in pieces:
+            if current and current_len + len(piece) + 2 > max_chars:
+                chunks.append("\n\n".join(current))
+                current, current_len = [], 0
+            current.append(piece)
+            current_len += len(piece) + 2
+
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return chunks
+
+def _norm(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value or "")).strip().lower()
+
+# Clé d'unicité des éléments de liste pour la fusion des résultats partiels
+_LIST_ITEM_KEYS: Dict[str, Callable[[Any], Any]] = {
+    "skills": lambda item: _norm(item.get("name") if isinstance(item, dict) else item),
+    "softwares": lambda item: _norm(item.get("name") if isinstance(item, dict) else item),
+    "languages": lambda item: _norm(item.get("language") if isinstance(item, dict) else item),
+    "experience": lambda item: (
+        (_norm(item.get("title")), _norm(item.get("company")), _norm(item.get("start_date")))
+        if isinstance(item, dict) else _norm(item)
+    ),
+    "education": lambda item: (
+        (_norm(item.get("degree")), _norm(item.get("institution")))
+        if isinstance(item, dict) else _norm(item)
+    )
+}
+
+def merge_partial_results(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fusionne les résultats partiels d'un CV découpé, de façon déterministe
+
+    - les morceaux sont parcourus dans l'ordre du document ;
+    - champs simples et champs de personal_info : première valeur non vide ;
+    - listes : concaténation dans l'ordre, doublons supprimés (clé normalisée),
+      la première occurrence est conservée ;
+    - les morceaux en erreur sont ignorés, sauf si tous ont échoué.
+
+    Args:
+        partials: Résultats de l'analyse de chaque morceau, dans l'ordre
+
+    Returns:
+        Dict[str, Any]: Résultat fusionné
+    """
+    valid = [partial for partial in partials if isinstance(partial, dict) and not partial.get("error")]
+    if not valid:
+        return partials[0] if partials else {}
+
+    if len(valid) < len(partials):
+        logger.warning(f"{len(partials) - len(valid)} morceau(x) de CV en erreur ignoré(s) lors de la fusion")
+
+    merged: Dict[str, Any] = {}
+    seen: Dict[str, set] = {}
+
+    for partial in valid:
+        for field, value in partial.items():
+            if field == "raw_response":
+                continue
+
+            if isinstance(value, dict):
+                target = merged.setdefault(field, {})
+                if not isinstance(target, dict):
+                    continue
+                for sub_field, sub_value in value.items():
+                    if sub_value and not target.get(sub_field):
+                        target[sub_field] = sub_value
+                    else:
+                        target.setdefault(sub_field, sub_value)
+
+            elif isinstance(value, list):
+                target = merged.setdefault(field, [])
+                if not isinstance(target, list):
+                    continue
+                key_of = _LIST_ITEM_KEYS.get(field, _norm)
+                field_seen = seen.setdefault(field, set())
+                for item in value:
+                    try:
+                        key = key_of(item)
+                    except Exception:
+                        key = _norm(item)
+                    if key in field_seen or key in ("", ("", "", ""), ("", "")):
+                        continue
+                    field_seen.add(key)
+                    target.append(item)
+
+            elif value and not merged.get(field):
+                merged[field] = value
+            else:
+                merged.setdefault(field, value)
+
+    return merged
@@ -0,0 +1,81 @@
+# CV Parser Service - Exécuteurs pour les traitements CPU et contexte de priorité
+
+import logging
+import pickle
+import threading
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Pool de processus pour l'extraction (configuré par le worker concurrent, sinon exécution directe)
+_cpu_executor: Optional[Executor] = None
+
+# Priorité du job en cours d'exécution dans le thread courant (premium, standard, batch)
+_job_context = threading.local()
+
+def set_cpu_executor(executor: Optional[Executor]):
+    """Définit le pool utilisé pour les traitements CPU (None = exécution dans le thread courant)"""
+    global _cpu_executor
+    _cpu_executor = executor
+
+def _call_in_pool(func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Tuple[bool, Any]:
+    """Exécute le traitement dans le processus du pool
+
+    Les erreurs du traitement sont renvoyées comme valeur : toute exception levée par
+    le Future vient alors du pool lui-même (processus mort, sérialisation).
+    """
+    try:
+        return True, func(*args, **kwargs)
+    except Exception as e:
+        return False, e
+
+def run_cpu_bound(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Exécute un traitement CPU dans le pool de processus s'il est configuré
+
+    Les arguments et le résultat doivent être sérialisables (pickle). Si le pool est
+    inutilisable (processus mort) ou qu'un objet ne peut pas être sérialisé, le
+    traitement est exécuté localement ; les erreurs du traitement sont relevées telles
+    quelles, sans seconde exécution.
+
+    Les effets de bord du traitement sur l'état global (compteurs, caches) restent
+    dans le processus du pool : le traitement doit les renvoyer avec son résultat.
+    """
+    if _cpu_executor is None:
+        return func(*args, **kwargs)
+
+    try:
+        succeeded, value = _cpu_executor.submit(_call_in_pool, func, args, kwargs).result()
+    except (BrokenProcessPool, pickle.PicklingError, TypeError, AttributeError) as e:
+        # TypeError / AttributeError : objet non sérialisable (fichier ouvert, fonction locale...)
+        logger.warning(f"Échec de l'exécution dans le pool CPU ({str(e)}), exécution locale")
+        return func(*args, **kwargs)
+
+    if not succeeded:
+        raise value
+    return value
+
+def set_current_priority(priority: Optional[str]):
+    """Associe une priorité de queue au thread courant"""
+    _job_context.priority = priority
+
+def get_current_priority() -> str:
+    """Priorité du job exécuté par le thread courant
+
+    Déduite du nom de la queue RQ d'origine si elle n'a pas été définie explicitement.
+    """
+    priority = getattr(_job_context, "priority", None)
+    if priority:
+        return priority
+
+    try:
+        from rq import get_current_job
+        job = get_current_job()
+        if job and job.origin:
+            return job.origin.rsplit("_", 1)[-1]
+    except Exception:
+        pass
+
+    return "standard"
@@ -0,0 +1,235 @@
+# CV Parser Service - Cache des réponses LLM, backend simulé et instrumentation des appels
+
+import re
+import time
+import hashlib
+import logging
+import threading
+import unicodedata
+from typing import Callable, Dict, Any, Optional
+
+import redis
+
+from app.core.config import settings
+from app.services.resilience import resilient_openai_call
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "cv:llm:cache"
+METRICS_KEY = "cv:llm:metrics"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_redis_client = None
+
+def _get_redis() -> redis.Redis:
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            db=settings.REDIS_DB,
+            password=settings.REDIS_PASSWORD or None,
+            decode_responses=True,
+            socket_timeout=2
+        )
+    return _redis_client
+
+def normalize_text(text: str) -> str:
+    """Normalise un texte avant hachage (Unicode NFC, espaces consécutifs fusionnés)
+
+    Deux extractions du même document qui ne diffèrent que par la mise en page
+    produisent ainsi la même clé de cache.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+def template_version(template: str) -> str:
+    """Version d'un template de prompt : empreinte de son contenu
+
+    Toute modification du template invalide automatiquement les réponses en cache.
+    """
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+def cache_key(namespace: str, text: str, version: str, model: str) -> str:
+    """Clé de cache : hash du texte normalisé + version du template + modèle"""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{namespace}:{model}:{version}:{digest}"
+
+def estimate_tokens(text: str) -> int:
+    """Estimation grossière du nombre de tokens (~4 caractères par token)"""
+    return max(1, len(text) // 4) if text else 0
+
+class LLMMetrics:
+    """Compteurs des appels LLM (tokens, latence, cache)
+
+    Les compteurs sont tenus en mémoire pour le processus courant et agrégés dans
+    Redis pour l'ensemble des workers.
+    """
+
+    FIELDS = ("calls", "cache_hits", "cache_misses", "errors",
+              "tokens_in", "tokens_out", "latency_ms")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = {field: 0 for field in self.FIELDS}
+
+    def record(self, namespace: str, backend: str, cache_hit: bool = False, error: bool = False,
+               tokens_in: int = 0, tokens_out: int = 0, latency: float = 0.0):
+        """Enregistre un appel (ou une réponse servie depuis le cache)"""
+        latency_ms = int(latency * 1000)
+        delta = {
+            "calls": 0 if cache_hit else 1,
+            "cache_hits": 1 if cache_hit else 0,
+            "cache_misses": 0 if cache_hit else 1,
+            "errors": 1 if error else 0,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "latency_ms": latency_ms
+        }
+
+        with self._lock:
+            for field, value in delta.items():
+                self._local[field] += value
+
+        if not cache_hit:
+            logger.info(
+                f"Appel LLM {namespace} ({backend}): {tokens_in} tokens en entrée, "
+                f"{tokens_out} en sortie, {latency_ms} ms{' [erreur]' if error else ''}"
+            )
+
+        try:
+            with _get_redis().pipeline(transaction=False) as pipeline:
+                for field, value in delta.items():
+                    if value:
+                        pipeline.hincrby(METRICS_KEY, field, value)
+                        pipeline.hincrby(METRICS_KEY, f"{namespace}:{field}", value)
+                pipeline.execute()
+        except Exception as e:
+            logger.debug(f"Impossible d'agréger les métriques LLM dans Redis: {str(e)}")
+
+    def snapshot(self, aggregated: bool = True) -> Dict[str, Any]:
+        """Compteurs du processus courant, ou agrégés sur tous les workers"""
+        if aggregated:
+            try:
+                return {field: int(value) for field, value in _get_redis().hgetall(METRICS_KEY).items()}
+            except Exception as e:
+                logger.warning(f"Métriques LLM agrégées indisponibles: {str(e)}")
+
+        with self._lock:
+            return dict(self._local)
+
+llm_metrics = LLMMetrics()
+
+class MockLLMBackend:
+    """Backend LLM local pour les tests et benchmarks
+
+    Ne fait aucun appel réseau : la réponse est produite par le générateur fourni par
+    l'appelant (données simulées sérialisées en JSON), après une latence configurable.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def complete(self, prompt: str, mock_response: Callable[[], str], usage: Dict[str, int], **kwargs) -> str:
+        if self.latency > 0:
+            time.sleep(self.latency)
+        response_text = mock_response()
+        usage["prompt_tokens"] = estimate_tokens(prompt)
+        usage["completion_tokens"] = estimate_tokens(response_text)
+        return response_text
+
+class OpenAIBackend:
+    """Backend OpenAI (appel résilient : limiteur de débit, circuit breaker, retry)"""
+
+    name = "openai"
+
+    def complete(self, prompt: str, mock_response: Callable[[], str], usage: Dict[str, int],
+                 model: str = None, temperature: float = 0.1, max_tokens: int = 4000) -> str:
+        return resilient_openai_call(
+            prompt=prompt,
+            model=model,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            usage=usage
+        )
+
+def get_llm_backend():
+    """Backend sélectionné par LLM_BACKEND (openai | mock)"""
+    if settings.LLM_BACKEND == "mock":
+        return MockLLMBackend(latency=settings.LLM_MOCK_LATENCY)
+    return OpenAIBackend()
+
+def _is_valid(validate: Callable[[str], bool], response_text: str, namespace: str) -> bool:
+    """Applique le validateur de l'appelant (une exception vaut un refus)"""
+    try:
+        return bool(validate(response_text))
+    except Exception as e:
+        logger.warning(f"Réponse LLM non mise en cache ({namespace}): {str(e)}")
+        return False
+
+def cached_llm_call(namespace: str, text: str, prompt: str, version: str,
+                    mock_response: Callable[[], str], validate: Optional[Callable[[str], bool]] = None,
+                    model: Optional[str] = None, temperature: float = 0.1, max_tokens: int = 4000) -> str:
+    """Appel LLM avec cache persistant des réponses
+
+    Seules les réponses acceptées par `validate` sont mises en cache : l'appelant
+    y vérifie que la réponse se parse dans la forme qu'il attend, pour qu'une
+    sortie invalide ne soit pas resservie jusqu'à l'expiration du cache.
+
+    Args:
+        namespace: Type d'analyse (cv, cv_batch...), partie de la clé de cache
+        text: Texte analysé (la clé porte sur sa forme normalisée)
+        prompt: Prompt complet envoyé au modèle
+        version: Version du template de prompt
+        mock_response: Générateur de réponse pour le backend simulé
+        validate: Vérifie la réponse avant sa mise en cache (sans validateur,
+            rien n'est mis en cache)
+        model: Modèle à utiliser (défaut: settings.OPENAI_MODEL)
+        temperature: Température
+        max_tokens: Nombre maximum de tokens en réponse
+
+    Returns:
+        str: Réponse brute du modèle
+    """
+    model = model or settings.OPENAI_MODEL
+    backend = get_llm_backend()
+    key = cache_key(namespace, text, version, f"{backend.name}:{model}")
+
+    if settings.LLM_CACHE_ENABLED:
+        try:
+            cached = _get_redis().get(key)
+            if cached is not None:
+                logger.info(f"Réponse LLM servie depuis le cache ({namespace})")
+                llm_metrics.record(namespace, backend.name, cache_hit=True)
+                return cached
+        except Exception as e:
+            logger.warning(f"Cache LLM indisponible: {str(e)}")
+
+    usage: Dict[str, int] = {}
+    start_time = time.time()
+    try:
+        response_text = backend.complete(
+            prompt, mock_response, usage,
+            model=model, temperature=temperature, max_tokens=max_tokens
+        )
+    except Exception:
+        llm_metrics.record(namespace, backend.name, error=True, latency=time.time() - start_time)
+        raise
+
+    llm_metrics.record(
+        namespace, backend.name,
+        tokens_in=usage.get("prompt_tokens", estimate_tokens(prompt)),
+        tokens_out=usage.get("completion_tokens", estimate_tokens(response_text)),
+        latency=time.time() - start_time
+    )
+
+    if settings.LLM_CACHE_ENABLED and validate is not None and _is_valid(validate, response_text, namespace):
+        try:
+            _get_redis().set(key, response_text, ex=settings.LLM_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Impossible de mettre en cache la réponse LLM: {str(e)}")
+
+    return response_text
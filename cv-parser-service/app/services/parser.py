@@ -4,39 +4,166 @@
 import os
 import time
 import logging
-from typing import Dict, Any, Optional, List, BinaryIO
+import io
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, BinaryIO, Union, Tuple
 import tempfile
 import json
 import traceback
 import re
 
 from app.core.config import settings
-from app.services.resilience import resilient_openai_call
+from app.services.llm_cache import cached_llm_call, template_version
 from app.services.mock_parser import get_mock_cv_data
+from app.services.executors import run_cpu_bound, get_current_priority, set_current_priority
+from app.services.cv_chunking import build_cv_chunks, merge_partial_results
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def parse_cv(file_path: str, file_format: Optional[str] = None) -> Dict[str, Any]:
+# Source d'extraction : chemin sur disque ou contenu en mémoire (bytes / objet file-like)
+CVSource = Union[str, bytes, BinaryIO]
+
+# Compteurs d'E/S de l'extraction (documents traités en mémoire vs fichiers temporaires écrits)
+EXTRACTION_IO_STATS = {
+    "in_memory_documents": 0,
+    "in_memory_bytes": 0,
+    "temp_files_written": 0,
+    "temp_bytes_written": 0
+}
+
+# Structure JSON attendue en sortie du modèle (partagée par les prompts unitaires et batch)
+CV_JSON_SCHEMA = """{
+  "personal_info": {
+    "name": "",     // Nom complet sans préfixe comme "undefined"
+    "email": "",    // Email exact
+    "phone": "",    // Numéro de téléphone dans son format original
+    "address": ""   // Adresse si présente, sinon vide
+  },
+  "position": "",   // Poste actuel ou recherché (titre professionnel)
+  "skills": [       // Liste des compétences (hors langues et logiciels)
+    {
+      "name": "Compétence 1"
+    },
+    {
+      "name": "Compétence 2"
+    }
+  ],
+  "softwares": [    // Logiciels maîtrisés (SAP, Excel, Sage, etc.)
+    "Logiciel 1",
+    "Logiciel 2"
+  ],
+  "languages": [    // Langues
+    {
+      "language": "Français",
+      "level": "Natif"
+    },
+    {
+      "language": "Anglais",
+      "level": "Courant"
+    }
+  ],
+  "experience": [   // Expériences professionnelles
+    {
+      "title": "Titre du poste",
+      "company": "Nom de l'entreprise",
+      "start_date": "Date de début",
+      "end_date": "Date de fin ou Présent",
+      "description": "Description des responsabilités"
+    }
+  ],
+  "education": [    // Formation
+    {
+      "degree": "Nom du diplôme",
+      "institution": "Établissement",
+      "start_date": "Date de début",
+      "end_date": "Date de fin"
+    }
+  ]
+}"""
+
+# Templates de prompts : les valeurs variables sont insérées par render_prompt, le
+# reste du texte est figé pour que la version (empreinte du template) soit stable
+CV_PROMPT_TEMPLATE = f"""
+Tu es un expert en analyse de CV et extraction de données pour l'industrie du recrutement.
+Tu dois extraire avec précision toutes les informations importantes d'un CV, en particulier pour les domaines de la finance, comptabilité et audit.
+
+INSTRUCTIONS IMPÉRATIVES:
+1. Extrait UNIQUEMENT les informations réellement présentes dans le CV.
+2. Ne génère JAMAIS d'informations fictives comme "John Doe" ou "example@email.com".
+3. Pour tout champ non présent dans le CV, renvoie une valeur vide (chaîne vide ou tableau vide).
+4. Sois particulièrement attentif aux numéros de téléphone, titres de poste, langues et logiciels.
+5. Pour les compétences, différencie bien les compétences techniques et les logiciels maîtrisés.
+
+EXTRACTION DEMANDÉE:
+Retourne un JSON avec cette structure précise et TOUS ces champs, même vides:
+
+{CV_JSON_SCHEMA}
+
+CV À ANALYSER:
+{{cv_text}}
+
+IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations récupérées du CV, sans aucun texte d'introduction ou commentaire.
+"""
+
+CV_BATCH_PROMPT_TEMPLATE = f"""
+Tu es un expert en analyse de CV et extraction de données pour l'industrie du recrutement.
+Tu vas recevoir {{count}} CV distincts, chacun délimité par <<<CV n>>> et <<<FIN CV n>>>.
+
+INSTRUCTIONS IMPÉRATIVES:
+1. Analyse chaque CV indépendamment, sans mélanger les informations entre CV.
+2. Extrait UNIQUEMENT les informations réellement présentes dans chaque CV.
+3. Ne génère JAMAIS d'informations fictives comme "John Doe" ou "example@email.com".
+4. Pour tout champ non présent, renvoie une valeur vide (chaîne vide ou tableau vide).
+
+EXTRACTION DEMANDÉE:
+Retourne un tableau JSON de {{count}} objets, dans l'ordre des CV, chacun avec cette structure:
+
+{CV_JSON_SCHEMA}
+
+CV À ANALYSER:
+{{documents}}
+
+IMPORTANT: Tu dois retourner UNIQUEMENT le tableau JSON, sans aucun texte d'introduction ou commentaire.
+"""
+
+CV_PROMPT_VERSION = template_version(CV_PROMPT_TEMPLATE)
+CV_BATCH_PROMPT_VERSION = template_version(CV_BATCH_PROMPT_TEMPLATE)
+
+def render_prompt(template: str, **values: str) -> str:
+    """Insère les valeurs dans un template ({nom} remplacé par la valeur, sans interpréter le JSON)"""
+    for name, value in values.items():
+        template = template.replace("{" + name + "}", value)
+    return template
+
+def parse_cv(source: CVSource, file_format: Optional[str] = None,
+             file_name: Optional[str] = None) -> Dict[str, Any]:
     """Parse un CV pour en extraire les informations structurées
     
     Args:
-        file_path: Chemin vers le fichier CV
+        source: Chemin vers le fichier CV, ou contenu en mémoire (bytes / objet file-like)
         file_format: Format du fichier (.pdf, .docx, etc.)
+        file_name: Nom du fichier d'origine (par défaut, nom du chemin)
         
     Returns:
         Dict[str, Any]: Informations structurées extraites du CV
     """
+    is_path = isinstance(source, (str, os.PathLike))
+    
     # 1. Déterminer le format si non fourni
-    if not file_format and file_path:
-        file_format = os.path.splitext(file_path)[1].lower()
+    if not file_format and is_path:
+        file_format = os.path.splitext(source)[1].lower()
+    
+    if not file_name:
+        file_name = os.path.basename(source) if is_path else "document"
     
     # Logging du fichier traité pour le debugging
-    logger.info(f"Traitement du fichier: {os.path.basename(file_path)} (format: {file_format})")
+    logger.info(f"Traitement du fichier: {file_name} (format: {file_format})")
     
     try:
-        # 2. Extraire le texte du CV selon le format
-        cv_text = extract_text_from_file(file_path, file_format)
+        # 2. Extraire le texte du CV selon le format (pool de processus si le worker en fournit un)
+        cv_text, io_stats = extract_text_with_io_stats(source, file_format)
         
         # Log de la taille du texte extrait pour debug
         logger.info(f"Texte extrait: {len(cv_text)} caractères")
@@ -53,8 +180,8 @@ def parse_cv(file_path: str, file_format: Optional[str] = None) -> Dict[str, Any
         try:
             # Si USE_MOCK_PARSER est activé, utiliser le mock au lieu de l'API
             if settings.USE_MOCK_PARSER:
-                logger.info(f"Utilisation du mock parser (mode de simulation) pour {file_path}")
-                parsed_data = get_mock_cv_data(cv_text, os.path.basename(file_path))
+                logger.info(f"Utilisation du mock parser (mode de simulation) pour {file_name}")
+                parsed_data = get_mock_cv_data(cv_text, file_name)
             else:
                 # Sinon, utiliser l'API OpenAI
                 parsed_data = analyze_cv_with_gpt(cv_text)
@@ -65,7 +192,7 @@ def parse_cv(file_path: str, file_format: Optional[str] = None) -> Dict[str, Any
             logger.error(f"Erreur lors de l'analyse du CV: {str(e)}. Fallback sur le mock parser.")
             logger.error(f"Stacktrace: {traceback.format_exc()}")
             # En cas d'erreur, utiliser le mock parser comme fallback
-            parsed_data = get_mock_cv_data(cv_text, os.path.basename(file_path))
+            parsed_data = get_mock_cv_data(cv_text, file_name)
         
         processing_time = time.time() - start_time
         logger.info(f"CV parsé en {processing_time:.2f} secondes")
@@ -76,12 +203,13 @@ def parse_cv(file_path: str, file_format: Optional[str] = None) -> Dict[str, Any
             "parsed_at": time.time(),
             "file_format": file_format,
             "model": "mock" if settings.USE_MOCK_PARSER else settings.OPENAI_MODEL,
+            "io_stats": io_stats,
             "data": parsed_data
         }
         
         return result
     except Exception as e:
-        logger.error(f"Erreur pendant le parsing du CV {os.path.basename(file_path)}: {str(e)}")
+        logger.error(f"Erreur pendant le parsing du CV {file_name}: {str(e)}")
         logger.error(f"Stacktrace: {traceback.format_exc()}")
         
         # Retourner un résultat avec l'erreur mais une structure minimale valide
@@ -323,68 +451,162 @@ def extract_languages(text: str) -> List[Dict[str, str]]:
     
     return languages
 
-def extract_text_from_file(file_path: str, file_format: Optional[str] = None) -> str:
+def _is_path(source: CVSource) -> bool:
+    """Indique si la source est un chemin de fichier"""
+    return isinstance(source, (str, os.PathLike))
+
+def _read_source_bytes(source: CVSource) -> bytes:
+    """Retourne le contenu binaire d'une source (chemin, bytes ou file-like)"""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if _is_path(source):
+        with open(source, 'rb') as file:
+            return file.read()
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return source.read()
+
+def _open_binary(source: CVSource) -> BinaryIO:
+    """Retourne un flux binaire positionné au début pour une source"""
+    if _is_path(source):
+        return open(source, 'rb')
+    return io.BytesIO(_read_source_bytes(source))
+
+@contextmanager
+def _source_as_path(source: CVSource, suffix: str = ""):
+    """Fournit un chemin de fichier pour les outils qui l'exigent (antiword, textract...)
+
+    Un fichier temporaire n'est écrit que si la source est en mémoire.
+    """
+    if _is_path(source):
+        yield source
+        return
+    
+    content = _read_source_bytes(source)
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        tmp.write(content)
+        temp_path = tmp.name
+    
+    EXTRACTION_IO_STATS["temp_files_written"] += 1
+    EXTRACTION_IO_STATS["temp_bytes_written"] += len(content)
+    
+    try:
+        yield temp_path
+    finally:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+
+def _translate_newlines(text: str) -> str:
+    """Normalise les fins de ligne comme une lecture en mode texte (\r\n et \r -> \n)"""
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def _decode_text(content: bytes) -> str:
+    """Décode un contenu texte en essayant plusieurs encodages"""
+    for encoding in ['utf-8', 'latin-1', 'windows-1252', 'iso-8859-1', 'cp1252']:
+        try:
+            return _translate_newlines(content.decode(encoding))
+        except UnicodeDecodeError:
+            continue
+    return str(content)
+
+def extract_text_from_file(source: CVSource, file_format: Optional[str] = None) -> str:
     """Extrait le texte d'un fichier CV
     
     Args:
-        file_path: Chemin vers le fichier
-        file_format: Format du fichier
+        source: Chemin vers le fichier, ou contenu en mémoire (bytes / objet file-like)
+        file_format: Format du fichier (obligatoire si la source est en mémoire)
         
     Returns:
         str: Texte extrait du CV
     """
-    logger.info(f"Extraction du texte depuis {file_path} (format: {file_format})")
-    
-    # Déterminer le format si non fourni
-    if not file_format:
-        file_format = os.path.splitext(file_path)[1].lower()
-    
-    # Vérifier si le fichier existe pour éviter des erreurs
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"Le fichier n'existe pas: {file_path}")
+    if _is_path(source):
+        logger.info(f"Extraction du texte depuis {source} (format: {file_format})")
+        
+        # Déterminer le format si non fourni
+        if not file_format:
+            file_format = os.path.splitext(source)[1].lower()
+        
+        # Vérifier si le fichier existe pour éviter des erreurs
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Le fichier n'existe pas: {source}")
+        
+        file_size = os.path.getsize(source)
+    else:
+        if not file_format:
+            raise ValueError("file_format est obligatoire pour une extraction en mémoire")
+        
+        # Charger une seule fois le contenu : les extracteurs travaillent ensuite sur des buffers
+        source = _read_source_bytes(source)
+        file_size = len(source)
+        EXTRACTION_IO_STATS["in_memory_documents"] += 1
+        EXTRACTION_IO_STATS["in_memory_bytes"] += file_size
+        logger.info(f"Extraction du texte en mémoire (format: {file_format})")
     
     # Log de la taille du fichier
-    file_size = os.path.getsize(file_path)
     logger.info(f"Taille du fichier: {file_size / 1024:.2f} KB")
     
     # Extraction selon le format avec gestion d'erreur améliorée
     try:
         if file_format.lower() in [".pdf", ".PDF"]:
-            return extract_text_from_pdf(file_path)
+            return extract_text_from_pdf(source)
         elif file_format.lower() in [".docx", ".DOCX"]:
-            return extract_text_from_docx(file_path)
+            return extract_text_from_docx(source)
         elif file_format.lower() in [".doc", ".DOC"]:
-            return extract_text_from_doc(file_path)
+            return extract_text_from_doc(source)
         elif file_format.lower() in [".txt", ".TXT", ".text"]:
-            return extract_text_from_txt(file_path)
+            return extract_text_from_txt(source)
         elif file_format.lower() in [".rtf", ".RTF"]:
-            return extract_text_from_rtf(file_path)
+            return extract_text_from_rtf(source)
         else:
             # Tenter une extraction générique pour les formats non reconnus
             logger.warning(f"Format non reconnu: {file_format}. Tentative d'extraction générique.")
-            return extract_text_generic(file_path)
+            return extract_text_generic(source, file_format)
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction du texte ({file_format}): {str(e)}")
         logger.error(f"Stacktrace: {traceback.format_exc()}")
         # En cas d'échec, tenter une extraction générique alternative
         try:
             logger.info("Tentative d'extraction alternative...")
-            return extract_text_generic(file_path)
+            return extract_text_generic(source, file_format)
         except Exception as alt_e:
             logger.error(f"Échec de l'extraction alternative: {str(alt_e)}")
             # Retourner une chaîne vide mais non None pour éviter des erreurs en aval
             return f"Échec d'extraction du texte. Format: {file_format}. Erreur: {str(e)}"
 
-def extract_text_generic(file_path: str) -> str:
+def _extract_text_counting_io(source: CVSource, file_format: Optional[str]) -> Tuple[str, Dict[str, int], int]:
+    """Extrait le texte et mesure les compteurs d'E/S de cet appel (exécuté dans le pool CPU)"""
+    before = dict(EXTRACTION_IO_STATS)
+    text = extract_text_from_file(source, file_format)
+    return text, {key: EXTRACTION_IO_STATS[key] - before[key] for key in before}, os.getpid()
+
+def extract_text_with_io_stats(source: CVSource, file_format: Optional[str] = None) -> Tuple[str, Dict[str, int]]:
+    """Extrait le texte d'un CV (pool de processus si configuré) avec ses compteurs d'E/S
+    
+    Dans un processus du pool, les incréments de EXTRACTION_IO_STATS restent dans
+    ce processus : ils sont renvoyés avec le texte et reportés ici.
+    
+    Returns:
+        Tuple[str, Dict[str, int]]: Texte extrait et compteurs d'E/S du document
+    """
+    text, io_stats, pid = run_cpu_bound(_extract_text_counting_io, source, file_format)
+    if pid != os.getpid():
+        for key, value in io_stats.items():
+            EXTRACTION_IO_STATS[key] += value
+    return text, io_stats
+
+def extract_text_generic(source: CVSource, file_format: Optional[str] = None) -> str:
     """Méthode d'extraction générique qui tente plusieurs approches"""
-    logger.info(f"Extraction générique pour {file_path}")
+    logger.info(f"Extraction générique pour {source if _is_path(source) else 'contenu en mémoire'}")
     
     # Essayer des méthodes alternatives d'extraction
     try:
-        # Tenter avec textract qui supporte de nombreux formats
+        # Tenter avec textract qui supporte de nombreux formats (nécessite un chemin)
         try:
             import textract
-            text = textract.process(file_path).decode('utf-8')
+            with _source_as_path(source, file_format or "") as path:
+                text = textract.process(path).decode('utf-8')
             if text and len(text) > 100:  # Vérifier qu'on a extrait quelque chose de significatif
                 return text
         except:
@@ -393,7 +615,7 @@ def extract_text_generic(file_path: str) -> str:
         # Tenter avec pdfplumber (autre bibliothèque pour PDF)
         try:
             import pdfplumber
-            with pdfplumber.open(file_path) as pdf:
+            with _open_binary(source) as stream, pdfplumber.open(stream) as pdf:
                 text = ""
                 for page in pdf.pages:
                     text += page.extract_text() or ""
@@ -404,38 +626,37 @@ def extract_text_generic(file_path: str) -> str:
         
         # Utiliser notre propre méthode PDF comme dernier recours
         try:
-            return extract_text_from_pdf(file_path)
+            return extract_text_from_pdf(source)
         except:
             logger.warning("Échec de l'extraction PDF standard")
         
         # Si tout échoue, tenter une lecture binaire simple
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            try:
-                # Tenter plusieurs encodages
-                for encoding in ['utf-8', 'latin-1', 'windows-1252', 'ascii']:
-                    try:
-                        return content.decode(encoding)
-                    except:
-                        continue
-            except:
-                pass
+        content = _read_source_bytes(source)
+        try:
+            # Tenter plusieurs encodages
+            for encoding in ['utf-8', 'latin-1', 'windows-1252', 'ascii']:
+                try:
+                    return content.decode(encoding)
+                except:
+                    continue
+        except:
+            pass
         
         return "Extraction de texte échouée pour ce document."
     except Exception as e:
         logger.error(f"Toutes les méthodes d'extraction ont échoué: {str(e)}")
         return "Échec de toutes les méthodes d'extraction de texte."
 
-def extract_text_from_pdf(file_path: str) -> str:
+def extract_text_from_pdf(source: CVSource) -> str:
     """Extrait le texte d'un fichier PDF avec meilleure gestion d'erreurs"""
     try:
-        logger.info(f"Tentative d'extraction PDF depuis {file_path}")
+        logger.info(f"Tentative d'extraction PDF depuis {source if _is_path(source) else 'un buffer mémoire'}")
         
         # Première tentative avec PyPDF2
         try:
             from PyPDF2 import PdfReader
             
-            with open(file_path, 'rb') as file:
+            with _open_binary(source) as file:
                 reader = PdfReader(file)
                 text = ""
                 for page in reader.pages:
@@ -451,10 +672,11 @@ def extract_text_from_pdf(file_path: str) -> str:
         except Exception as e:
             logger.warning(f"Échec de l'extraction avec PyPDF2: {str(e)}")
         
-        # Deuxième tentative avec pdfminer.six
+        # Deuxième tentative avec pdfminer.six (accepte un objet file-like)
         try:
             from pdfminer.high_level import extract_text as pdfminer_extract
-            text = pdfminer_extract(file_path)
+            with _open_binary(source) as file:
+                text = pdfminer_extract(file)
             if text.strip():
                 logger.info(f"Extraction pdfminer.six réussie: {len(text)} caractères")
                 return text
@@ -470,7 +692,10 @@ def extract_text_from_pdf(file_path: str) -> str:
             import pdf2image
             
             logger.info("Tentative d'extraction via OCR (conversion PDF en images puis OCR)")
-            pages = pdf2image.convert_from_path(file_path)
+            if _is_path(source):
+                pages = pdf2image.convert_from_path(source)
+            else:
+                pages = pdf2image.convert_from_bytes(_read_source_bytes(source))
             text = ""
             for page in pages:
                 text += pytesseract.image_to_string(page) + "\n"
@@ -488,11 +713,12 @@ def extract_text_from_pdf(file_path: str) -> str:
         logger.error(f"Erreur lors de l'extraction du texte PDF: {str(e)}")
         raise
 
-def extract_text_from_docx(file_path: str) -> str:
+def extract_text_from_docx(source: CVSource) -> str:
     """Extrait le texte d'un fichier DOCX"""
     try:
         import docx
-        doc = docx.Document(file_path)
+        with _open_binary(source) as stream:
+            doc = docx.Document(stream)
         text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
         
         # Extraire également les tableaux qui peuvent contenir des informations importantes
@@ -507,103 +733,126 @@ def extract_text_from_docx(file_path: str) -> str:
         logger.error(f"Erreur lors de l'extraction du texte DOCX: {str(e)}")
         raise
 
-def extract_text_from_doc(file_path: str) -> str:
-    """Extrait le texte d'un fichier DOC (ancien format Word)"""
+def extract_text_from_doc(source: CVSource) -> str:
+    """Extrait le texte d'un fichier DOC (ancien format Word)
+    
+    Les outils disponibles pour ce format exigent un chemin : un fichier temporaire
+    est écrit une seule fois si la source est en mémoire.
+    """
     try:
-        # Plusieurs approches possibles
-        methods_tried = []
-        
-        # Essayer avec textract (nécessite installation système)
-        try:
-            import textract
-            text = textract.process(file_path).decode('utf-8')
-            methods_tried.append("textract")
-            if text:
-                return text
-        except ImportError:
-            logger.warning("Module textract non disponible pour l'extraction DOC")
-        except Exception as e:
-            logger.warning(f"Échec de l'extraction DOC avec textract: {str(e)}")
-        
-        # Essayer avec antiword
-        try:
-            import subprocess
-            result = subprocess.run(['antiword', file_path], stdout=subprocess.PIPE)
-            text = result.stdout.decode('utf-8')
-            methods_tried.append("antiword")
-            if text:
-                return text
-        except Exception as e:
-            logger.warning(f"Échec de l'extraction DOC avec antiword: {str(e)}")
-        
-        # Essayer avec pywin32 (Windows uniquement)
-        try:
-            import win32com.client
-            word = win32com.client.Dispatch("Word.Application")
-            word.Visible = False
-            doc = word.Documents.Open(file_path)
-            text = doc.Content.Text
-            doc.Close()
-            word.Quit()
-            methods_tried.append("win32com")
-            if text:
-                return text
-        except Exception as e:
-            logger.warning(f"Échec de l'extraction DOC avec win32com: {str(e)}")
-
-        if not methods_tried:
-            raise NotImplementedError("Aucune méthode d'extraction DOC n'a fonctionné")
-        else:
-            raise Exception(f"Échec de l'extraction DOC avec les méthodes: {', '.join(methods_tried)}")
+        with _source_as_path(source, ".doc") as file_path:
+            return _extract_text_from_doc_path(file_path)
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction du texte DOC: {str(e)}")
         raise
 
-def extract_text_from_txt(file_path: str) -> str:
+def _extract_text_from_doc_path(file_path: str) -> str:
+    """Extraction DOC à partir d'un chemin (textract, antiword, win32com)"""
+    # Plusieurs approches possibles
+    methods_tried = []
+    
+    # Essayer avec textract (nécessite installation système)
+    try:
+        import textract
+        text = textract.process(file_path).decode('utf-8')
+        methods_tried.append("textract")
+        if text:
+            return text
+    except ImportError:
+        logger.warning("Module textract non disponible pour l'extraction DOC")
+    except Exception as e:
+        logger.warning(f"Échec de l'extraction DOC avec textract: {str(e)}")
+    
+    # Essayer avec antiword
+    try:
+        import subprocess
+        result = subprocess.run(['antiword', file_path], stdout=subprocess.PIPE)
+        text = result.stdout.decode('utf-8')
+        methods_tried.append("antiword")
+        if text:
+            return text
+    except Exception as e:
+        logger.warning(f"Échec de l'extraction DOC avec antiword: {str(e)}")
+    
+    # Essayer avec pywin32 (Windows uniquement)
+    try:
+        import win32com.client
+        word = win32com.client.Dispatch("Word.Application")
+        word.Visible = False
+        doc = word.Documents.Open(file_path)
+        text = doc.Content.Text
+        doc.Close()
+        word.Quit()
+        methods_tried.append("win32com")
+        if text:
+            return text
+    except Exception as e:
+        logger.warning(f"Échec de l'extraction DOC avec win32com: {str(e)}")
+
+    if not methods_tried:
+        raise NotImplementedError("Aucune méthode d'extraction DOC n'a fonctionné")
+    else:
+        raise Exception(f"Échec de l'extraction DOC avec les méthodes: {', '.join(methods_tried)}")
+
+def extract_text_from_txt(source: CVSource) -> str:
     """Extrait le texte d'un fichier texte"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except UnicodeDecodeError:
-        # Essayer avec des encodages alternatifs
-        for encoding in ['latin-1', 'windows-1252', 'iso-8859-1', 'cp1252']:
-            try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    return file.read()
-            except UnicodeDecodeError:
-                continue
-        
-        # Si tous les encodages échouent, essayer en mode binaire
-        with open(file_path, 'rb') as file:
-            content = file.read()
-            return str(content)
+        return _decode_text(_read_source_bytes(source))
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction du texte TXT: {str(e)}")
         raise
 
-def extract_text_from_rtf(file_path: str) -> str:
+def extract_text_from_rtf(source: CVSource) -> str:
     """Extrait le texte d'un fichier RTF"""
     try:
         # Essayer avec striprtf
         try:
             from striprtf.striprtf import rtf_to_text
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                content = file.read()
-            return rtf_to_text(content)
+            content = _read_source_bytes(source).decode('utf-8', errors='ignore')
+            return rtf_to_text(_translate_newlines(content))
         except ImportError:
-            # Fallback à textract
+            # Fallback à textract (nécessite un chemin)
             import textract
-            text = textract.process(file_path).decode('utf-8')
+            with _source_as_path(source, ".rtf") as file_path:
+                text = textract.process(file_path).decode('utf-8')
             return text
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction du texte RTF: {str(e)}")
         raise
 
-def analyze_cv_with_gpt(cv_text: str) -> Dict[str, Any]:
+def parse_json_response(response_text: str) -> Optional[Dict[str, Any]]:
+    """Extrait l'objet JSON d'une réponse LLM
+    
+    Essaie successivement l'objet {...} contenu dans le texte, le texte brut, puis
+    le texte débarrassé d'un bloc de code markdown.
+    
+    Returns:
+        Optional[Dict[str, Any]]: Objet décodé, None si la réponse n'en contient pas
+    """
+    match = re.search(r'(\{[\s\S]*\})', response_text)
+    clean_text = response_text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    
+    candidates = [match.group(1)] if match else []
+    candidates += [response_text, clean_text.strip()]
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+def analyze_cv_with_gpt(cv_text: str, allow_chunking: bool = True) -> Dict[str, Any]:
     """Analyse un CV avec GPT pour en extraire les informations structurées
     
     Args:
         cv_text: Texte du CV
+        allow_chunking: Découper les CV longs par sections (voir analyze_cv_chunked)
         
     Returns:
         Dict[str, Any]: Informations structurées extraites du CV
@@ -623,86 +872,29 @@ def analyze_cv_with_gpt(cv_text: str) -> Dict[str, Any]:
             "softwares": []
         }
     
+    # CV long : analyse par sections avec des prompts plus courts plutôt qu'une troncature
+    if allow_chunking and settings.CV_CHUNKED_PARSING and len(cv_text) > settings.CV_CHUNK_THRESHOLD:
+        return analyze_cv_chunked(cv_text)
+    
     # Si le texte est trop long, le tronquer pour éviter des problèmes avec l'API
     max_tokens = 15000  # Approximativement 15000 caractères
     if len(cv_text) > max_tokens:
         logger.warning(f"CV trop long ({len(cv_text)} caractères), troncature à {max_tokens} caractères")
         cv_text = cv_text[:max_tokens] + "...[texte tronqué]"
     
-    # Définir le prompt pour l'extraction d'information structurée avec instructions améliorées
-    prompt = f"""
-Tu es un expert en analyse de CV et extraction de données pour l'industrie du recrutement.
-Tu dois extraire avec précision toutes les informations importantes d'un CV, en particulier pour les domaines de la finance, comptabilité et audit.
-
-INSTRUCTIONS IMPÉRATIVES:
-1. Extrait UNIQUEMENT les informations réellement présentes dans le CV.
-2. Ne génère JAMAIS d'informations fictives comme "John Doe" ou "example@email.com".
-3. Pour tout champ non présent dans le CV, renvoie une valeur vide (chaîne vide ou tableau vide).
-4. Sois particulièrement attentif aux numéros de téléphone, titres de poste, langues et logiciels.
-5. Pour les compétences, différencie bien les compétences techniques et les logiciels maîtrisés.
-
-EXTRACTION DEMANDÉE:
-Retourne un JSON avec cette structure précise et TOUS ces champs, même vides:
-
-{{
-  "personal_info": {{
-    "name": "",     // Nom complet sans préfixe comme "undefined"
-    "email": "",    // Email exact
-    "phone": "",    // Numéro de téléphone dans son format original
-    "address": ""   // Adresse si présente, sinon vide
-  }},
-  "position": "",   // Poste actuel ou recherché (titre professionnel)
-  "skills": [       // Liste des compétences (hors langues et logiciels)
-    {{
-      "name": "Compétence 1"
-    }},
-    {{
-      "name": "Compétence 2"
-    }}
-  ],
-  "softwares": [    // Logiciels maîtrisés (SAP, Excel, Sage, etc.)
-    "Logiciel 1",
-    "Logiciel 2"
-  ],
-  "languages": [    // Langues
-    {{
-      "language": "Français",
-      "level": "Natif"
-    }},
-    {{
-      "language": "Anglais",
-      "level": "Courant"
-    }}
-  ],
-  "experience": [   // Expériences professionnelles
-    {{
-      "title": "Titre du poste",
-      "company": "Nom de l'entreprise",
-      "start_date": "Date de début",
-      "end_date": "Date de fin ou Présent",
-      "description": "Description des responsabilités"
-    }}
-  ],
-  "education": [    // Formation
-    {{
-      "degree": "Nom du diplôme",
-      "institution": "Établissement",
-      "start_date": "Date de début",
-      "end_date": "Date de fin"
-    }}
-  ]
-}}
-
-CV À ANALYSER:
-{cv_text}
-
-IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations récupérées du CV, sans aucun texte d'introduction ou commentaire.
-"""
+    # Prompt construit à partir d'un template figé (sa version fait partie de la clé de cache)
+    prompt = render_prompt(CV_PROMPT_TEMPLATE, cv_text=cv_text)
     
     try:
-        # Appel résilient à OpenAI (avec circuit breaker et retry)
-        response_text = resilient_openai_call(
-            prompt=prompt, 
+        # Appel résilient à OpenAI (avec circuit breaker et retry), réponses identiques servies par le cache
+        response_text = cached_llm_call(
+            namespace="cv",
+            text=cv_text,
+            prompt=prompt,
+            version=CV_PROMPT_VERSION,
+            mock_response=lambda: json.dumps(get_mock_cv_data(cv_text, "document"), ensure_ascii=False),
+            # Seule une réponse contenant l'objet attendu est mise en cache
+            validate=lambda text: parse_json_response(text) is not None,
             model=settings.OPENAI_MODEL,
             temperature=0.1,
             max_tokens=4000
@@ -712,55 +904,28 @@ IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations ré
         
         # Parser la réponse JSON
         try:
-            # Nettoyage du texte pour s'assurer qu'il ne contient que du JSON
-            import re
-            json_pattern = r'(\{[\s\S]*\})' 
-            match = re.search(json_pattern, response_text)
-            if match:
-                json_str = match.group(1)
-                try:
-                    parsed_result = json.loads(json_str)
-                    logger.info("Parsing JSON réussi")
-                    return parsed_result
-                except json.JSONDecodeError as json_err:
-                    logger.error(f"Erreur de décodage JSON après extraction: {str(json_err)}")
-            
-            # Essayer de parser directement si l'extraction a échoué
-            try:
-                parsed_result = json.loads(response_text)
+            parsed_result = parse_json_response(response_text)
+            if parsed_result is not None:
+                logger.info("Parsing JSON réussi")
                 return parsed_result
-            except json.JSONDecodeError:
-                pass
-                
-            # Tentative de nettoyage et d'extraction plus agressive
-            clean_text = response_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            clean_text = clean_text.strip()
             
-            try:
-                return json.loads(clean_text)
-            except json.JSONDecodeError:
-                logger.error("Échec de la tentative de nettoyage JSON")
-                
-                # En dernier recours, renvoyer un dictionnaire avec la réponse brute
-                return {
-                    "error": "Format JSON invalide dans la réponse",
-                    "raw_response": response_text[:1000],  # Tronquer pour éviter les réponses trop longues
-                    "personal_info": {
-                        "name": "",
-                        "email": "",
-                        "phone": ""
-                    },
-                    "position": "",
-                    "skills": [],
-                    "experience": [],
-                    "education": [],
-                    "languages": [],
-                    "softwares": []
-                }
+            logger.error("Aucun objet JSON exploitable dans la réponse")
+            # En dernier recours, renvoyer un dictionnaire avec la réponse brute
+            return {
+                "error": "Format JSON invalide dans la réponse",
+                "raw_response": response_text[:1000],  # Tronquer pour éviter les réponses trop longues
+                "personal_info": {
+                    "name": "",
+                    "email": "",
+                    "phone": ""
+                },
+                "position": "",
+                "skills": [],
+                "experience": [],
+                "education": [],
+                "languages": [],
+                "softwares": []
+            }
         except Exception as parse_err:
             logger.error(f"Erreur lors du parsing de la réponse: {str(parse_err)}")
             # Structure de retour par défaut en cas d'erreur
@@ -788,3 +953,105 @@ IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations ré
             "languages": [],
             "softwares": []
         }
+
+def analyze_cv_chunked(cv_text: str) -> Dict[str, Any]:
+    """Analyse un CV long morceau par morceau puis fusionne les résultats
+    
+    Le CV est découpé selon ses sections (en-tête, expériences, formation...), les
+    morceaux sont analysés en parallèle avec des prompts plus courts, puis les
+    résultats partiels sont fusionnés dans l'ordre du document.
+    
+    Args:
+        cv_text: Texte prétraité du CV
+        
+    Returns:
+        Dict[str, Any]: Informations structurées extraites du CV
+    """
+    chunks = build_cv_chunks(cv_text, settings.CV_CHUNK_MAX_CHARS)
+    if len(chunks) > settings.CV_CHUNK_MAX_CHUNKS:
+        dropped = sum(len(chunk) for chunk in chunks[settings.CV_CHUNK_MAX_CHUNKS:])
+        logger.warning(f"CV découpé en {len(chunks)} morceaux, {dropped} caractères ignorés "
+                       f"au-delà de {settings.CV_CHUNK_MAX_CHUNKS} morceaux")
+        chunks = chunks[:settings.CV_CHUNK_MAX_CHUNKS]
+    
+    logger.info(f"Analyse par sections: {len(cv_text)} caractères en {len(chunks)} morceaux")
+    if len(chunks) == 1:
+        return analyze_cv_with_gpt(chunks[0], allow_chunking=False)
+    
+    # Les threads d'analyse héritent de la priorité du job (limiteur de débit LLM)
+    priority = get_current_priority()
+    
+    def _analyze_chunk(chunk: str) -> Dict[str, Any]:
+        set_current_priority(priority)
+        try:
+            return analyze_cv_with_gpt(chunk, allow_chunking=False)
+        finally:
+            set_current_priority(None)
+    
+    with ThreadPoolExecutor(max_workers=min(settings.CV_CHUNK_WORKERS, len(chunks))) as executor:
+        partials = list(executor.map(_analyze_chunk, chunks))
+    
+    return merge_partial_results(partials)
+
+def analyze_cv_batch_with_gpt(cv_texts: List[str]) -> List[Dict[str, Any]]:
+    """Analyse plusieurs CV courts en un seul appel GPT
+    
+    Les CV sont délimités par des balises numérotées et le modèle doit renvoyer
+    un tableau JSON dans le même ordre. Si la réponse est inexploitable (nombre
+    d'éléments incohérent, JSON invalide), chaque CV est ré-analysé individuellement.
+    
+    Args:
+        cv_texts: Textes des CV (déjà prétraités)
+        
+    Returns:
+        List[Dict[str, Any]]: Informations structurées, une entrée par CV, dans l'ordre
+    """
+    if len(cv_texts) == 1:
+        return [analyze_cv_with_gpt(cv_texts[0])]
+    
+    logger.info(f"Analyse groupée de {len(cv_texts)} CV avec {settings.OPENAI_MODEL}")
+    
+    documents = "\n\n".join(
+        f"<<<CV {index}>>>\n{text}\n<<<FIN CV {index}>>>"
+        for index, text in enumerate(cv_texts, start=1)
+    )
+    
+    prompt = render_prompt(CV_BATCH_PROMPT_TEMPLATE, count=str(len(cv_texts)), documents=documents)
+    
+    def _parse_batch(response_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Tableau d'un objet par CV, None si la réponse ne correspond pas au lot"""
+        match = re.search(r'(\[[\s\S]*\])', response_text)
+        try:
+            parsed_results = json.loads(match.group(1) if match else response_text)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(parsed_results, list) and len(parsed_results) == len(cv_texts) \
+                and all(isinstance(item, dict) for item in parsed_results):
+            return parsed_results
+        return None
+    
+    try:
+        response_text = cached_llm_call(
+            namespace="cv_batch",
+            text=documents,
+            prompt=prompt,
+            version=CV_BATCH_PROMPT_VERSION,
+            mock_response=lambda: json.dumps(
+                [get_mock_cv_data(text, "document") for text in cv_texts], ensure_ascii=False
+            ),
+            validate=lambda text: _parse_batch(text) is not None,
+            model=settings.OPENAI_MODEL,
+            temperature=0.1,
+            max_tokens=min(4000 * len(cv_texts), 16000)
+        )
+        
+        parsed_results = _parse_batch(response_text)
+        if parsed_results is not None:
+            logger.info(f"Analyse groupée réussie pour {len(cv_texts)} CV")
+            return parsed_results
+        
+        logger.warning("Réponse groupée incohérente avec le nombre de CV, analyse individuelle")
+    except Exception as e:
+        logger.warning(f"Échec de l'analyse groupée ({str(e)}), analyse individuelle")
+    
+    return [analyze_cv_with_gpt(text) for text in cv_texts]
@@ -0,0 +1,112 @@
+# CV Parser Service - Limiteur de débit global vers le fournisseur LLM
+
+import time
+import logging
+from typing import Dict, Optional
+
+import redis
+
+from app.core.config import settings
+from app.services.executors import get_current_priority
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Token bucket partagé via Redis entre tous les workers
+# Le script calcule l'état avec l'horloge du serveur Redis pour rester cohérent entre workers.
+# Une priorité ne peut consommer un jeton que s'il en reste plus que sa réserve :
+# les jobs batch laissent toujours une marge aux jobs premium.
+TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens - 1 >= reserve then
+  tokens = tokens - 1
+else
+  wait = (reserve + 1 - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+class RateLimitTimeout(Exception):
+    """Aucun jeton LLM obtenu dans le délai imparti (attente locale, pas une panne du fournisseur)"""
+
+class LLMRateLimiter:
+    """Limiteur de débit global pour les appels au fournisseur LLM"""
+
+    def __init__(self, rate: float, burst: int, reserves: Dict[str, float], key: str = "cv:llm:rate_limit",
+                 client: Optional[redis.Redis] = None):
+        self.rate = rate
+        self.burst = burst
+        # Une réserve d'au moins `burst` jetons ne serait jamais atteinte : la priorité
+        # concernée attendrait indéfiniment. Elle garde au plus un jeton utilisable.
+        self.reserves = {priority: min(reserve, max(0, burst - 1)) for priority, reserve in reserves.items()}
+        self.key = key
+        self._client = client
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            client = self._client or redis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD or None
+            )
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._script
+
+    def acquire(self, priority: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Attend un jeton disponible pour la priorité donnée
+
+        Args:
+            priority: premium, standard ou batch (défaut: priorité du job courant)
+            timeout: Attente maximale en secondes (défaut: LLM_RATE_LIMIT_MAX_WAIT)
+
+        Returns:
+            bool: True si un jeton a été obtenu, False si le délai a expiré
+        """
+        if not settings.LLM_RATE_LIMIT_ENABLED:
+            return True
+
+        priority = priority or get_current_priority()
+        reserve = self.reserves.get(priority, 0)
+        deadline = time.time() + (timeout if timeout is not None else settings.LLM_RATE_LIMIT_MAX_WAIT)
+
+        while True:
+            try:
+                wait = float(self._get_script()(keys=[self.key], args=[self.rate, self.burst, reserve]))
+            except Exception as e:
+                # Redis indisponible : ne pas bloquer le parsing
+                logger.warning(f"Limiteur LLM indisponible, appel autorisé: {str(e)}")
+                return True
+
+            if wait <= 0:
+                return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"Délai d'attente du limiteur LLM dépassé pour la priorité {priority}")
+                return False
+
+            time.sleep(min(wait, remaining))
+
+llm_rate_limiter = LLMRateLimiter(
+    rate=settings.LLM_RATE_LIMIT_PER_SECOND,
+    burst=settings.LLM_RATE_LIMIT_BURST,
+    reserves={
+        "premium": 0,
+        "standard": settings.LLM_RATE_LIMIT_RESERVE_STANDARD,
+        "batch": settings.LLM_RATE_LIMIT_RESERVE_BATCH
+    }
+)
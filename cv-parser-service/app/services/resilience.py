@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional, Callable
 from openai import OpenAI, OpenAIError, RateLimitError, APIConnectionError
 
 from app.core.config import settings
+from app.services.rate_limiter import llm_rate_limiter, RateLimitTimeout
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -67,6 +68,9 @@ def circuit_breaker(func):
                 
             return result
             
+        except RateLimitTimeout:
+            # Attente du limiteur de débit : le fournisseur n'a pas été appelé
+            raise
         except Exception as e:
             # Échec, incrémenter compteur ou ouvrir le circuit
             circuit_state.failure_count += 1
@@ -159,7 +163,8 @@ def retry_with_backoff(max_retries: int = 3, base_delay: float = 1.0, max_delay:
 # Utilisation combinée du circuit breaker et du retry avec backoff
 @circuit_breaker
 @retry_with_backoff(max_retries=3, base_delay=2.0, max_delay=30.0)
-def resilient_openai_call(prompt: str, model: str = "gpt-4o-mini", temperature: float = 0.1, max_tokens: int = 4000) -> str:
+def resilient_openai_call(prompt: str, model: str = "gpt-4o-mini", temperature: float = 0.1, max_tokens: int = 4000,
+                          usage: Optional[Dict[str, int]] = None) -> str:
     """Appel résilient à l'API OpenAI avec circuit breaker et retry
     
     Args:
@@ -167,10 +172,15 @@ def resilient_openai_call(prompt: str, model: str = "gpt-4o-mini", temperature:
         model: Modèle GPT à utiliser
         temperature: Température (créativité)
         max_tokens: Nombre maximum de tokens en réponse
+        usage: Dictionnaire complété avec les tokens consommés (prompt_tokens, completion_tokens)
         
     Returns:
         str: Réponse du modèle
     """
+    # Respecter le débit global du fournisseur (chaque tentative consomme un jeton)
+    if not llm_rate_limiter.acquire():
+        raise RateLimitTimeout("Délai d'attente du limiteur de débit LLM dépassé")
+    
     try:
         response = client.chat.completions.create(
             model=model,
@@ -181,6 +191,9 @@ def resilient_openai_call(prompt: str, model: str = "gpt-4o-mini", temperature:
             temperature=temperature,
             max_tokens=max_tokens
         )
+        if usage is not None and getattr(response, "usage", None):
+            usage["prompt_tokens"] = response.usage.prompt_tokens
+            usage["completion_tokens"] = response.usage.completion_tokens
         return response.choices[0].message.content
     except RateLimitError as e:
         logger.warning(f"Rate limit atteint: {str(e)}")
@@ -5,14 +5,18 @@ import logging
 import json
 import io
 import time
-from typing import Optional, Dict, Any, BinaryIO, Union
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional, Dict, Any, BinaryIO, Union, List, Tuple
 
 import aiofiles
 import redis
 from minio import Minio
 from minio.error import S3Error
 from fastapi import UploadFile, HTTPException
-from sqlalchemy import create_engine, Column, String, Integer, Text, Float, DateTime, func, MetaData, Table
+from sqlalchemy import create_engine, Column, String, Integer, Text, Float, DateTime, func, MetaData, Table, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -210,6 +214,254 @@ def delete_file_from_storage(file_path: str) -> bool:
             logger.error(f"Erreur de suppression du fichier local: {str(e)}")
             return False
 
+# Sérialisation unique du résultat (orjson si disponible, sinon json standard)
+try:
+    import orjson
+
+    def serialize_result(result: Dict[str, Any]) -> bytes:
+        """Sérialise un résultat en JSON (bytes UTF-8)"""
+        return orjson.dumps(result)
+except ImportError:
+    def serialize_result(result: Dict[str, Any]) -> bytes:
+        """Sérialise un résultat en JSON (bytes UTF-8)"""
+        return json.dumps(result).encode('utf-8')
+
+def result_object_name(job_id: str) -> str:
+    """Nom de l'objet MinIO pour un résultat volumineux"""
+    return f"results/{job_id}.json"
+
+def _write_redis_tier(job_id: str, payload: bytes) -> bool:
+    """Écrit le résultat sérialisé dans Redis (accès rapide)"""
+    try:
+        redis_client.set(f"cv:result:{job_id}", payload, ex=settings.REDIS_RESULT_TTL)
+        logger.debug(f"Résultat stocké dans Redis pour job: {job_id}")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur de stockage Redis pour job {job_id}: {str(e)}")
+        return False
+
+def _write_minio_tier(job_id: str, payload: bytes) -> bool:
+    """Écrit un résultat volumineux dans MinIO"""
+    try:
+        ensure_bucket_exists()
+        minio_client.put_object(
+            bucket_name=settings.MINIO_BUCKET_NAME,
+            object_name=result_object_name(job_id),
+            data=io.BytesIO(payload),
+            length=len(payload),
+            content_type="application/json"
+        )
+        logger.info(f"Résultat volumineux stocké dans MinIO pour job {job_id}")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors du stockage MinIO pour job {job_id}: {str(e)}")
+        return False
+
+def upsert_results_postgres(records: List[Dict[str, Any]]) -> bool:
+    """Insère ou met à jour plusieurs résultats en une seule instruction
+    
+    Utilise INSERT ... ON CONFLICT (job_id) DO UPDATE : une seule transaction et un
+    seul aller-retour pour tout le lot, sans SELECT préalable.
+    
+    Args:
+        records: Lignes à écrire (job_id, status, result_json, file_path, priority,
+            processing_time, error)
+        
+    Returns:
+        bool: True si l'écriture a réussi
+    """
+    if not records or not SessionLocal:
+        return False
+    
+    table = CVParsingResult.__table__
+    
+    # Dédupliquer par job_id (la dernière écriture gagne) : Postgres refuse deux
+    # lignes ciblant la même clé dans un même ON CONFLICT
+    rows = list({record["job_id"]: record for record in records}.values())
+    
+    statement = pg_insert(table).values(rows)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.job_id],
+        set_={
+            "status": excluded.status,
+            "result_json": excluded.result_json,
+            "file_path": func.coalesce(excluded.file_path, table.c.file_path),
+            "priority": func.coalesce(excluded.priority, table.c.priority),
+            "processing_time": func.coalesce(excluded.processing_time, table.c.processing_time),
+            "error": func.coalesce(excluded.error, table.c.error),
+            "updated_at": func.now()
+        }
+    )
+    
+    try:
+        with db_engine.begin() as connection:
+            connection.execute(statement)
+        logger.info(f"{len(rows)} résultat(s) stocké(s) dans PostgreSQL")
+        return True
+    except Exception as e:
+        logger.error(f"Erreur lors du stockage PostgreSQL de {len(rows)} résultat(s): {str(e)}")
+        return False
+
+class PostgresResultBatcher:
+    """Regroupe les écritures PostgreSQL de plusieurs jobs (worker concurrent)
+    
+    Chaque enregistrement ajouté reçoit un Future résolu une fois le lot qui le
+    contient écrit : les jobs exécutés en parallèle partagent un seul upsert mais
+    chacun attend que sa ligne soit durable avant de se terminer. Le lot part dès
+    que la taille est atteinte ou que l'intervalle expire. En cas d'échec de
+    l'upsert, les enregistrements sont remis en tête du lot suivant.
+    
+    Le batcher n'est utilisé que dans le worker concurrent, processus de longue
+    durée : le work horse du worker RQ classique se termine par os._exit, ce qui
+    tuerait le thread de fond avant l'écriture.
+    """
+    
+    def __init__(self, batch_size: int, flush_interval: float, max_pending: int = 1000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Tuple[Dict[str, Any], Future]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="pg-result-batcher", daemon=True)
+            self._thread.start()
+    
+    def add(self, record: Dict[str, Any]) -> Future:
+        """Ajoute un enregistrement au lot courant
+        
+        Returns:
+            Future: résolu à True quand la ligne est écrite, à False si l'upsert
+            du lot a échoué (l'enregistrement reste alors en attente)
+        """
+        future = Future()
+        with self._lock:
+            self._pending.append((record, future))
+            full = len(self._pending) >= self.batch_size
+            self._ensure_started()
+        if full:
+            self._wakeup.set()
+        return future
+    
+    def flush(self) -> bool:
+        """Écrit immédiatement les enregistrements en attente"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return True
+            
+            success = upsert_results_postgres([record for record, _ in pending])
+            if not success:
+                with self._lock:
+                    # Remis avant les plus récents : la dernière écriture d'un job gagne toujours
+                    self._pending = pending + self._pending
+                    dropped = len(self._pending) - self.max_pending
+                    if dropped > 0:
+                        logger.error(f"{dropped} résultat(s) abandonné(s): PostgreSQL indisponible")
+                        del self._pending[:dropped]
+            
+            for _, future in pending:
+                if not future.done():
+                    future.set_result(success)
+            return success
+    
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+postgres_batcher = PostgresResultBatcher(
+    batch_size=settings.RESULT_DB_BATCH_SIZE,
+    flush_interval=settings.RESULT_DB_FLUSH_INTERVAL
+)
+
+# Regroupement des upserts entre jobs, activé par le worker concurrent uniquement
+_batching_enabled = False
+
+def set_result_batching(enabled: bool) -> None:
+    """Active le regroupement des écritures PostgreSQL (worker concurrent)
+    
+    À la désactivation, le lot en attente est écrit immédiatement.
+    """
+    global _batching_enabled
+    _batching_enabled = enabled
+    if not enabled:
+        postgres_batcher.flush()
+
+def _write_postgres_tier(record: Dict[str, Any]) -> bool:
+    """Écrit la ligne PostgreSQL d'un job et attend qu'elle soit durable"""
+    if not _batching_enabled:
+        return upsert_results_postgres([record])
+    
+    future = postgres_batcher.add(record)
+    try:
+        return future.result(timeout=postgres_batcher.flush_interval + 30)
+    except FutureTimeoutError:
+        logger.error(f"Délai d'écriture PostgreSQL dépassé pour job {record['job_id']}")
+        return False
+
+# Pool partagé pour écrire les différents niveaux en parallèle
+_tier_executor = ThreadPoolExecutor(max_workers=settings.RESULT_STORAGE_WORKERS, thread_name_prefix="result-tier")
+
+def write_result_tiers(job_id: str, result: Dict[str, Any], status: str = "completed",
+                       error: Optional[str] = None, priority: Optional[str] = None,
+                       processing_time: Optional[float] = None) -> bool:
+    """Écrit un résultat dans tous les niveaux configurés (version bloquante)
+    
+    Le résultat est sérialisé une seule fois. Redis et MinIO sont écrits en
+    parallèle, puis la ligne PostgreSQL : elle ne référence l'objet MinIO que si
+    l'upload a réussi et contient sinon le résultat lui-même.
+    
+    Args:
+        job_id: Identifiant unique du job
+        result: Résultat du parsing
+        status: Statut du job
+        error: Message d'erreur éventuel
+        priority: Priorité du job
+        processing_time: Temps de traitement en secondes
+        
+    Returns:
+        bool: True une fois le résultat écrit dans son stockage durable :
+        PostgreSQL si configuré, sinon MinIO pour un résultat volumineux, sinon
+        Redis
+    """
+    payload = serialize_result(result)
+    is_large = len(payload) > settings.LARGE_RESULT_THRESHOLD
+    use_minio = is_large and settings.USE_MINIO_FOR_FILES
+    use_postgres = settings.STORE_RESULTS_IN_POSTGRES and SessionLocal is not None
+    
+    redis_future = None
+    if settings.STORE_RESULTS_IN_REDIS:
+        redis_future = _tier_executor.submit(_write_redis_tier, job_id, payload)
+    minio_written = _write_minio_tier(job_id, payload) if use_minio else False
+    
+    postgres_written = False
+    if use_postgres:
+        # Sans objet MinIO, la ligne PostgreSQL porte le résultat lui-même
+        postgres_written = _write_postgres_tier({
+            "job_id": job_id,
+            "status": status,
+            "result_json": None if minio_written else payload.decode('utf-8'),
+            "file_path": result_object_name(job_id) if minio_written else None,
+            "priority": priority,
+            "processing_time": processing_time,
+            "error": error
+        })
+    
+    redis_written = redis_future.result() if redis_future is not None else False
+    if use_postgres:
+        return postgres_written
+    if use_minio:
+        return minio_written
+    return redis_written
+
 # Fonction de stockage multi-tier
 async def store_result_multi_tier(job_id: str, result: Dict[str, Any], status: str = "completed", 
                                error: Optional[str] = None, priority: Optional[str] = None, 
@@ -217,6 +469,9 @@ async def store_result_multi_tier(job_id: str, result: Dict[str, Any], status: s
     """Stocke le résultat dans plusieurs niveaux (Redis, PostgreSQL, MinIO)
     selon la taille et les besoins
     
+    Les clients Redis/MinIO/SQLAlchemy étant bloquants, l'écriture est exécutée
+    hors de la boucle d'événements.
+    
     Args:
         job_id: Identifiant unique du job
         result: Résultat du parsing
@@ -228,105 +483,95 @@ async def store_result_multi_tier(job_id: str, result: Dict[str, Any], status: s
     Returns:
         bool: True si le stockage a réussi
     """
-    success = False
-    
-    # 1. Déterminer si le résultat est volumineux
-    result_json = json.dumps(result)
-    is_large = len(result_json) > settings.LARGE_RESULT_THRESHOLD
+    return await asyncio.to_thread(
+        write_result_tiers, job_id, result, status, error, priority, processing_time
+    )
+
+def read_result_tiers(job_id: str) -> Optional[Dict[str, Any]]:
+    """Lit un résultat depuis le stockage multi-tier (version bloquante)
     
-    # 2. Stocker dans Redis (court terme, accès rapide)
+    Chemin rapide : un seul GET Redis. Sinon, une seule requête PostgreSQL sur les
+    colonnes utiles, puis MinIO si le résultat y a été déporté.
+    """
+    # 1. Chercher dans Redis (plus rapide)
     if settings.STORE_RESULTS_IN_REDIS:
         try:
-            redis_client.set(
-                f"cv:result:{job_id}",
-                result_json,
-                ex=settings.REDIS_RESULT_TTL
-            )
-            success = True
-            logger.debug(f"Résultat stocké dans Redis pour job: {job_id}")
+            redis_result = redis_client.get(f"cv:result:{job_id}")
+            if redis_result:
+                try:
+                    return json.loads(redis_result)
+                except json.JSONDecodeError:
+                    logger.error(f"Erreur de décodage JSON pour job {job_id} dans Redis")
         except Exception as e:
-            logger.error(f"Erreur de stockage Redis pour job {job_id}: {str(e)}")
+            logger.error(f"Erreur de récupération Redis pour job {job_id}: {str(e)}")
+    
+    # 2. Chercher dans PostgreSQL
+    if not (settings.STORE_RESULTS_IN_POSTGRES and SessionLocal):
+        return None
     
-    # 3. Stocker dans PostgreSQL (persistance longue durée)
-    if settings.STORE_RESULTS_IN_POSTGRES and SessionLocal:
+    table = CVParsingResult.__table__
+    try:
+        with db_engine.connect() as connection:
+            db_record = connection.execute(
+                select(
+                    table.c.status, table.c.result_json, table.c.file_path,
+                    table.c.error, table.c.created_at, table.c.updated_at
+                ).where(table.c.job_id == job_id)
+            ).first()
+    except Exception as e:
+        logger.error(f"Erreur de requête PostgreSQL pour job {job_id}: {str(e)}")
+        return None
+    
+    if not db_record:
+        return None
+    
+    # Si le résultat est directement disponible dans PostgreSQL
+    if db_record.result_json:
         try:
-            db = SessionLocal()
-            
-            try:
-                # Vérifier si l'enregistrement existe déjà
-                existing = db.query(CVParsingResult).filter(CVParsingResult.job_id == job_id).first()
-                
-                if existing:
-                    # Mettre à jour les champs
-                    existing.status = status
-                    existing.result_json = None if is_large else result_json
-                    existing.priority = priority or existing.priority
-                    existing.processing_time = processing_time or existing.processing_time
-                    existing.error = error or existing.error
-                    existing.updated_at = func.now()
-                else:
-                    # Nouvel enregistrement
-                    db_record = CVParsingResult(
-                        job_id=job_id,
-                        status=status,
-                        result_json=None if is_large else result_json,
-                        file_path=None,
-                        priority=priority,
-                        processing_time=processing_time,
-                        error=error
-                    )
-                    db.add(db_record)
-                
-                db.commit()
-                success = True
-                logger.info(f"Résultat stocké dans PostgreSQL pour job {job_id}")
-            except Exception as e:
-                logger.error(f"Erreur lors du stockage PostgreSQL pour job {job_id}: {str(e)}")
-                db.rollback()
-            finally:
-                db.close()
-        except Exception as e:
-            logger.error(f"Erreur de connexion PostgreSQL pour job {job_id}: {str(e)}")
+            return json.loads(db_record.result_json)
+        except json.JSONDecodeError:
+            logger.error(f"Erreur de décodage JSON pour job {job_id} dans PostgreSQL")
     
-    # 4. Si volumineux, stocker dans MinIO
-    if is_large and settings.USE_MINIO_FOR_FILES:
+    # 3. Si le résultat est dans MinIO
+    if db_record.file_path and settings.USE_MINIO_FOR_FILES:
         try:
-            ensure_bucket_exists()
-            
-            # Stocker le JSON dans MinIO
-            object_name = f"results/{job_id}.json"
-            minio_client.put_object(
+            response = minio_client.get_object(
                 bucket_name=settings.MINIO_BUCKET_NAME,
-                object_name=object_name,
-                data=io.BytesIO(result_json.encode('utf-8')),
-                length=len(result_json.encode('utf-8')),
-                content_type="application/json"
+                object_name=db_record.file_path
             )
+            try:
+                payload = response.read()
+            finally:
+                response.close()
+                response.release_conn()
             
-            # Mettre à jour le chemin dans PostgreSQL si configuré
-            if settings.STORE_RESULTS_IN_POSTGRES and SessionLocal:
-                try:
-                    db = SessionLocal()
-                    result_record = db.query(CVParsingResult).filter(CVParsingResult.job_id == job_id).first()
-                    if result_record:
-                        result_record.file_path = object_name
-                        db.commit()
-                    db.close()
-                except Exception as e:
-                    logger.error(f"Erreur de mise à jour du chemin MinIO dans PostgreSQL: {str(e)}")
+            # Mettre en cache dans Redis pour les prochains accès
+            if settings.STORE_RESULTS_IN_REDIS:
+                _write_redis_tier(job_id, payload)
             
-            logger.info(f"Résultat volumineux stocké dans MinIO pour job {job_id}")
-            success = True
+            return json.loads(payload)
         except Exception as e:
-            logger.error(f"Erreur lors du stockage MinIO pour job {job_id}: {str(e)}")
+            logger.error(f"Erreur lors de la récupération MinIO pour job {job_id}: {str(e)}")
     
-    return success
+    # Si le statut est complété mais pas de résultat, c'est une anomalie
+    if db_record.status == "completed" and not db_record.error:
+        logger.error(f"Anomalie: job {job_id} marqué comme complété mais aucun résultat trouvé")
+    
+    # Retourner les métadonnées disponibles
+    return {
+        "job_id": job_id,
+        "status": db_record.status,
+        "error": db_record.error,
+        "created_at": db_record.created_at.isoformat() if db_record.created_at else None,
+        "updated_at": db_record.updated_at.isoformat() if db_record.updated_at else None
+    }
 
 # Fonction de récupération multi-tier
 async def get_result_multi_tier(job_id: str) -> Optional[Dict[str, Any]]:
     """Récupère le résultat à partir du stockage multi-tier
     
-    Recherche d'abord dans Redis, puis PostgreSQL, puis MinIO si nécessaire
+    Recherche d'abord dans Redis, puis PostgreSQL, puis MinIO si nécessaire,
+    hors de la boucle d'événements.
     
     Args:
         job_id: Identifiant unique du job
@@ -334,86 +579,4 @@ async def get_result_multi_tier(job_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Optional[Dict[str, Any]]: Résultat ou None si non trouvé
     """
-    # 1. Chercher dans Redis (plus rapide)
-    if settings.STORE_RESULTS_IN_REDIS:
-        try:
-            redis_result = redis_client.get(f"cv:result:{job_id}")
-            if redis_result:
-                try:
-                    return json.loads(redis_result)
-                except json.JSONDecodeError:
-                    logger.error(f"Erreur de décodage JSON pour job {job_id} dans Redis")
-        except Exception as e:
-            logger.error(f"Erreur de récupération Redis pour job {job_id}: {str(e)}")
-    
-    # 2. Chercher dans PostgreSQL
-    if settings.STORE_RESULTS_IN_POSTGRES and SessionLocal:
-        try:
-            db = SessionLocal()
-            
-            try:
-                db_record = db.query(CVParsingResult).filter(CVParsingResult.job_id == job_id).first()
-                
-                if not db_record:
-                    db.close()
-                    return None
-                    
-                # Si le résultat est directement disponible dans PostgreSQL
-                if db_record.result_json:
-                    try:
-                        result = json.loads(db_record.result_json)
-                        db.close()
-                        return result
-                    except json.JSONDecodeError:
-                        logger.error(f"Erreur de décodage JSON pour job {job_id} dans PostgreSQL")
-                
-                # 3. Si le résultat est dans MinIO
-                if db_record.file_path and settings.USE_MINIO_FOR_FILES:
-                    file_path = db_record.file_path
-                    db.close()
-                    
-                    try:
-                        response = minio_client.get_object(
-                            bucket_name=settings.MINIO_BUCKET_NAME,
-                            object_name=file_path
-                        )
-                        
-                        result_json = response.read().decode('utf-8')
-                        response.close()
-                        
-                        # Mettre en cache dans Redis pour les prochains accès
-                        if settings.STORE_RESULTS_IN_REDIS:
-                            redis_client.set(
-                                f"cv:result:{job_id}",
-                                result_json,
-                                ex=settings.REDIS_RESULT_TTL
-                            )
-                        
-                        return json.loads(result_json)
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la récupération MinIO pour job {job_id}: {str(e)}")
-                
-                # Si le statut est complété mais pas de résultat, c'est une anomalie
-                if db_record.status == "completed" and not db_record.error:
-                    logger.error(f"Anomalie: job {job_id} marqué comme complété mais aucun résultat trouvé")
-                
-                # Retourner les métadonnées disponibles
-                metadata = {
-                    "job_id": job_id,
-                    "status": db_record.status,
-                    "error": db_record.error,
-                    "created_at": db_record.created_at.isoformat() if db_record.created_at else None,
-                    "updated_at": db_record.updated_at.isoformat() if db_record.updated_at else None
-                }
-                
-                db.close()
-                return metadata
-                
-            except Exception as e:
-                logger.error(f"Erreur de requête PostgreSQL pour job {job_id}: {str(e)}")
-                db.close()
-        except Exception as e:
-            logger.error(f"Erreur de connexion PostgreSQL pour job {job_id}: {str(e)}")
-    
-    # Aucun résultat trouvé
-    return None
+    return await asyncio.to_thread(read_result_tiers, job_id)
@@ -0,0 +1,197 @@
+"""
+Ordonnanceur concurrent pour les workers de parsing CV.
+
+Exécute plusieurs jobs RQ en parallèle dans un même processus : les appels LLM
+(liés aux E/S) tournent dans des threads, l'extraction de texte (liée au CPU) est
+déléguée à un pool de processus. Les queues sont servies selon un partage pondéré
+(smooth weighted round-robin) et la queue batch ne peut occuper qu'une part des slots,
+afin que la latence premium reste stable pendant les imports massifs.
+"""
+
+import socket
+import logging
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from redis import Redis
+from rq import Queue
+from rq.job import Job, JobStatus
+from rq.utils import utcnow
+
+from app.core.config import settings
+from app.services.executors import set_cpu_executor, set_current_priority
+from app.services.storage import set_result_batching
+
+logger = logging.getLogger("cv-parser-worker")
+
+class WeightedQueueSelector:
+    """Sélection pondérée des queues (smooth weighted round-robin, comme nginx)
+
+    Sur une période, chaque queue non vide est servie proportionnellement à son
+    poids, sans rafales : avec des poids 6/3/1, la queue batch obtient un slot sur dix.
+    """
+
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = {name: max(1, weight) for name, weight in weights.items()}
+        self.current = {name: 0 for name in self.weights}
+
+    def order(self, eligible: Optional[List[str]] = None) -> List[str]:
+        """Retourne les queues éligibles par ordre de préférence pour ce tour
+
+        La première est l'élue du round-robin pondéré ; les suivantes servent de
+        repli (par poids décroissant) si l'élue est vide.
+        """
+        names = [name for name in self.weights if eligible is None or name in eligible]
+        if not names:
+            return []
+
+        total = sum(self.weights[name] for name in names)
+        for name in names:
+            self.current[name] += self.weights[name]
+
+        chosen = max(names, key=lambda name: self.current[name])
+        self.current[chosen] -= total
+
+        fallbacks = sorted(
+            (name for name in names if name != chosen),
+            key=lambda name: self.weights[name],
+            reverse=True
+        )
+        return [chosen] + fallbacks
+
+class ConcurrentWorker:
+    """Worker RQ exécutant plusieurs jobs simultanément avec partage pondéré des queues
+
+    Limites : le timeout RQ des jobs n'est pas appliqué (pas de signal dans les threads),
+    les appels sortants disposent de leurs propres timeouts.
+    """
+
+    def __init__(self, connection: Redis, queue_names: List[str],
+                 weights: Optional[Dict[str, int]] = None,
+                 max_concurrent_jobs: Optional[int] = None,
+                 cpu_processes: Optional[int] = None,
+                 batch_queue: str = "cv_parsing_batch"):
+        self.connection = connection
+        self.queues = {name: Queue(name, connection=connection) for name in queue_names}
+        self.selector = WeightedQueueSelector(
+            {name: (weights or settings.WORKER_QUEUE_WEIGHTS).get(name, 1) for name in queue_names}
+        )
+        self.max_concurrent_jobs = max_concurrent_jobs or settings.WORKER_MAX_CONCURRENT_JOBS
+        self.cpu_processes = settings.WORKER_CPU_PROCESSES if cpu_processes is None else cpu_processes
+        self.batch_queue = batch_queue
+        self.batch_max_slots = max(1, int(self.max_concurrent_jobs * settings.WORKER_BATCH_MAX_SHARE))
+        self.name = f"cv-parser-concurrent.{socket.gethostname()}.{id(self)}"
+
+        self._slots = threading.Semaphore(self.max_concurrent_jobs)
+        self._in_flight: Dict[str, int] = {name: 0 for name in queue_names}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def request_stop(self, *args):
+        """Demande l'arrêt : plus aucun job n'est pris, les jobs en cours se terminent"""
+        logger.info("Arrêt demandé, fin des jobs en cours...")
+        self._stop.set()
+
+    def _eligible_queues(self) -> List[str]:
+        with self._lock:
+            return [
+                name for name in self.queues
+                if name != self.batch_queue or self._in_flight[name] < self.batch_max_slots
+            ]
+
+    def _dequeue(self) -> Optional[Job]:
+        """Récupère le prochain job selon le partage pondéré"""
+        for name in self.selector.order(self._eligible_queues()):
+            queue = self.queues[name]
+            # LPOP direct : Queue.pop_job_id lève ValueError quand la queue est vide
+            job_id = self.connection.lpop(queue.key)
+            if not job_id:
+                continue
+            if isinstance(job_id, bytes):
+                job_id = job_id.decode("utf-8")
+            try:
+                return Job.fetch(job_id, connection=self.connection)
+            except Exception as e:
+                logger.warning(f"Job {job_id} introuvable dans {name}: {str(e)}")
+        return None
+
+    def _execute(self, job: Job):
+        """Exécute un job et enregistre son résultat dans les registres RQ"""
+        queue = self.queues[job.origin]
+        started_registry = queue.started_job_registry
+        set_current_priority(job.origin.rsplit("_", 1)[-1])
+
+        try:
+            with self.connection.pipeline() as pipeline:
+                job.prepare_for_execution(self.name, pipeline)
+                started_registry.add(job, job.timeout or settings.DEFAULT_TIMEOUT, pipeline=pipeline)
+                pipeline.execute()
+
+            try:
+                job._result = job.perform()
+                job.ended_at = utcnow()
+                with self.connection.pipeline() as pipeline:
+                    result_ttl = job.get_result_ttl(settings.RESULT_TTL)
+                    if result_ttl != 0:
+                        job._handle_success(result_ttl, pipeline=pipeline)
+                    job.cleanup(result_ttl, pipeline=pipeline, remove_from_queue=False)
+                    started_registry.remove(job, pipeline=pipeline)
+                    pipeline.execute()
+                queue.enqueue_dependents(job)
+                logger.info(f"{job.origin}: job {job.id} terminé")
+            except Exception:
+                job.ended_at = utcnow()
+                exc_string = traceback.format_exc()
+                with self.connection.pipeline() as pipeline:
+                    job.set_status(JobStatus.FAILED, pipeline=pipeline)
+                    started_registry.remove(job, pipeline=pipeline)
+                    job._handle_failure(exc_string, pipeline=pipeline)
+                    pipeline.execute()
+                logger.error(f"{job.origin}: job {job.id} en échec\n{exc_string}")
+        finally:
+            set_current_priority(None)
+            with self._lock:
+                self._in_flight[job.origin] -= 1
+            self._slots.release()
+
+    def work(self):
+        """Boucle principale : attend un slot libre, prend un job, le confie au pool de threads"""
+        cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_processes) if self.cpu_processes > 0 else None
+        set_cpu_executor(cpu_pool)
+        # Les jobs simultanés partagent leurs upserts PostgreSQL (chacun attend le sien)
+        set_result_batching(True)
+
+        logger.info(
+            f"Worker concurrent démarré: {self.max_concurrent_jobs} jobs simultanés, "
+            f"{self.cpu_processes} processus d'extraction, poids {self.selector.weights}"
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrent_jobs,
+                                    thread_name_prefix="cv-job") as job_pool:
+                while not self._stop.is_set():
+                    if not self._slots.acquire(timeout=settings.WORKER_POLL_INTERVAL):
+                        continue
+
+                    try:
+                        job = self._dequeue()
+                    except Exception as e:
+                        logger.error(f"Erreur lors de la récupération d'un job: {str(e)}")
+                        job = None
+
+                    if job is None:
+                        self._slots.release()
+                        self._stop.wait(settings.WORKER_POLL_INTERVAL)
+                        continue
+
+                    with self._lock:
+                        self._in_flight[job.origin] += 1
+                    job_pool.submit(self._execute, job)
+        finally:
+            set_result_batching(False)
+            set_cpu_executor(None)
+            if cpu_pool:
+                cpu_pool.shutdown(wait=True)
+            logger.info("Worker concurrent arrêté")
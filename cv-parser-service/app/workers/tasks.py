@@ -4,13 +4,12 @@ import os
 import time
 import logging
 import json
-import tempfile
 import traceback
-from typing import Dict, Any, Optional, BinaryIO, List
+from typing import Dict, Any, Optional, BinaryIO, List, Sequence
 import redis
 
 from app.core.config import settings
-from app.services.storage import get_file_from_storage, delete_file_from_storage, store_result_multi_tier
+from app.services.storage import get_file_from_storage, delete_file_from_storage, write_result_tiers
 from app.services.parser import parse_cv
 from app.services.webhook import send_webhook
 
@@ -128,35 +127,37 @@ def move_to_dead_letter_queue(job_id: str, error: str, file_path: Optional[str]
 def store_result_multi_tier_sync(job_id: str, result: Dict[str, Any], status: str = "completed", 
                                error: Optional[str] = None, priority: Optional[str] = None, 
                                processing_time: Optional[float] = None) -> bool:
-    """Version synchrone de store_result_multi_tier pour utilisation dans RQ"""
-    # Similaire à store_result_multi_tier mais sans async/await
-    # Utiliser directement les fonctions Redis et PostgreSQL synchrones
-    # ...
-    # Une implémentation complète nécessiterait de dupliquer la logique
-    # Pour les besoins actuels, nous utilisons simplement le stockage Redis 
+    """Version synchrone de store_result_multi_tier pour utilisation dans RQ
+    
+    Délègue à write_result_tiers (sérialisation unique, niveaux écrits en parallèle,
+    upserts PostgreSQL regroupés entre jobs dans le worker concurrent) puis met à
+    jour les métadonnées du job une fois le résultat durable.
+    
+    Returns:
+        bool: True si le résultat a été écrit dans son stockage durable
+    """
     try:
-        # 1. Convertir en JSON
-        result_json = json.dumps(result)
-        
-        # 2. Stocker dans Redis
-        redis_conn.set(
-            f"cv:result:{job_id}",
-            result_json,
-            ex=settings.REDIS_RESULT_TTL
+        success = write_result_tiers(
+            job_id=job_id,
+            result=result,
+            status=status,
+            error=error,
+            priority=priority,
+            processing_time=processing_time
         )
         
-        # 3. Stocker les métadonnées
-        redis_conn.hset(
-            f"cv:meta:{job_id}",
-            mapping={
-                "status": status,
-                "updated_at": time.time(),
-                "processing_time": processing_time or 0
-            }
-        )
+        if not success:
+            return False
         
+        # Stocker les métadonnées en un seul aller-retour
+        meta = {
+            "status": status,
+            "updated_at": time.time(),
+            "processing_time": processing_time or 0
+        }
         if error:
-            redis_conn.hset(f"cv:meta:{job_id}", "error", error)
+            meta["error"] = error
+        redis_conn.hset(f"cv:meta:{job_id}", mapping=meta)
             
         return True
     except Exception as e:
@@ -220,10 +221,9 @@ def parse_cv_task(*args, **kwargs):
     
     logger.info(f"Démarrage du parsing CV pour job: {job_id}, fichier: {file_name}")
     
-    # Fichier temporaire si nécessaire
-    temp_file = None
     retry_count = 0
     last_error = None
+    result = None
     
     try:
         # Récupérer les informations de webhook depuis Redis
@@ -236,53 +236,62 @@ def parse_cv_task(*args, **kwargs):
         # Traitement avec logique de retry
         while retry_count < max_retries:
             try:
-                start_time = time.time()
+                # Après un échec de stockage, le résultat déjà calculé est réutilisé
+                if result is None:
+                    start_time = time.time()
                 
-                # Récupérer le fichier depuis le stockage
-                file_obj = get_file_from_storage(file_path)
+                    # Récupérer le fichier depuis le stockage
+                    file_obj = get_file_from_storage(file_path)
                 
-                # Pour MinIO ou objet file-like, enregistrer dans un fichier temporaire
-                if hasattr(file_obj, 'read') and not isinstance(file_obj, str):
-                    # Créer un fichier temporaire avec l'extension correcte
-                    suffix = file_format if file_format.startswith('.') else f".{file_format}"
-                    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-                        tmp.write(file_obj.read())
-                        temp_file = tmp.name
-                    
-                    # Fermer l'objet file-like si possible
-                    if hasattr(file_obj, 'close'):
-                        file_obj.close()
-                    
-                    # Utiliser le fichier temporaire pour le parsing
-                    file_to_parse = temp_file
-                else:
-                    # Utiliser le chemin de fichier original
-                    file_to_parse = file_path
+                    # Pour MinIO ou objet file-like, parser directement le contenu en mémoire :
+                    # pas d'aller-retour disque (le parser n'écrit un fichier temporaire que
+                    # pour les outils qui exigent un chemin, ex. antiword)
+                    if hasattr(file_obj, 'read') and not isinstance(file_obj, str):
+                        try:
+                            source = file_obj.read()
+                        finally:
+                            if hasattr(file_obj, 'close'):
+                                file_obj.close()
+                            if hasattr(file_obj, 'release_conn'):
+                                file_obj.release_conn()
+                    else:
+                        # Utiliser le chemin de fichier original
+                        source = file_path
                 
-                # Parser le CV
-                parsing_result = parse_cv(file_to_parse, file_format)
-                processing_time = time.time() - start_time
+                    fetch_time = time.time() - start_time
                 
-                # Préparer le résultat avec métadonnées
-                result = {
-                    "job_id": job_id,
-                    "file_name": file_name,
-                    "file_format": file_format,
-                    "processing_time": processing_time,
-                    "parsed_at": time.time(),
-                    "status": "done",
-                    "data": parsing_result.get("data", parsing_result)
-                }
+                    # Parser le CV
+                    parsing_result = parse_cv(source, file_format, file_name=file_name)
+                    processing_time = time.time() - start_time
                 
-                # Stocker le résultat
-                store_result_multi_tier_sync(
+                    # Préparer le résultat avec métadonnées
+                    result = {
+                        "job_id": job_id,
+                        "file_name": file_name,
+                        "file_format": file_format,
+                        "processing_time": processing_time,
+                        "parsed_at": time.time(),
+                        "status": "done",
+                        "data": parsing_result.get("data", parsing_result),
+                        "io_stats": {
+                            "in_memory": not isinstance(source, str),
+                            "bytes_read": len(source) if isinstance(source, bytes) else 0,
+                            "fetch_time": fetch_time,
+                            # Octets qu'il a fallu écrire sur disque pour ce document (0 hors DOC/textract)
+                            "temp_bytes_written": parsing_result.get("io_stats", {}).get("temp_bytes_written", 0)
+                        }
+                    }
+                
+                # Stocker le résultat (le job ne réussit qu'une fois le résultat durable)
+                if not store_result_multi_tier_sync(
                     job_id=job_id,
                     result=result,
                     status="completed",
-                    processing_time=processing_time
-                )
+                    processing_time=result["processing_time"]
+                ):
+                    raise Exception(f"Stockage du résultat impossible pour job {job_id}")
                 
-                logger.info(f"Parsing CV réussi pour job: {job_id}, durée: {processing_time:.2f}s")
+                logger.info(f"Parsing CV réussi pour job: {job_id}, durée: {result['processing_time']:.2f}s")
                 
                 # Envoyer la notification webhook si URL fournie
                 if webhook_url:
@@ -333,16 +342,176 @@ def parse_cv_task(*args, **kwargs):
         return {"error": f"Échec après {max_retries} tentatives"}
         
     finally:
-        # Nettoyer le fichier temporaire si créé
-        if temp_file and os.path.exists(temp_file) and settings.CLEANUP_TEMP_FILES:
-            try:
-                os.unlink(temp_file)
-            except Exception as e:
-                logger.warning(f"Erreur lors de la suppression du fichier temporaire {temp_file}: {str(e)}")
-        
         # Nettoyer le fichier original si configuré
         if settings.CLEANUP_TEMP_FILES:
             try:
                 delete_file_from_storage(file_path)
             except Exception as e:
                 logger.warning(f"Erreur lors de la suppression du fichier original {file_path}: {str(e)}")
+
+def update_batch_progress(batch_id: str, succeeded: Sequence[str] = (),
+                          failed: Sequence[str] = ()) -> Dict[str, Any]:
+    """Met à jour la progression d'un batch et retourne l'état courant
+    
+    Les documents terminés sont enregistrés par job_id dans deux sets Redis et les
+    compteurs sont leurs cardinalités : un groupe rejoué par RQ après une erreur ne
+    compte pas deux fois ses documents. Un document repris passe d'un set à l'autre
+    selon son dernier résultat.
+    
+    Args:
+        batch_id: Identifiant du batch
+        succeeded: job_id des documents traités avec succès
+        failed: job_id des documents en échec
+        
+    Returns:
+        Dict[str, Any]: total, completed, failed et indicateur de fin
+    """
+    key = f"cv:batch:{batch_id}"
+    completed_key, failed_key = f"{key}:completed", f"{key}:failed"
+    
+    pipe = redis_conn.pipeline()
+    if succeeded:
+        pipe.srem(failed_key, *succeeded)
+        pipe.sadd(completed_key, *succeeded)
+    if failed:
+        pipe.srem(completed_key, *failed)
+        pipe.sadd(failed_key, *failed)
+    pipe.expire(completed_key, settings.BATCH_PROGRESS_TTL)
+    pipe.expire(failed_key, settings.BATCH_PROGRESS_TTL)
+    pipe.scard(completed_key)
+    pipe.scard(failed_key)
+    pipe.hget(key, "total")
+    completed, failed_count, total = pipe.execute()[-3:]
+    
+    # Compteurs recopiés dans le hash lu par GET /batch/{batch_id}
+    redis_conn.hset(key, mapping={"completed": completed, "failed": failed_count})
+    
+    total = int(total or 0)
+    finished = total > 0 and completed + failed_count >= total
+    
+    # Un seul appel pose finished_at : c'est lui qui clôt le batch, même en cas de reprise
+    just_finished = finished and bool(redis_conn.hsetnx(key, "finished_at", time.time()))
+    if just_finished:
+        redis_conn.hset(key, "status", "done")
+    
+    return {
+        "total": total,
+        "completed": completed,
+        "failed": failed_count,
+        "finished": finished,
+        "just_finished": just_finished
+    }
+
+def parse_cv_batch_task(batch_id: str, documents: List[Dict[str, Any]],
+                        webhook_url: Optional[str] = None,
+                        webhook_secret: Optional[str] = None) -> Dict[str, Any]:
+    """Parse un groupe de CV appartenant à un batch
+    
+    Le texte des documents est extrait en parallèle, puis les CV courts sont
+    regroupés dans un nombre réduit de requêtes LLM. Chaque document conserve son
+    propre job_id pour la récupération du résultat via /result/{job_id}.
+    
+    Args:
+        batch_id: Identifiant du batch
+        documents: Descripteurs (job_id, file_path, file_name, file_format)
+        webhook_url: URL notifiée à la fin du batch complet
+        webhook_secret: Secret de signature du webhook
+        
+    Returns:
+        Dict[str, Any]: Résumé du traitement du groupe
+    """
+    from app.services.batch_parser import extract_texts_parallel, analyze_texts
+    
+    logger.info(f"Démarrage du parsing batch {batch_id}: {len(documents)} documents")
+    start_time = time.time()
+    
+    # 1. Extraction parallèle du texte
+    extractions = extract_texts_parallel(documents)
+    
+    ready = [
+        (document, extraction)
+        for document, extraction in zip(documents, extractions)
+        if extraction["error"] is None
+    ]
+    
+    # 2. Analyse groupée des CV extraits
+    try:
+        parsed = analyze_texts(
+            [extraction["text"] for _, extraction in ready],
+            [document["file_name"] for document, _ in ready]
+        )
+    except Exception as e:
+        logger.error(f"Erreur lors de l'analyse du batch {batch_id}: {str(e)}")
+        parsed = [None] * len(ready)
+        for _, extraction in ready:
+            extraction["error"] = str(e)
+    
+    parsed_by_job = {
+        document["job_id"]: data
+        for (document, _), data in zip(ready, parsed)
+    }
+    analysis_time = time.time() - start_time
+    
+    # 3. Stockage des résultats par document
+    succeeded, failed = [], []
+    for document, extraction in zip(documents, extractions):
+        job_id = document["job_id"]
+        data = parsed_by_job.get(job_id)
+        
+        error = extraction["error"]
+        if error is None and data is not None:
+            stored = store_result_multi_tier_sync(
+                job_id=job_id,
+                result={
+                    "job_id": job_id,
+                    "batch_id": batch_id,
+                    "file_name": document["file_name"],
+                    "file_format": document["file_format"],
+                    "processing_time": analysis_time / len(documents),
+                    "parsed_at": time.time(),
+                    "status": "done",
+                    "data": data
+                },
+                status="completed",
+                processing_time=analysis_time / len(documents)
+            )
+            if stored:
+                succeeded.append(job_id)
+            else:
+                # Résultat non durable : le document compte comme un échec
+                error = "Stockage du résultat impossible"
+        
+        if error is not None or data is None:
+            failed.append(job_id)
+            store_result_multi_tier_sync(
+                job_id=job_id,
+                result={
+                    "job_id": job_id,
+                    "batch_id": batch_id,
+                    "file_name": document["file_name"],
+                    "status": "failed",
+                    "error": error or "Analyse impossible"
+                },
+                status="failed",
+                error=error
+            )
+        
+        if settings.CLEANUP_TEMP_FILES:
+            delete_file_from_storage(document["file_path"])
+    
+    # 4. Progression du batch et notification finale
+    progress = update_batch_progress(batch_id, succeeded=succeeded, failed=failed)
+    logger.info(
+        f"Groupe du batch {batch_id} traité en {time.time() - start_time:.2f}s "
+        f"({len(succeeded)} succès, {len(failed)} échecs) - progression {progress['completed'] + progress['failed']}/{progress['total']}"
+    )
+    
+    if progress["just_finished"] and webhook_url:
+        send_webhook(
+            job_id=batch_id,
+            url=webhook_url,
+            data={"status": "done", "batch_id": batch_id, **progress},
+            secret=webhook_secret or ""
+        )
+    
+    return {"batch_id": batch_id, "succeeded": len(succeeded), "failed": len(failed)}
@@ -62,6 +62,11 @@ def run_worker():
         )
         queues.append(queue)
     
+    # Mode concurrent : plusieurs jobs par processus, partage pondéré des queues
+    if settings.WORKER_MODE == "concurrent":
+        run_concurrent_worker(redis_conn, queue_names)
+        return
+    
     # Gestionnaire de signaux
     killer = GracefulKiller()
     
@@ -89,5 +94,19 @@ def run_worker():
             else:
                 logger.warning("Worker arrêté de manière inattendue")
 
+def run_concurrent_worker(redis_conn, queue_names):
+    """Démarre le worker concurrent (WORKER_MODE=concurrent)."""
+    from app.workers.scheduler import ConcurrentWorker
+    
+    worker = ConcurrentWorker(connection=redis_conn, queue_names=queue_names)
+    signal.signal(signal.SIGINT, worker.request_stop)
+    signal.signal(signal.SIGTERM, worker.request_stop)
+    
+    try:
+        worker.work()
+    except Exception as e:
+        logger.error(f"Erreur dans le worker concurrent: {e}")
+        sys.exit(1)
+
 if __name__ == "__main__":
     run_worker()
\ No newline at end of file
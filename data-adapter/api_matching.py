@@ -12,10 +12,10 @@ Date: 26/05/2025
 Version: 1.0.0
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field, validator
 from typing import List, Dict, Any, Optional
 import logging
@@ -31,6 +31,7 @@ try:
         create_matching_response, 
         create_error_response
     )
+    import streaming_json
 except ImportError:
     # Fallback pour les tests
     import sys
@@ -41,6 +42,7 @@ except ImportError:
         create_matching_response, 
         create_error_response
     )
+    import streaming_json
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -355,57 +357,94 @@ async def single_job_matching(
 @app.post("/api/matching/batch")
 async def batch_matching(
     request: BatchMatchingRequest,
-    background_tasks: BackgroundTasks,
+    http_request: Request,
+    format: Optional[str] = None,
     adapter: CommitmentDataAdapter = Depends(get_adapter)
 ):
     """
     Matching en lot pour plusieurs candidats
+
+    La réponse est envoyée en flux, candidat par candidat :
+    - par défaut, document JSON identique à la réponse classique, écrit par morceaux ;
+    - NDJSON avec `Accept: application/x-ndjson` ou `?format=ndjson` : une ligne
+      d'en-tête, une ligne par candidat, une ligne de pied (processed_candidates) ;
+    - `?format=json` : réponse construite entièrement en mémoire (ancien comportement).
     """
     request_id = generate_request_id()
     
     try:
-        batch_results = []
+        # Offres converties une seule fois pour tous les candidats
+        jobs_dict = [job.dict() for job in request.jobs_data]
+        mode = streaming_json.negotiate_mode(
+            accept=http_request.headers.get("accept"),
+            format=format,
+            default=streaming_json.MODE_JSON_STREAM
+        )
+        processed = {"count": 0}
         
-        for i, candidate in enumerate(request.candidates):
-            try:
-                # Extraire CV et questionnaire du candidat
-                cv_data = candidate.get('cv_data', {})
-                questionnaire_data = candidate.get('questionnaire_data', {})
-                
-                # Valider que le CV a des compétences
-                if not cv_data.get('competences'):
-                    continue
-                
-                # Lancer le matching pour ce candidat
-                results = adapter.run_matching(
-                    cv_data=cv_data,
-                    questionnaire_data=questionnaire_data,
-                    jobs_data=[job.dict() for job in request.jobs_data],
-                    limit=request.options.limit
-                )
-                
-                batch_results.append({
-                    'candidate_index': i,
-                    'candidate_id': cv_data.get('email', f'candidate_{i}'),
-                    'results': results,
-                    'stats': adapter.get_matching_statistics(results)
-                })
+        def iter_candidate_results():
+            for i, candidate in enumerate(request.candidates):
+                try:
+                    # Extraire CV et questionnaire du candidat
+                    cv_data = candidate.get('cv_data', {})
+                    questionnaire_data = candidate.get('questionnaire_data', {})
+                    
+                    # Valider que le CV a des compétences
+                    if not cv_data.get('competences'):
+                        continue
+                    
+                    # Lancer le matching pour ce candidat
+                    results = adapter.run_matching(
+                        cv_data=cv_data,
+                        questionnaire_data=questionnaire_data,
+                        jobs_data=jobs_dict,
+                        limit=request.options.limit
+                    )
+                    
+                    candidate_result = {
+                        'candidate_index': i,
+                        'candidate_id': cv_data.get('email', f'candidate_{i}'),
+                        'results': results,
+                        'stats': adapter.get_matching_statistics(results)
+                    }
+                    
+                except Exception as e:
+                    logger.error(f"[{request_id}] Erreur candidat {i}: {str(e)}")
+                    candidate_result = {
+                        'candidate_index': i,
+                        'error': str(e)
+                    }
                 
-            except Exception as e:
-                logger.error(f"Erreur candidat {i}: {str(e)}")
-                batch_results.append({
-                    'candidate_index': i,
-                    'error': str(e)
-                })
+                processed["count"] += 1
+                yield candidate_result
         
-        return {
+        envelope = {
             'success': True,
             'request_id': request_id,
-            'processed_candidates': len(batch_results),
-            'results': batch_results,
             'timestamp': datetime.now().isoformat()
         }
         
+        def footer():
+            logger.info(f"[{request_id}] Batch terminé: {processed['count']} candidats")
+            return {'processed_candidates': processed['count']}
+        
+        if mode is None:
+            batch_results = list(iter_candidate_results())
+            return {**envelope, **footer(), 'results': batch_results}
+        
+        if mode == streaming_json.MODE_NDJSON:
+            body = streaming_json.iter_ndjson(iter_candidate_results(), header=envelope, footer=footer)
+        else:
+            body = streaming_json.iter_json_document(envelope, ('results',), iter_candidate_results(), footer=footer)
+        
+        # Itérateur synchrone : exécuté par Starlette dans le pool de threads,
+        # chaque candidat est envoyé dès que son matching est terminé
+        return StreamingResponse(
+            body,
+            media_type=streaming_json.media_type_for(mode),
+            headers={'X-Request-ID': request_id}
+        )
+        
     except Exception as e:
         logger.error(f"[{request_id}] Erreur batch matching: {str(e)}")
         return JSONResponse(
@@ -0,0 +1,77 @@
+-- Pagination par curseur et totaux en cache pour les listes de matches
+
+-- 1. Index composites pour la pagination par curseur sur (match_score, id)
+-- Chaque page est lue directement dans l'index à partir du dernier élément de
+-- la page précédente, quelle que soit la profondeur (pas d'OFFSET)
+CREATE INDEX IF NOT EXISTS idx_matches_job_score_id
+    ON matching.matches (job_id, match_score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_candidate_score_id
+    ON matching.matches (candidate_id, match_score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_job_status_score_id
+    ON matching.matches (job_id, status, match_score DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_matches_candidate_status_score_id
+    ON matching.matches (candidate_id, status, match_score DESC, id DESC);
+
+-- 2. Compteurs de matches par offre / candidat et par statut
+-- Remplace le COUNT(*) exécuté à chaque consultation d'une liste
+CREATE TABLE IF NOT EXISTS matching.match_counts (
+    owner_type VARCHAR(10) NOT NULL CHECK (owner_type IN ('job', 'candidate')),
+    owner_id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner_type, owner_id, status)
+);
+
+-- 3. Maintien des compteurs à l'insertion, à la suppression et au changement de statut
+CREATE OR REPLACE FUNCTION matching.adjust_match_count(
+    p_owner_type VARCHAR,
+    p_owner_id INTEGER,
+    p_status VARCHAR,
+    p_delta INTEGER
+) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO matching.match_counts (owner_type, owner_id, status, total)
+    VALUES (p_owner_type, p_owner_id, COALESCE(p_status, 'pending'), GREATEST(p_delta, 0))
+    ON CONFLICT (owner_type, owner_id, status)
+    DO UPDATE SET total = GREATEST(matching.match_counts.total + p_delta, 0);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION matching.match_counts_trigger_func()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (TG_OP = 'INSERT') THEN
+        PERFORM matching.adjust_match_count('job', NEW.job_id, NEW.status, 1);
+        PERFORM matching.adjust_match_count('candidate', NEW.candidate_id, NEW.status, 1);
+    ELSIF (TG_OP = 'DELETE') THEN
+        PERFORM matching.adjust_match_count('job', OLD.job_id, OLD.status, -1);
+        PERFORM matching.adjust_match_count('candidate', OLD.candidate_id, OLD.status, -1);
+    ELSIF (TG_OP = 'UPDATE') THEN
+        IF (NEW.status IS DISTINCT FROM OLD.status
+            OR NEW.job_id <> OLD.job_id
+            OR NEW.candidate_id <> OLD.candidate_id) THEN
+            PERFORM matching.adjust_match_count('job', OLD.job_id, OLD.status, -1);
+            PERFORM matching.adjust_match_count('candidate', OLD.candidate_id, OLD.status, -1);
+            PERFORM matching.adjust_match_count('job', NEW.job_id, NEW.status, 1);
+            PERFORM matching.adjust_match_count('candidate', NEW.candidate_id, NEW.status, 1);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS match_counts_trigger ON matching.matches;
+CREATE TRIGGER match_counts_trigger
+AFTER INSERT OR UPDATE OF status, job_id, candidate_id OR DELETE ON matching.matches
+FOR EACH ROW EXECUTE FUNCTION matching.match_counts_trigger_func();
+
+-- 4. Initialisation des compteurs à partir des matches existants
+TRUNCATE matching.match_counts;
+INSERT INTO matching.match_counts (owner_type, owner_id, status, total)
+SELECT 'job', job_id, COALESCE(status, 'pending'), COUNT(*)
+FROM matching.matches
+GROUP BY job_id, COALESCE(status, 'pending')
+UNION ALL
+SELECT 'candidate', candidate_id, COALESCE(status, 'pending'), COUNT(*)
+FROM matching.matches
+GROUP BY candidate_id, COALESCE(status, 'pending');
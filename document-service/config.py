@@ -63,6 +63,12 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = 20 * 1024 * 1024  # 20 Mo par défaut
     DEFAULT_DOCUMENT_EXPIRY_DAYS: int = 365  # 1 an par défaut
     PRESIGNED_URL_EXPIRE_SECONDS: int = 300  # 5 minutes par défaut
+
+    # Streaming du contenu des documents
+    CONTENT_STREAM_MIN_CHUNK_SIZE: int = 64 * 1024  # 64 Ko
+    CONTENT_STREAM_MAX_CHUNK_SIZE: int = 1024 * 1024  # 1 Mo
+    CONTENT_REDIRECT_TO_PRESIGNED: bool = False  # Rediriger /content vers une URL pré-signée
+    CONTENT_CACHE_MAX_AGE: int = 3600  # Durée de cache privée côté client (secondes)
     ALLOWED_DOCUMENT_TYPES: list = ["cv", "cover_letter", "job_description"]
     ALLOWED_MIME_TYPES: list = [
         "application/pdf",
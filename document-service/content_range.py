@@ -0,0 +1,103 @@
+from typing import Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    """
+    Levée lorsque l'en-tête Range ne peut pas être satisfait (HTTP 416)
+    """
+
+
+def build_etag(content_hash: str) -> str:
+    """
+    Construit un ETag fort à partir du hash SHA-256 du contenu
+    """
+    return f"\"{content_hash}\""
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Vérifie si l'en-tête If-None-Match correspond à l'ETag du document
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    # Comparaison faible : on ignore le préfixe W/ des validateurs
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """
+    Vérifie si la plage demandée peut être servie au regard de l'en-tête If-Range.
+
+    If-Range utilise la comparaison forte : un ETag faible ou une date (le service
+    n'expose pas de Last-Modified) ne correspond jamais, et le document est alors
+    renvoyé en entier.
+    """
+    if not if_range:
+        return True
+    return if_range.strip() == etag
+
+
+def parse_range_header(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Analyse un en-tête Range de type "bytes=start-end" et retourne (start, end) inclusifs.
+
+    Seules les plages uniques sont prises en charge : une requête multi-plages est
+    traitée comme une requête complète (comportement autorisé par la RFC 9110).
+    Retourne None si l'en-tête est absent, invalide (ex. "bytes=5-3") ou ignoré.
+    """
+    if not range_header:
+        return None
+
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or not ranges or "," in ranges:
+        return None
+
+    start_str, sep, end_str = ranges.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_str == "":
+            # Suffixe : les N derniers octets
+            suffix_length = int(end_str)
+            if suffix_length <= 0:
+                raise RangeNotSatisfiable()
+            start = max(size - suffix_length, 0)
+            end = size - 1
+        else:
+            start = int(start_str)
+            end = int(end_str) if end_str else size - 1
+            if end_str and end < start:
+                # Plage syntaxiquement invalide : l'en-tête est ignoré
+                return None
+            end = min(end, size - 1)
+    except ValueError:
+        return None
+
+    if start < 0 or start >= size or end < start:
+        raise RangeNotSatisfiable()
+
+    return start, end
+
+
+def select_chunk_size(length: int, min_chunk: int, max_chunk: int) -> int:
+    """
+    Choisit une taille de bloc de streaming adaptée à la taille à transférer.
+
+    Les petits fichiers sont envoyés en un seul bloc, les gros fichiers en blocs
+    plus larges pour limiter le nombre d'itérations Python par téléchargement.
+    Les bornes viennent de CONTENT_STREAM_MIN_CHUNK_SIZE / CONTENT_STREAM_MAX_CHUNK_SIZE.
+    """
+    # Viser une soixantaine de blocs par transfert, bornés entre min et max
+    target = length // 64
+    return max(min_chunk, min(max_chunk, target))
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, Path, Request, Header, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse, RedirectResponse, Response
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, or_
@@ -29,6 +29,9 @@ from auth import (
 from storage import storage_client
 from security import SecurityUtils
 from expiration import calculate_expiry_date
+from content_range import (
+    RangeNotSatisfiable, build_etag, etag_matches, if_range_matches, parse_range_header, select_chunk_size
+)
 
 # Configuration du logger
 logger.add(
@@ -398,12 +401,20 @@ async def get_document_access(
 @app.get("/documents/{document_id}/content")
 async def get_document_content(
     document_id: uuid.UUID = Path(...),
+    redirect: Optional[bool] = Query(None, description="Rediriger vers une URL pré-signée au lieu de streamer le contenu"),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    if_range: Optional[str] = Header(None, alias="If-Range"),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db),
     request: Request = None
 ):
     """
-    Récupère directement le contenu d'un document (streaming)
+    Récupère directement le contenu d'un document (streaming).
+
+    Prend en charge les requêtes partielles (Range / 206), les requêtes
+    conditionnelles (If-None-Match / 304) et, sur demande, une redirection
+    vers une URL pré-signée afin que le service ne relaie pas les octets.
     """
     # Récupérer le document
     document = db.query(Document).filter(Document.id == document_id).first()
@@ -419,17 +430,81 @@ async def get_document_content(
     # Logger l'accès
     log_access_attempt(db, document_id, current_user["id"], "download", True, request)
     
+    etag = build_etag(document.content_hash)
+    cache_headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={settings.CONTENT_CACHE_MAX_AGE}"
+    }
+    
+    # Requête conditionnelle : le client possède déjà la bonne version
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers)
+    
+    # Redirection vers une URL pré-signée : MinIO sert directement les octets
+    if redirect is None:
+        redirect = settings.CONTENT_REDIRECT_TO_PRESIGNED
+    
+    if redirect:
+        expires_in_seconds = settings.PRESIGNED_URL_EXPIRE_SECONDS
+        url = storage_client.generate_presigned_url(
+            object_key=document.object_key,
+            expires_in_seconds=expires_in_seconds,
+            bucket_name=document.bucket_name
+        )
+        db.add(PresignedUrl(
+            document_id=document_id,
+            url=url,
+            expires_at=datetime.utcnow() + timedelta(seconds=expires_in_seconds),
+            created_by=current_user["id"]
+        ))
+        db.commit()
+        return RedirectResponse(url=url, status_code=307, headers={"Cache-Control": "no-store"})
+    
+    size = document.size_bytes
+    
+    # Un If-Range qui ne correspond pas à la version courante invalide la plage demandée
+    if not if_range_matches(if_range, etag):
+        range_header = None
+    
     try:
-        # Récupérer le contenu depuis MinIO
+        byte_range = parse_range_header(range_header, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=416,
+            detail="Plage demandée non satisfaisable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        length = end - start + 1
+        cache_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    else:
+        start = 0
+        status_code = 200
+        length = size
+    
+    try:
+        # Récupérer uniquement la plage utile depuis MinIO
         response = storage_client.download_file(
             object_key=document.object_key,
-            bucket_name=document.bucket_name
+            bucket_name=document.bucket_name,
+            offset=start,
+            length=length if byte_range is not None else 0
+        )
+        
+        chunk_size = select_chunk_size(
+            length,
+            settings.CONTENT_STREAM_MIN_CHUNK_SIZE,
+            settings.CONTENT_STREAM_MAX_CHUNK_SIZE
         )
         
         # Créer une fonction de streaming pour le contenu
         def iterfile():
             try:
-                for data in response.stream(32*1024):
+                for data in response.stream(chunk_size):
                     yield data
             finally:
                 response.close()
@@ -437,8 +512,11 @@ async def get_document_content(
         
         return StreamingResponse(
             iterfile(),
+            status_code=status_code,
             media_type=document.mime_type,
             headers={
+                **cache_headers,
+                "Content-Length": str(length),
                 "Content-Disposition": f"attachment; filename=\"{document.filename}\""
             }
         )
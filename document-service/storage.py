@@ -75,9 +75,17 @@ class StorageClient:
         finally:
             await file.seek(0)  # Réinitialiser le curseur du fichier
 
-    def download_file(self, object_key: str, bucket_name: Optional[str] = None) -> BinaryIO:
+    def download_file(
+        self,
+        object_key: str,
+        bucket_name: Optional[str] = None,
+        offset: int = 0,
+        length: int = 0
+    ) -> BinaryIO:
         """
-        Télécharge un fichier depuis MinIO et le retourne sous forme de stream
+        Télécharge un fichier depuis MinIO et le retourne sous forme de stream.
+        `offset` et `length` permettent de ne récupérer qu'une plage d'octets
+        (length=0 signifie jusqu'à la fin de l'objet).
         """
         if bucket_name is None:
             bucket_name = settings.DOCUMENT_BUCKET
@@ -85,7 +93,9 @@ class StorageClient:
         try:
             response = self.client.get_object(
                 bucket_name=bucket_name,
-                object_name=object_key
+                object_name=object_key,
+                offset=offset,
+                length=length
             )
             
             return response
@@ -13,12 +13,12 @@ import numpy as np
 from sqlalchemy.orm import Session
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
-from textblob import TextBlob
 
 from feedback_service.models import (
     Feedback, FeedbackAnalysis, FeedbackTrend, 
     Sentiment, FeedbackType, FeedbackChannel
 )
+from feedback_service.sentiment import SentimentModel, get_sentiment_model, extract_keywords
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -28,53 +28,76 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
+# Nombre de feedbacks analysés et enregistrés par transaction
+ANALYSIS_CHUNK_SIZE = 1000
+
 
 class FeedbackAnalyzer:
     """Classe pour analyser les feedbacks utilisateurs."""
     
-    def __init__(self, db_session: Session):
+    def __init__(self, db_session: Session, sentiment_model: Optional[SentimentModel] = None):
         """
         Initialise l'analyseur de feedback.
         
         Args:
             db_session: Session de base de données SQLAlchemy
+            sentiment_model: Modèle de sentiment (FEEDBACK_SENTIMENT_MODEL par défaut)
         """
         self.db_session = db_session
+        self.sentiment_model = sentiment_model or get_sentiment_model()
         self.vectorizer = TfidfVectorizer(
             max_features=100, 
             stop_words='english',
             ngram_range=(1, 2)
         )
     
-    def analyze_new_feedback(self) -> int:
+    def analyze_new_feedback(self, chunk_size: int = ANALYSIS_CHUNK_SIZE,
+                             max_chunks: Optional[int] = None) -> int:
         """
-        Analyse tous les feedbacks non traités.
+        Analyse les feedbacks non traités, par lots.
+        
+        Chaque lot est lu, analysé (sentiment et mots clés en une passe
+        vectorisée) et enregistré dans sa propre transaction : le flag
+        `processed` sert de point de reprise, une interruption ne perd que le
+        lot en cours et un nouvel appel reprend au premier feedback non traité.
         
+        Args:
+            chunk_size: Nombre de feedbacks par lot
+            max_chunks: Nombre maximum de lots pour cet appel (tous par défaut)
+            
         Returns:
             Nombre de feedbacks analysés
         """
-        # Récupérer les feedbacks non traités
-        unprocessed_feedback = self.db_session.query(Feedback).filter_by(processed=False).all()
         count = 0
-        
-        for feedback in unprocessed_feedback:
-            # Analyser le sentiment
-            if feedback.content:
-                sentiment_result = self.analyze_sentiment(feedback.content)
-                self._save_analysis(feedback.id, "sentiment", sentiment_result)
-                feedback.sentiment = sentiment_result["sentiment"]
+        chunks = 0
+        last_id = 0
+        
+        while max_chunks is None or chunks < max_chunks:
+            # Lecture du lot suivant (seules les colonnes utiles, pagination sur l'id)
+            rows = self.db_session.query(Feedback.id, Feedback.channel, Feedback.content).filter(
+                Feedback.processed.is_(False),
+                Feedback.id > last_id
+            ).order_by(Feedback.id).limit(chunk_size).all()
+            
+            if not rows:
+                break
+            
+            try:
+                self._analyze_chunk(rows)
+                self.db_session.commit()
+            except Exception:
+                self.db_session.rollback()
+                logger.error(f"Échec de l'analyse du lot après le feedback {last_id}", exc_info=True)
+                raise
             
-            # Analyser les sujets si c'est un commentaire textuel
-            if feedback.channel == FeedbackChannel.COMMENT and feedback.content:
-                topic_result = self.extract_topics(feedback.content)
-                self._save_analysis(feedback.id, "topic", {"topics": topic_result})
+            count += len(rows)
+            chunks += 1
+            last_id = rows[-1].id
+            logger.info(f"Lot analysé: {len(rows)} feedbacks (jusqu'à l'id {last_id})")
             
-            # Marquer comme traité
-            feedback.processed = True
-            count += 1
+            if len(rows) < chunk_size:
+                break
         
-        # Commiter les changements
-        self.db_session.commit()
         logger.info(f"Analysé {count} nouveaux feedbacks")
         
         # Mettre à jour les tendances si des feedbacks ont été analysés
@@ -83,6 +106,55 @@ class FeedbackAnalyzer:
             
         return count
     
+    def _analyze_chunk(self, rows: List[Any]) -> None:
+        """
+        Analyse un lot de feedbacks et prépare les écritures groupées.
+        
+        Args:
+            rows: Lignes (id, channel, content) du lot
+        """
+        with_content = [row for row in rows if row.content]
+        now = datetime.utcnow()
+        
+        analyses = []
+        updates = {row.id: {"id": row.id, "processed": True} for row in rows}
+        
+        # Sentiment de tous les textes du lot en un appel
+        if with_content:
+            sentiments, polarities, confidences = self.sentiment_model.analyze(
+                [row.content for row in with_content]
+            )
+            for row, sentiment, polarity, confidence in zip(with_content, sentiments, polarities, confidences):
+                analyses.append({
+                    "feedback_id": row.id,
+                    "analysis_type": "sentiment",
+                    "result": {
+                        "sentiment": sentiment.value,
+                        "score": float(polarity),
+                        "confidence": float(confidence)
+                    },
+                    "confidence": float(confidence),
+                    "created_at": now
+                })
+                updates[row.id]["sentiment"] = sentiment
+        
+        # Mots clés des commentaires textuels
+        comments = [row for row in with_content if row.channel == FeedbackChannel.COMMENT]
+        if comments:
+            keywords = extract_keywords([row.content for row in comments])
+            for row, topics in zip(comments, keywords):
+                analyses.append({
+                    "feedback_id": row.id,
+                    "analysis_type": "topic",
+                    "result": {"topics": topics},
+                    "confidence": 0.8,  # Valeur par défaut
+                    "created_at": now
+                })
+        
+        if analyses:
+            self.db_session.bulk_insert_mappings(FeedbackAnalysis, analyses)
+        self.db_session.bulk_update_mappings(Feedback, list(updates.values()))
+    
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyse le sentiment d'un texte.
@@ -93,26 +165,12 @@ class FeedbackAnalyzer:
         Returns:
             Dictionnaire avec le sentiment, le score et la confiance
         """
-        # Utiliser TextBlob pour l'analyse de sentiment
-        analysis = TextBlob(text)
-        polarity = analysis.sentiment.polarity
-        
-        # Déterminer le sentiment basé sur la polarité
-        if polarity > 0.2:
-            sentiment = Sentiment.POSITIVE
-        elif polarity < -0.2:
-            sentiment = Sentiment.NEGATIVE
-        else:
-            sentiment = Sentiment.NEUTRAL
-            
-        # Calculer le score de confiance
-        # (distance par rapport à 0, normalisée entre 0 et 1)
-        confidence = min(abs(polarity) * 1.5, 1.0)
+        sentiments, polarities, confidences = self.sentiment_model.analyze([text])
         
         return {
-            "sentiment": sentiment,
-            "score": polarity,
-            "confidence": confidence
+            "sentiment": sentiments[0],
+            "score": float(polarities[0]),
+            "confidence": float(confidences[0])
         }
     
     def extract_topics(self, text: str, num_topics: int = 3) -> List[str]:
@@ -126,29 +184,7 @@ class FeedbackAnalyzer:
         Returns:
             Liste des sujets principaux
         """
-        # Méthode simple basée sur la fréquence des mots
-        # Nettoyer le texte
-        clean_text = re.sub(r'[^\w\s]', '', text.lower())
-        words = clean_text.split()
-        
-        # Filtrer les mots courts
-        words = [word for word in words if len(word) > 3]
-        
-        # Compter les occurrences
-        word_counts = {}
-        for word in words:
-            if word in word_counts:
-                word_counts[word] += 1
-            else:
-                word_counts[word] = 1
-        
-        # Trier par fréquence
-        sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        # Retourner les N premiers mots comme "sujets"
-        topics = [word for word, count in sorted_words[:num_topics]]
-        
-        return topics
+        return extract_keywords([text], num_topics)[0]
     
     def cluster_feedback(self, min_samples: int = 20) -> Dict[str, Any]:
         """
@@ -377,23 +413,6 @@ class FeedbackAnalyzer:
             'period_end': end_date
         }
     
-    def _save_analysis(self, feedback_id: int, analysis_type: str, result: Dict[str, Any]) -> None:
-        """
-        Enregistre les résultats d'analyse en base de données.
-        
-        Args:
-            feedback_id: ID du feedback
-            analysis_type: Type d'analyse
-            result: Résultats de l'analyse
-        """
-        analysis = FeedbackAnalysis(
-            feedback_id=feedback_id,
-            analysis_type=analysis_type,
-            result=result,
-            confidence=result.get('confidence', 0.8)  # Valeur par défaut
-        )
-        self.db_session.add(analysis)
-    
     def _save_trends(self, trends: List[Dict[str, Any]]) -> None:
         """
         Enregistre les tendances en base de données.
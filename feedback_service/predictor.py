@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any, Optional, Union
 import numpy as np
 import pandas as pd
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
@@ -34,6 +35,19 @@ logger.setLevel(logging.INFO)
 MODEL_VERSION = "1.0.0"
 SATISFACTION_THRESHOLD = 3.5  # Sur une échelle de 1 à 5
 CONFIDENCE_THRESHOLD = 0.7    # Confiance minimale
+CHUNK_SIZE = 5000             # Utilisateurs traités par lot (requête, prédiction, écriture)
+
+# Features d'un utilisateur, dans l'ordre des colonnes du modèle
+FEATURE_COLUMNS = (
+    # Compteurs par canal
+    [f"count_{channel.value}" for channel in FeedbackChannel]
+    # Compteurs par type
+    + [f"count_{feedback_type.value}" for feedback_type in FeedbackType]
+    # Compteurs par sentiment
+    + [f"count_{sentiment.value}" for sentiment in Sentiment]
+    # Moyennes et temporalité
+    + ["avg_rating", "days_since_first", "days_since_last", "feedback_frequency"]
+)
 
 
 class SatisfactionPredictor:
@@ -49,6 +63,7 @@ class SatisfactionPredictor:
         self.db_session = db_session
         self.model = None
         self.scaler = None
+        self.imputer = None
         self.feature_names = None
     
     def train_model(self, min_samples: int = 50) -> Dict[str, Any]:
@@ -73,8 +88,7 @@ class SatisfactionPredictor:
                 "min_samples": min_samples
             }
         
-        # Convertir en DataFrame et préparer les features
-        df = pd.DataFrame(training_data)
+        df = training_data
         
         # Définir les features et la target
         X = df.drop(columns=['user_id', 'target_satisfaction'])
@@ -95,6 +109,7 @@ class SatisfactionPredictor:
         imputer = SimpleImputer(strategy='mean')
         X_train_imputed = imputer.fit_transform(X_train_scaled)
         X_test_imputed = imputer.transform(X_test_scaled)
+        self.imputer = imputer
         
         # Entraînement du modèle RandomForest
         start_time = datetime.utcnow()
@@ -178,48 +193,20 @@ class SatisfactionPredictor:
                         "details": training_result
                     }
         
-        # Récupérer les données pour l'utilisateur
-        user_data = self._prepare_user_data(user_id)
+        # Récupérer les features de l'utilisateur
+        frame = self._load_feature_frame(user_ids=[user_id])
         
-        if not user_data:
+        if frame.empty:
             logger.warning(f"Données insuffisantes pour prédire la satisfaction de l'utilisateur {user_id}")
             return {
                 "success": False,
                 "reason": "insufficient_user_data"
             }
         
-        # Préparer les features
-        X = pd.DataFrame([user_data])
-        X = X.drop(columns=['user_id'])
-        
-        # Ajouter les colonnes manquantes et réordonner
-        for feature in self.feature_names:
-            if feature not in X.columns:
-                X[feature] = 0
-        X = X[self.feature_names]
-        
-        # Normaliser et imputer
-        X_scaled = self.scaler.transform(X)
-        imputer = SimpleImputer(strategy='mean')
-        X_imputed = imputer.fit_transform(X_scaled)
-        
-        # Prédire
-        satisfaction_score = float(self.model.predict(X_imputed)[0])
-        
-        # Calculer la confiance (basée sur nombre de feedbacks)
-        feedback_count = sum(user_data.get(f"count_{channel.value}", 0) 
-                             for channel in FeedbackChannel)
-        confidence = min(feedback_count / 10, 1.0)  # Max confiance à 10+ feedbacks
-        
-        # Identifier les facteurs principaux
-        feature_importance = self.model.feature_importances_
-        sorted_features = sorted(
-            zip(self.feature_names, feature_importance),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        top_factors = {feature: float(importance) 
-                      for feature, importance in sorted_features[:5]}
+        scores, confidences = self._predict_frame(frame)
+        satisfaction_score = float(scores[0])
+        confidence = float(confidences[0])
+        top_factors = self._top_factors()
         
         # Enregistrer la prédiction
         self._save_prediction(user_id, satisfaction_score, confidence, top_factors)
@@ -234,12 +221,13 @@ class SatisfactionPredictor:
             "prediction_time": datetime.utcnow().isoformat()
         }
     
-    def update_all_predictions(self, min_confidence: float = 0.5) -> Dict[str, Any]:
+    def update_all_predictions(self, min_confidence: float = 0.5, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
         """
         Met à jour les prédictions pour tous les utilisateurs.
         
         Args:
             min_confidence: Confiance minimale pour les prédictions
+            chunk_size: Nombre d'utilisateurs par lot
             
         Returns:
             Résultats de la mise à jour
@@ -256,21 +244,24 @@ class SatisfactionPredictor:
                         "details": training_result
                     }
         
-        # Récupérer tous les utilisateurs distincts
-        users = self.db_session.query(Feedback.user_id).distinct().all()
-        user_ids = [user[0] for user in users]
+        # Features de tous les utilisateurs, par lots : une requête agrégée,
+        # une prédiction et une écriture groupée par lot
+        top_factors = self._top_factors()
+        total_users = 0
+        predictions_made = 0
         
-        predictions = []
-        for user_id in user_ids:
-            prediction = self.predict_satisfaction(user_id)
-            if (prediction.get("success", False) and 
-                prediction.get("confidence", 0) >= min_confidence):
-                predictions.append(prediction)
+        for frame in self._iter_feature_frames(chunk_size=chunk_size):
+            scores, confidences = self._predict_frame(frame)
+            self._save_predictions_bulk(
+                frame["user_id"].tolist(), scores, confidences, top_factors
+            )
+            total_users += len(frame)
+            predictions_made += int(np.count_nonzero(confidences >= min_confidence))
         
         return {
             "success": True,
-            "total_users": len(user_ids),
-            "predictions_made": len(predictions),
+            "total_users": total_users,
+            "predictions_made": predictions_made,
             "prediction_time": datetime.utcnow().isoformat()
         }
     
@@ -303,127 +294,154 @@ class SatisfactionPredictor:
             # Faire une prédiction si aucune n'existe
             return self.predict_satisfaction(user_id)
     
-    def _prepare_training_data(self) -> List[Dict[str, Any]]:
+    def _prepare_training_data(self, chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
         """
         Prépare les données d'entraînement pour le modèle.
         
+        Les features sont agrégées par la base de données et lues par lots
+        d'utilisateurs : les feedbacks eux-mêmes ne sont pas chargés.
+        
+        Args:
+            chunk_size: Nombre d'utilisateurs par lot
+            
         Returns:
-            Liste des échantillons d'entraînement
+            Une ligne par utilisateur ayant au moins une évaluation, avec la
+            cible (satisfaction moyenne basée sur les ratings)
         """
-        # Récupérer tous les feedbacks
-        feedbacks = self.db_session.query(Feedback).all()
-        
-        # Regrouper par utilisateur
-        user_feedbacks = {}
-        for feedback in feedbacks:
-            if feedback.user_id not in user_feedbacks:
-                user_feedbacks[feedback.user_id] = []
-            user_feedbacks[feedback.user_id].append(feedback)
-        
-        # Construire les features pour chaque utilisateur
-        training_data = []
-        for user_id, feedbacks in user_feedbacks.items():
-            user_data = self._extract_user_features(user_id, feedbacks)
-            
-            # Calculer la cible (satisfaction moyenne basée sur les ratings)
-            ratings = [f.rating for f in feedbacks if f.rating is not None]
-            if ratings:
-                user_data["target_satisfaction"] = sum(ratings) / len(ratings)
-                training_data.append(user_data)
+        frames = list(self._iter_feature_frames(chunk_size=chunk_size, rated_only=True))
+        if not frames:
+            return pd.DataFrame(columns=["user_id", *FEATURE_COLUMNS, "target_satisfaction"])
         
+        training_data = pd.concat(frames, ignore_index=True)
+        training_data["target_satisfaction"] = training_data["avg_rating"]
         return training_data
     
-    def _prepare_user_data(self, user_id: int) -> Optional[Dict[str, Any]]:
+    def _feature_columns(self) -> List[Any]:
+        """Expressions d'agrégation des features (une ligne par utilisateur)"""
+        columns = [Feedback.user_id.label("user_id")]
+        for name, column, values in (
+            ("channel", Feedback.channel, FeedbackChannel),
+            ("type", Feedback.feedback_type, FeedbackType),
+            ("sentiment", Feedback.sentiment, Sentiment),
+        ):
+            for value in values:
+                columns.append(
+                    func.sum(case((column == value, 1), else_=0)).label(f"count_{value.value}")
+                )
+        columns.extend([
+            func.avg(Feedback.rating).label("avg_rating"),
+            func.min(Feedback.created_at).label("first_date"),
+            func.max(Feedback.created_at).label("last_date"),
+            func.count(Feedback.id).label("feedback_count"),
+        ])
+        return columns
+    
+    def _iter_feature_frames(self, user_ids: Optional[List[int]] = None, chunk_size: int = CHUNK_SIZE,
+                             rated_only: bool = False):
         """
-        Prépare les données d'un utilisateur pour la prédiction.
+        Parcourt les features des utilisateurs par lots (pagination sur user_id).
         
         Args:
-            user_id: ID de l'utilisateur
+            user_ids: Utilisateurs à traiter (tous par défaut)
+            chunk_size: Nombre d'utilisateurs par lot
+            rated_only: Ne garder que les utilisateurs ayant au moins un rating
+            
+        Yields:
+            DataFrame des features d'un lot d'utilisateurs
+        """
+        columns = self._feature_columns()
+        names = [column.key for column in columns]
+        last_user_id = None
+        
+        while True:
+            query = self.db_session.query(*columns)
+            if user_ids is not None:
+                query = query.filter(Feedback.user_id.in_(user_ids))
+            if last_user_id is not None:
+                query = query.filter(Feedback.user_id > last_user_id)
+            query = query.group_by(Feedback.user_id)
+            if rated_only:
+                query = query.having(func.count(Feedback.rating) > 0)
+            rows = query.order_by(Feedback.user_id).limit(chunk_size).all()
+            
+            if not rows:
+                return
+            yield self._features_from_rows(rows, names)
+            
+            if len(rows) < chunk_size:
+                return
+            last_user_id = rows[-1][0]
+    
+    def _load_feature_frame(self, user_ids: List[int]) -> pd.DataFrame:
+        """Features d'un ensemble d'utilisateurs (DataFrame vide si aucun feedback)"""
+        frames = list(self._iter_feature_frames(user_ids=user_ids, chunk_size=max(len(user_ids), 1)))
+        if not frames:
+            return pd.DataFrame(columns=["user_id", *FEATURE_COLUMNS])
+        return pd.concat(frames, ignore_index=True)
+    
+    @staticmethod
+    def _features_from_rows(rows: List[Any], names: List[str]) -> pd.DataFrame:
+        """
+        Calcule les features dérivées (temporalité, fréquence) sur tout un lot.
+        
+        Args:
+            rows: Lignes agrégées par utilisateur
+            names: Noms des colonnes des lignes
             
         Returns:
-            Dictionnaire des features de l'utilisateur
+            DataFrame avec user_id et les colonnes FEATURE_COLUMNS
         """
-        # Récupérer les feedbacks de l'utilisateur
-        feedbacks = self.db_session.query(Feedback).filter_by(user_id=user_id).all()
+        frame = pd.DataFrame.from_records(rows, columns=names)
+        now = pd.Timestamp(datetime.utcnow())
         
-        if not feedbacks:
-            return None
+        frame["avg_rating"] = frame["avg_rating"].astype(float).fillna(0)
+        frame["days_since_first"] = (now - pd.to_datetime(frame.pop("first_date"))).dt.days
+        frame["days_since_last"] = (now - pd.to_datetime(frame.pop("last_date"))).dt.days
         
-        # Extraire les features
-        return self._extract_user_features(user_id, feedbacks)
+        # Feedbacks par jour
+        days = frame["days_since_first"].to_numpy(dtype=float)
+        counts = frame.pop("feedback_count").to_numpy(dtype=float)
+        frame["feedback_frequency"] = np.divide(counts, days, out=np.zeros_like(counts), where=days > 0)
+        
+        return frame[["user_id", *FEATURE_COLUMNS]]
     
-    def _extract_user_features(self, user_id: int, feedbacks: List[Feedback]) -> Dict[str, Any]:
+    def _predict_frame(self, frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Extrait les features pour un utilisateur à partir de ses feedbacks.
+        Prédit la satisfaction de tous les utilisateurs d'un lot en un appel.
         
         Args:
-            user_id: ID de l'utilisateur
-            feedbacks: Liste des feedbacks de l'utilisateur
+            frame: Features des utilisateurs
             
         Returns:
-            Dictionnaire des features de l'utilisateur
+            Scores de satisfaction et confiances (basées sur le nombre de feedbacks)
         """
-        # Initialiser les features
-        features = {
-            "user_id": user_id,
-            # Compteurs par canal
-            "count_rating": 0,
-            "count_thumbs": 0,
-            "count_comment": 0,
-            "count_suggestion": 0,
-            "count_survey": 0,
-            "count_behavior": 0,
-            "count_other": 0,
-            # Compteurs par type
-            "count_explicit": 0,
-            "count_implicit": 0,
-            "count_system": 0,
-            # Compteurs par sentiment
-            "count_positive": 0,
-            "count_neutral": 0,
-            "count_negative": 0,
-            "count_unknown": 0,
-            # Moyennes
-            "avg_rating": 0,
-            # Temporalité
-            "days_since_first": 0,
-            "days_since_last": 0,
-            "feedback_frequency": 0  # Feedbacks par jour
-        }
+        # Ajouter les colonnes manquantes et réordonner
+        X = frame.reindex(columns=self.feature_names, fill_value=0)
         
-        # Compteurs
-        for feedback in feedbacks:
-            # Par canal
-            channel_key = f"count_{feedback.channel.value}"
-            features[channel_key] += 1
-            
-            # Par type
-            type_key = f"count_{feedback.feedback_type.value}"
-            features[type_key] += 1
-            
-            # Par sentiment
-            sentiment_key = f"count_{feedback.sentiment.value}"
-            features[sentiment_key] += 1
-        
-        # Moyennes
-        ratings = [f.rating for f in feedbacks if f.rating is not None]
-        if ratings:
-            features["avg_rating"] = sum(ratings) / len(ratings)
-        
-        # Temporalité
-        if feedbacks:
-            dates = [f.created_at for f in feedbacks]
-            first_date = min(dates)
-            last_date = max(dates)
-            now = datetime.utcnow()
-            
-            features["days_since_first"] = (now - first_date).days
-            features["days_since_last"] = (now - last_date).days
-            
-            if features["days_since_first"] > 0:
-                features["feedback_frequency"] = len(feedbacks) / features["days_since_first"]
+        # Normaliser et imputer
+        X_scaled = self.scaler.transform(X)
+        if self.imputer is not None:
+            X_imputed = self.imputer.transform(X_scaled)
+        else:
+            X_imputed = SimpleImputer(strategy='mean').fit_transform(X_scaled)
         
-        return features
+        scores = self.model.predict(X_imputed)
+        
+        # Confiance maximale à 10+ feedbacks
+        feedback_counts = frame[[f"count_{channel.value}" for channel in FeedbackChannel]].sum(axis=1).to_numpy()
+        confidences = np.minimum(feedback_counts / 10, 1.0)
+        
+        return scores, confidences
+    
+    def _top_factors(self) -> Dict[str, float]:
+        """Les 5 features les plus importantes du modèle"""
+        sorted_features = sorted(
+            zip(self.feature_names, self.model.feature_importances_),
+            key=lambda x: x[1],
+            reverse=True
+        )
+        return {feature: float(importance) 
+                for feature, importance in sorted_features[:5]}
     
     def _save_prediction(
         self, user_id: int, satisfaction_score: float, 
@@ -438,27 +456,48 @@ class SatisfactionPredictor:
             confidence: Confiance dans la prédiction
             factors: Facteurs influençant la prédiction
         """
-        # Vérifier si une prédiction existe déjà
-        existing = self.db_session.query(UserSatisfactionModel).filter_by(
-            user_id=user_id
-        ).first()
+        self._save_predictions_bulk([user_id], [satisfaction_score], [confidence], factors)
+    
+    def _save_predictions_bulk(
+        self, user_ids: List[int], scores: Any, confidences: Any, factors: Dict[str, float]
+    ) -> None:
+        """
+        Enregistre les prédictions d'un lot d'utilisateurs (une transaction par lot).
         
-        if existing:
-            # Mettre à jour
-            existing.satisfaction_score = satisfaction_score
-            existing.confidence = confidence
-            existing.factors = factors
-            existing.last_updated = datetime.utcnow()
-        else:
-            # Créer une nouvelle
-            model = UserSatisfactionModel(
-                user_id=user_id,
-                satisfaction_score=satisfaction_score,
-                confidence=confidence,
-                factors=factors
-            )
-            self.db_session.add(model)
+        Les prédictions existantes sont mises à jour, les autres insérées,
+        chacune en une seule instruction groupée.
         
+        Args:
+            user_ids: IDs des utilisateurs
+            scores: Scores de satisfaction prédits
+            confidences: Confiances des prédictions
+            factors: Facteurs influençant les prédictions
+        """
+        existing = dict(
+            self.db_session.query(UserSatisfactionModel.user_id, UserSatisfactionModel.id)
+            .filter(UserSatisfactionModel.user_id.in_(user_ids))
+            .all()
+        )
+        now = datetime.utcnow()
+        
+        updates = []
+        inserts = []
+        for user_id, score, confidence in zip(user_ids, scores, confidences):
+            values = {
+                "satisfaction_score": float(score),
+                "confidence": float(confidence),
+                "factors": factors,
+                "last_updated": now
+            }
+            if user_id in existing:
+                updates.append({"id": existing[user_id], **values})
+            else:
+                inserts.append({"user_id": int(user_id), **values})
+        
+        if updates:
+            self.db_session.bulk_update_mappings(UserSatisfactionModel, updates)
+        if inserts:
+            self.db_session.bulk_insert_mappings(UserSatisfactionModel, inserts)
         self.db_session.commit()
     
     def _load_latest_model(self) -> Optional[Any]:
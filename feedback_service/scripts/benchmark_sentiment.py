@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Débit de l'analyse des feedbacks : modèle lexical vectorisé (par lots) et
+TextBlob (un texte à la fois), sur des commentaires synthétiques.
+
+Mesures : textes/s pour le sentiment et pour l'extraction de mots clés, par
+taille de lot, et accord entre les sentiments des deux modèles.
+
+Usage:
+    python feedback_service/scripts/benchmark_sentiment.py [--texts 20000] [--chunk-sizes 100,1000,5000] [--json]
+"""
+
+import sys
+import os
+import json
+import time
+import random
+import argparse
+
+# Ajouter la racine du dépôt au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from feedback_service.sentiment import (
+    LexiconSentimentModel, TextBlobSentimentModel, extract_keywords
+)
+
+FRAGMENTS = [
+    "the matching results were great and very relevant",
+    "search is slow and the filters are confusing",
+    "les offres proposées sont pertinentes, merci",
+    "l'application est lente et pas pratique",
+    "not bad but the recommendations could be better",
+    "interface claire, candidature facile",
+    "terrible experience, the upload is broken",
+    "je suis déçu, aucune offre adaptée à mon profil",
+    "excellent service, I would recommend it",
+    "le matching n'est pas pertinent pour mon secteur",
+]
+
+
+def make_texts(count, seed=42):
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(FRAGMENTS, rng.randint(1, 3))) for _ in range(count)]
+
+
+def measure(func, texts, chunk_size):
+    start = time.perf_counter()
+    results = []
+    for i in range(0, len(texts), chunk_size):
+        results.extend(func(texts[i:i + chunk_size]))
+    elapsed = time.perf_counter() - start
+    return results, len(texts) / elapsed if elapsed else float("inf")
+
+
+def run(count, chunk_sizes):
+    texts = make_texts(count)
+    lexicon = LexiconSentimentModel()
+    report = {"texts": count, "lexicon": {}, "keywords": {}}
+
+    for chunk_size in chunk_sizes:
+        _, rate = measure(lambda batch: lexicon.analyze(batch)[0], texts, chunk_size)
+        report["lexicon"][chunk_size] = round(rate, 1)
+        _, rate = measure(extract_keywords, texts, chunk_size)
+        report["keywords"][chunk_size] = round(rate, 1)
+
+    try:
+        textblob = TextBlobSentimentModel()
+        sample = texts[:min(count, 2000)]
+        textblob_sentiments, rate = measure(lambda batch: textblob.analyze(batch)[0], sample, len(sample))
+        lexicon_sample = lexicon.analyze(sample)[0]
+        report["textblob"] = round(rate, 1)
+        report["agreement"] = round(
+            sum(a == b for a, b in zip(lexicon_sample, textblob_sentiments)) / len(sample), 3
+        )
+    except ImportError:
+        report["textblob"] = None
+        report["agreement"] = None
+
+    return report
+
+
+def print_report(report):
+    print(f"{report['texts']} textes")
+    print(f"{'lot':>8} {'sentiment (textes/s)':>22} {'mots clés (textes/s)':>22}")
+    for chunk_size, rate in report["lexicon"].items():
+        print(f"{chunk_size:>8} {rate:>22.1f} {report['keywords'][chunk_size]:>22.1f}")
+    if report["textblob"] is not None:
+        print(f"TextBlob (un texte à la fois): {report['textblob']:.1f} textes/s, "
+              f"accord des sentiments: {report['agreement']:.1%}")
+    else:
+        print("TextBlob non installé : comparaison ignorée")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débit de l'analyse de sentiment des feedbacks")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--chunk-sizes", default="100,1000,5000")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    results = run(args.texts, [int(size) for size in args.chunk_sizes.split(",")])
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
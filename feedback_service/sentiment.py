@@ -0,0 +1,215 @@
+"""
+Modèles d'analyse de sentiment par lots pour le service de feedback.
+Le modèle lexical évalue un lot de textes en une opération matricielle
+(matrice creuse documents x termes du lexique), localement et sans ressource externe.
+"""
+
+import os
+import re
+import json
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from feedback_service.models import Sentiment
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Seuils de polarité (identiques à l'analyse TextBlob historique)
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+# Lexique par défaut (français et anglais), polarité entre -1 et 1
+DEFAULT_LEXICON: Dict[str, float] = {
+    # Anglais
+    "good": 0.7, "great": 0.8, "excellent": 1.0, "amazing": 0.9, "awesome": 0.9,
+    "love": 0.8, "like": 0.4, "nice": 0.6, "helpful": 0.6, "useful": 0.5,
+    "easy": 0.5, "fast": 0.4, "perfect": 1.0, "happy": 0.8, "satisfied": 0.7,
+    "relevant": 0.5, "clear": 0.4, "recommend": 0.6, "best": 0.9, "thanks": 0.5,
+    "bad": -0.7, "poor": -0.6, "terrible": -1.0, "awful": -1.0, "horrible": -1.0,
+    "hate": -0.8, "slow": -0.4, "useless": -0.8, "difficult": -0.4, "confusing": -0.5,
+    "broken": -0.7, "bug": -0.5, "bugs": -0.5, "error": -0.5, "irrelevant": -0.6,
+    "disappointed": -0.7, "annoying": -0.6, "worst": -1.0, "wrong": -0.5, "crash": -0.7,
+    # Français
+    "bon": 0.6, "bonne": 0.6, "bien": 0.5, "super": 0.8, "excellente": 1.0,
+    "génial": 0.9, "genial": 0.9, "parfait": 1.0, "parfaite": 1.0, "top": 0.7,
+    "satisfait": 0.7, "satisfaite": 0.7, "pratique": 0.5, "utile": 0.5, "facile": 0.5,
+    "rapide": 0.4, "pertinent": 0.5, "pertinente": 0.5, "pertinents": 0.5, "clair": 0.4,
+    "merci": 0.5, "adore": 0.8, "aime": 0.5, "efficace": 0.6, "intéressant": 0.5,
+    "mauvais": -0.7, "mauvaise": -0.7, "nul": -0.8, "nulle": -0.8, "catastrophique": -1.0,
+    "lent": -0.4, "lente": -0.4, "inutile": -0.8, "difficile": -0.4, "compliqué": -0.5,
+    "bogue": -0.5, "erreur": -0.5, "erreurs": -0.5, "déçu": -0.7,
+    "déçue": -0.7, "décevant": -0.7, "pénible": -0.6, "pire": -1.0, "inadapté": -0.6,
+}
+
+# Négations : le mot qui suit est remplacé par sa forme niée (neg_<mot>)
+NEGATION_PATTERN = re.compile(r"\b(not|no|never|pas|jamais|aucun|aucune)\s+(\w+)", re.IGNORECASE)
+NEGATION_FACTOR = -0.5
+
+TOKEN_PATTERN = r"(?u)\b\w+\b"
+
+
+class SentimentModel(ABC):
+    """Interface des modèles de sentiment : polarité d'un lot de textes."""
+
+    name = "base"
+
+    @abstractmethod
+    def polarity(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Calcule la polarité de chaque texte.
+
+        Args:
+            texts: Textes à analyser
+
+        Returns:
+            Polarités entre -1 et 1
+        """
+
+    def analyze(self, texts: Sequence[str]) -> Tuple[List[Sentiment], np.ndarray, np.ndarray]:
+        """
+        Analyse le sentiment d'un lot de textes.
+
+        Returns:
+            Sentiments, polarités et confiances (distance à 0, normalisée entre 0 et 1)
+        """
+        polarity = self.polarity(texts)
+        labels = (Sentiment.NEGATIVE, Sentiment.NEUTRAL, Sentiment.POSITIVE)
+        classes = 1 + (polarity > POSITIVE_THRESHOLD).astype(int) - (polarity < NEGATIVE_THRESHOLD).astype(int)
+        sentiments = [labels[c] for c in classes]
+        confidence = np.minimum(np.abs(polarity) * 1.5, 1.0)
+        return sentiments, polarity, confidence
+
+
+class LexiconSentimentModel(SentimentModel):
+    """
+    Modèle lexical vectorisé.
+
+    Les textes d'un lot sont transformés en une matrice creuse de comptes sur
+    les termes du lexique ; la polarité de chaque texte est la moyenne des
+    polarités des termes reconnus (produit matrice creuse x vecteur).
+    """
+
+    name = "lexicon"
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None):
+        """
+        Initialise le modèle lexical.
+
+        Args:
+            lexicon: Polarité par mot (DEFAULT_LEXICON par défaut)
+        """
+        lexicon = {word.lower(): float(score) for word, score in (lexicon or DEFAULT_LEXICON).items()}
+        # Formes niées : polarité inversée et atténuée
+        lexicon.update({f"neg_{word}": score * NEGATION_FACTOR for word, score in list(lexicon.items())})
+
+        self.vocabulary = {word: index for index, word in enumerate(sorted(lexicon))}
+        self.weights = np.array([lexicon[word] for word in sorted(lexicon)], dtype=np.float64)
+        self.vectorizer = CountVectorizer(
+            vocabulary=self.vocabulary,
+            lowercase=True,
+            token_pattern=TOKEN_PATTERN
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> "LexiconSentimentModel":
+        """Charge un lexique JSON ({"mot": polarité, ...})"""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def polarity(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros(0)
+        documents = [NEGATION_PATTERN.sub(r"\1 neg_\2", text or "") for text in texts]
+        counts = self.vectorizer.transform(documents)
+
+        total = counts @ self.weights
+        matched = np.asarray(counts.sum(axis=1)).ravel()
+        polarity = np.divide(total, matched, out=np.zeros_like(total), where=matched > 0)
+        return np.clip(polarity, -1.0, 1.0)
+
+
+class TextBlobSentimentModel(SentimentModel):
+    """Modèle TextBlob (un texte à la fois), conservé pour comparaison."""
+
+    name = "textblob"
+
+    def polarity(self, texts: Sequence[str]) -> np.ndarray:
+        from textblob import TextBlob
+        return np.array([TextBlob(text or "").sentiment.polarity for text in texts], dtype=np.float64)
+
+
+SENTIMENT_MODELS = {
+    LexiconSentimentModel.name: LexiconSentimentModel,
+    TextBlobSentimentModel.name: TextBlobSentimentModel,
+}
+
+
+def get_sentiment_model(name: Optional[str] = None) -> SentimentModel:
+    """
+    Instancie le modèle de sentiment configuré.
+
+    Args:
+        name: Nom du modèle (variable FEEDBACK_SENTIMENT_MODEL, "lexicon" par défaut)
+
+    Returns:
+        Modèle de sentiment ; avec le modèle lexical, FEEDBACK_SENTIMENT_LEXICON
+        peut désigner un lexique JSON
+    """
+    name = (name or os.getenv("FEEDBACK_SENTIMENT_MODEL", LexiconSentimentModel.name)).lower()
+    if name not in SENTIMENT_MODELS:
+        raise ValueError(f"Modèle de sentiment inconnu: {name}")
+
+    lexicon_path = os.getenv("FEEDBACK_SENTIMENT_LEXICON")
+    if name == LexiconSentimentModel.name and lexicon_path:
+        return LexiconSentimentModel.from_file(lexicon_path)
+    return SENTIMENT_MODELS[name]()
+
+
+def extract_keywords(texts: Sequence[str], num_topics: int = 3) -> List[List[str]]:
+    """
+    Mots les plus fréquents (plus de 3 lettres) de chaque texte d'un lot.
+
+    Chaque texte est tokenisé une seule fois ; les comptes de tout le lot sont
+    tenus dans une matrice creuse documents x mots et la sélection se fait ligne
+    par ligne sur les seules valeurs non nulles. Les ex aequo sont départagés par
+    ordre de première apparition dans le texte, comme l'extraction historique :
+    le résultat d'un texte ne dépend pas des autres textes du lot.
+
+    Args:
+        texts: Textes à analyser
+        num_topics: Nombre de mots par texte
+
+    Returns:
+        Liste de mots clés par texte (dans l'ordre des textes)
+    """
+    if not texts:
+        return []
+
+    analyzer = CountVectorizer(lowercase=True, token_pattern=r"(?u)\b\w{4,}\b").build_analyzer()
+    tokens = [analyzer(re.sub(r"[^\w\s]", "", text or "")) for text in texts]
+    if not any(tokens):
+        # Aucun mot de plus de 3 lettres dans le lot
+        return [[] for _ in texts]
+
+    vectorizer = CountVectorizer(analyzer=lambda document: document)
+    counts = vectorizer.fit_transform(tokens).tocsr()
+    terms = vectorizer.get_feature_names_out()
+
+    keywords = []
+    for row, row_tokens in enumerate(tokens):
+        start, end = counts.indptr[row], counts.indptr[row + 1]
+        if start == end:
+            keywords.append([])
+            continue
+        names = terms[counts.indices[start:end]]
+        first_seen = {token: position for position, token in enumerate(dict.fromkeys(row_tokens))}
+        positions = np.array([first_seen[name] for name in names])
+        # Tri par (-occurrences, première apparition)
+        best = np.lexsort((positions, -counts.data[start:end]))[:num_topics]
+        keywords.append(names[best].tolist())
+    return keywords
@@ -16,6 +16,7 @@ from app.core.dependencies import validate_api_key, RateLimiter
 from app.services.storage import save_temp_file, get_file_from_storage, get_result_multi_tier
 from app.utils.validation import validate_job_file, validate_webhook_url
 from app.workers.tasks import parse_job_task
+from app.services.llm_cache import METRICS_KEY
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -186,6 +187,32 @@ async def queue_job_parsing(
             detail=f"Erreur lors de la mise en queue du job: {str(e)}"
         )
 
+@router.get("/llm/stats", status_code=status.HTTP_200_OK)
+async def get_llm_stats(
+    api_key: Optional[str] = Header(None, description="Clé API pour authentification"),
+):
+    """Statistiques agrégées des appels LLM (tokens, latence, taux de cache)"""
+    
+    if settings.REQUIRE_API_KEY:
+        validate_api_key(api_key)
+    
+    counters = {key.decode(): int(value) for key, value in redis_conn.hgetall(METRICS_KEY).items()}
+    calls = counters.get("calls", 0)
+    hits = counters.get("cache_hits", 0)
+    
+    return {
+        "backend": settings.LLM_BACKEND,
+        "model": settings.OPENAI_MODEL,
+        "calls": calls,
+        "cache_hits": hits,
+        "cache_hit_rate": round(hits / (calls + hits), 3) if calls + hits else 0.0,
+        "tokens_in": counters.get("tokens_in", 0),
+        "tokens_out": counters.get("tokens_out", 0),
+        "avg_latency_ms": round(counters.get("latency_ms", 0) / calls, 1) if calls else 0.0,
+        "errors": counters.get("errors", 0),
+        "by_namespace": {key: value for key, value in counters.items() if ":" in key}
+    }
+
 @router.get("/result/{job_id}", status_code=status.HTTP_200_OK)
 async def get_parsing_result(
     job_id: str,
@@ -57,6 +57,12 @@ class Settings(BaseSettings):
     # Mode de simulation/test
     USE_MOCK_PARSER: bool = os.environ.get('USE_MOCK_PARSER', '').lower() == 'true'
     
+    # Cache des réponses LLM et backend d'analyse
+    LLM_BACKEND: str = os.environ.get('LLM_BACKEND') or 'openai'  # 'openai' ou 'mock' (tests, benchmarks)
+    LLM_MOCK_LATENCY: float = float(os.environ.get('LLM_MOCK_LATENCY') or 0.0)  # secondes simulées par appel mock
+    LLM_CACHE_ENABLED: bool = os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_TTL: int = int(os.environ.get('LLM_CACHE_TTL') or 2592000)  # 30 jours
+    
     # Configuration de journalisation
     LOG_DIR: str = os.environ.get('LOG_DIR') or 'logs'
     LOG_LEVEL: str = os.environ.get('LOG_LEVEL') or 'INFO'
@@ -10,6 +10,11 @@ import os
 import re
 from typing import Dict, Any, List, Optional
 
+from app.utils.text_features import (
+    ExperienceExtractor, FeatureExtractor, JobFeatureExtractor, LocationExtractor,
+    NormalizedText, RegexExtractor, SalaryExtractor
+)
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -93,91 +98,118 @@ MOCK_BENEFITS = [
     "Séminaires d'entreprise", "Ambiance startup", "Équipe internationale"
 ]
 
-def extract_job_info_from_text(job_text: Optional[str]) -> Dict[str, Any]:
+class SectorExtractor(FeatureExtractor):
+    """Secteur d'activité d'après des mots-clés (début de mot, ou expression exacte)"""
+
+    name = "sector"
+
+    SECTORS_KEYWORDS = {
+        "Finance & Comptabilité": ["comptabilité", "finance", "audit", "fiscal", "trésorerie", "comptable"],
+        "Technologie & IT": ["développeur", "informatique", "tech", "logiciel", "data", "code", "python", "java", "javascript"],
+        "Marketing & Communication": ["marketing", "communication", "social media", "digital", "brand", "marque", "community"],
+        "RH & Recrutement": ["ressources humaines", "recrutement", "talent", "rh", "carrière", "paie"],
+        "Industrie & Production": ["industrie", "production", "usine", "manufacturing", "qualité", "maintenance"],
+    }
+
+    def __init__(self):
+        self._keywords = [
+            (sector, [NormalizedText(keyword, clean=False).folded for keyword in keywords])
+            for sector, keywords in self.SECTORS_KEYWORDS.items()
+        ]
+
+    def extract(self, doc: NormalizedText) -> Optional[str]:
+        words = [token.norm for token in doc.tokens]
+        for sector, keywords in self._keywords:
+            for keyword in keywords:
+                if " " in keyword:
+                    if keyword in doc.folded:
+                        return sector
+                elif any(word.startswith(keyword) for word in words):
+                    return sector
+        return None
+
+class TitleExtractor(FeatureExtractor):
+    """Titre du poste d'après les formulations courantes ("nous recherchons un ...", "... H/F")"""
+
+    name = "title"
+
+    PATTERNS = [
+        r"(?:recherch(?:e|ons)|offre d'emploi)[^\n.]*?([^\n.]+?(?:developpeur|ingenieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|pour)",
+        r"(?:poste de|profil)[^\n.]*?([^\n.]+?(?:developpeur|ingenieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|h/f)",
+        r"([^\n.]*?(?:developpeur|ingenieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*)(?:\s*\(h/f\)|\s*h/f)"
+    ]
+
+    def __init__(self):
+        self._regexes = [re.compile(pattern) for pattern in self.PATTERNS]
+
+    def extract(self, doc: NormalizedText) -> Optional[str]:
+        for regex in self._regexes:
+            match = regex.search(doc.folded)
+            if match:
+                # Nettoyer et capitaliser le titre
+                title = doc.span(match.start(1), match.end(1)).strip()
+                return " ".join(word.capitalize() for word in title.split())
+        return None
+
+class MockContractExtractor(RegexExtractor):
+    """Type de contrat mentionné après "contrat" ("Type de contrat : CDI")"""
+
+    name = "contract_type"
+    pattern = r"(?:type de contrat|contrat)[^\n.]*?\b(cdi|cdd|stage|alternance|freelance|interim)\b"
+
+    FORMS = {"cdi": "CDI", "cdd": "CDD", "interim": "Intérim"}
+
+    def format(self, value: str) -> str:
+        value = value.lower()
+        return self.FORMS.get(value, value.capitalize())
+
+# Extracteurs du mock parser, appliqués au texte normalisé une seule fois
+_mock_features = JobFeatureExtractor([
+    SectorExtractor(),
+    TitleExtractor(),
+    LocationExtractor(),
+    MockContractExtractor(),
+    SalaryExtractor(),
+    ExperienceExtractor()
+])
+
+def extract_job_info_from_text(job_text: Optional[str], job_doc: Optional[NormalizedText] = None) -> Dict[str, Any]:
     """Tente d'extraire des informations pertinentes du texte de la fiche de poste
     
     Args:
         job_text: Texte de la fiche de poste
+        job_doc: Texte déjà normalisé par le parser (évite une nouvelle normalisation)
         
     Returns:
         Dict[str, Any]: Informations extraites
     """
-    extracted = {}
+    if job_doc is None:
+        if not job_text:
+            return {}
+        job_doc = NormalizedText(job_text, clean=False)
     
-    if not job_text:
-        return extracted
+    extracted = _mock_features.extract(job_doc)
     
-    job_text_lower = job_text.lower()
-    
-    # Recherche de mots-clés pour le secteur
-    sectors_keywords = {
-        "Finance & Comptabilité": ["comptabilité", "finance", "audit", "fiscal", "trésorerie", "comptable"],
-        "Technologie & IT": ["développeur", "informatique", "tech", "logiciel", "data", "code", "python", "java", "javascript"],
-        "Marketing & Communication": ["marketing", "communication", "social media", "digital", "brand", "marque", "community"],
-        "RH & Recrutement": ["ressources humaines", "recrutement", "talent", "rh", "carrière", "paie"],
-        "Industrie & Production": ["industrie", "production", "usine", "manufacturing", "qualité", "maintenance"],
-    }
-    
-    for sector, keywords in sectors_keywords.items():
-        if any(keyword in job_text_lower for keyword in keywords):
-            extracted["sector"] = sector
-            break
-    
-    # Recherche de titres de poste courants
-    title_patterns = [
-        r"(?:recherch(?:e|ons)|offre d'emploi)[^\n.]*?([^\n.]+?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|pour)",
-        r"(?:poste de|profil)[^\n.]*?([^\n.]+?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|h/f)",
-        r"([^\n.]*?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*)(?:\s*\(h/f\)|\s*h/f)"
-    ]
+    if "salary" in extracted:
+        extracted["salary_info"] = extracted.pop("salary")
     
-    for pattern in title_patterns:
-        matches = re.findall(pattern, job_text_lower)
-        if matches:
-            # Nettoyer le résultat
-            title = matches[0].strip()
-            # Capitaliser le titre
-            title = " ".join(word.capitalize() for word in title.split())
-            extracted["title"] = title
-            break
-    
-    # Recherche de lieu
-    location_pattern = r"(?:lieu|localisation|basé à|site de travail|poste basé).*?(?:à|en|au)\s+([A-Za-zÀ-ÿ\s-]+?)(?:\s|\.|\n|$)"
-    location_matches = re.findall(location_pattern, job_text_lower)
-    if location_matches:
-        location = location_matches[0].strip().capitalize()
+    # Ramener le lieu à une ville connue si possible
+    if "location" in extracted:
         for known_location in MOCK_LOCATIONS:
-            if known_location.lower() in location.lower():
+            if known_location.lower() in extracted["location"].lower():
                 extracted["location"] = known_location
                 break
-        if "location" not in extracted:
-            extracted["location"] = location
-    
-    # Recherche de type de contrat
-    contract_pattern = r"(?:type de contrat|contrat)[^\n.]*?(CDI|CDD|Stage|Alternance|Freelance|Intérim)"
-    contract_matches = re.findall(contract_pattern, job_text_lower)
-    if contract_matches:
-        extracted["contract_type"] = contract_matches[0]
-    
-    # Recherche d'informations sur le salaire
-    salary_pattern = r"(?:salaire|rémunération)[^\n.]*?(\d+[^\n.]*?(?:€|euros|k€|k))"
-    salary_matches = re.findall(salary_pattern, job_text_lower)
-    if salary_matches:
-        extracted["salary_info"] = salary_matches[0].strip()
-    
-    # Recherche d'expérience requise
-    experience_pattern = r"(?:expérience)[^\n.]*?(\d+[^\n.]*?(?:an|année|ans|mois))"
-    experience_matches = re.findall(experience_pattern, job_text_lower)
-    if experience_matches:
-        extracted["experience"] = experience_matches[0].strip()
     
     return extracted
 
-def get_mock_job_data(job_text: str = None, filename: str = None) -> Dict[str, Any]:
+def get_mock_job_data(job_text: str = None, filename: str = None,
+                      job_doc: Optional[NormalizedText] = None) -> Dict[str, Any]:
     """Génère des données de fiche de poste fictives mais réalistes pour les tests
     
     Args:
         job_text: Texte de la fiche de poste (utilisé pour générer un hash déterministe)
         filename: Nom du fichier (utilisé comme fallback pour le hash)
+        job_doc: Texte déjà normalisé par le parser (optionnel)
         
     Returns:
         Dict[str, Any]: Données structurées fictives simulant l'analyse d'une fiche de poste
@@ -190,7 +222,7 @@ def get_mock_job_data(job_text: str = None, filename: str = None) -> Dict[str, A
     # Extraire des informations du texte si disponible
     extracted_info = {}
     if job_text:
-        extracted_info = extract_job_info_from_text(job_text)
+        extracted_info = extract_job_info_from_text(job_text, job_doc)
         logger.info(f"Informations extraites: {extracted_info}")
     
     # Définir le secteur (extrait ou aléatoire)
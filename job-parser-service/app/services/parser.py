@@ -10,13 +10,80 @@ import traceback
 import re
 
 from app.core.config import settings
-from app.services.resilience import resilient_openai_call
+from app.services.llm_cache import cached_llm_call, template_version
 from app.services.mock_parser import get_mock_job_data
 from app.utils.pdf_extractor import extract_text_from_pdf
+from app.utils.text_features import (
+    ContractTypeExtractor, ExperienceExtractor, JobFeatureExtractor, LocationExtractor,
+    NormalizedText, SalaryExtractor, SkillsExtractor, clean_job_text, remove_pdf_artifacts
+)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Template du prompt d'analyse : la fiche de poste est insérée par render_prompt, le
+# reste du texte est figé pour que la version (empreinte du template) soit stable
+JOB_PROMPT_TEMPLATE = """
+Tu es un expert en analyse de fiches de poste pour l'industrie du recrutement.
+Tu dois extraire avec précision toutes les informations importantes d'une fiche de poste.
+
+INSTRUCTIONS IMPÉRATIVES:
+1. Extrait UNIQUEMENT les informations réellement présentes dans la fiche de poste.
+2. Ne génère JAMAIS d'informations fictives.
+3. Pour tout champ non présent dans la fiche de poste, renvoie une valeur vide (chaîne vide ou tableau vide).
+4. Sois particulièrement attentif au titre du poste, à l'entreprise, au lieu de travail et au type de contrat.
+5. Différencie bien les compétences requises des compétences souhaitées.
+
+EXTRACTION DEMANDÉE:
+Retourne un JSON avec cette structure précise et TOUS ces champs, même vides:
+
+{
+  "title": "",           // Titre du poste
+  "company": "",        // Nom de l'entreprise
+  "location": "",       // Lieu de travail
+  "contract_type": "",  // Type de contrat (CDI, CDD, freelance, etc.)
+  "required_skills": [  // Compétences requises (obligatoires)
+    "Compétence 1",
+    "Compétence 2"
+  ],
+  "preferred_skills": [ // Compétences souhaitées (optionnelles)
+    "Compétence A",
+    "Compétence B"
+  ],
+  "responsibilities": [  // Missions et responsabilités
+    "Responsabilité 1",
+    "Responsabilité 2"
+  ],
+  "requirements": [     // Prérequis (formation, expérience, etc.)
+    "Prérequis 1",
+    "Prérequis 2"
+  ],
+  "benefits": [        // Avantages proposés
+    "Avantage 1",
+    "Avantage 2"
+  ],
+  "salary_range": "",  // Fourchette de salaire (si mentionnée)
+  "remote_policy": "", // Politique de télétravail (si mentionnée)
+  "application_process": "", // Processus de candidature
+  "company_description": ""  // Description de l'entreprise
+}
+
+TRÈS IMPORTANT: Veille à ignorer tout artefact technique ou structures PDF (comme des numéros d'objets PDF, des références xref, etc.).
+
+FICHE DE POSTE À ANALYSER:
+{job_text}
+
+IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations récupérées de la fiche de poste, sans aucun texte d'introduction ou commentaire.
+"""
+
+JOB_PROMPT_VERSION = template_version(JOB_PROMPT_TEMPLATE)
+
+def render_prompt(template: str, **values: str) -> str:
+    """Insère les valeurs dans un template ({nom} remplacé par la valeur, sans interpréter le JSON)"""
+    for name, value in values.items():
+        template = template.replace("{" + name + "}", value)
+    return template
+
 def parse_job(file_path: str, file_format: Optional[str] = None) -> Dict[str, Any]:
     """Parse une fiche de poste pour en extraire les informations structurées
     
@@ -44,8 +111,10 @@ def parse_job(file_path: str, file_format: Optional[str] = None) -> Dict[str, An
             logger.warning(f"Texte extrait très court ({len(job_text)} caractères), possible problème d'extraction")
             logger.debug(f"Contenu extrait: {job_text}")
         
-        # Pré-traitement du texte pour améliorer la détection
-        job_text = preprocess_job_text(job_text)
+        # Pré-traitement du texte pour améliorer la détection (nettoyage et
+        # normalisation une seule fois, partagés par tous les extracteurs)
+        job_doc = NormalizedText(job_text)
+        job_text = job_doc.text
         
         # 3. Utiliser OpenAI pour analyser la fiche de poste
         start_time = time.time()
@@ -54,18 +123,18 @@ def parse_job(file_path: str, file_format: Optional[str] = None) -> Dict[str, An
             # Si USE_MOCK_PARSER est activé, utiliser le mock au lieu de l'API
             if settings.USE_MOCK_PARSER:
                 logger.info(f"Utilisation du mock parser (mode de simulation) pour {file_path}")
-                parsed_data = get_mock_job_data(job_text, os.path.basename(file_path))
+                parsed_data = get_mock_job_data(job_text, os.path.basename(file_path), job_doc=job_doc)
             else:
                 # Sinon, utiliser l'API OpenAI
                 parsed_data = analyze_job_with_gpt(job_text)
                 
                 # Post-traitement pour corriger et enrichir les données
-                parsed_data = postprocess_job_data(parsed_data, job_text)
+                parsed_data = postprocess_job_data(parsed_data, job_text, job_doc=job_doc)
         except Exception as e:
             logger.error(f"Erreur lors de l'analyse de la fiche de poste: {str(e)}. Fallback sur le mock parser.")
             logger.error(f"Stacktrace: {traceback.format_exc()}")
             # En cas d'erreur, utiliser le mock parser comme fallback
-            parsed_data = get_mock_job_data(job_text, os.path.basename(file_path))
+            parsed_data = get_mock_job_data(job_text, os.path.basename(file_path), job_doc=job_doc)
         
         processing_time = time.time() - start_time
         logger.info(f"Fiche de poste parsée en {processing_time:.2f} secondes")
@@ -106,61 +175,17 @@ def parse_job(file_path: str, file_format: Optional[str] = None) -> Dict[str, An
 
 def preprocess_job_text(text: str) -> str:
     """Prétraite le texte de la fiche de poste pour améliorer la qualité de l'analyse"""
-    if not text:
-        return ""
-    
-    # Supprimer les artefacts PDF
-    text = remove_pdf_artifacts(text)
-    
-    # Remplacer les séquences de plusieurs espaces par un seul
-    text = re.sub(r' +', ' ', text)
-    
-    # Remplacer les séquences de plusieurs lignes vides par une seule
-    text = re.sub(r'\n+', '\n', text)
-    
-    return text
+    return clean_job_text(text)
 
-def remove_pdf_artifacts(text: str) -> str:
-    """Supprime les artefacts PDF du texte extrait"""
-    if not text:
-        return ""
-    
-    # Patterns d'artefacts PDF à supprimer
-    pdf_artifacts = [
-        r'\d+ \d+ obj',      # Objets PDF (ex: "1 0 obj")
-        r'endobj',           # Fin d'objet
-        r'xref',             # Table de référence
-        r'trailer',          # Trailer
-        r'startxref',        # Début de xref
-        r'stream',           # Début de stream
-        r'endstream',        # Fin de stream
-        r'<<.*?>>',          # Dictionnaire PDF
-        r'%PDF-\d+\.\d+',    # En-tête PDF
-        r'%[\s\n]*\d+',      # Commentaire avec nombre
-        r'/[A-Za-z]+\s+\d+', # Références dans le PDF
-        r'\[\s*\d+\s+\d+\s+\d+\s+\d+\s*\]', # Rectangle de sélection
-    ]
-    
-    # Appliquer les filtres
-    for pattern in pdf_artifacts:
-        text = re.sub(pattern, '', text)
-    
-    # Supprimer les lignes qui contiennent uniquement des nombres ou des caractères spéciaux
-    lines = text.split('\n')
-    filtered_lines = []
-    
-    for line in lines:
-        # Ignorer les lignes qui sont juste des nombres ou des caractères spéciaux
-        if not re.match(r'^[\d\s\W]+$', line.strip()):
-            filtered_lines.append(line)
-    
-    return '\n'.join(filtered_lines)
-
-def postprocess_job_data(data: Dict[str, Any], original_text: str) -> Dict[str, Any]:
+def postprocess_job_data(data: Dict[str, Any], original_text: str,
+                         job_doc: Optional[NormalizedText] = None) -> Dict[str, Any]:
     """Post-traitement des données extraites pour corriger et enrichir les informations"""
     if not data:
         return {}
     
+    if job_doc is None:
+        job_doc = NormalizedText(original_text, clean=False)
+    
     # S'assurer que tous les champs requis existent
     required_fields = [
         "title", "company", "location", "contract_type", 
@@ -175,17 +200,18 @@ def postprocess_job_data(data: Dict[str, Any], original_text: str) -> Dict[str,
             else:
                 data[field] = ""
     
-    # Extraire le type de contrat s'il n'est pas détecté
+    # Compléter le type de contrat et les compétences requises s'ils n'ont pas été détectés
+    missing = []
     if not data.get("contract_type"):
-        contract_type = extract_contract_type(original_text)
-        if contract_type:
-            data["contract_type"] = contract_type
-    
-    # Extraire les compétences requises si aucune n'a été détectée
+        missing.append("contract_type")
     if not data.get("required_skills"):
-        skills = extract_skills_from_text(original_text)
-        if skills:
-            data["required_skills"] = skills
+        missing.append("skills")
+    if missing:
+        features = _job_features.extract(job_doc, names=missing)
+        if features.get("contract_type"):
+            data["contract_type"] = features["contract_type"]
+        if features.get("skills"):
+            data["required_skills"] = features["skills"]
     
     # Nettoyer les textes des champs (supprimer "Non spécifié" si présent)
     for field in required_fields:
@@ -198,43 +224,35 @@ def postprocess_job_data(data: Dict[str, Any], original_text: str) -> Dict[str,
 
 def extract_contract_type(text: str) -> str:
     """Extrait le type de contrat du texte de la fiche de poste"""
-    contract_patterns = [
-        r'(?i)\b(CDI|contrat à durée indéterminée)\b',
-        r'(?i)\b(CDD|contrat à durée déterminée)\b',
-        r'(?i)\b(stage|internship)\b',
-        r'(?i)\b(freelance|indépendant)\b',
-        r'(?i)\b(alternance|apprentissage)\b',
-        r'(?i)\b(temps partiel|part[ -]time)\b',
-        r'(?i)\b(temps plein|full[ -]time)\b'
-    ]
-    
-    for pattern in contract_patterns:
-        match = re.search(pattern, text)
-        if match:
-            return match.group(0).capitalize()
-    
-    return ""
+    return _job_features.extractors["contract_type"].extract(NormalizedText(text, clean=False)) or ""
+
+# Liste de compétences courantes en finance/comptabilité
+COMMON_SKILLS = [
+    'Comptabilité générale', 'Comptabilité analytique', 'Comptabilité clients', 
+    'Comptabilité fournisseurs', 'Fiscalité', 'Audit', 'Contrôle de gestion',
+    'Gestion de trésorerie', 'Finance d\'entreprise', 'Normes IFRS', 'Normes US GAAP',
+    'Consolidation', 'Reporting', 'Budget', 'Prévisions', 'Analyse financière',
+    'Clôture comptable', 'Rapprochement bancaire', 'Liasse fiscale', 'Bilan',
+    'SAP', 'Oracle', 'Sage', 'Excel', 'Power BI', 'Anglais'
+]
+
+# Extracteurs appliqués au texte normalisé (motifs et automate compilés une seule fois)
+_job_features = JobFeatureExtractor([
+    ContractTypeExtractor(),
+    SkillsExtractor(COMMON_SKILLS),
+    SalaryExtractor(),
+    LocationExtractor(),
+    ExperienceExtractor()
+])
+
+def get_job_feature_extractor() -> JobFeatureExtractor:
+    """Extracteurs partagés du service (de nouveaux extracteurs peuvent y être enregistrés)"""
+    return _job_features
 
 def extract_skills_from_text(text: str) -> List[str]:
     """Extrait des compétences potentielles du texte de la fiche de poste"""
-    skills = []
-    
-    # Liste de compétences courantes en finance/comptabilité
-    common_skills = [
-        'Comptabilité générale', 'Comptabilité analytique', 'Comptabilité clients', 
-        'Comptabilité fournisseurs', 'Fiscalité', 'Audit', 'Contrôle de gestion',
-        'Gestion de trésorerie', 'Finance d\'entreprise', 'Normes IFRS', 'Normes US GAAP',
-        'Consolidation', 'Reporting', 'Budget', 'Prévisions', 'Analyse financière',
-        'Clôture comptable', 'Rapprochement bancaire', 'Liasse fiscale', 'Bilan',
-        'SAP', 'Oracle', 'Sage', 'Excel', 'Power BI', 'Anglais'
-    ]
-    
-    # Rechercher les compétences dans le texte
-    for skill in common_skills:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE):
-            skills.append(skill)
-    
-    return skills
+    # Une seule passe sur le texte, résultats dans l'ordre de la liste de référence
+    return _job_features.extractors["skills"].find(text)
 
 def extract_text_from_file(file_path: str, file_format: Optional[str] = None) -> str:
     """Extrait le texte d'un fichier
@@ -438,6 +456,33 @@ def extract_text_from_rtf(file_path: str) -> str:
         logger.error(f"Erreur lors de l'extraction du texte RTF: {str(e)}")
         raise
 
+def parse_json_response(response_text: str) -> Optional[Dict[str, Any]]:
+    """Extrait l'objet JSON d'une réponse LLM
+    
+    Essaie successivement l'objet {...} contenu dans le texte, le texte brut, puis
+    le texte débarrassé d'un bloc de code markdown.
+    
+    Returns:
+        Optional[Dict[str, Any]]: Objet décodé, None si la réponse n'en contient pas
+    """
+    match = re.search(r'(\{[\s\S]*\})', response_text)
+    clean_text = response_text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    
+    candidates = [match.group(1)] if match else []
+    candidates += [response_text, clean_text.strip()]
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
 def analyze_job_with_gpt(job_text: str) -> Dict[str, Any]:
     """Analyse une fiche de poste avec GPT pour en extraire les informations structurées
     
@@ -470,64 +515,19 @@ def analyze_job_with_gpt(job_text: str) -> Dict[str, Any]:
         logger.warning(f"Fiche de poste trop longue ({len(job_text)} caractères), troncature à {max_tokens} caractères")
         job_text = job_text[:max_tokens] + "...[texte tronqué]"
     
-    # Définir le prompt pour l'extraction d'information structurée
-    prompt = f"""
-Tu es un expert en analyse de fiches de poste pour l'industrie du recrutement.
-Tu dois extraire avec précision toutes les informations importantes d'une fiche de poste.
-
-INSTRUCTIONS IMPÉRATIVES:
-1. Extrait UNIQUEMENT les informations réellement présentes dans la fiche de poste.
-2. Ne génère JAMAIS d'informations fictives.
-3. Pour tout champ non présent dans la fiche de poste, renvoie une valeur vide (chaîne vide ou tableau vide).
-4. Sois particulièrement attentif au titre du poste, à l'entreprise, au lieu de travail et au type de contrat.
-5. Différencie bien les compétences requises des compétences souhaitées.
-
-EXTRACTION DEMANDÉE:
-Retourne un JSON avec cette structure précise et TOUS ces champs, même vides:
-
-{{
-  "title": "",           // Titre du poste
-  "company": "",        // Nom de l'entreprise
-  "location": "",       // Lieu de travail
-  "contract_type": "",  // Type de contrat (CDI, CDD, freelance, etc.)
-  "required_skills": [  // Compétences requises (obligatoires)
-    "Compétence 1",
-    "Compétence 2"
-  ],
-  "preferred_skills": [ // Compétences souhaitées (optionnelles)
-    "Compétence A",
-    "Compétence B"
-  ],
-  "responsibilities": [  // Missions et responsabilités
-    "Responsabilité 1",
-    "Responsabilité 2"
-  ],
-  "requirements": [     // Prérequis (formation, expérience, etc.)
-    "Prérequis 1",
-    "Prérequis 2"
-  ],
-  "benefits": [        // Avantages proposés
-    "Avantage 1",
-    "Avantage 2"
-  ],
-  "salary_range": "",  // Fourchette de salaire (si mentionnée)
-  "remote_policy": "", // Politique de télétravail (si mentionnée)
-  "application_process": "", // Processus de candidature
-  "company_description": ""  // Description de l'entreprise
-}}
-
-TRÈS IMPORTANT: Veille à ignorer tout artefact technique ou structures PDF (comme des numéros d'objets PDF, des références xref, etc.).
-
-FICHE DE POSTE À ANALYSER:
-{job_text}
-
-IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations récupérées de la fiche de poste, sans aucun texte d'introduction ou commentaire.
-"""
+    # Prompt construit à partir d'un template figé (sa version fait partie de la clé de cache)
+    prompt = render_prompt(JOB_PROMPT_TEMPLATE, job_text=job_text)
     
     try:
-        # Appel résilient à OpenAI (avec circuit breaker et retry)
-        response_text = resilient_openai_call(
-            prompt=prompt, 
+        # Appel résilient à OpenAI (avec circuit breaker et retry), réponses identiques servies par le cache
+        response_text = cached_llm_call(
+            namespace="job",
+            text=job_text,
+            prompt=prompt,
+            version=JOB_PROMPT_VERSION,
+            mock_response=lambda: json.dumps(get_mock_job_data(job_text), ensure_ascii=False),
+            # Seule une réponse contenant l'objet attendu est mise en cache
+            validate=lambda text: parse_json_response(text) is not None,
             model=settings.OPENAI_MODEL,
             temperature=0.1,
             max_tokens=4000
@@ -537,52 +537,25 @@ IMPORTANT: Tu dois retourner UNIQUEMENT le JSON avec toutes les informations ré
         
         # Parser la réponse JSON
         try:
-            # Nettoyage du texte pour s'assurer qu'il ne contient que du JSON
-            import re
-            json_pattern = r'(\{[\s\S]*\})' 
-            match = re.search(json_pattern, response_text)
-            if match:
-                json_str = match.group(1)
-                try:
-                    parsed_result = json.loads(json_str)
-                    logger.info("Parsing JSON réussi")
-                    return parsed_result
-                except json.JSONDecodeError as json_err:
-                    logger.error(f"Erreur de décodage JSON après extraction: {str(json_err)}")
-            
-            # Essayer de parser directement si l'extraction a échoué
-            try:
-                parsed_result = json.loads(response_text)
+            parsed_result = parse_json_response(response_text)
+            if parsed_result is not None:
+                logger.info("Parsing JSON réussi")
                 return parsed_result
-            except json.JSONDecodeError:
-                pass
-                
-            # Tentative de nettoyage et d'extraction plus agressive
-            clean_text = response_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            clean_text = clean_text.strip()
             
-            try:
-                return json.loads(clean_text)
-            except json.JSONDecodeError:
-                logger.error("Échec de la tentative de nettoyage JSON")
-                
-                # En dernier recours, renvoyer un dictionnaire par défaut
-                return {
-                    "error": "Format JSON invalide dans la réponse",
-                    "title": "",
-                    "company": "",
-                    "location": "",
-                    "contract_type": "",
-                    "required_skills": [],
-                    "preferred_skills": [],
-                    "responsibilities": [],
-                    "requirements": [],
-                    "benefits": []
-                }
+            logger.error("Aucun objet JSON exploitable dans la réponse")
+            # En dernier recours, renvoyer un dictionnaire par défaut
+            return {
+                "error": "Format JSON invalide dans la réponse",
+                "title": "",
+                "company": "",
+                "location": "",
+                "contract_type": "",
+                "required_skills": [],
+                "preferred_skills": [],
+                "responsibilities": [],
+                "requirements": [],
+                "benefits": []
+            }
         except Exception as parse_err:
             logger.error(f"Erreur lors du parsing de la réponse: {str(parse_err)}")
             # Structure de retour par défaut en cas d'erreur
@@ -30,7 +30,8 @@ def resilient_openai_call(
     temperature: float = 0.1, 
     max_tokens: int = 4000,
     retry_count: int = 3,
-    base_wait_time: float = 2.0
+    base_wait_time: float = 2.0,
+    usage: Optional[Dict[str, int]] = None
 ) -> str:
     """
     Effectue un appel résilient à l'API OpenAI avec circuit breaker et retry
@@ -42,6 +43,7 @@ def resilient_openai_call(
         max_tokens: Nombre maximum de tokens en réponse (défaut: 4000)
         retry_count: Nombre de tentatives en cas d'échec (défaut: 3)
         base_wait_time: Temps d'attente de base en secondes entre les tentatives (défaut: 2.0)
+        usage: Dictionnaire complété avec les tokens consommés (prompt_tokens, completion_tokens)
         
     Returns:
         str: La réponse générée par l'API
@@ -90,6 +92,9 @@ def resilient_openai_call(
             
             # Extraire le texte de la réponse
             response_text = response.choices[0].message.content.strip()
+            if usage is not None and getattr(response, "usage", None):
+                usage["prompt_tokens"] = response.usage.prompt_tokens
+                usage["completion_tokens"] = response.usage.completion_tokens
             
             # Réinitialiser le compteur d'échecs si l'appel réussit
             CIRCUIT_STATE["failure_count"] = 0
@@ -0,0 +1,208 @@
+"""
+Recherche multi-motifs de compétences (automate d'Aho-Corasick)
+
+L'automate est construit une seule fois à partir de la base de connaissances, puis
+chaque texte est parcouru en une seule passe, quel que soit le nombre de compétences.
+Les comparaisons se font sur un texte normalisé (minuscules, sans accents) de même
+longueur que l'original, ce qui permet de retrouver les positions exactes des mentions.
+
+Même moteur que backend/app/nlp/skill_matcher.py (le service est construit et
+déployé indépendamment du backend).
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional
+
+# Apostrophes typographiques ramenées à l'apostrophe simple ("travail d’équipe")
+_APOSTROPHES = {"’": "'", "‘": "'", "ʼ": "'", "`": "'"}
+
+
+@lru_cache(maxsize=8192)
+def _fold_char(char: str) -> str:
+    """Normalise un caractère (minuscule, sans accent) en conservant un seul caractère"""
+    decomposed = unicodedata.normalize("NFKD", char)
+    base = "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    if len(base) != 1:
+        # Ligatures, "İ"... : on garde un seul caractère pour préserver les positions
+        lowered = char.lower()
+        base = lowered if len(lowered) == 1 else char
+    return _APOSTROPHES.get(base, base)
+
+
+def fold_text(text: str) -> str:
+    """
+    Normalise un texte pour la recherche (minuscules, accents et apostrophes unifiés).
+
+    Le texte retourné a exactement la même longueur que le texte d'origine.
+    """
+    if text.isascii():
+        return text.lower().replace("`", "'")
+    return "".join(map(_fold_char, text))
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class SkillMatch(NamedTuple):
+    """Mention d'une compétence dans un texte"""
+    start: int
+    end: int
+    term: str
+    value: Any
+
+
+class SkillMatcher:
+    """
+    Automate d'Aho-Corasick sur un dictionnaire de compétences.
+
+    - insensible à la casse et aux accents ;
+    - respecte les frontières de mots : une compétence commençant (ou finissant)
+      par un caractère alphanumérique ne peut pas être précédée (ou suivie) d'un
+      autre caractère alphanumérique, ce qui gère aussi "C++", "C#" ou ".NET" ;
+    - en cas de chevauchement, la mention la plus à gauche puis la plus longue
+      l'emporte ("machine learning" plutôt que "learning").
+    """
+
+    def __init__(self, terms: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            terms: Dictionnaire forme de surface -> valeur retournée (ex: compétence canonique)
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[int] = [-1]
+        self._output_link: List[int] = [-1]
+        self._terms: List[str] = []
+        self._values: List[Any] = []
+        self._lengths: List[int] = []
+        self._bounded: List[tuple] = []
+        self._index: Dict[str, int] = {}
+        self._built = False
+
+        for term, value in (terms or {}).items():
+            self.add(term, value)
+        self.build()
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return fold_text(term).strip() in self._index
+
+    def add(self, term: str, value: Any = None) -> None:
+        """
+        Ajoute une forme de surface. La première valeur enregistrée pour une forme
+        normalisée est conservée.
+        """
+        key = fold_text(term).strip()
+        if not key or key in self._index:
+            return
+
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(-1)
+                self._output_link.append(-1)
+            state = next_state
+
+        pattern_id = len(self._terms)
+        self._index[key] = pattern_id
+        self._terms.append(term)
+        self._values.append(term if value is None else value)
+        self._lengths.append(len(key))
+        self._bounded.append((_is_word_char(key[0]), _is_word_char(key[-1])))
+        self._output[state] = pattern_id
+        self._built = False
+
+    def build(self) -> None:
+        """Calcule les liens d'échec et de sortie (parcours en largeur)"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            self._fail[state] = 0
+            self._output_link[state] = -1
+
+        position = 0
+        while position < len(queue):
+            state = queue[position]
+            position += 1
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                failed = self._fail[child]
+                self._output_link[child] = failed if self._output[failed] >= 0 else self._output_link[failed]
+
+        self._built = True
+
+    def find_all(self, text: str, overlapping: bool = False, folded: Optional[str] = None) -> List[SkillMatch]:
+        """
+        Trouve les mentions de compétences en une seule passe sur le texte.
+
+        Args:
+            text: Texte à analyser
+            overlapping: Conserver toutes les mentions, y compris celles incluses dans une autre
+            folded: fold_text(text), s'il a déjà été calculé par l'appelant
+
+        Returns:
+            List[SkillMatch]: Mentions triées par position
+        """
+        if not self._built:
+            self.build()
+        if not text or not self._terms:
+            return []
+
+        if folded is None:
+            folded = fold_text(text)
+        text_length = len(folded)
+        goto, fail = self._goto, self._fail
+        output, output_link = self._output, self._output_link
+        lengths, bounded = self._lengths, self._bounded
+
+        candidates = []
+        state = 0
+        for position, char in enumerate(folded):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            hit = state if output[state] >= 0 else output_link[state]
+            while hit > 0:
+                pattern_id = output[hit]
+                start = position - lengths[pattern_id] + 1
+                end = position + 1
+                check_start, check_end = bounded[pattern_id]
+                if not (check_start and start > 0 and _is_word_char(folded[start - 1])) and \
+                        not (check_end and end < text_length and _is_word_char(folded[end])):
+                    candidates.append((start, end, pattern_id))
+                hit = output_link[hit]
+
+        candidates.sort(key=lambda candidate: (candidate[0], candidate[0] - candidate[1]))
+
+        matches = []
+        last_end = 0
+        for start, end, pattern_id in candidates:
+            if not overlapping and start < last_end:
+                continue
+            matches.append(SkillMatch(start, end, self._terms[pattern_id], self._values[pattern_id]))
+            last_end = max(last_end, end)
+        return matches
+
+    def find_values(self, text: str) -> List[Any]:
+        """Valeurs distinctes des compétences trouvées, dans l'ordre d'apparition"""
+        seen = set()
+        values = []
+        for match in self.find_all(text):
+            if match.value not in seen:
+                seen.add(match.value)
+                values.append(match.value)
+        return values
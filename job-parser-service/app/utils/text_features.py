@@ -0,0 +1,238 @@
+# Job Parser Service - Normalisation du texte en une passe et extracteurs d'informations
+
+import re
+import logging
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from app.utils.skill_matcher import SkillMatcher, fold_text
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Artefacts PDF, regroupés dans une seule expression (une passe au lieu d'une par motif ;
+# à une même position, les formes longues "startxref" / "endstream" sont essayées avant les courtes)
+_PDF_ARTIFACTS_RE = re.compile("|".join([
+    r'\d+ \d+ obj',      # Objets PDF (ex: "1 0 obj")
+    r'endobj',           # Fin d'objet
+    r'xref',             # Table de référence
+    r'trailer',          # Trailer
+    r'startxref',        # Début de xref
+    r'stream',           # Début de stream
+    r'endstream',        # Fin de stream
+    r'<<.*?>>',          # Dictionnaire PDF
+    r'%PDF-\d+\.\d+',    # En-tête PDF
+    r'%[\s\n]*\d+',      # Commentaire avec nombre
+    r'/[A-Za-z]+\s+\d+', # Références dans le PDF
+    r'\[\s*\d+\s+\d+\s+\d+\s+\d+\s*\]', # Rectangle de sélection
+]))
+_JUNK_LINE_RE = re.compile(r'^[\d\s\W]+$')
+_SPACES_RE = re.compile(r' +')
+_NEWLINES_RE = re.compile(r'\n+')
+
+# Mots du texte normalisé ("c++", "c#", "node.js", "aujourd'hui" restent d'un seul tenant)
+_TOKEN_RE = re.compile(r"\w+(?:[+#]+|(?:[.'-]\w+)+)?")
+
+def remove_pdf_artifacts(text: str) -> str:
+    """Supprime les artefacts PDF et les lignes sans contenu textuel"""
+    if not text:
+        return ""
+
+    text = _PDF_ARTIFACTS_RE.sub('', text)
+
+    # Supprimer les lignes qui contiennent uniquement des nombres ou des caractères spéciaux
+    return '\n'.join(line for line in text.split('\n') if not _JUNK_LINE_RE.match(line.strip()))
+
+def clean_job_text(text: str) -> str:
+    """Nettoie le texte extrait d'une fiche de poste (artefacts PDF, espaces, lignes vides)"""
+    if not text:
+        return ""
+
+    text = remove_pdf_artifacts(text)
+    text = _SPACES_RE.sub(' ', text)
+    return _NEWLINES_RE.sub('\n', text)
+
+class Token(NamedTuple):
+    """Mot du texte : forme d'origine, forme normalisée et position"""
+    text: str
+    norm: str
+    start: int
+    end: int
+
+class NormalizedText:
+    """Texte d'une fiche de poste, nettoyé et normalisé une seule fois
+
+    - `text` : texte nettoyé (celui transmis au modèle) ;
+    - `folded` : `text` en minuscules et sans accents, de même longueur, ce qui
+      permet aux extracteurs de chercher sur `folded` et de renvoyer la portion
+      correspondante de `text` ;
+    - `tokens` : flux de mots normalisés, calculé au premier accès.
+    """
+
+    __slots__ = ("text", "folded", "_tokens")
+
+    def __init__(self, text: str, clean: bool = True):
+        """
+        Args:
+            text: Texte brut (ou déjà nettoyé si clean=False)
+            clean: Nettoyer le texte (artefacts PDF, espaces)
+        """
+        self.text = clean_job_text(text) if clean else (text or "")
+        self.folded = fold_text(self.text)
+        self._tokens: Optional[List[Token]] = None
+
+    @property
+    def tokens(self) -> List[Token]:
+        if self._tokens is None:
+            self._tokens = [
+                Token(self.text[match.start():match.end()], match.group(0), match.start(), match.end())
+                for match in _TOKEN_RE.finditer(self.folded)
+            ]
+        return self._tokens
+
+    def span(self, start: int, end: int) -> str:
+        """Portion du texte d'origine correspondant à une position dans `folded`"""
+        return self.text[start:end]
+
+class FeatureExtractor:
+    """Extracteur d'une information à partir d'un NormalizedText
+
+    Les sous-classes définissent `name` (clé du résultat) et `extract`, qui retourne
+    None (ou une valeur vide) lorsque l'information est absente.
+    """
+
+    name = ""
+
+    def extract(self, doc: NormalizedText) -> Any:
+        raise NotImplementedError
+
+class ContractTypeExtractor(FeatureExtractor):
+    """Type de contrat : le motif le plus prioritaire présent dans le texte l'emporte"""
+
+    name = "contract_type"
+
+    # Par ordre de priorité, sur le texte normalisé (minuscules, sans accents)
+    PATTERNS = [
+        r'cdi|contrat a duree indeterminee',
+        r'cdd|contrat a duree determinee',
+        r'stage|internship',
+        r'freelance|independant',
+        r'alternance|apprentissage',
+        r'temps partiel|part[ -]time',
+        r'temps plein|full[ -]time'
+    ]
+
+    def __init__(self):
+        self._regex = re.compile("|".join(
+            rf"(?P<p{index}>\b(?:{pattern})\b)" for index, pattern in enumerate(self.PATTERNS)
+        ))
+
+    def extract(self, doc: NormalizedText) -> Optional[str]:
+        best = None
+        for match in self._regex.finditer(doc.folded):
+            priority = int(match.lastgroup[1:])
+            if best is None or priority < best[0]:
+                best = (priority, match.start(), match.end())
+                if priority == 0:
+                    break
+        if best is None:
+            return None
+        return doc.span(best[1], best[2]).capitalize()
+
+class SkillsExtractor(FeatureExtractor):
+    """Compétences d'une liste de référence, retournées dans l'ordre de la liste"""
+
+    name = "skills"
+
+    def __init__(self, skills: Sequence[str]):
+        self.skills = list(skills)
+        # Automate construit une seule fois (insensible à la casse et aux accents)
+        self._matcher = SkillMatcher({skill: index for index, skill in enumerate(self.skills)})
+
+    def extract(self, doc: NormalizedText) -> List[str]:
+        return self.find(doc.text, doc.folded)
+
+    def find(self, text: str, folded: Optional[str] = None) -> List[str]:
+        found = {match.value for match in self._matcher.find_all(text, overlapping=True, folded=folded)}
+        return [self.skills[index] for index in sorted(found)]
+
+class RegexExtractor(FeatureExtractor):
+    """Premier groupe capturé par une expression appliquée au texte normalisé"""
+
+    pattern = ""
+
+    def __init__(self):
+        self._regex = re.compile(self.pattern)
+
+    def extract(self, doc: NormalizedText) -> Optional[str]:
+        match = self._regex.search(doc.folded)
+        if not match:
+            return None
+        return self.format(doc.span(match.start(1), match.end(1)))
+
+    def format(self, value: str) -> str:
+        return value.strip().lower()
+
+class SalaryExtractor(RegexExtractor):
+    """Mention de salaire ("rémunération : 45 à 55 k€")"""
+
+    name = "salary"
+    pattern = r"(?:salaire|remuneration)[^\n.]*?(\d+[^\n.]*?(?:€|euros|k€|k))"
+
+class LocationExtractor(RegexExtractor):
+    """Lieu de travail ("poste basé à Lyon")"""
+
+    name = "location"
+    pattern = r"(?:lieu|localisation|base a|site de travail|poste base).*?\b(?:a|en|au)\s+([a-z\s-]+?)(?:\s|\.|\n|$)"
+
+    def format(self, value: str) -> str:
+        return value.strip().capitalize()
+
+class ExperienceExtractor(RegexExtractor):
+    """Expérience requise ("5 ans d'expérience")"""
+
+    name = "experience"
+    pattern = r"(?:experience)[^\n.]*?(\d+[^\n.]*?(?:an|annee|ans|mois))"
+
+class JobFeatureExtractor:
+    """Applique une série d'extracteurs au même texte normalisé
+
+    Le texte n'est nettoyé et normalisé qu'une fois, quel que soit le nombre
+    d'extracteurs ; de nouveaux extracteurs peuvent être ajoutés avec `register`.
+    """
+
+    def __init__(self, extractors: Iterable[FeatureExtractor] = ()):
+        self.extractors: Dict[str, FeatureExtractor] = {}
+        for extractor in extractors:
+            self.register(extractor)
+
+    def register(self, extractor: FeatureExtractor) -> FeatureExtractor:
+        """Ajoute (ou remplace) l'extracteur portant ce nom"""
+        self.extractors[extractor.name] = extractor
+        return extractor
+
+    def extract(self, doc: Any, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Extrait les informations d'un texte
+
+        Args:
+            doc: NormalizedText, ou texte brut (normalisé ici)
+            names: Extracteurs à appliquer (défaut: tous)
+
+        Returns:
+            Dict[str, Any]: Informations trouvées (les valeurs vides sont omises)
+        """
+        if not isinstance(doc, NormalizedText):
+            doc = NormalizedText(doc)
+
+        selected = self.extractors.values() if names is None else \
+            [self.extractors[name] for name in names if name in self.extractors]
+
+        features = {}
+        for extractor in selected:
+            try:
+                value = extractor.extract(doc)
+            except Exception as e:
+                logger.warning(f"Extracteur {extractor.name} en erreur: {str(e)}")
+                continue
+            if value:
+                features[extractor.name] = value
+        return features
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark du prétraitement et de l'extraction d'informations des fiches de poste :
+passes successives (une par motif, minuscules recalculées à chaque étape) contre
+la normalisation unique partagée par les extracteurs (app.utils.text_features).
+
+Usage:
+    python scripts/benchmark_text_features.py [--docs 500] [--repeat 3]
+"""
+
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.parser import COMMON_SKILLS, get_job_feature_extractor
+from app.services.mock_parser import SectorExtractor, _mock_features
+from app.utils.text_features import NormalizedText
+
+# Ancienne implémentation : un re.sub / re.search par motif
+LEGACY_PDF_ARTIFACTS = [
+    r'\d+ \d+ obj', r'endobj', r'xref', r'trailer', r'startxref', r'stream', r'endstream',
+    r'<<.*?>>', r'%PDF-\d+\.\d+', r'%[\s\n]*\d+', r'/[A-Za-z]+\s+\d+',
+    r'\[\s*\d+\s+\d+\s+\d+\s+\d+\s*\]',
+]
+LEGACY_CONTRACT_PATTERNS = [
+    r'(?i)\b(CDI|contrat à durée indéterminée)\b', r'(?i)\b(CDD|contrat à durée déterminée)\b',
+    r'(?i)\b(stage|internship)\b', r'(?i)\b(freelance|indépendant)\b',
+    r'(?i)\b(alternance|apprentissage)\b', r'(?i)\b(temps partiel|part[ -]time)\b',
+    r'(?i)\b(temps plein|full[ -]time)\b'
+]
+LEGACY_EXTRA_PATTERNS = [
+    r"(?:recherch(?:e|ons)|offre d'emploi)[^\n.]*?([^\n.]+?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|pour)",
+    r"(?:lieu|localisation|basé à|site de travail|poste basé).*?(?:à|en|au)\s+([A-Za-zÀ-ÿ\s-]+?)(?:\s|\.|\n|$)",
+    r"(?:type de contrat|contrat)[^\n.]*?(CDI|CDD|Stage|Alternance|Freelance|Intérim)",
+    r"(?:salaire|rémunération)[^\n.]*?(\d+[^\n.]*?(?:€|euros|k€|k))",
+    r"(?:expérience)[^\n.]*?(\d+[^\n.]*?(?:an|année|ans|mois))",
+]
+
+
+def legacy_pipeline(text):
+    for pattern in LEGACY_PDF_ARTIFACTS:
+        text = re.sub(pattern, '', text)
+    text = '\n'.join(line for line in text.split('\n') if not re.match(r'^[\d\s\W]+$', line.strip()))
+    text = re.sub(r' +', ' ', text)
+    text = re.sub(r'\n+', '\n', text)
+
+    features = {}
+    for pattern in LEGACY_CONTRACT_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            features["contract_type"] = match.group(0).capitalize()
+            break
+    features["skills"] = [skill for skill in COMMON_SKILLS
+                          if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text.lower())]
+
+    text_lower = text.lower()
+    features["sector"] = next((sector for sector, keywords in SectorExtractor.SECTORS_KEYWORDS.items()
+                               if any(keyword in text_lower for keyword in keywords)), None)
+    for pattern in LEGACY_EXTRA_PATTERNS:
+        re.findall(pattern, text_lower)
+    return features
+
+
+def single_pass_pipeline(text):
+    doc = NormalizedText(text)
+    features = get_job_feature_extractor().extract(doc, names=["contract_type", "skills"])
+    features.update(_mock_features.extract(doc))
+    return features
+
+
+def generate_corpus(count, rng):
+    """Génère des fiches de poste synthétiques (avec quelques artefacts PDF)"""
+    titles = ["Comptable général", "Développeur Python", "Contrôleur de gestion", "Chef de projet IT",
+              "Auditeur financier", "Data Scientist", "Responsable paie"]
+    cities = ["Paris", "Lyon", "Bordeaux", "Nantes", "Lille", "Toulouse"]
+    contracts = ["CDI", "CDD", "Stage", "Alternance", "Freelance"]
+    filler = ("Vous rejoindrez une équipe dynamique et participerez à l'amélioration continue des "
+              "processus. Vous serez en relation avec les opérationnels et la direction.").split()
+    corpus = []
+    for _ in range(count):
+        lines = [
+            "%PDF-1.4", "1 0 obj << /Type /Page >> endobj",
+            f"Offre d'emploi : nous recherchons un {rng.choice(titles)} (H/F)",
+            f"Poste basé à {rng.choice(cities)}. Type de contrat : {rng.choice(contracts)}.",
+            f"Rémunération : {rng.randint(30, 60)} à {rng.randint(61, 90)} k€ selon expérience.",
+            f"Expérience : {rng.randint(1, 10)} ans minimum.",
+        ]
+        for _ in range(rng.randint(10, 40)):
+            words = [rng.choice(COMMON_SKILLS) if rng.random() < 0.05 else rng.choice(filler)
+                     for _ in range(rng.randint(8, 20))]
+            lines.append(" ".join(words) + ".")
+        lines.append("startxref 1234")
+        corpus.append("\n".join(lines))
+    return corpus
+
+
+def run(doc_count, repeat, seed=42):
+    corpus = generate_corpus(doc_count, random.Random(seed))
+    print(f"{'pipeline':>14} {'docs/s':>10}")
+    rates = {}
+    for name, pipeline in (("passes", legacy_pipeline), ("passe unique", single_pass_pipeline)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for document in corpus:
+                pipeline(document)
+            best = min(best, time.perf_counter() - start)
+        rates[name] = doc_count / best
+        print(f"{name:>14} {rates[name]:>10.1f}")
+    print(f"accélération: {rates['passe unique'] / rates['passes']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du prétraitement des fiches de poste")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.docs, args.repeat)
@@ -13,6 +13,16 @@ from app.services.personalized_matching import (
 )
 from app.models.match import Match
 from app.utils.db import get_db_connection, setup_audit_context
+from app.utils.pagination import (
+    MAX_PAGE_SIZE,
+    InvalidCursor,
+    build_match_filters,
+    cached_match_total,
+    decode_cursor,
+    filters_fingerprint,
+    keyset_condition,
+    page_results
+)
 
 # Blueprint pour les matchs
 matches_bp = Blueprint('matches', __name__, url_prefix='/matches')
@@ -28,6 +38,15 @@ class CalculateMatchRequest(BaseModel):
 class MatchStatusUpdate(BaseModel):
     status: str = Field(..., description="Nouveau statut du match", pattern='^(pending|viewed|interested|not_interested)$')
 
+class MatchSearchRequest(BaseModel):
+    job_id: Optional[int] = Field(None, description="ID de l'offre d'emploi")
+    candidate_id: Optional[int] = Field(None, description="ID du candidat")
+    statuses: Optional[List[str]] = Field(None, description="Statuts acceptés (tous si absent)")
+    min_score: Optional[float] = Field(0, ge=0, le=100, description="Score minimum")
+    max_score: Optional[float] = Field(None, ge=0, le=100, description="Score maximum")
+    limit: Optional[int] = Field(20, ge=1, le=100, description="Nombre de matches par page")
+    cursor: Optional[str] = Field(None, description="Curseur `next_cursor` de la page précédente")
+
 @matches_bp.route('/calculate', methods=['POST'])
 @jwt_required()
 @validate()
@@ -122,12 +141,126 @@ def calculate_match_score(body: CalculateMatchRequest):
     finally:
         conn.close()
 
+# Colonnes et jointures des listes de matches (id et match_score en 1re et 4e positions,
+# attendues par app.utils.pagination.page_results)
+JOB_MATCHES_SELECT = """
+        SELECT m.id, m.candidate_id, m.job_id, m.match_score, m.status, 
+               m.match_details, m.created_at, m.updated_at,
+               c.first_name, c.last_name
+        FROM matching.matches m
+        JOIN profiles.candidates c ON m.candidate_id = c.id
+"""
+
+CANDIDATE_MATCHES_SELECT = """
+        SELECT m.id, m.candidate_id, m.job_id, m.match_score, m.status, 
+               m.match_details, m.created_at, m.updated_at,
+               j.title AS job_title, c.name AS company_name
+        FROM matching.matches m
+        JOIN jobs.jobs j ON m.job_id = j.id
+        JOIN profiles.companies c ON j.company_id = c.id
+"""
+
+def _format_match_row(match, owner_column):
+    """Formate une ligne de liste de matches"""
+    formatted = {
+        "id": match[0],
+        "candidate_id": match[1],
+        "job_id": match[2],
+        "score": float(match[3]),
+        "status": match[4],
+        "details": match[5],
+        "created_at": match[6].isoformat() if match[6] else None,
+        "updated_at": match[7].isoformat() if match[7] else None
+    }
+    if owner_column == "job_id":
+        formatted["candidate_name"] = f"{match[8]} {match[9]}"
+    else:
+        formatted["job_title"] = match[8]
+        formatted["company_name"] = match[9]
+    return formatted
+
+def _can_view_job_matches(conn, job_id, current_user):
+    """Administrateurs, ou recruteurs de l'entreprise du job"""
+    if current_user["user_type"] == 'admin':
+        return True
+    if current_user["user_type"] == 'company':
+        query = """
+        SELECT 1 FROM jobs.jobs j 
+        JOIN profiles.companies c ON j.company_id = c.id 
+        WHERE j.id = %s AND c.user_id = %s
+        """
+        return conn.execute(query, (job_id, current_user["id"])).fetchone() is not None
+    return False
+
+def _can_view_candidate_matches(conn, candidate_id, current_user):
+    """Administrateurs, ou le candidat lui-même"""
+    if current_user["user_type"] == 'admin':
+        return True
+    if current_user["user_type"] == 'candidate':
+        query = "SELECT 1 FROM profiles.candidates WHERE id = %s AND user_id = %s"
+        return conn.execute(query, (candidate_id, current_user["id"])).fetchone() is not None
+    return False
+
+def _list_matches(conn, owner_column, owner_id, limit, offset=0, cursor=None,
+                  statuses=None, min_score=0, max_score=None):
+    """
+    Lit une page de matches triés par score décroissant (puis id décroissant).
+
+    Avec `cursor` (chaîne, vide pour la première page), la page est lue par
+    curseur ; sinon par LIMIT / OFFSET (ancienne API). Dans les deux cas, le
+    curseur de la page suivante est retourné.
+
+    Raises:
+        InvalidCursor: Curseur invalide ou émis pour d'autres filtres
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    fingerprint = filters_fingerprint({
+        "owner": [owner_column, owner_id],
+        "statuses": sorted(statuses or []),
+        "min_score": min_score,
+        "max_score": max_score
+    })
+    conditions, params = build_match_filters(owner_column, owner_id, statuses, min_score, max_score)
+    
+    if cursor:
+        keyset, keyset_params = keyset_condition(decode_cursor(cursor, fingerprint))
+        conditions.append(keyset)
+        params.extend(keyset_params)
+    
+    select = JOB_MATCHES_SELECT if owner_column == "job_id" else CANDIDATE_MATCHES_SELECT
+    query = f"""
+        {select}
+        WHERE {" AND ".join(conditions)}
+        ORDER BY m.match_score DESC, m.id DESC
+        LIMIT %s
+    """
+    params.append(limit + 1)
+    if cursor is None and offset:
+        query += " OFFSET %s"
+        params.append(offset)
+    
+    rows, next_cursor = page_results(conn.execute(query, params).fetchall(), limit, fingerprint)
+    total, total_exact = cached_match_total(conn, owner_column, owner_id, statuses, min_score, max_score)
+    
+    return {
+        "matches": [_format_match_row(row, owner_column) for row in rows],
+        "count": len(rows),
+        "total": total,
+        "total_exact": total_exact,
+        "next_cursor": next_cursor
+    }
+
 @matches_bp.route('/job/<int:job_id>', methods=['GET'])
 @jwt_required()
 def get_job_matches(job_id):
-    """Récupère les matches existants pour une offre d'emploi"""
+    """Récupère les matches existants pour une offre d'emploi
+    
+    Pagination par curseur avec `cursor` (vide pour la première page, puis la
+    valeur `next_cursor` de la réponse précédente) ; `offset` reste accepté.
+    """
     limit = request.args.get('limit', default=20, type=int)
     offset = request.args.get('offset', default=0, type=int)
+    cursor = request.args.get('cursor', default=None, type=str)
     status = request.args.get('status', default=None, type=str)
     min_score = request.args.get('min_score', default=0, type=float)
     personalized = request.args.get('personalized', default='true', type=str).lower() == 'true'
@@ -137,78 +270,24 @@ def get_job_matches(job_id):
         # Vérifier les permissions (l'utilisateur doit être lié à l'entreprise du job)
         current_user = get_jwt_identity()
         user_id = current_user["id"]
-        user_type = current_user["user_type"]
-        
-        # Les administrateurs peuvent tout voir
-        is_authorized = user_type == 'admin'
-        
-        # Les recruteurs peuvent voir les matches pour leurs propres jobs
-        if user_type == 'company' and not is_authorized:
-            query = """
-            SELECT 1 FROM jobs.jobs j 
-            JOIN profiles.companies c ON j.company_id = c.id 
-            WHERE j.id = %s AND c.user_id = %s
-            """
-            result = conn.execute(query, (job_id, user_id)).fetchone()
-            is_authorized = result is not None
         
-        if not is_authorized:
+        if not _can_view_job_matches(conn, job_id, current_user):
             return jsonify({"error": "Unauthorized access"}), 403
         
-        # Construire la requête avec filtres
-        query_filters = ["job_id = %s"]
-        query_params = [job_id]
-        
-        if status:
-            query_filters.append("status = %s")
-            query_params.append(status)
-            
-        if min_score > 0:
-            query_filters.append("match_score >= %s")
-            query_params.append(min_score)
-        
-        where_clause = " AND ".join(query_filters)
-        
-        # Récupérer les matches
-        query = f"""
-        SELECT m.id, m.candidate_id, m.job_id, m.match_score, m.status, 
-               m.match_details, m.created_at, m.updated_at,
-               c.first_name, c.last_name
-        FROM matching.matches m
-        JOIN profiles.candidates c ON m.candidate_id = c.id
-        WHERE {where_clause}
-        ORDER BY m.match_score DESC
-        LIMIT %s OFFSET %s
-        """
-        
-        query_params.extend([limit, offset])
-        matches = conn.execute(query, query_params).fetchall()
-        
-        # Compter le nombre total de matches
-        count_query = f"SELECT COUNT(*) FROM matching.matches WHERE {where_clause}"
-        total_count = conn.execute(count_query, query_params[:-2]).fetchone()[0]
-        
-        # Formater les résultats
-        formatted_matches = [{
-            "id": match[0],
-            "candidate_id": match[1],
-            "job_id": match[2],
-            "score": float(match[3]),
-            "status": match[4],
-            "details": match[5],
-            "created_at": match[6].isoformat() if match[6] else None,
-            "updated_at": match[7].isoformat() if match[7] else None,
-            "candidate_name": f"{match[8]} {match[9]}"
-        } for match in matches]
+        try:
+            page = _list_matches(conn, "job_id", job_id, limit, offset=offset, cursor=cursor,
+                                 statuses=[status] if status else None, min_score=min_score)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
         
         # Si personnalisation demandée, réordonner les résultats
-        if personalized and formatted_matches:
+        if personalized and page["matches"]:
             # Enregistrer que l'utilisateur a consulté cette liste
             record_match_interaction(
                 user_id=user_id,
                 job_id=job_id,
                 action="view_candidates_list",
-                context={"count": len(formatted_matches), "filters": {"status": status, "min_score": min_score}}
+                context={"count": page["count"], "filters": {"status": status, "min_score": min_score}}
             )
             
             # Note: Dans un cas réel, nous pourrions appeler le service de personnalisation 
@@ -216,9 +295,7 @@ def get_job_matches(job_id):
         
         return jsonify({
             "job_id": job_id,
-            "matches": formatted_matches,
-            "count": len(formatted_matches),
-            "total": total_count,
+            **page,
             "personalized": personalized
         })
     finally:
@@ -227,9 +304,14 @@ def get_job_matches(job_id):
 @matches_bp.route('/candidate/<int:candidate_id>', methods=['GET'])
 @jwt_required()
 def get_candidate_matches(candidate_id):
-    """Récupère les matches existants pour un candidat"""
+    """Récupère les matches existants pour un candidat
+    
+    Pagination par curseur avec `cursor` (vide pour la première page, puis la
+    valeur `next_cursor` de la réponse précédente) ; `offset` reste accepté.
+    """
     limit = request.args.get('limit', default=20, type=int)
     offset = request.args.get('offset', default=0, type=int)
+    cursor = request.args.get('cursor', default=None, type=str)
     status = request.args.get('status', default=None, type=str)
     min_score = request.args.get('min_score', default=0, type=float)
     personalized = request.args.get('personalized', default='true', type=str).lower() == 'true'
@@ -239,76 +321,24 @@ def get_candidate_matches(candidate_id):
         # Vérifier les permissions (l'utilisateur doit être le candidat lui-même ou un admin)
         current_user = get_jwt_identity()
         user_id = current_user["id"]
-        user_type = current_user["user_type"]
-        
-        # Les administrateurs peuvent tout voir
-        is_authorized = user_type == 'admin'
         
-        # Les candidats peuvent voir leurs propres matches
-        if user_type == 'candidate' and not is_authorized:
-            query = "SELECT 1 FROM profiles.candidates WHERE id = %s AND user_id = %s"
-            result = conn.execute(query, (candidate_id, user_id)).fetchone()
-            is_authorized = result is not None
-        
-        if not is_authorized:
+        if not _can_view_candidate_matches(conn, candidate_id, current_user):
             return jsonify({"error": "Unauthorized access"}), 403
         
-        # Construire la requête avec filtres
-        query_filters = ["candidate_id = %s"]
-        query_params = [candidate_id]
-        
-        if status:
-            query_filters.append("status = %s")
-            query_params.append(status)
-            
-        if min_score > 0:
-            query_filters.append("match_score >= %s")
-            query_params.append(min_score)
-        
-        where_clause = " AND ".join(query_filters)
-        
-        # Récupérer les matches
-        query = f"""
-        SELECT m.id, m.candidate_id, m.job_id, m.match_score, m.status, 
-               m.match_details, m.created_at, m.updated_at,
-               j.title AS job_title, c.name AS company_name
-        FROM matching.matches m
-        JOIN jobs.jobs j ON m.job_id = j.id
-        JOIN profiles.companies c ON j.company_id = c.id
-        WHERE {where_clause}
-        ORDER BY m.match_score DESC
-        LIMIT %s OFFSET %s
-        """
-        
-        query_params.extend([limit, offset])
-        matches = conn.execute(query, query_params).fetchall()
-        
-        # Compter le nombre total de matches
-        count_query = f"SELECT COUNT(*) FROM matching.matches WHERE {where_clause}"
-        total_count = conn.execute(count_query, query_params[:-2]).fetchone()[0]
-        
-        # Formater les résultats
-        formatted_matches = [{
-            "id": match[0],
-            "candidate_id": match[1],
-            "job_id": match[2],
-            "score": float(match[3]),
-            "status": match[4],
-            "details": match[5],
-            "created_at": match[6].isoformat() if match[6] else None,
-            "updated_at": match[7].isoformat() if match[7] else None,
-            "job_title": match[8],
-            "company_name": match[9]
-        } for match in matches]
+        try:
+            page = _list_matches(conn, "candidate_id", candidate_id, limit, offset=offset, cursor=cursor,
+                                 statuses=[status] if status else None, min_score=min_score)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
         
         # Si personnalisation demandée, réordonner les résultats
-        if personalized and formatted_matches:
+        if personalized and page["matches"]:
             # Enregistrer que l'utilisateur a consulté cette liste
             record_match_interaction(
                 user_id=user_id,
                 candidate_id=candidate_id,
                 action="view_jobs_list",
-                context={"count": len(formatted_matches), "filters": {"status": status, "min_score": min_score}}
+                context={"count": page["count"], "filters": {"status": status, "min_score": min_score}}
             )
             
             # Note: Dans un cas réel, nous pourrions appeler le service de personnalisation 
@@ -316,14 +346,40 @@ def get_candidate_matches(candidate_id):
         
         return jsonify({
             "candidate_id": candidate_id,
-            "matches": formatted_matches,
-            "count": len(formatted_matches),
-            "total": total_count,
+            **page,
             "personalized": personalized
         })
     finally:
         conn.close()
 
+@matches_bp.route('/search', methods=['POST'])
+@jwt_required()
+@validate()
+def search_matches(body: MatchSearchRequest):
+    """Liste filtrée des matches d'une offre ou d'un candidat, paginée par curseur"""
+    if bool(body.job_id) == bool(body.candidate_id):
+        return jsonify({"error": "Exactly one of job_id or candidate_id is required"}), 400
+    
+    owner_column, owner_id = ("job_id", body.job_id) if body.job_id else ("candidate_id", body.candidate_id)
+    
+    conn = get_db_connection()
+    try:
+        current_user = get_jwt_identity()
+        can_view = _can_view_job_matches if owner_column == "job_id" else _can_view_candidate_matches
+        if not can_view(conn, owner_id, current_user):
+            return jsonify({"error": "Unauthorized access"}), 403
+        
+        try:
+            page = _list_matches(conn, owner_column, owner_id, body.limit, cursor=body.cursor or "",
+                                 statuses=body.statuses, min_score=body.min_score or 0,
+                                 max_score=body.max_score)
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({owner_column: owner_id, **page})
+    finally:
+        conn.close()
+
 @matches_bp.route('/<int:match_id>', methods=['GET'])
 @jwt_required()
 def get_match(match_id):
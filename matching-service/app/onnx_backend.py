@@ -0,0 +1,244 @@
+"""
+Backend d'inférence ONNX Runtime pour les modèles transformers sur CPU
+----------------------------------------------------------------------
+Les modèles (sentence-transformers, camembert...) sont exportés une fois en ONNX,
+quantifiés dynamiquement en int8 puis exécutés avec ONNX Runtime. Les fichiers
+exportés sont conservés sur disque et réutilisés aux démarrages suivants.
+
+PyTorch n'est nécessaire que pour l'export ; l'inférence n'utilise qu'ONNX Runtime
+et le tokenizer du modèle.
+"""
+
+import os
+import logging
+import tempfile
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Importations conditionnelles : le backend est optionnel
+HAS_ONNXRUNTIME = False
+try:
+    import onnxruntime as ort
+    HAS_ONNXRUNTIME = True
+except ImportError:
+    logger.info("onnxruntime non installé, backend ONNX indisponible")
+
+DEFAULT_ONNX_DIR = os.environ.get(
+    'ONNX_MODELS_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'onnx_models')
+)
+
+# Entrées acceptées par les modèles exportés, dans l'ordre de leur méthode forward
+_MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+
+def _hub_model_id(model_name: str) -> str:
+    """Identifiant Hugging Face d'un modèle (les noms courts sont des sentence-transformers)"""
+    if "/" in model_name or os.path.isdir(model_name):
+        return model_name
+    return f"sentence-transformers/{model_name}"
+
+
+def onnx_model_dir(model_name: str, base_dir: Optional[str] = None) -> str:
+    """Répertoire des fichiers ONNX d'un modèle"""
+    safe_name = model_name.strip("/").replace("/", "__")
+    return os.path.join(base_dir or DEFAULT_ONNX_DIR, safe_name)
+
+
+def export_to_onnx(model_name: str, output_dir: str, opset: int = 14) -> str:
+    """
+    Exporte un modèle transformers en ONNX (sortie : last_hidden_state)
+
+    Args:
+        model_name: Nom du modèle (Hugging Face ou sentence-transformers)
+        output_dir: Répertoire de destination (le tokenizer y est aussi enregistré)
+        opset: Version de l'opset ONNX
+
+    Returns:
+        str: Chemin du modèle exporté
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    model_id = _hub_model_id(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(model_id)
+    model = AutoModel.from_pretrained(model_id)
+    model.eval()
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, wrapped):
+            super().__init__()
+            self.wrapped = wrapped
+
+        def forward(self, *inputs):
+            return self.wrapped(*inputs, return_dict=False)[0]
+
+    sample = tokenizer(["Exemple de phrase pour l'export", "Python"], padding=True, return_tensors="pt")
+    input_names = [name for name in _MODEL_INPUTS if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = os.path.join(output_dir, "model.onnx")
+    # Écriture dans un fichier temporaire : plusieurs workers peuvent exporter en même temps
+    fd, tmp_path = tempfile.mkstemp(suffix=".onnx", dir=output_dir)
+    os.close(fd)
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(model),
+            tuple(sample[name] for name in input_names),
+            tmp_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True
+        )
+    os.replace(tmp_path, output_path)
+    tokenizer.save_pretrained(output_dir)
+
+    logger.info(f"Modèle {model_id} exporté en ONNX: {output_path}")
+    return output_path
+
+
+def quantize_onnx_model(model_path: str, output_path: Optional[str] = None) -> str:
+    """
+    Quantification dynamique int8 des poids (les activations restent en float)
+
+    Args:
+        model_path: Modèle ONNX float32
+        output_path: Destination (défaut: model.int8.onnx à côté du modèle)
+
+    Returns:
+        str: Chemin du modèle quantifié
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = output_path or os.path.join(os.path.dirname(model_path), "model.int8.onnx")
+    fd, tmp_path = tempfile.mkstemp(suffix=".onnx", dir=os.path.dirname(output_path))
+    os.close(fd)
+    quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Modèle quantifié en int8: {output_path} "
+                f"({os.path.getsize(model_path) / 1e6:.0f} Mo -> {os.path.getsize(output_path) / 1e6:.0f} Mo)")
+    return output_path
+
+
+class ONNXEncoder:
+    """
+    Encodeur de phrases exécuté par ONNX Runtime.
+
+    Expose `encode` avec la même convention que SentenceTransformer.encode
+    (un texte -> vecteur, une liste -> matrice) afin d'être interchangeable avec
+    le modèle PyTorch.
+    """
+
+    def __init__(self, model_name: str, model_dir: Optional[str] = None, quantize: bool = True,
+                 pooling: str = "mean", normalize: bool = False, max_length: int = 128,
+                 num_threads: int = 0):
+        """
+        Args:
+            model_name: Nom du modèle
+            model_dir: Répertoire des modèles ONNX (défaut: ONNX_MODELS_DIR)
+            quantize: Utiliser le modèle quantifié en int8
+            pooling: "mean" (sentence-transformers) ou "cls" (représentation [CLS])
+            normalize: Normaliser les vecteurs (norme L2)
+            max_length: Nombre maximal de tokens par texte
+            num_threads: Threads ONNX Runtime (0 = valeur par défaut)
+        """
+        if not HAS_ONNXRUNTIME:
+            raise ImportError("onnxruntime n'est pas installé")
+
+        from transformers import AutoTokenizer
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.pooling = pooling
+        self.normalize = normalize
+        self.max_length = max_length
+
+        directory = onnx_model_dir(model_name, model_dir)
+        float_path = os.path.join(directory, "model.onnx")
+        int8_path = os.path.join(directory, "model.int8.onnx")
+        if not os.path.exists(float_path):
+            export_to_onnx(model_name, directory)
+        if quantize and not os.path.exists(int8_path):
+            quantize_onnx_model(float_path, int8_path)
+        self.model_path = int8_path if quantize else float_path
+
+        self.tokenizer = AutoTokenizer.from_pretrained(directory)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+        logger.info(f"Modèle ONNX chargé: {self.model_path}")
+
+    def run(self, inputs: Dict[str, np.ndarray]) -> np.ndarray:
+        """Exécute le modèle sur des entrées tokenisées ; retourne last_hidden_state"""
+        feed = {name: np.asarray(inputs[name], dtype=np.int64) for name in self.input_names if name in inputs}
+        return self.session.run(["last_hidden_state"], feed)[0]
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        if self.pooling == "cls":
+            return hidden[:, 0, :]
+        mask = attention_mask[..., None].astype(hidden.dtype)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               normalize_embeddings: Optional[bool] = None, **kwargs) -> np.ndarray:
+        """
+        Encode un texte ou une liste de textes
+
+        Les textes sont triés par longueur avant d'être regroupés en lots afin de
+        limiter le padding ; les vecteurs sont retournés dans l'ordre d'origine.
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        normalize = self.normalize if normalize_embeddings is None else normalize_embeddings
+
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer(
+                [texts[index] for index in batch], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="np"
+            )
+            pooled = self._pool(self.run(inputs), inputs["attention_mask"])
+            if normalize:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for row, index in enumerate(batch):
+                embeddings[index] = pooled[row]
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        matrix = np.stack(embeddings)
+        return matrix[0] if single else matrix
+
+
+def load_sentence_encoder(model_name: str, backend: str = "pytorch", **onnx_options):
+    """
+    Charge un encodeur de phrases avec le backend demandé
+
+    Args:
+        model_name: Nom du modèle sentence-transformers
+        backend: "pytorch", "onnx" (float32) ou "onnx-int8"
+        onnx_options: Options de ONNXEncoder
+
+    Returns:
+        Object: Encodeur exposant `encode` (retombe sur PyTorch si ONNX est indisponible)
+    """
+    if backend in ("onnx", "onnx-int8"):
+        try:
+            return ONNXEncoder(model_name, quantize=backend == "onnx-int8", **onnx_options)
+        except Exception as e:
+            logger.warning(f"Backend ONNX indisponible pour {model_name} ({e}), utilisation de PyTorch")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
@@ -37,7 +37,8 @@ class SemanticSkillsAnalyzer:
                 cache_size: int = 2000,
                 similarity_threshold: float = 0.6,
                 use_threading: bool = True,
-                max_workers: int = 4):
+                max_workers: int = 4,
+                embedding_backend: Optional[str] = None):
         """
         Initialise l'analyseur sémantique des compétences
         
@@ -48,12 +49,15 @@ class SemanticSkillsAnalyzer:
             similarity_threshold: Seuil de similarité pour considérer deux compétences comme similaires
             use_threading: Utiliser le multithreading pour les calculs d'embeddings
             max_workers: Nombre maximum de threads pour les calculs parallèles
+            embedding_backend: Backend d'inférence du modèle : "pytorch", "onnx" ou "onnx-int8"
+                               (défaut: variable d'environnement EMBEDDING_BACKEND)
         """
         self.embedding_model_name = embedding_model_name
         self.cache_size = cache_size
         self.similarity_threshold = similarity_threshold
         self.use_threading = use_threading
         self.max_workers = max_workers
+        self.embedding_backend = embedding_backend or os.environ.get('EMBEDDING_BACKEND', 'pytorch')
         
         # Initialiser l'embedding model
         self.embedding_model = self._initialize_embedding_model()
@@ -82,9 +86,10 @@ class SemanticSkillsAnalyzer:
             Object: Modèle d'embeddings initialisé ou None si non disponible
         """
         try:
-            from sentence_transformers import SentenceTransformer
-            model = SentenceTransformer(self.embedding_model_name)
-            logger.info(f"Modèle d'embeddings {self.embedding_model_name} chargé avec succès")
+            from app.onnx_backend import load_sentence_encoder
+            model = load_sentence_encoder(self.embedding_model_name, self.embedding_backend)
+            logger.info(f"Modèle d'embeddings {self.embedding_model_name} chargé avec succès "
+                        f"(backend: {type(model).__name__})")
             return model
         except ImportError:
             logger.warning("Module sentence-transformers non installé, analyse sémantique désactivée")
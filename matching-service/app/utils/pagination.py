@@ -0,0 +1,178 @@
+"""
+Module d'utilitaires pour la pagination des listes de matches.
+
+Pagination par curseur sur (match_score, id) : le curseur désigne le dernier
+match de la page précédente et la page suivante est lue dans l'index composite
+à partir de cette position (voir database/17_match_pagination.sql), au lieu de
+parcourir puis d'ignorer OFFSET lignes.
+
+Les totaux viennent des compteurs matching.match_counts, maintenus par trigger ;
+lorsque des filtres ne sont pas couverts par ces compteurs (score minimum), le
+COUNT(*) est mis en cache pour une courte durée.
+"""
+
+import base64
+import hashlib
+import json
+import time
+import logging
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Durée de vie des totaux calculés par COUNT(*) (secondes)
+COUNT_CACHE_TTL = 60
+
+# Nombre maximal d'éléments par page
+MAX_PAGE_SIZE = 100
+
+_count_cache: Dict[Tuple, Tuple[float, int]] = {}
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible ou émis pour d'autres filtres"""
+
+
+def filters_fingerprint(filters: Dict[str, Any]) -> str:
+    """Empreinte courte des filtres, pour refuser un curseur réutilisé avec d'autres filtres"""
+    serialized = json.dumps(filters, sort_keys=True, default=str)
+    return hashlib.md5(serialized.encode()).hexdigest()[:12]
+
+
+def encode_cursor(score: Any, match_id: int, fingerprint: str) -> str:
+    """
+    Encode la position du dernier match d'une page.
+
+    Args:
+        score: Score du match (conservé sous forme de chaîne pour rester exact)
+        match_id: ID du match
+        fingerprint: Empreinte des filtres de la requête
+
+    Returns:
+        Curseur opaque (base64 url-safe)
+    """
+    payload = json.dumps({"s": str(score), "i": match_id, "f": fingerprint}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> Tuple[Decimal, int]:
+    """
+    Décode un curseur.
+
+    Raises:
+        InvalidCursor: Curseur invalide ou émis pour d'autres filtres
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        score, match_id = Decimal(payload["s"]), int(payload["i"])
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+    if payload.get("f") != fingerprint:
+        raise InvalidCursor("Cursor does not match the current filters")
+    return score, match_id
+
+
+def build_match_filters(owner_column: str, owner_id: int, statuses: Optional[Sequence[str]] = None,
+                        min_score: float = 0, max_score: Optional[float] = None) -> Tuple[List[str], List[Any]]:
+    """
+    Construit les conditions WHERE d'une liste de matches.
+
+    Args:
+        owner_column: "job_id" ou "candidate_id"
+        owner_id: ID de l'offre ou du candidat
+        statuses: Statuts acceptés (tous si vide)
+        min_score: Score minimum (ignoré si 0)
+        max_score: Score maximum (optionnel)
+
+    Returns:
+        Conditions et paramètres correspondants
+    """
+    if owner_column not in ("job_id", "candidate_id"):
+        raise ValueError(f"Unsupported owner column: {owner_column}")
+
+    conditions = [f"m.{owner_column} = %s"]
+    params: List[Any] = [owner_id]
+
+    if statuses:
+        if len(statuses) == 1:
+            conditions.append("m.status = %s")
+            params.append(statuses[0])
+        else:
+            conditions.append("m.status = ANY(%s)")
+            params.append(list(statuses))
+
+    if min_score and min_score > 0:
+        conditions.append("m.match_score >= %s")
+        params.append(min_score)
+
+    if max_score is not None:
+        conditions.append("m.match_score <= %s")
+        params.append(max_score)
+
+    return conditions, params
+
+
+def keyset_condition(cursor_position: Optional[Tuple[Decimal, int]]) -> Tuple[Optional[str], List[Any]]:
+    """Condition de reprise après le dernier match de la page précédente (tri score DESC, id DESC)"""
+    if cursor_position is None:
+        return None, []
+    score, match_id = cursor_position
+    return "(m.match_score, m.id) < (%s::numeric, %s)", [str(score), match_id]
+
+
+def page_results(rows: List[Any], limit: int, fingerprint: str) -> Tuple[List[Any], Optional[str]]:
+    """
+    Découpe les lignes lues (limit + 1) en page et curseur suivant.
+
+    Les lignes doivent commencer par (id, ..., match_score en 4e position),
+    comme les requêtes de liste de app.api.routes.matches.
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[3], last[0], fingerprint)
+    return rows, next_cursor
+
+
+def cached_match_total(conn, owner_column: str, owner_id: int, statuses: Optional[Sequence[str]] = None,
+                       min_score: float = 0, max_score: Optional[float] = None) -> Tuple[int, bool]:
+    """
+    Nombre total de matches d'une offre ou d'un candidat.
+
+    Returns:
+        (total, exact) : exact vaut False lorsque le total provient du cache
+        de COUNT(*) (filtres de score) et peut dater de COUNT_CACHE_TTL secondes
+    """
+    owner_type = "job" if owner_column == "job_id" else "candidate"
+
+    if not (min_score and min_score > 0) and max_score is None:
+        # Compteurs maintenus par trigger : lecture de quelques lignes
+        query = "SELECT COALESCE(SUM(total), 0) FROM matching.match_counts WHERE owner_type = %s AND owner_id = %s"
+        params: List[Any] = [owner_type, owner_id]
+        if statuses:
+            query += " AND status = ANY(%s)"
+            params.append(list(statuses))
+        return int(conn.execute(query, params).fetchone()[0]), True
+
+    key = (owner_column, owner_id, tuple(sorted(statuses or ())), min_score, max_score)
+    cached = _count_cache.get(key)
+    now = time.time()
+    if cached and now < cached[0]:
+        return cached[1], False
+
+    conditions, params = build_match_filters(owner_column, owner_id, statuses, min_score, max_score)
+    count_query = f"SELECT COUNT(*) FROM matching.matches m WHERE {' AND '.join(conditions)}"
+    total = int(conn.execute(count_query, params).fetchone()[0])
+
+    if len(_count_cache) > 10000:
+        # Purge des entrées expirées
+        for expired in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+            del _count_cache[expired]
+    _count_cache[key] = (now + COUNT_CACHE_TTL, total)
+    return total, False
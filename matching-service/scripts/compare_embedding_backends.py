@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Comparaison précision / latence des backends d'embeddings sur CPU :
+PyTorch (sentence-transformers), ONNX Runtime float32 et ONNX Runtime int8.
+
+Mesures :
+- latence d'un texte isolé (p50 / p95) et débit par lots ;
+- similarité cosinus entre les vecteurs de chaque backend et ceux de PyTorch ;
+- accord sur le meilleur appariement de compétences (top-1), comme dans
+  SemanticSkillsAnalyzer.find_best_skill_match.
+
+Usage:
+    python scripts/compare_embedding_backends.py [--model paraphrase-multilingual-MiniLM-L12-v2]
+                                                 [--repeat 50] [--batch-size 32] [--threads 4] [--json]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.onnx_backend import ONNXEncoder
+
+SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Angular", "Vue.js", "Node.js",
+    "Django", "Flask", "FastAPI", "Spring Boot", "SQL", "PostgreSQL", "MongoDB", "Redis",
+    "Docker", "Kubernetes", "AWS", "Azure", "Google Cloud", "Terraform", "Jenkins", "GitLab CI",
+    "Machine Learning", "Deep Learning", "Traitement du langage naturel", "Vision par ordinateur",
+    "Analyse de données", "Power BI", "Tableau", "Excel avancé", "Gestion de projet", "Scrum",
+    "Kanban", "Management d'équipe", "Communication", "Négociation commerciale", "Comptabilité",
+    "Contrôle de gestion", "Recrutement", "Marketing digital", "SEO", "Rédaction web",
+    "Cybersécurité", "Réseaux informatiques", "Linux", "Administration système", "C++", "Rust"
+]
+
+QUERIES = [
+    "programmation python", "développement front-end react", "apprentissage automatique",
+    "bases de données relationnelles", "conteneurisation docker", "orchestration de conteneurs",
+    "cloud amazon", "intégration continue", "méthodes agiles", "encadrement d'équipe",
+    "analyse financière", "référencement naturel", "sécurité informatique", "NLP",
+    "tableaux de bord", "développement backend java", "administration linux", "gestion commerciale"
+]
+
+
+def cosine_rows(a, b):
+    a = a / np.clip(np.linalg.norm(a, axis=1, keepdims=True), 1e-12, None)
+    b = b / np.clip(np.linalg.norm(b, axis=1, keepdims=True), 1e-12, None)
+    return (a * b).sum(axis=1)
+
+
+def best_matches(encoder, batch_size):
+    queries = encoder.encode(QUERIES, batch_size=batch_size)
+    skills = encoder.encode(SKILLS, batch_size=batch_size)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    skills = skills / np.linalg.norm(skills, axis=1, keepdims=True)
+    return (queries @ skills.T).argmax(axis=1)
+
+
+def measure(encoder, repeat, batch_size):
+    texts = QUERIES + SKILLS
+    encoder.encode(texts[:2])  # Préchauffage
+
+    latencies = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        encoder.encode(texts[index % len(texts)])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    rounds = max(1, repeat // 10)
+    for _ in range(rounds):
+        encoder.encode(texts, batch_size=batch_size)
+    throughput = rounds * len(texts) / (time.perf_counter() - start)
+
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "texts_per_s": round(throughput, 1)
+    }
+
+
+def run(model_name, repeat, batch_size, threads):
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+
+    backends = {
+        "pytorch": SentenceTransformer(model_name),
+        "onnx": ONNXEncoder(model_name, quantize=False, num_threads=threads),
+        "onnx-int8": ONNXEncoder(model_name, quantize=True, num_threads=threads)
+    }
+
+    texts = QUERIES + SKILLS
+    reference = backends["pytorch"].encode(texts, batch_size=batch_size)
+    reference_matches = best_matches(backends["pytorch"], batch_size)
+
+    report = {}
+    for name, encoder in backends.items():
+        vectors = encoder.encode(texts, batch_size=batch_size)
+        similarity = cosine_rows(np.asarray(vectors), np.asarray(reference))
+        matches = best_matches(encoder, batch_size)
+        report[name] = {
+            **measure(encoder, repeat, batch_size),
+            "cosine_mean": round(float(similarity.mean()), 4),
+            "cosine_min": round(float(similarity.min()), 4),
+            "top1_agreement": round(float((matches == reference_matches).mean()), 3)
+        }
+        if isinstance(encoder, ONNXEncoder):
+            report[name]["model_mb"] = round(os.path.getsize(encoder.model_path) / 1e6, 1)
+    return report
+
+
+def print_report(report):
+    baseline = report["pytorch"]["texts_per_s"]
+    print(f"{'backend':>10} {'p50 (ms)':>9} {'p95 (ms)':>9} {'textes/s':>9} {'accél.':>7} "
+          f"{'cos moy':>8} {'cos min':>8} {'top-1':>6}")
+    for name, row in report.items():
+        print(f"{name:>10} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['texts_per_s']:>9.1f} "
+              f"{row['texts_per_s'] / baseline:>6.1f}x {row['cosine_mean']:>8.4f} {row['cosine_min']:>8.4f} "
+              f"{row['top1_agreement']:>6.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparaison des backends d'embeddings")
+    parser.add_argument("--model", default="paraphrase-multilingual-MiniLM-L12-v2")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    results = run(args.model, args.repeat, args.batch_size, args.threads)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
@@ -9,6 +9,10 @@ from typing import Dict, List, Tuple, Set, Any, Optional, Union, Callable
 
 # Import main components
 from .optimal_matcher import OptimalMatcher
+from .assignment_solvers import (
+    AssignmentSolver, LinearSumAssignmentSolver, AuctionSolver, AutoSolver, get_solver
+)
+from .incremental_assignment import IncrementalAssignment
 from .edge_case_handler import EdgeCaseHandler
 from .performance_analyzer import PerformanceAnalyzer
 
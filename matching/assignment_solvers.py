@@ -0,0 +1,506 @@
+"""Assignment solver backends for optimal matching.
+
+This module provides the solvers behind OptimalMatcher for the linear
+assignment problem, including rectangular problems, forbidden pairs and
+columns with several openings (capacity-aware matching):
+
+- LinearSumAssignmentSolver: exact solver based on
+  ``scipy.optimize.linear_sum_assignment``, for dense problems.
+- AuctionSolver: epsilon-scaling auction algorithm on a sparse graph that
+  keeps only the K cheapest edges of each row, for large pools where a
+  dense solve is too slow or too large in memory.
+- AutoSolver: picks one of the two from the problem size and density.
+
+A column with capacity c is expanded into c identical slots; solvers always
+return original column indices.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+    from scipy.optimize import linear_sum_assignment
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+logger = logging.getLogger(__name__)
+
+_EMPTY = (np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp))
+
+# Below this many unassigned bidders, the auction bids one bidder at a time
+SEQUENTIAL_BIDDERS = 64
+
+
+def _require_scipy(solver_name: str) -> None:
+    if not HAS_SCIPY:
+        raise ImportError(f"scipy is required for the '{solver_name}' assignment solver")
+
+
+def _slot_columns(num_cols: int, capacities: Optional[Sequence[int]]) -> Optional[np.ndarray]:
+    """
+    Column index of each slot, or None when every column has a single opening.
+
+    Raises:
+        ValueError: If capacities do not match the number of columns
+    """
+    if capacities is None:
+        return None
+    capacities = np.asarray(capacities, dtype=np.intp)
+    if capacities.shape != (num_cols,):
+        raise ValueError(f"Capacities length ({capacities.size}) must match cost matrix columns ({num_cols})")
+    if np.any(capacities < 0):
+        raise ValueError("Capacities must be non-negative")
+    if np.all(capacities == 1):
+        return None
+    return np.repeat(np.arange(num_cols), capacities)
+
+
+def _to_dense(cost_matrix: Any) -> np.ndarray:
+    """Dense float matrix; pairs missing from a sparse matrix are forbidden (inf)."""
+    if HAS_SCIPY and sp.issparse(cost_matrix):
+        coo = cost_matrix.tocsr().tocoo()
+        dense = np.full(coo.shape, np.inf)
+        dense[coo.row, coo.col] = coo.data
+        return dense
+    return np.asarray(cost_matrix, dtype=np.float64)
+
+
+class AssignmentSolver(ABC):
+    """Base class of assignment solvers."""
+
+    name = "base"
+
+    @abstractmethod
+    def solve(self,
+              cost_matrix: Any,
+              capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find a minimum-cost assignment.
+
+        Args:
+            cost_matrix: (rows, cols) costs, either a dense array where inf
+                or NaN marks a forbidden pair, or a scipy.sparse matrix whose
+                stored entries are the allowed pairs
+            capacities: Optional number of openings of each column (1 by default)
+
+        Returns:
+            Row indices and column indices of the assigned pairs, sorted by
+            row. Each row is assigned at most once and column j at most
+            capacities[j] times.
+        """
+
+
+class LinearSumAssignmentSolver(AssignmentSolver):
+    """
+    Exact dense solver (scipy.optimize.linear_sum_assignment).
+
+    Forbidden pairs get a penalty larger than any difference between feasible
+    assignments, so the solver first maximizes the number of feasible pairs,
+    then minimizes their cost; penalized pairs are dropped from the result.
+    """
+
+    name = "lsa"
+
+    def solve(self,
+              cost_matrix: Any,
+              capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        _require_scipy(self.name)
+
+        dense = _to_dense(cost_matrix)
+        slots = _slot_columns(dense.shape[1], capacities)
+        if slots is not None:
+            dense = dense[:, slots]
+        if dense.size == 0:
+            return _EMPTY
+
+        feasible = np.isfinite(dense)
+        if not feasible.all():
+            if not feasible.any():
+                return _EMPTY
+            finite = dense[feasible]
+            span = float(finite.max() - finite.min())
+            penalty = (span + 1.0) * (min(dense.shape) + 1) + abs(float(finite.max()))
+            dense = np.where(feasible, dense, penalty)
+
+        rows, cols = linear_sum_assignment(dense)
+        keep = feasible[rows, cols]
+        rows, cols = rows[keep], cols[keep]
+        if slots is not None:
+            cols = slots[cols]
+        return rows, cols
+
+
+class AuctionSolver(AssignmentSolver):
+    """
+    Epsilon-scaling auction algorithm on a sparse top-K graph.
+
+    Only the top_k cheapest allowed columns of each row are kept. The
+    rectangular problem is made square and always feasible by giving every
+    row and every column a private "unassigned" partner at `unassigned_cost`;
+    unassigned partners pair with each other along the mirrored real edges
+    at no cost, so the square graph has 2 * edges + rows + cols entries.
+
+    Rows of the square graph act as bidders: in each round every unassigned
+    bidder bids for its best column at the price that makes it indifferent
+    to its second best plus epsilon, and each column goes to its highest
+    bidder. Epsilon is divided by `scaling` between phases down to
+    `epsilon_final`; the result is then within (rows + cols) * epsilon_final
+    of the optimum of the pruned graph. Bidding is vectorized over all
+    unassigned bidders, then sequential for the last few eviction chains.
+
+    Memory is linear in the number of kept edges. The auction is fastest on
+    roughly balanced problems: rows or slots in large excess must be priced
+    out one by one, where linear_sum_assignment is usually faster.
+
+    By default, `unassigned_cost` is large enough for the number of assigned
+    pairs to be maximized first, as with LinearSumAssignmentSolver.
+    """
+
+    name = "auction"
+
+    def __init__(self,
+                 top_k: Optional[int] = 50,
+                 scaling: float = 5.0,
+                 epsilon_final: Optional[float] = None,
+                 unassigned_cost: Optional[float] = None):
+        """
+        Initialize the auction solver.
+
+        Args:
+            top_k: Edges kept per row (None keeps every allowed edge)
+            scaling: Factor by which epsilon decreases between phases
+            epsilon_final: Epsilon of the last phase (cost range / (10 * (rows + cols)) by default)
+            unassigned_cost: Cost, relative to the cheapest edge, of leaving a
+                row or a column unassigned
+        """
+        if scaling <= 1.0:
+            raise ValueError("Scaling factor must be greater than 1")
+        self.top_k = top_k
+        self.scaling = scaling
+        self.epsilon_final = epsilon_final
+        self.unassigned_cost = unassigned_cost
+
+        # Statistics of the last solve
+        self.iterations = 0
+        self.phases = 0
+        self.num_edges = 0
+
+    def solve(self,
+              cost_matrix: Any,
+              capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        _require_scipy(self.name)
+
+        graph = self.sparse_graph(cost_matrix)
+        slots = _slot_columns(graph.shape[1], capacities)
+        if slots is not None:
+            graph = graph[:, slots].tocsr()
+
+        self.iterations = self.phases = 0
+        self.num_edges = graph.nnz
+        if graph.nnz == 0:
+            return _EMPTY
+
+        rows, cols = self._auction(graph.tocoo())
+        if slots is not None:
+            cols = slots[cols]
+        return rows, cols
+
+    def sparse_graph(self, cost_matrix: Any) -> 'sp.csr_matrix':
+        """
+        CSR matrix of the allowed edges, keeping the top_k cheapest per row.
+
+        Args:
+            cost_matrix: Dense costs (inf/NaN forbidden) or sparse matrix of allowed edges
+
+        Returns:
+            CSR matrix whose stored entries are the kept edges and their costs
+        """
+        if sp.issparse(cost_matrix):
+            coo = cost_matrix.tocsr().tocoo()
+            rows, cols, costs = coo.row, coo.col, coo.data.astype(np.float64)
+            keep = np.isfinite(costs)
+            rows, cols, costs = rows[keep], cols[keep], costs[keep]
+            if self.top_k is not None and costs.size:
+                order = np.lexsort((costs, rows))
+                rows, cols, costs = rows[order], cols[order], costs[order]
+                row_starts = np.searchsorted(rows, rows, side='left')
+                keep = (np.arange(rows.size) - row_starts) < self.top_k
+                rows, cols, costs = rows[keep], cols[keep], costs[keep]
+            shape = cost_matrix.shape
+        else:
+            dense = np.asarray(cost_matrix, dtype=np.float64)
+            shape = dense.shape
+            if dense.size == 0:
+                return sp.csr_matrix(shape)
+            k = shape[1] if self.top_k is None else min(self.top_k, shape[1])
+            if k < shape[1]:
+                cols = np.argpartition(np.where(np.isnan(dense), np.inf, dense), k - 1, axis=1)[:, :k]
+            else:
+                cols = np.broadcast_to(np.arange(shape[1]), shape)
+            costs = np.take_along_axis(dense, cols, axis=1).ravel()
+            rows = np.repeat(np.arange(shape[0]), cols.shape[1])
+            cols = cols.ravel()
+            keep = np.isfinite(costs)
+            rows, cols, costs = rows[keep], cols[keep], costs[keep]
+
+        graph = sp.csr_matrix((costs, (rows, cols)), shape=shape)
+        graph.sort_indices()
+        return graph
+
+    def _auction(self, graph: 'sp.coo_matrix') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the auction on the square reduction of the graph.
+
+        Returns:
+            Row indices and column indices of the assigned real edges, sorted by row
+        """
+        num_rows, num_cols = graph.shape
+        size = num_rows + num_cols
+        costs = graph.data - graph.data.min()
+        span = float(costs.max()) or 1.0
+        if self.unassigned_cost is not None:
+            unassigned = float(self.unassigned_cost)
+        else:
+            # Assigning one more pair never costs more than (min(rows, cols) + 1) * span
+            unassigned = (min(num_rows, num_cols) + 1) * span
+
+        # Square graph: real edges, unassigned partners, mirrored edges between partners
+        edge_rows = np.concatenate((graph.row, np.arange(num_rows), num_rows + np.arange(num_cols),
+                                    num_rows + graph.col))
+        edge_cols = np.concatenate((graph.col, num_cols + np.arange(num_rows), np.arange(num_cols),
+                                    num_cols + graph.row))
+        benefits = -np.concatenate((costs, np.full(num_rows, unassigned), np.full(num_cols, unassigned),
+                                    np.zeros(graph.nnz)))
+
+        order = np.argsort(edge_rows, kind='stable')
+        indices = edge_cols[order].astype(np.intp)
+        values = benefits[order]
+        row_lengths = np.bincount(edge_rows, minlength=size)
+        indptr = np.concatenate(([0], np.cumsum(row_lengths)))
+
+        prices = np.zeros(size)
+        owner = np.full(size, -1, dtype=np.intp)
+        assigned = np.full(size, -1, dtype=np.intp)
+        assigned_benefit = np.zeros(size)
+        segment_starts = indptr[:-1]
+
+        epsilon_final = self.epsilon_final or span / (10.0 * (size + 1))
+        # Rows or columns in excess can only be left unassigned once prices reach
+        # the unassigned cost: start from that scale so they give up within a few phases
+        epsilon = max((span if num_rows == num_cols else max(span, unassigned)) / self.scaling, epsilon_final)
+        bid_cap = span + unassigned
+
+        while True:
+            self.phases += 1
+
+            # Keep the assignments that still satisfy epsilon-complementary slackness
+            best = np.maximum.reduceat(values - prices[indices], segment_starts)
+            holding = assigned >= 0
+            current = np.where(holding, assigned_benefit - prices[np.maximum(assigned, 0)], -np.inf)
+            released = np.flatnonzero(holding & (current < best - epsilon))
+            owner[assigned[released]] = -1
+            assigned[released] = -1
+            active = np.flatnonzero(assigned < 0)
+
+            while active.size > SEQUENTIAL_BIDDERS:
+                self.iterations += 1
+                active = self._bidding_round(active, indptr, row_lengths, indices, values,
+                                             prices, owner, assigned, assigned_benefit, epsilon, bid_cap)
+            # Eviction chains at the end of a phase: cheaper one bid at a time
+            self.iterations += self._sequential_bidding(active.tolist(), indptr, indices, values,
+                                                        prices, owner, assigned, assigned_benefit,
+                                                        epsilon, bid_cap)
+
+            if epsilon <= epsilon_final:
+                break
+            epsilon = max(epsilon / self.scaling, epsilon_final)
+
+        rows = np.flatnonzero(assigned[:num_rows] < num_cols)
+        return rows.astype(np.intp), assigned[rows].astype(np.intp)
+
+    @staticmethod
+    def _sequential_bidding(queue: list,
+                            indptr: np.ndarray,
+                            indices: np.ndarray,
+                            values: np.ndarray,
+                            prices: np.ndarray,
+                            owner: np.ndarray,
+                            assigned: np.ndarray,
+                            assigned_benefit: np.ndarray,
+                            epsilon: float,
+                            bid_cap: float) -> int:
+        """
+        Gauss-Seidel bidding until every bidder is assigned.
+
+        Returns:
+            Number of bids
+        """
+        bids = 0
+        while queue:
+            bidder = queue.pop()
+            start, end = indptr[bidder], indptr[bidder + 1]
+            objects = indices[start:end]
+            net = values[start:end] - prices[objects]
+
+            best_index = int(net.argmax())
+            best = net[best_index]
+            if end - start > 1:
+                net[best_index] = -np.inf
+                second = net.max()
+            else:
+                second = best - bid_cap
+
+            target = objects[best_index]
+            previous = owner[target]
+            if previous >= 0:
+                assigned[previous] = -1
+                queue.append(previous)
+            owner[target] = bidder
+            assigned[bidder] = target
+            assigned_benefit[bidder] = values[start + best_index]
+            prices[target] += best - second + epsilon
+            bids += 1
+        return bids
+
+    @staticmethod
+    def _bidding_round(active: np.ndarray,
+                       indptr: np.ndarray,
+                       row_lengths: np.ndarray,
+                       indices: np.ndarray,
+                       values: np.ndarray,
+                       prices: np.ndarray,
+                       owner: np.ndarray,
+                       assigned: np.ndarray,
+                       assigned_benefit: np.ndarray,
+                       epsilon: float,
+                       bid_cap: float) -> np.ndarray:
+        """
+        One Jacobi bidding round of all unassigned bidders.
+
+        Returns:
+            Bidders left unassigned after the round (losers and evicted owners)
+        """
+        lengths = row_lengths[active]
+        segment_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        positions = np.repeat(indptr[active] - segment_starts, lengths) + np.arange(lengths.sum())
+        segments = np.repeat(np.arange(active.size), lengths)
+
+        net = values[positions] - prices[indices[positions]]
+        best = np.maximum.reduceat(net, segment_starts)
+
+        # First best edge of each bidder, then second best value without it
+        candidates = np.flatnonzero(net == best[segments])
+        first = np.concatenate(([True], segments[candidates][1:] != segments[candidates][:-1]))
+        best_positions = candidates[first]
+        net[best_positions] = -np.inf
+        second = np.maximum.reduceat(net, segment_starts)
+        # Bidders with a single edge raise its price by a bounded amount
+        second = np.where(np.isfinite(second), second, best - bid_cap)
+
+        targets = indices[positions[best_positions]]
+        target_benefits = values[positions[best_positions]]
+        bids = prices[targets] + (best - second) + epsilon
+
+        # Highest bid wins each object
+        order = np.lexsort((-bids, targets))
+        sorted_targets = targets[order]
+        winning = np.concatenate(([True], sorted_targets[1:] != sorted_targets[:-1]))
+        winners = order[winning]
+        lost = order[~winning]
+
+        won_objects = targets[winners]
+        previous = owner[won_objects]
+        evicted = previous[previous >= 0]
+        assigned[evicted] = -1
+
+        owner[won_objects] = active[winners]
+        assigned[active[winners]] = won_objects
+        assigned_benefit[active[winners]] = target_benefits[winners]
+        prices[won_objects] = bids[winners]
+
+        return np.concatenate((active[lost], evicted))
+
+
+class AutoSolver(AssignmentSolver):
+    """
+    Exact dense solve for problems that fit in `dense_limit` cells (rows x
+    slots), auction on the top-K graph beyond.
+
+    linear_sum_assignment is faster up to a few thousand rows and on strongly
+    rectangular problems; the auction keeps memory linear in the number of
+    kept edges and is faster on large, roughly balanced pools.
+    """
+
+    name = "auto"
+
+    def __init__(self,
+                 dense_limit: int = 10_000_000,
+                 **auction_options: Any):
+        """
+        Initialize the automatic solver.
+
+        Args:
+            dense_limit: Maximum rows x slots solved with linear_sum_assignment
+            **auction_options: Options of the AuctionSolver
+        """
+        self.dense_limit = dense_limit
+        self.dense_solver = LinearSumAssignmentSolver()
+        self.auction_solver = AuctionSolver(**auction_options)
+        self.last_solver: Optional[AssignmentSolver] = None
+
+    def select(self, cost_matrix: Any, capacities: Optional[Sequence[int]] = None) -> AssignmentSolver:
+        """Solver to use for this problem."""
+        rows, cols = cost_matrix.shape
+        slots = int(np.sum(capacities)) if capacities is not None else cols
+        if rows * slots > self.dense_limit:
+            return self.auction_solver
+        return self.dense_solver
+
+    def solve(self,
+              cost_matrix: Any,
+              capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        self.last_solver = self.select(cost_matrix, capacities)
+        return self.last_solver.solve(cost_matrix, capacities)
+
+    @property
+    def iterations(self) -> int:
+        return getattr(self.last_solver, 'iterations', 0)
+
+
+SOLVERS = {
+    LinearSumAssignmentSolver.name: LinearSumAssignmentSolver,
+    AuctionSolver.name: AuctionSolver,
+    AutoSolver.name: AutoSolver,
+}
+
+
+def get_solver(solver: Union[str, AssignmentSolver] = "auto", **options: Any) -> AssignmentSolver:
+    """
+    Instantiate an assignment solver.
+
+    Args:
+        solver: Solver name ('lsa', 'auction' or 'auto') or solver instance
+        **options: Constructor options of the solver
+
+    Returns:
+        Assignment solver
+    """
+    if isinstance(solver, AssignmentSolver):
+        return solver
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown assignment solver: {solver}")
+    return SOLVERS[solver](**options)
+
+
+def assignment_cost(cost_matrix: Any, rows: np.ndarray, cols: np.ndarray) -> float:
+    """Total cost of the assigned pairs."""
+    if rows.size == 0:
+        return 0.0
+    if HAS_SCIPY and sp.issparse(cost_matrix):
+        return float(np.asarray(cost_matrix.tocsr()[rows, cols]).sum())
+    return float(np.asarray(cost_matrix)[rows, cols].sum())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Benchmark of the assignment solver backends.
+
+Random problems of several sizes and densities (share of allowed
+candidate-job pairs) are solved with linear_sum_assignment and with the
+top-K auction; the report gives solve times and the cost gap of the auction
+relative to the exact solution.
+
+Usage:
+    python matching/benchmark_solvers.py [--sizes 500,2000,5000] [--densities 1.0,0.1,0.01]
+                                         [--top-k 50] [--capacity 1] [--dense-limit 25000000] [--json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import scipy.sparse as sp
+
+# Import the solvers module directly (the matching package uses relative imports)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from assignment_solvers import AuctionSolver, LinearSumAssignmentSolver, assignment_cost
+
+
+def make_problem(size, density, seed=42):
+    """Square problem: dense costs in [0, 1), or sparse allowed pairs when density < 1."""
+    rng = np.random.default_rng(seed)
+    if density >= 1.0:
+        return rng.random((size, size))
+    return sp.random(size, size, density=density, format='csr', random_state=seed,
+                     data_rvs=rng.random)
+
+
+def measure(solver, cost_matrix, capacities):
+    start = time.perf_counter()
+    rows, cols = solver.solve(cost_matrix, capacities)
+    elapsed = time.perf_counter() - start
+    return elapsed, rows.size, assignment_cost(cost_matrix, rows, cols)
+
+
+def run(sizes, densities, top_k, capacity, dense_limit):
+    report = []
+    for size in sizes:
+        num_jobs = max(1, size // capacity)
+        capacities = np.full(num_jobs, capacity) if capacity > 1 else None
+        for density in densities:
+            cost_matrix = make_problem(size, density)
+            if capacity > 1:
+                cost_matrix = cost_matrix[:, :num_jobs]
+            entry = {'size': size, 'density': density, 'capacity': capacity}
+
+            if size * size <= dense_limit:
+                elapsed, assigned, cost = measure(LinearSumAssignmentSolver(), cost_matrix, capacities)
+                entry['lsa'] = {'seconds': round(elapsed, 4), 'assigned': assigned, 'cost': round(cost, 4)}
+            else:
+                entry['lsa'] = None
+
+            auction = AuctionSolver(top_k=top_k)
+            elapsed, assigned, cost = measure(auction, cost_matrix, capacities)
+            entry['auction'] = {'seconds': round(elapsed, 4), 'assigned': assigned, 'cost': round(cost, 4),
+                                'edges': auction.num_edges, 'iterations': auction.iterations}
+
+            if entry['lsa'] and entry['lsa']['assigned'] == assigned and entry['lsa']['cost']:
+                entry['cost_gap'] = round(cost / entry['lsa']['cost'] - 1.0, 6)
+            else:
+                entry['cost_gap'] = None
+            report.append(entry)
+    return report
+
+
+def print_report(report):
+    print(f"{'size':>7} {'density':>8} {'lsa (s)':>9} {'auction (s)':>12} {'edges':>10} "
+          f"{'iters':>7} {'assigned':>9} {'cost gap':>9}")
+    for entry in report:
+        lsa = f"{entry['lsa']['seconds']:.3f}" if entry['lsa'] else "-"
+        gap = f"{entry['cost_gap']:.3%}" if entry['cost_gap'] is not None else "-"
+        auction = entry['auction']
+        print(f"{entry['size']:>7} {entry['density']:>8} {lsa:>9} {auction['seconds']:>12.3f} "
+              f"{auction['edges']:>10} {auction['iterations']:>7} {auction['assigned']:>9} {gap:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve time of the assignment solver backends")
+    parser.add_argument("--sizes", default="500,2000,5000")
+    parser.add_argument("--densities", default="1.0,0.1,0.01")
+    parser.add_argument("--top-k", type=int, default=50, help="Edges kept per row by the auction")
+    parser.add_argument("--capacity", type=int, default=1, help="Openings per job")
+    parser.add_argument("--dense-limit", type=int, default=25_000_000,
+                        help="Largest size x size solved with linear_sum_assignment")
+    parser.add_argument("--json", action="store_true", help="JSON output")
+    args = parser.parse_args()
+
+    results = run([int(size) for size in args.sizes.split(",")],
+                  [float(density) for density in args.densities.split(",")],
+                  args.top_k, args.capacity, args.dense_limit)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
@@ -0,0 +1,484 @@
+"""Incremental (warm-start) re-optimization of assignments.
+
+This module keeps an optimal assignment up to date when a few rows
+(candidates) or columns (jobs) are added, removed or re-weighted, instead
+of solving the whole problem again. It implements the dynamic Hungarian
+algorithm: the dual variables of the last solution are kept, the duals of
+changed rows/columns are reset to feasible values, the affected pairs are
+released, and optimality is restored with one shortest augmenting path
+(Dijkstra on reduced costs) per released row.
+
+Internally the problem is square: missing rows/columns are dummies whose
+pairs cost `penalty`, which is also the cost of forbidden pairs. The
+penalty exceeds any difference between feasible assignments, so the number
+of real feasible pairs is maximized first, as with LinearSumAssignmentSolver.
+"""
+
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .assignment_solvers import LinearSumAssignmentSolver, _slot_columns, _to_dense
+
+logger = logging.getLogger(__name__)
+
+# Rows of the cost matrix processed at once by the full-matrix passes
+CHUNK_ROWS = 1024
+
+
+class IncrementalAssignment:
+    """
+    Warm-started assignment between identified rows and columns.
+
+    Rows and columns are identified by hashable ids (positions by default),
+    so that changes between two cost matrices can be detected: ids that
+    disappear are removed, new ids are added, and rows or columns whose costs
+    changed are re-weighted. Past `change_threshold` (share of the problem
+    size) the assignment is solved from scratch.
+    """
+
+    def __init__(self, change_threshold: float = 0.1, growth: float = 0.125):
+        """
+        Initialize the incremental assignment.
+
+        Args:
+            change_threshold: Share of changed rows/columns above which a full solve is done
+            growth: Share of spare dummy rows/columns added when the problem grows
+        """
+        self.change_threshold = change_threshold
+        self.growth = growth
+        self.full_solver = LinearSumAssignmentSolver()
+        self.reset()
+
+        # Statistics
+        self.full_solves = 0
+        self.repairs = 0
+        self.augmentations = 0
+
+    def reset(self) -> None:
+        """Forget the current problem; the next update solves from scratch."""
+        self.costs = np.zeros((0, 0))
+        self.u = np.zeros(0)
+        self.v = np.zeros(0)
+        self.row_to_col = np.zeros(0, dtype=np.intp)
+        self.col_to_row = np.zeros(0, dtype=np.intp)
+        self.row_ids: List[Optional[Hashable]] = []
+        self.col_ids: List[Optional[Hashable]] = []
+        self.row_index: Dict[Hashable, int] = {}
+        self.col_index: Dict[Hashable, int] = {}
+        self.penalty = 0.0
+        self.cost_range = (0.0, 0.0)
+        self.max_size = 0
+
+    @property
+    def size(self) -> int:
+        """Size of the internal square problem (real and dummy rows)."""
+        return self.costs.shape[0]
+
+    def update(self,
+               cost_matrix: Any,
+               row_ids: Optional[Sequence[Hashable]] = None,
+               col_ids: Optional[Sequence[Hashable]] = None,
+               capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bring the assignment up to date with a new cost matrix.
+
+        Args:
+            cost_matrix: Dense cost matrix (inf/NaN for forbidden pairs) or
+                scipy.sparse matrix of allowed pairs
+            row_ids: Id of each row (positions by default)
+            col_ids: Id of each column (positions by default)
+            capacities: Optional number of openings of each column; the
+                openings of a column are identified by (column id, opening)
+
+        Returns:
+            Row indices and column indices (positions in cost_matrix) of the
+            assigned pairs, sorted by row
+
+        Raises:
+            ValueError: If ids or capacities do not match the cost matrix shape
+        """
+        cost_matrix = _to_dense(cost_matrix)
+        num_rows, num_cols = cost_matrix.shape
+        row_ids = list(range(num_rows)) if row_ids is None else list(row_ids)
+        col_ids = list(range(num_cols)) if col_ids is None else list(col_ids)
+        if len(row_ids) != num_rows or len(col_ids) != num_cols:
+            raise ValueError("Row and column ids must match the cost matrix shape")
+
+        slots = _slot_columns(num_cols, capacities)
+        if slots is not None:
+            cost_matrix = cost_matrix[:, slots]
+            openings = np.arange(slots.size) - np.searchsorted(slots, slots)
+            col_ids = [(col_ids[col], int(opening)) for col, opening in zip(slots, openings)]
+
+        if not self._repair(cost_matrix, row_ids, col_ids):
+            logger.debug("Full solve of a %d x %d assignment", *cost_matrix.shape)
+            self.solve(cost_matrix, row_ids, col_ids)
+        rows, cols = self.assignment(row_ids, col_ids)
+        return rows, (cols if slots is None else slots[cols])
+
+    def solve(self,
+              cost_matrix: np.ndarray,
+              row_ids: Sequence[Hashable],
+              col_ids: Sequence[Hashable]) -> None:
+        """
+        Solve from scratch and compute the dual variables of the solution.
+
+        Args:
+            cost_matrix: (rows, cols) costs, inf/NaN for forbidden pairs
+            row_ids: Id of each row
+            col_ids: Id of each column
+        """
+        self.reset()
+        num_rows, num_cols = cost_matrix.shape
+        size = max(num_rows, num_cols)
+
+        finite = cost_matrix[np.isfinite(cost_matrix)]
+        low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+        self._set_penalty(low, high, size)
+
+        self.costs = np.full((size, size), self.penalty)
+        self.costs[:num_rows, :num_cols] = self._sanitize(cost_matrix)
+        self.row_ids = list(row_ids) + [None] * (size - num_rows)
+        self.col_ids = list(col_ids) + [None] * (size - num_cols)
+        self.row_index = {row_id: index for index, row_id in enumerate(row_ids)}
+        self.col_index = {col_id: index for index, col_id in enumerate(col_ids)}
+
+        if size:
+            rows, cols = self.full_solver.solve(self.costs)
+            self.row_to_col = np.empty(size, dtype=np.intp)
+            self.row_to_col[rows] = cols
+            self.col_to_row = np.empty(size, dtype=np.intp)
+            self.col_to_row[cols] = rows
+            self._recover_duals()
+        self.full_solves += 1
+
+    def assignment(self,
+                   row_ids: Optional[Sequence[Hashable]] = None,
+                   col_ids: Optional[Sequence[Hashable]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Current assignment of real, feasible pairs.
+
+        Args:
+            row_ids: Row ids giving the returned row positions (internal slots by default)
+            col_ids: Column ids giving the returned column positions
+
+        Returns:
+            Row positions and column positions of the assigned pairs, sorted by row
+        """
+        if self.size == 0:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+
+        rows = np.arange(self.size)
+        cols = self.row_to_col
+        real = (np.array([row_id is not None for row_id in self.row_ids])
+                & np.array([self.col_ids[col] is not None for col in cols])
+                & (self.costs[rows, cols] < self.penalty))
+        rows, cols = rows[real], cols[real]
+
+        row_positions = {row_id: index for index, row_id in enumerate(row_ids)} if row_ids is not None else None
+        col_positions = {col_id: index for index, col_id in enumerate(col_ids)} if col_ids is not None else None
+        out_rows = np.array([row_positions[self.row_ids[row]] if row_positions is not None else row
+                             for row in rows], dtype=np.intp)
+        out_cols = np.array([col_positions[self.col_ids[col]] if col_positions is not None else col
+                             for col in cols], dtype=np.intp)
+        order = np.argsort(out_rows, kind='stable')
+        return out_rows[order], out_cols[order]
+
+    # ------------------------------------------------------------------
+    # Change detection and repair
+    # ------------------------------------------------------------------
+
+    def _repair(self,
+                cost_matrix: np.ndarray,
+                row_ids: List[Hashable],
+                col_ids: List[Hashable]) -> bool:
+        """
+        Apply the differences with the current problem and repair the assignment.
+
+        Returns:
+            False when a full solve is needed instead
+        """
+        if self.size == 0:
+            return False
+
+        new_rows = {row_id: index for index, row_id in enumerate(row_ids)}
+        new_cols = {col_id: index for index, col_id in enumerate(col_ids)}
+        if len(new_rows) != len(row_ids) or len(new_cols) != len(col_ids):
+            raise ValueError("Row and column ids must be unique")
+
+        removed_rows = [row_id for row_id in self.row_index if row_id not in new_rows]
+        removed_cols = [col_id for col_id in self.col_index if col_id not in new_cols]
+        added_rows = [row_id for row_id in row_ids if row_id not in self.row_index]
+        added_cols = [col_id for col_id in col_ids if col_id not in self.col_index]
+
+        # Re-weighted rows or columns among those kept (smallest cover of the changed entries)
+        kept_rows = [row_id for row_id in row_ids if row_id in self.row_index]
+        kept_cols = [col_id for col_id in col_ids if col_id in self.col_index]
+        changed_rows, changed_cols = [], []
+        if kept_rows and kept_cols:
+            row_changes, col_changes = self._changed_entries(
+                cost_matrix,
+                np.array([self.row_index[row_id] for row_id in kept_rows]),
+                np.array([new_rows[row_id] for row_id in kept_rows]),
+                np.array([self.col_index[col_id] for col_id in kept_cols]),
+                np.array([new_cols[col_id] for col_id in kept_cols]))
+            if row_changes.size <= col_changes.size:
+                changed_rows = [kept_rows[index] for index in row_changes]
+            else:
+                changed_cols = [kept_cols[index] for index in col_changes]
+
+        changes = (len(removed_rows) + len(removed_cols) + len(added_rows) + len(added_cols)
+                   + len(changed_rows) + len(changed_cols))
+        if changes == 0:
+            return True
+        if changes > self.change_threshold * max(len(row_ids), len(col_ids), 1):
+            return False
+        if max(len(row_ids), len(col_ids)) > self.max_size:
+            return False
+
+        for row_id in removed_rows:
+            self._set_row(self.row_index.pop(row_id), None)
+        for col_id in removed_cols:
+            self._set_column(self.col_index.pop(col_id), None)
+
+        for col_id in added_cols:
+            index = self._free_slot(self.col_ids)
+            self.col_ids[index] = col_id
+            self.col_index[col_id] = index
+        for row_id in added_rows:
+            index = self._free_slot(self.row_ids)
+            self.row_ids[index] = row_id
+            self.row_index[row_id] = index
+
+        # Internal slots of the real rows/columns and their positions in cost_matrix
+        row_slots = np.array([index for index, row_id in enumerate(self.row_ids) if row_id is not None])
+        row_positions = np.array([new_rows[self.row_ids[index]] for index in row_slots], dtype=np.intp)
+        col_slots = np.array([index for index, col_id in enumerate(self.col_ids) if col_id is not None])
+        col_positions = np.array([new_cols[self.col_ids[index]] for index in col_slots], dtype=np.intp)
+
+        for col_id in added_cols + changed_cols:
+            costs = cost_matrix[row_positions, new_cols[col_id]]
+            if not self._in_range(costs):
+                return False  # The penalty no longer dominates the costs: solve again
+            self._set_column(self.col_index[col_id], self._internal_costs(costs, row_slots))
+        for row_id in added_rows + changed_rows:
+            costs = cost_matrix[new_rows[row_id], col_positions]
+            if not self._in_range(costs):
+                return False
+            self._set_row(self.row_index[row_id], self._internal_costs(costs, col_slots))
+
+        for row in np.flatnonzero(self.row_to_col < 0):
+            self._augment(row)
+        self.repairs += 1
+        return True
+
+    def _changed_entries(self,
+                         cost_matrix: np.ndarray,
+                         row_slots: np.ndarray,
+                         row_positions: np.ndarray,
+                         col_slots: np.ndarray,
+                         col_positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Kept rows and columns (indices into the slot arrays) with changed costs.
+
+        Compared by chunks of rows; contiguous slots and positions (the usual
+        case) are sliced instead of gathered.
+        """
+        def selector(indices, chunk=None):
+            if chunk is not None:
+                indices = indices[chunk]
+            if indices.size and np.array_equal(indices, np.arange(indices[0], indices[0] + indices.size)):
+                return slice(indices[0], indices[0] + indices.size)
+            return indices
+
+        old_cols, new_cols = selector(col_slots), selector(col_positions)
+        row_changed = np.zeros(row_slots.size, dtype=bool)
+        col_changed = np.zeros(col_slots.size, dtype=bool)
+
+        for start in range(0, row_slots.size, CHUNK_ROWS):
+            chunk = slice(start, start + CHUNK_ROWS)
+            old = self.costs[selector(row_slots, chunk)][:, old_cols]
+            new = cost_matrix[selector(row_positions, chunk)][:, new_cols]
+            differs = old != new
+            if differs.any():
+                # Forbidden pairs are stored as the penalty
+                differs &= np.isfinite(new) | (old != self.penalty)
+                row_changed[chunk] = differs.any(axis=1)
+                col_changed |= differs.any(axis=0)
+        return np.flatnonzero(row_changed), np.flatnonzero(col_changed)
+
+    def _internal_costs(self, costs: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        """Internal cost row/column: costs on the real slots, the penalty elsewhere."""
+        internal = np.full(self.size, self.penalty)
+        internal[slots] = self._sanitize(costs)
+        return internal
+
+    def _in_range(self, costs: np.ndarray) -> bool:
+        finite = costs[np.isfinite(costs)]
+        return not finite.size or (finite.min() >= self.cost_range[0] and finite.max() <= self.cost_range[1])
+
+    def _set_row(self, row: int, costs: Optional[np.ndarray]) -> None:
+        """
+        Replace the costs of a row (None turns it into a dummy row) and release it.
+
+        Its dual is reset to the smallest reduced cost, which keeps every
+        reduced cost of the row non-negative.
+        """
+        if costs is None:
+            self.row_ids[row] = None
+            costs = np.full(self.size, self.penalty)
+        self.costs[row] = costs
+        self._release_row(row)
+        self.u[row] = np.min(self.costs[row] - self.v)
+
+    def _set_column(self, col: int, costs: Optional[np.ndarray]) -> None:
+        """Replace the costs of a column (None turns it into a dummy column) and release it."""
+        if costs is None:
+            self.col_ids[col] = None
+            costs = np.full(self.size, self.penalty)
+        self.costs[:, col] = costs
+        row = self.col_to_row[col]
+        if row >= 0:
+            self._release_row(row)
+        self.v[col] = np.min(self.costs[:, col] - self.u)
+
+    def _release_row(self, row: int) -> None:
+        col = self.row_to_col[row]
+        if col >= 0:
+            self.col_to_row[col] = -1
+            self.row_to_col[row] = -1
+
+    def _free_slot(self, ids: List[Optional[Hashable]]) -> int:
+        """Index of a dummy row/column, growing the problem when there is none."""
+        if None not in ids:
+            self._grow()
+        return ids.index(None)
+
+    def _grow(self) -> None:
+        """Add spare dummy rows and columns (free, with feasible duals)."""
+        size = self.size
+        extra = max(1, int(size * self.growth))
+        costs = np.full((size + extra, size + extra), self.penalty)
+        costs[:size, :size] = self.costs
+        self.costs = costs
+
+        self.row_ids.extend([None] * extra)
+        self.col_ids.extend([None] * extra)
+        self.row_to_col = np.concatenate((self.row_to_col, np.full(extra, -1, dtype=np.intp)))
+        self.col_to_row = np.concatenate((self.col_to_row, np.full(extra, -1, dtype=np.intp)))
+
+        # New columns: v = min_i(penalty - u_i); new rows: u = min_j(c_j - v_j)
+        new_v = self.penalty - self.u.max() if size else 0.0
+        self.v = np.concatenate((self.v, np.full(extra, new_v)))
+        new_u = np.min(self.penalty - self.v)
+        self.u = np.concatenate((self.u, np.full(extra, new_u)))
+
+    # ------------------------------------------------------------------
+    # Shortest augmenting paths and duals
+    # ------------------------------------------------------------------
+
+    def _augment(self, start: int) -> None:
+        """
+        Assign a free row along a shortest augmenting path (Dijkstra on
+        reduced costs), then update the duals so that reduced costs stay
+        non-negative and assigned pairs stay tight.
+        """
+        size = self.size
+        distances = np.full(size, np.inf)
+        predecessors = np.full(size, -1, dtype=np.intp)
+        scanned = np.zeros(size, dtype=bool)
+        visited_rows = [start]
+        row_distances = [0.0]
+
+        row, row_distance = start, 0.0
+        while True:
+            reduced = self.costs[row] - self.u[row] - self.v + row_distance
+            improved = ~scanned & (reduced < distances)
+            distances[improved] = reduced[improved]
+            predecessors[improved] = row
+
+            col = int(np.argmin(np.where(scanned, np.inf, distances)))
+            shortest = distances[col]
+            scanned[col] = True
+            if self.col_to_row[col] < 0:
+                break
+            row, row_distance = self.col_to_row[col], shortest
+            visited_rows.append(row)
+            row_distances.append(shortest)
+
+        # Duals: rows and columns reached before the free column
+        self.u[visited_rows] += shortest - np.asarray(row_distances)
+        self.v[scanned] -= shortest - distances[scanned]
+
+        # Flip the path
+        while True:
+            row = predecessors[col]
+            previous = self.row_to_col[row]
+            self.row_to_col[row] = col
+            self.col_to_row[col] = row
+            if row == start:
+                break
+            col = previous
+        self.augmentations += 1
+
+    def _recover_duals(self) -> None:
+        """
+        Dual variables of the (optimal) current assignment.
+
+        With u_i = c_i,s(i) - v_s(i), feasibility reads
+            v_j <= c_ij - c_i,s(i) + v_s(i)
+        a shortest path system without negative cycles (Bellman-Ford). After
+        a first pass over all rows, only the rows whose assigned column got a
+        lower v are relaxed again.
+        """
+        size = self.size
+        assigned_costs = self.costs[np.arange(size), self.row_to_col]
+        v = np.zeros(size)
+        tolerance = 1e-12 * max(1.0, abs(self.penalty))
+
+        rows = np.arange(size)
+        while rows.size:
+            offsets = v[self.row_to_col[rows]] - assigned_costs[rows]
+            candidate = np.full(size, np.inf)
+            for start in range(0, rows.size, CHUNK_ROWS):
+                chunk = slice(start, start + CHUNK_ROWS)
+                block = self.costs[rows[chunk]] + offsets[chunk, np.newaxis]
+                np.minimum(candidate, block.min(axis=0), out=candidate)
+            lowered = candidate < v - tolerance
+            v[lowered] = candidate[lowered]
+            rows = self.col_to_row[lowered]
+
+        self.v = v
+        self.u = assigned_costs - v[self.row_to_col]
+
+    # ------------------------------------------------------------------
+    # Costs
+    # ------------------------------------------------------------------
+
+    def _set_penalty(self, low: float, high: float, size: int) -> None:
+        """
+        Penalty of dummy and forbidden pairs, with room for the problem to
+        double in size and for costs to move within twice their range.
+        """
+        span = max(high - low, 1.0)
+        self.cost_range = (low - span / 2.0, high + span / 2.0)
+        self.max_size = max(2 * size, 16)
+        range_span = self.cost_range[1] - self.cost_range[0]
+        self.penalty = (range_span + 1.0) * (self.max_size + 1) + abs(self.cost_range[1])
+
+    def _sanitize(self, costs: np.ndarray) -> np.ndarray:
+        """Costs with forbidden pairs (inf/NaN) replaced by the penalty."""
+        costs = np.array(costs, dtype=np.float64)
+        costs[~np.isfinite(costs)] = self.penalty
+        return costs
+
+    def stats(self) -> Dict[str, Any]:
+        """Full solves, repairs and augmenting paths since creation."""
+        return {
+            'size': self.size,
+            'full_solves': self.full_solves,
+            'repairs': self.repairs,
+            'augmentations': self.augmentations
+        }
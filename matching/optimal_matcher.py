@@ -6,12 +6,13 @@ with support for constraints, priorities, and multi-criteria optimization.
 
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Set, Any, Optional, Union, Callable
-from functools import lru_cache
+import hashlib
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Set, Any, Optional, Sequence, Union, Callable
 import time
 
-from ..hungarian.algorithm import HungarianAlgorithm
-from ..hungarian.cost_matrix import CostMatrix
+from .assignment_solvers import AssignmentSolver, assignment_cost, get_solver
+from .incremental_assignment import IncrementalAssignment
 from ..hungarian.constraint_system import ConstraintSystem
 from ..hungarian.bidirectional_matcher import BidirectionalMatcher
 from ..constraints.base_constraints import BaseConstraint, ConstraintPriority
@@ -31,7 +32,11 @@ class OptimalMatcher:
     def __init__(self, 
                  use_bidirectional: bool = False,
                  cache_size: int = 128,
-                 constraint_validator: Optional[ConstraintValidator] = None):
+                 constraint_validator: Optional[ConstraintValidator] = None,
+                 solver: Union[str, AssignmentSolver] = "auto",
+                 solver_options: Optional[Dict[str, Any]] = None,
+                 warm_start: bool = False,
+                 warm_start_threshold: float = 0.1):
         """
         Initialize the optimal matcher.
         
@@ -39,8 +44,15 @@ class OptimalMatcher:
             use_bidirectional: Whether to use bidirectional matching for preference stability
             cache_size: Size of the LRU cache for cost matrix computations
             constraint_validator: Validator for checking constraints
+            solver: Assignment solver name ('lsa', 'auction', 'auto') or instance
+            solver_options: Constructor options of the solver when given by name
+            warm_start: Whether to repair the previous assignment when few rows
+                or columns change instead of solving again
+            warm_start_threshold: Share of changed rows/columns above which a
+                warm-started matcher solves from scratch
         """
-        self.hungarian = HungarianAlgorithm()
+        self.solver = get_solver(solver, **(solver_options or {}))
+        self.incremental = IncrementalAssignment(warm_start_threshold) if warm_start else None
         self.use_bidirectional = use_bidirectional
         self.bidirectional_matcher = BidirectionalMatcher() if use_bidirectional else None
         self.constraint_system = ConstraintSystem()
@@ -60,10 +72,55 @@ class OptimalMatcher:
         Args:
             cache_size: Maximum number of entries in the cache
         """
-        if cache_size > 0:
-            self.compute_assignment = lru_cache(maxsize=cache_size)(self._compute_assignment_uncached)
+        self.cache_size = cache_size
+        self._assignment_cache: 'OrderedDict[str, Tuple[np.ndarray, np.ndarray]]' = OrderedDict()
+    
+    def compute_assignment(self, 
+                           cost_matrix: Any,
+                           capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the optimal assignment, reusing the result for identical inputs.
+        
+        Args:
+            cost_matrix: Dense cost matrix or scipy.sparse matrix of allowed pairs
+            capacities: Optional number of openings of each column
+            
+        Returns:
+            Tuple of row and column indices for optimal assignment
+        """
+        if self.cache_size <= 0:
+            return self._compute_assignment_uncached(cost_matrix, capacities)
+        
+        key = self._matrix_digest(cost_matrix, capacities)
+        cached = self._assignment_cache.get(key)
+        if cached is not None:
+            self._assignment_cache.move_to_end(key)
+            return cached
+        
+        result = self._compute_assignment_uncached(cost_matrix, capacities)
+        self._assignment_cache[key] = result
+        while len(self._assignment_cache) > self.cache_size:
+            self._assignment_cache.popitem(last=False)
+        return result
+    
+    @staticmethod
+    def _matrix_digest(cost_matrix: Any, capacities: Optional[Sequence[int]] = None) -> str:
+        """
+        Digest of a cost matrix (dense or sparse) and of the column capacities.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr(cost_matrix.shape).encode())
+        if hasattr(cost_matrix, 'tocsr'):
+            csr = cost_matrix.tocsr()
+            arrays = (csr.data, csr.indices, csr.indptr)
         else:
-            self.compute_assignment = self._compute_assignment_uncached
+            arrays = (np.asarray(cost_matrix, dtype=np.float64),)
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        if capacities is not None:
+            digest.update(b'capacities')
+            digest.update(np.asarray(capacities, dtype=np.int64).tobytes())
+        return digest.hexdigest()
     
     def add_constraint(self, constraint: BaseConstraint, group_name: str = "default") -> None:
         """
@@ -87,15 +144,18 @@ class OptimalMatcher:
               cost_matrix: np.ndarray,
               row_preferences: Optional[List[List[int]]] = None,
               col_preferences: Optional[List[List[int]]] = None,
-              context: Optional[Dict[str, Any]] = None) -> Tuple[List[Tuple[int, int]], float]:
+              context: Optional[Dict[str, Any]] = None,
+              capacities: Optional[Sequence[int]] = None) -> Tuple[List[Tuple[int, int]], float]:
         """
         Find optimal assignment using the Hungarian algorithm.
         
         Args:
-            cost_matrix: 2D array of assignment costs
+            cost_matrix: 2D array of assignment costs (inf marks a forbidden pair)
             row_preferences: Optional ordered preferences for rows (for bidirectional matching)
             col_preferences: Optional ordered preferences for columns (for bidirectional matching)
             context: Additional context for constraint validation
+            capacities: Optional number of openings of each column; a column
+                can then be assigned to several rows
             
         Returns:
             Tuple containing:
@@ -126,7 +186,7 @@ class OptimalMatcher:
                 cost_matrix, row_preferences, col_preferences, context
             )
         else:
-            assignments = self._hungarian_match(cost_matrix, context)
+            assignments = self._hungarian_match(cost_matrix, context, capacities)
         
         # Calculate total cost
         total_cost = self._calculate_total_cost(cost_matrix, assignments)
@@ -186,13 +246,16 @@ class OptimalMatcher:
     
     def _hungarian_match(self, 
                         cost_matrix: np.ndarray,
-                        context: Dict[str, Any]) -> List[Tuple[int, int]]:
+                        context: Dict[str, Any],
+                        capacities: Optional[Sequence[int]] = None) -> List[Tuple[int, int]]:
         """
-        Perform matching using the Hungarian algorithm.
+        Perform matching using the configured assignment solver.
         
         Args:
             cost_matrix: 2D array of assignment costs
-            context: Additional context for constraint validation
+            context: Additional context for constraint validation; with warm
+                start, 'row_ids' and 'col_ids' identify rows and columns across calls
+            capacities: Optional number of openings of each column
             
         Returns:
             List of (row, col) assignment pairs
@@ -200,36 +263,34 @@ class OptimalMatcher:
         # Apply constraint penalties to cost matrix
         adjusted_matrix = self.constraint_system.apply_penalties(cost_matrix, context)
         
-        # Create a cost matrix wrapper
-        cost_matrix_obj = CostMatrix(adjusted_matrix)
-        
-        # Use cached computation for identical inputs
-        matrix_hash = cost_matrix_obj.hash()
-        row_indices, col_indices = self.compute_assignment(matrix_hash)
+        if self.incremental is not None:
+            # Repair the previous assignment when only a few rows/columns changed
+            row_indices, col_indices = self.incremental.update(
+                adjusted_matrix, context.get('row_ids'), context.get('col_ids'), capacities
+            )
+        else:
+            # Use cached computation for identical inputs
+            row_indices, col_indices = self.compute_assignment(adjusted_matrix, capacities)
         
         # Convert to list of pairs
         assignments = [(int(row), int(col)) for row, col in zip(row_indices, col_indices)]
         
         return assignments
     
-    @staticmethod
-    def _compute_assignment_uncached(matrix_hash: str) -> Tuple[np.ndarray, np.ndarray]:
+    def _compute_assignment_uncached(self, 
+                                     cost_matrix: Any,
+                                     capacities: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Compute Hungarian algorithm assignment (uncached version).
+        Compute the optimal assignment with the solver (uncached version).
         
         Args:
-            matrix_hash: Hash of the cost matrix for caching
+            cost_matrix: Dense cost matrix or scipy.sparse matrix of allowed pairs
+            capacities: Optional number of openings of each column
             
         Returns:
             Tuple of row and column indices for optimal assignment
         """
-        # In a real implementation, this would extract the matrix from the hash
-        # and compute the assignment. For now, we'll just return dummy indices.
-        # This would be replaced with actual Hungarian algorithm implementation.
-        cost_matrix = CostMatrix.from_hash(matrix_hash)
-        algorithm = HungarianAlgorithm()
-        row_indices, col_indices = algorithm.solve(cost_matrix.matrix)
-        return row_indices, col_indices
+        return self.solver.solve(cost_matrix, capacities)
     
     def _bidirectional_match(self, 
                             cost_matrix: np.ndarray,
@@ -275,7 +336,10 @@ class OptimalMatcher:
         Returns:
             Total cost of the assignment
         """
-        return sum(cost_matrix[row, col] for row, col in assignments)
+        if not assignments:
+            return 0.0
+        rows, cols = np.asarray(assignments).T
+        return assignment_cost(cost_matrix, rows, cols)
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """
@@ -285,26 +349,32 @@ class OptimalMatcher:
             Dictionary of performance statistics
         """
         if not self.execution_times:
-            return {
+            stats = {
                 'count': 0,
                 'avg_time': 0,
                 'min_time': 0,
                 'max_time': 0,
                 'last_time': 0
             }
+        else:
+            stats = {
+                'count': len(self.execution_times),
+                'avg_time': sum(self.execution_times) / len(self.execution_times),
+                'min_time': min(self.execution_times),
+                'max_time': max(self.execution_times),
+                'last_time': self.last_execution_time
+            }
+        
+        if self.incremental is not None:
+            stats['warm_start'] = self.incremental.stats()
         
-        return {
-            'count': len(self.execution_times),
-            'avg_time': sum(self.execution_times) / len(self.execution_times),
-            'min_time': min(self.execution_times),
-            'max_time': max(self.execution_times),
-            'last_time': self.last_execution_time
-        }
+        return stats
     
     def clear_cache(self) -> None:
-        """Clear the computation cache."""
-        if hasattr(self.compute_assignment, 'cache_clear'):
-            self.compute_assignment.cache_clear()
+        """Clear the computation cache and the warm-start state."""
+        self._assignment_cache.clear()
+        if self.incremental is not None:
+            self.incremental.reset()
     
     def get_constraint_report(self) -> Dict[str, Any]:
         """
@@ -18,7 +18,6 @@ from pathlib import Path
 import psutil
 import gc
 
-from ..hungarian.algorithm import HungarianAlgorithm
 from .optimal_matcher import OptimalMatcher
 
 logger = logging.getLogger(__name__)
@@ -152,8 +151,8 @@ class PerformanceAnalyzer:
             solution_quality += total_cost
             
             # Record iterations if available
-            if hasattr(matcher.hungarian, 'iterations'):
-                iterations_count += matcher.hungarian.iterations
+            if hasattr(matcher.solver, 'iterations'):
+                iterations_count += matcher.solver.iterations
             
             # Record constraint violations if available
             if hasattr(matcher, 'constraint_validator'):
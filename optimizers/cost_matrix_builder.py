@@ -0,0 +1,481 @@
+"""Vectorized cost matrix construction for the Hungarian optimizer.
+
+Resources (candidates) and tasks (jobs) are encoded as sparse skill-weight
+matrices over a shared skill vocabulary, so the skill similarity of every
+resource-task pair comes from one sparse matrix product instead of one
+``SkillSet.match_score`` call per pair. Preference, workload, location and
+salary terms are computed for all pairs at once with NumPy broadcasting.
+"""
+
+import logging
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+    HAS_SCIPY = True
+except ImportError:
+    HAS_SCIPY = False
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0088
+
+DEFAULT_COST_WEIGHTS = {
+    'skill_match': 0.6,
+    'preference_match': 0.3,
+    'workload_balance': 0.1,
+    'location_match': 0.2,
+    'salary_match': 0.1
+}
+
+# Row normalization applied to resources and tasks for each similarity mode
+SIMILARITY_NORMALIZATION = {
+    # Share of the task's skill weight covered by the resource, in [0, 1]
+    'coverage': ('max', 'sum'),
+    # Cosine between skill-weight vectors, in [0, 1] for non-negative weights
+    'cosine': ('l2', 'l2')
+}
+
+
+def _numeric(value: Any) -> Optional[float]:
+    """Return value as a float if it is a number (or an enum of a number)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    inner = getattr(value, 'value', None)
+    if isinstance(inner, (int, float)) and not isinstance(inner, bool):
+        return float(inner)
+    return None
+
+
+def _skill_weight(skill: Any) -> float:
+    """Weight of a skill object (``weight``, ``level`` or ``proficiency``, 1.0 by default)."""
+    for attribute in ('weight', 'level', 'proficiency'):
+        value = _numeric(getattr(skill, attribute, None))
+        if value is not None:
+            return value
+    return 1.0
+
+
+def _skill_weights(skill_set: Any) -> Dict[str, float]:
+    """
+    Weight of each skill of a skill set, keyed by normalized skill name.
+
+    Accepts mappings of name to weight or skill object, objects exposing a
+    ``skills`` attribute, and iterables of names, (name, weight) tuples or
+    skill objects with a ``name``.
+
+    Raises:
+        TypeError: If the skills cannot be extracted
+    """
+    skills = getattr(skill_set, 'skills', skill_set)
+    if callable(skills):
+        skills = skills()
+
+    if isinstance(skills, Mapping):
+        pairs = skills.items()
+    elif isinstance(skills, Iterable) and not isinstance(skills, (str, bytes)):
+        pairs = [_split_skill(skill) for skill in skills]
+    else:
+        raise TypeError(f"Cannot extract skills from {type(skill_set).__name__}")
+
+    weights: Dict[str, float] = {}
+    for name, value in pairs:
+        if type(value) is int or type(value) is float:
+            weight = value
+        else:
+            weight = _numeric(value)
+            if weight is None:
+                weight = _skill_weight(value)
+        if weight > 0:
+            name = name.strip().lower() if type(name) is str else str(name).strip().lower()
+            if weight > weights.get(name, 0.0):
+                weights[name] = weight
+    return weights
+
+
+def _split_skill(skill: Any) -> Tuple[str, Any]:
+    if isinstance(skill, str):
+        return skill, 1.0
+    if isinstance(skill, tuple) and len(skill) == 2:
+        return skill
+    name = getattr(skill, 'name', None)
+    if name is None:
+        raise TypeError(f"Cannot extract skill name from {type(skill).__name__}")
+    return name, skill
+
+
+class VectorizedCostMatrixBuilder:
+    """
+    Build Hungarian cost matrices with matrix operations.
+
+    The cost of assigning resource i to task j is a weighted sum of terms in
+    [0, 1] (lower is better):
+        skill:      1 - similarity(skills_i, skills_j)
+        preference: 1 - preference[i, j], normalized per resource
+        workload:   workload[i], normalized across resources
+        location:   distance(i, j) / max_distance_km, capped at 1
+        salary:     salary shortfall of task j relative to the expectation of i
+
+    Optional terms are only added when their data is present in the context.
+    Skill similarities, the costly part, are kept in a bounded LRU cache keyed
+    by the stable identifiers of the resources and tasks (see _cache_key); the
+    other terms are cheap and recomputed on every call.
+    """
+
+    def __init__(self,
+                 weights: Optional[Dict[str, float]] = None,
+                 similarity: str = 'coverage',
+                 max_distance_km: float = 100.0,
+                 cache_size: int = 128):
+        """
+        Initialize the builder.
+
+        Args:
+            weights: Weight of each cost term (see DEFAULT_COST_WEIGHTS)
+            similarity: Skill similarity ('coverage' or 'cosine')
+            max_distance_km: Distance at which the location cost saturates
+            cache_size: Maximum number of cached similarity matrices (0 disables caching)
+        """
+        if similarity not in SIMILARITY_NORMALIZATION:
+            raise ValueError(f"Unknown skill similarity: {similarity}")
+
+        self.weights = dict(DEFAULT_COST_WEIGHTS)
+        self.weights.update(weights or {})
+        self.similarity = similarity
+        self.max_distance_km = max_distance_km
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+
+    def build(self,
+              resources: Sequence[Any],
+              tasks: Sequence[Any],
+              preferences: Optional[Sequence[Sequence[float]]] = None,
+              context: Optional[Dict[str, Any]] = None) -> np.ndarray:
+        """
+        Build the cost matrix for all resource-task pairs.
+
+        Args:
+            resources: Skill sets of the resources (rows)
+            tasks: Skill sets of the tasks (columns)
+            preferences: Optional matrix of resource-task preferences
+            context: Optional terms: 'workloads' (per resource),
+                'resource_locations' / 'task_locations' ((lat, lon) or None),
+                'salary_expectations' (per resource) and 'salary_ranges'
+                ((min, max), a single amount or None, per task); optional
+                'resource_ids' / 'task_ids' for the cache (see _cache_key)
+
+        Returns:
+            Cost matrix of shape (len(resources), len(tasks))
+        """
+        context = context or {}
+        num_resources, num_tasks = len(resources), len(tasks)
+        if not (num_resources and num_tasks):
+            return np.zeros((num_resources, num_tasks))
+
+        # Skill cost = weight * (1 - similarity); the product allocates the matrix
+        cost_matrix = self._cached_similarity(resources, tasks, context) * -self.weights['skill_match']
+        cost_matrix += self.weights['skill_match']
+
+        terms = self._context_terms(num_resources, num_tasks, preferences, context)
+        if 'preferences' in terms:
+            self._add_term(cost_matrix, 'preference_match', self.preference_costs(terms['preferences']))
+        if 'workloads' in terms:
+            cost_matrix += self.weights['workload_balance'] * self.workload_costs(terms['workloads'])[:, np.newaxis]
+        if 'locations' in terms:
+            self._add_term(cost_matrix, 'location_match', self.location_costs(
+                *terms['locations'], max_distance_km=self.max_distance_km
+            ))
+        if 'salaries' in terms:
+            self._add_term(cost_matrix, 'salary_match', self.salary_costs(*terms['salaries']))
+
+        return cost_matrix
+
+    def _cached_similarity(self, resources: Sequence[Any], tasks: Sequence[Any],
+                           context: Dict[str, Any]) -> np.ndarray:
+        """Skill similarity of all pairs, from the cache when resources and tasks are identified."""
+        cache_key = self._cache_key(resources, tasks, context) if self.cache_size > 0 else None
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                return cached
+
+        encoded = self._encode_skills(resources, tasks)
+        similarity = (self._skill_similarity(*encoded, len(resources), len(tasks)) if encoded is not None
+                      else self._pairwise_similarity(resources, tasks))
+
+        if cache_key is not None:
+            self._cache[cache_key] = similarity
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return similarity
+
+    def _add_term(self, cost_matrix: np.ndarray, weight_name: str, costs: np.ndarray) -> None:
+        """Add a weighted cost term in place (costs is overwritten)."""
+        costs *= self.weights[weight_name]
+        cost_matrix += costs
+
+    def _encode_skills(self, resources: Sequence[Any], tasks: Sequence[Any]) -> Optional[tuple]:
+        """
+        Encode resources and tasks over a shared skill vocabulary.
+
+        Returns:
+            (vocabulary, resource triples, task triples), each triple being
+            (rows, columns, values) of the normalized skill-weight matrix, or
+            None if the skill sets cannot be introspected
+        """
+        resource_norm, task_norm = SIMILARITY_NORMALIZATION[self.similarity]
+        vocabulary: Dict[str, int] = {}
+        try:
+            resource_triples = self._encode_rows(resources, vocabulary, resource_norm)
+            task_triples = self._encode_rows(tasks, vocabulary, task_norm)
+        except TypeError as e:
+            logger.warning(f"Falling back to pairwise skill matching: {e}")
+            return None
+        return vocabulary, resource_triples, task_triples
+
+    @staticmethod
+    def _encode_rows(skill_sets: Sequence[Any],
+                     vocabulary: Dict[str, int],
+                     normalization: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lengths: List[int] = []
+        columns: List[int] = []
+        values: List[float] = []
+
+        for skill_set in skill_sets:
+            weights = _skill_weights(skill_set)
+            lengths.append(len(weights))
+            columns.extend([vocabulary.setdefault(name, len(vocabulary)) for name in weights])
+            values.extend(weights.values())
+
+        rows = np.repeat(np.arange(len(lengths), dtype=np.int32), lengths)
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            # Row normalization in one pass over all entries
+            starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))[np.asarray(lengths) > 0]
+            if normalization == 'max':
+                scales = np.maximum.reduceat(values, starts)
+            elif normalization == 'sum':
+                scales = np.add.reduceat(values, starts)
+            else:
+                scales = np.sqrt(np.add.reduceat(values * values, starts))
+            values /= np.repeat(scales, np.asarray(lengths)[np.asarray(lengths) > 0])
+
+        return rows, np.asarray(columns, dtype=np.int32), values
+
+    def _skill_similarity(self,
+                          vocabulary: Dict[str, int],
+                          resource_triples: tuple,
+                          task_triples: tuple,
+                          num_resources: int,
+                          num_tasks: int) -> np.ndarray:
+        """Similarity of all pairs as one (sparse) matrix product."""
+        num_skills = max(len(vocabulary), 1)
+
+        if HAS_SCIPY:
+            resource_matrix = sp.csr_matrix(
+                (resource_triples[2], (resource_triples[0], resource_triples[1])),
+                shape=(num_resources, num_skills)
+            )
+            task_matrix = sp.csr_matrix(
+                (task_triples[2], (task_triples[0], task_triples[1])),
+                shape=(num_tasks, num_skills)
+            )
+            similarity = (resource_matrix @ task_matrix.T).toarray()
+        else:
+            resource_matrix = np.zeros((num_resources, num_skills))
+            resource_matrix[resource_triples[0], resource_triples[1]] = resource_triples[2]
+            task_matrix = np.zeros((num_tasks, num_skills))
+            task_matrix[task_triples[0], task_triples[1]] = task_triples[2]
+            similarity = resource_matrix @ task_matrix.T
+
+        if self.similarity == 'coverage':
+            # A task without required skills is fully covered by any resource
+            no_requirements = np.bincount(task_triples[0], minlength=num_tasks) == 0
+            similarity[:, no_requirements] = 1.0
+
+        return np.clip(similarity, 0.0, 1.0, out=similarity)
+
+    @staticmethod
+    def _pairwise_similarity(resources: Sequence[Any], tasks: Sequence[Any]) -> np.ndarray:
+        """Legacy path for skill sets that only expose ``match_score``."""
+        return np.array([[resource.match_score(task) for task in tasks] for resource in resources],
+                        dtype=np.float64)
+
+    def _context_terms(self,
+                       num_resources: int,
+                       num_tasks: int,
+                       preferences: Optional[Sequence[Sequence[float]]],
+                       context: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect the optional cost term inputs as arrays of the right shape."""
+        terms: Dict[str, Any] = {}
+
+        if preferences is not None and len(preferences) == num_resources:
+            try:
+                matrix = np.asarray(preferences, dtype=np.float64)
+            except ValueError:
+                matrix = None  # Ragged rows
+            if matrix is not None and matrix.shape == (num_resources, num_tasks):
+                terms['preferences'] = matrix
+
+        workloads = context.get('workloads')
+        if isinstance(workloads, (list, tuple, np.ndarray)) and len(workloads) == num_resources:
+            terms['workloads'] = np.asarray(workloads, dtype=np.float64)
+
+        resource_locations = context.get('resource_locations')
+        task_locations = context.get('task_locations')
+        if (resource_locations is not None and task_locations is not None
+                and len(resource_locations) == num_resources and len(task_locations) == num_tasks):
+            terms['locations'] = (self._coordinates(resource_locations), self._coordinates(task_locations))
+
+        expectations = context.get('salary_expectations')
+        ranges = context.get('salary_ranges')
+        if (expectations is not None and ranges is not None
+                and len(expectations) == num_resources and len(ranges) == num_tasks):
+            terms['salaries'] = (
+                np.array([np.nan if value is None else value for value in expectations], dtype=np.float64),
+                self._salary_maxima(ranges)
+            )
+
+        return terms
+
+    @staticmethod
+    def _coordinates(locations: Sequence[Any]) -> np.ndarray:
+        """(n, 2) array of (lat, lon), NaN where unknown."""
+        coordinates = np.full((len(locations), 2), np.nan)
+        for index, location in enumerate(locations):
+            if location is not None:
+                coordinates[index] = location[:2]
+        return coordinates
+
+    @staticmethod
+    def _salary_maxima(ranges: Sequence[Any]) -> np.ndarray:
+        """Upper bound of each task's salary range, NaN where unknown."""
+        maxima = np.full(len(ranges), np.nan)
+        for index, salary_range in enumerate(ranges):
+            if salary_range is None:
+                continue
+            if isinstance(salary_range, (list, tuple)):
+                known = [value for value in salary_range if value is not None]
+                if known:
+                    maxima[index] = max(known)
+            else:
+                maxima[index] = salary_range
+        return maxima
+
+    @staticmethod
+    def preference_costs(preferences: np.ndarray) -> np.ndarray:
+        """1 - preferences normalized to [0, 1] per resource (0.5 for flat rows)."""
+        minima = preferences.min(axis=1, keepdims=True)
+        spans = preferences.max(axis=1, keepdims=True) - minima
+        costs = np.full_like(preferences, 0.5)
+        np.divide(preferences - minima, spans, out=costs, where=spans > 0)
+        np.subtract(1.0, costs, out=costs)
+        return costs
+
+    @staticmethod
+    def workload_costs(workloads: np.ndarray) -> np.ndarray:
+        """Workloads normalized to [0, 1] across resources (0.5 if all equal)."""
+        span = workloads.max() - workloads.min() if workloads.size else 0.0
+        if span <= 0:
+            return np.full_like(workloads, 0.5)
+        return (workloads - workloads.min()) / span
+
+    @staticmethod
+    def location_costs(resource_coordinates: np.ndarray,
+                       task_coordinates: np.ndarray,
+                       max_distance_km: float = 100.0) -> np.ndarray:
+        """
+        Great-circle distance of all pairs, scaled by max_distance_km and capped at 1.
+
+        Pairs with an unknown location get a neutral cost of 0.5.
+        """
+        # Unit vectors: the angle between two points comes from one (n x 3) @ (3 x m) product
+        resource_vectors = VectorizedCostMatrixBuilder._unit_vectors(resource_coordinates)
+        task_vectors = VectorizedCostMatrixBuilder._unit_vectors(task_coordinates)
+        costs = resource_vectors @ task_vectors.T
+        # Half chord = sqrt((1 - cos) / 2), distance = 2R * arcsin(half chord); in place
+        np.subtract(1.0, costs, out=costs)
+        costs *= 0.5
+        np.clip(costs, 0.0, 1.0, out=costs)
+        np.sqrt(costs, out=costs)
+        np.arcsin(costs, out=costs)
+        costs *= 2.0 * EARTH_RADIUS_KM / max_distance_km
+        np.minimum(costs, 1.0, out=costs)
+        costs[np.isnan(costs)] = 0.5
+        return costs
+
+    @staticmethod
+    def _unit_vectors(coordinates: np.ndarray) -> np.ndarray:
+        """(n, 3) unit vectors of (lat, lon) coordinates in degrees."""
+        lat = np.radians(coordinates[:, 0])
+        lon = np.radians(coordinates[:, 1])
+        cos_lat = np.cos(lat)
+        return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+    @staticmethod
+    def salary_costs(expectations: np.ndarray, task_maxima: np.ndarray) -> np.ndarray:
+        """
+        Share of each resource's expected salary that the task cannot pay, in [0, 1].
+
+        Pairs with an unknown expectation or salary range cost nothing.
+        """
+        # shortfall = 1 - maximum / expectation, as one outer product
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inverse = np.where(expectations > 0, 1.0 / expectations, np.nan)
+        shortfall = np.multiply.outer(inverse, -task_maxima)
+        shortfall += 1.0
+        np.clip(shortfall, 0.0, 1.0, out=shortfall)
+        shortfall[np.isnan(shortfall)] = 0.0
+        return shortfall
+
+    def _cache_key(self, resources: Sequence[Any], tasks: Sequence[Any],
+                   context: Dict[str, Any]) -> Optional[Tuple[tuple, tuple]]:
+        """
+        Cache key made of the stable identifiers of the resources and tasks.
+
+        Identifiers must change whenever the skills change, e.g. (candidate_id,
+        updated_at). They come from context['resource_ids'] / context['task_ids'],
+        or else from the ``id`` and ``version`` (or ``updated_at``) attributes of
+        each skill set. Without identifiers for every item nothing is cached:
+        hashing the skills themselves costs about as much as encoding them.
+        """
+        resource_ids = self._stable_ids(resources, context.get('resource_ids'))
+        if resource_ids is None:
+            return None
+        task_ids = self._stable_ids(tasks, context.get('task_ids'))
+        if task_ids is None:
+            return None
+        return resource_ids, task_ids
+
+    @staticmethod
+    def _stable_ids(items: Sequence[Any], ids: Optional[Sequence[Any]]) -> Optional[tuple]:
+        """Identifier of each item, or None if some item has none."""
+        if ids is not None:
+            return tuple(ids) if len(ids) == len(items) else None
+
+        keys = []
+        for item in items:
+            item_id = getattr(item, 'id', None)
+            version = getattr(item, 'version', None)
+            if version is None:
+                version = getattr(item, 'updated_at', None)
+            if item_id is None or version is None:
+                return None
+            keys.append((item_id, version))
+        return tuple(keys)
+
+    def clear_cache(self) -> None:
+        """Clear the matrix cache."""
+        self._cache.clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        """Current and maximum number of cached similarity matrices."""
+        return {'size': len(self._cache), 'max_size': self.cache_size}
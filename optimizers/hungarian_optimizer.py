@@ -15,13 +15,13 @@ import json
 # Import from Session 5 optimizer module
 from ..optimizers.base_optimizer import BaseOptimizer, OptimizationResult
 from ..optimizers.ml_optimizer import MLOptimizer
+from ..optimizers.cost_matrix_builder import VectorizedCostMatrixBuilder
 
 # Import from Session 4 skills module
 from ..skills.enhanced_skills import SkillSet, Skill
 
 # Import from current session
 from ..matching.optimal_matcher import OptimalMatcher
-from ..hungarian.cost_matrix import CostMatrix
 from ..constraints.constraint_validator import ConstraintValidator
 
 logger = logging.getLogger(__name__)
@@ -57,7 +57,9 @@ class HungarianOptimizer(BaseOptimizer):
         # Initialize matchers
         self.optimal_matcher = OptimalMatcher(
             use_bidirectional=self.config.get('use_bidirectional', False),
-            cache_size=cache_size if use_cache else 0
+            cache_size=cache_size if use_cache else 0,
+            solver=self.config.get('solver', 'auto'),
+            solver_options=self.config.get('solver_options')
         )
         
         # Initialize ML optimizer if enabled
@@ -73,8 +75,13 @@ class HungarianOptimizer(BaseOptimizer):
         # Performance tracking
         self.execution_times = []
         
-        # Cache for cost matrices
-        self.cost_matrix_cache = {}
+        # Vectorized cost matrix builder (bounded LRU cache of skill similarities)
+        self.cost_matrix_builder = VectorizedCostMatrixBuilder(
+            weights=self.config.get('cost_weights'),
+            similarity=self.config.get('skill_similarity', 'coverage'),
+            max_distance_km=self.config.get('max_distance_km', 100.0),
+            cache_size=cache_size if use_cache else 0
+        )
     
     def _load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
         """
@@ -88,11 +95,17 @@ class HungarianOptimizer(BaseOptimizer):
         """
         default_config = {
             'use_bidirectional': False,
+            'solver': 'auto',
+            'solver_options': {},
             'cost_weights': {
                 'skill_match': 0.6,
                 'preference_match': 0.3,
-                'workload_balance': 0.1
+                'workload_balance': 0.1,
+                'location_match': 0.2,
+                'salary_match': 0.1
             },
+            'skill_similarity': 'coverage',
+            'max_distance_km': 100.0,
             'constraint_weights': {
                 'required_skills': 1.0,
                 'capacity': 0.8,
@@ -168,90 +181,20 @@ class HungarianOptimizer(BaseOptimizer):
             skills: List of skill sets for resources
             tasks: List of skill sets for tasks
             preferences: Optional matrix of resource-task preferences
-            context: Additional context for calculation
+            context: Additional context for calculation ('workloads',
+                'resource_locations', 'task_locations', 'salary_expectations',
+                'salary_ranges', 'resource_ids', 'task_ids',
+                'historical_assignments')
             
         Returns:
             Cost matrix for Hungarian algorithm
         """
-        # Create cache key
-        cache_key = (
-            tuple(hash(skill) for skill in skills),
-            tuple(hash(task) for task in tasks),
-            None if preferences is None else tuple(tuple(row) for row in preferences)
-        )
-        
-        # Check cache
-        if cache_key in self.cost_matrix_cache:
-            return self.cost_matrix_cache[cache_key]
-        
         # Initialize context
         if context is None:
             context = {}
         
-        # Get weights from config
-        weights = self.config.get('cost_weights', {})
-        skill_weight = weights.get('skill_match', 0.6)
-        preference_weight = weights.get('preference_match', 0.3)
-        workload_weight = weights.get('workload_balance', 0.1)
-        
-        # Get dimensions
-        num_resources = len(skills)
-        num_tasks = len(tasks)
-        
-        # Initialize cost matrix
-        cost_matrix = np.zeros((num_resources, num_tasks))
-        
-        # Calculate skill match costs
-        for i in range(num_resources):
-            for j in range(num_tasks):
-                # Calculate skill match score (higher is better)
-                skill_match = skills[i].match_score(tasks[j])
-                
-                # Convert to cost (lower is better)
-                skill_cost = 1.0 - skill_match
-                
-                # Add to cost matrix with weight
-                cost_matrix[i, j] += skill_weight * skill_cost
-        
-        # Add preference costs if provided
-        if preferences is not None and len(preferences) == num_resources:
-            for i in range(num_resources):
-                pref_row = preferences[i]
-                
-                if len(pref_row) == num_tasks:
-                    # Normalize preferences to [0, 1]
-                    pref_min = min(pref_row)
-                    pref_max = max(pref_row)
-                    pref_range = pref_max - pref_min
-                    
-                    if pref_range > 0:
-                        normalized_prefs = [(p - pref_min) / pref_range for p in pref_row]
-                    else:
-                        normalized_prefs = [0.5 for _ in pref_row]
-                    
-                    # Add to cost matrix (inverted and weighted)
-                    for j in range(num_tasks):
-                        cost_matrix[i, j] += preference_weight * (1.0 - normalized_prefs[j])
-        
-        # Add workload balance factor if available in context
-        if 'workloads' in context and isinstance(context['workloads'], list):
-            workloads = context['workloads']
-            
-            if len(workloads) == num_resources:
-                # Normalize workloads to [0, 1]
-                min_load = min(workloads)
-                max_load = max(workloads)
-                load_range = max_load - min_load
-                
-                if load_range > 0:
-                    normalized_loads = [(load - min_load) / load_range for load in workloads]
-                else:
-                    normalized_loads = [0.5 for _ in workloads]
-                
-                # Add to cost matrix (weighted)
-                for i in range(num_resources):
-                    for j in range(num_tasks):
-                        cost_matrix[i, j] += workload_weight * normalized_loads[i]
+        # Skill, preference, workload, location and salary costs for all pairs at once
+        cost_matrix = self.cost_matrix_builder.build(skills, tasks, preferences, context)
         
         # Apply ML optimization if enabled
         if self.ml_optimizer is not None and 'historical_assignments' in context:
@@ -267,9 +210,6 @@ class HungarianOptimizer(BaseOptimizer):
                 max_iterations=self.config.get('ml_parameters', {}).get('max_iterations', 100)
             )
         
-        # Store in cache
-        self.cost_matrix_cache[cache_key] = cost_matrix
-        
         return cost_matrix
     
     def optimize(self, 
@@ -317,24 +257,16 @@ class HungarianOptimizer(BaseOptimizer):
         
         if self.config.get('use_bidirectional', False):
             # Create preference lists from cost matrix (lower cost = higher preference)
-            row_preferences = []
-            for i in range(cost_matrix.shape[0]):
-                row_costs = [(j, cost_matrix[i, j]) for j in range(cost_matrix.shape[1])]
-                row_costs.sort(key=lambda x: x[1])  # Sort by cost
-                row_preferences.append([j for j, _ in row_costs])  # Keep only indices
-            
-            col_preferences = []
-            for j in range(cost_matrix.shape[1]):
-                col_costs = [(i, cost_matrix[i, j]) for i in range(cost_matrix.shape[0])]
-                col_costs.sort(key=lambda x: x[1])  # Sort by cost
-                col_preferences.append([i for i, _ in col_costs])  # Keep only indices
+            row_preferences = np.argsort(cost_matrix, axis=1, kind='stable').tolist()
+            col_preferences = np.argsort(cost_matrix.T, axis=1, kind='stable').tolist()
         
-        # Perform matching
+        # Perform matching (jobs with several openings via context['capacities'])
         assignments, total_cost = self.optimal_matcher.match(
             cost_matrix, 
             row_preferences, 
             col_preferences, 
-            context
+            context,
+            capacities=context.get('capacities')
         )
         
         # Calculate end time
@@ -350,6 +282,7 @@ class HungarianOptimizer(BaseOptimizer):
             constraint_violations=self._count_constraint_violations(),
             metadata={
                 'algorithm': 'Hungarian',
+                'solver': self.optimal_matcher.solver.name,
                 'matrix_size': cost_matrix.shape,
                 'use_ml': self.ml_optimizer is not None,
                 'use_bidirectional': self.config.get('use_bidirectional', False)
@@ -401,7 +334,7 @@ class HungarianOptimizer(BaseOptimizer):
     
     def clear_cache(self) -> None:
         """Clear all caches."""
-        self.cost_matrix_cache.clear()
+        self.cost_matrix_builder.clear_cache()
         
         if hasattr(self.optimal_matcher, 'clear_cache'):
             self.optimal_matcher.clear_cache()
@@ -11,7 +11,7 @@ en fonction des préférences utilisateur et du comportement passé.
 import os
 import logging
 from typing import Dict, List, Any, Optional
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import datetime
 import redis
@@ -22,6 +22,7 @@ from models.collaborative_filter import CollaborativeFilter
 from models.preference_model import PreferenceModel
 from models.cold_start import ColdStartHandler
 from models.temporal_drift import TemporalDriftDetector
+from models.online_updater import OnlineUserUpdater
 from utils.ab_testing import ABTestManager
 from utils.data_loader import DataLoader
 import config
@@ -41,13 +42,45 @@ redis_client = redis.Redis(
     password=config.REDIS_PASSWORD
 )
 
-data_loader = DataLoader(redis_client)
-preference_model = PreferenceModel(data_loader)
-collaborative_filter = CollaborativeFilter(data_loader)
+data_loader = DataLoader(
+    config.DATABASE_URL,
+    redis_client,
+    min_connections=config.DB_POOL_MIN_CONNECTIONS,
+    max_connections=config.DB_POOL_MAX_CONNECTIONS,
+    pool_timeout=config.DB_POOL_TIMEOUT
+)
+temporal_drift_detector = TemporalDriftDetector(half_life_days=config.TEMPORAL_DRIFT_HALF_LIFE_DAYS)
+preference_model = PreferenceModel(data_loader, drift_detector=temporal_drift_detector)
+online_updater = OnlineUserUpdater(
+    redis_client,
+    learning_rate=config.ONLINE_LEARNING_RATE,
+    half_life_hours=config.ONLINE_HALF_LIFE_HOURS
+) if config.ONLINE_UPDATES_ENABLED else None
+collaborative_filter = CollaborativeFilter(
+    data_loader,
+    model_dir=config.MF_MODEL_DIR,
+    reload_interval=config.MF_RELOAD_INTERVAL,
+    online_updater=online_updater
+)
 cold_start_handler = ColdStartHandler(data_loader)
-temporal_drift_detector = TemporalDriftDetector()
 ab_test_manager = ABTestManager(redis_client)
 
+@app.before_request
+def open_data_scope():
+    """
+    Ouvre l'identity map du chargeur de données pour la requête
+    """
+    g.data_scope_token = data_loader.begin_request()
+
+@app.teardown_request
+def close_data_scope(exc=None):
+    """
+    Ferme l'identity map de la requête
+    """
+    token = g.pop('data_scope_token', None)
+    if token is not None:
+        data_loader.end_request(token)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """
@@ -389,13 +422,17 @@ def get_user_stats(user_id):
         # Obtenir les utilisateurs similaires
         similar_users = collaborative_filter.get_similar_users(user_id, limit=5)
         
+        # Dérive du vecteur en ligne depuis le dernier entraînement
+        online_drift = collaborative_filter.get_drift_metrics(user_id)
+        
         return jsonify({
             'status': 'success',
             'user_id': user_id,
             'feedback_count': feedback_count,
             'segment': user_segment,
             'current_weights': current_weights,
-            'similar_users': similar_users
+            'similar_users': similar_users,
+            'online_drift': online_drift
         })
     
     except Exception as e:
@@ -8,6 +8,8 @@ Ce module implémente un système de recommandation basé sur le filtrage
 collaboratif pour personnaliser les résultats de matching.
 """
 
+import os
+import time
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional
@@ -15,8 +17,14 @@ import logging
 from scipy.spatial.distance import cosine
 import json
 
+from models.matrix_factorization import ImplicitALS, META_FILE
+from models.online_updater import OnlineUserUpdater
+
 logger = logging.getLogger(__name__)
 
+# Taille maximale des caches de vecteurs et de similarités (mode sans modèle)
+MAX_CACHE_ENTRIES = 10000
+
 class CollaborativeFilter:
     """
     Système de recommandation basé sur le filtrage collaboratif.
@@ -25,33 +33,100 @@ class CollaborativeFilter:
     préférences pour personnaliser les recommandations.
     """
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, model_dir: Optional[str] = None, reload_interval: int = 300,
+                 online_updater: Optional[OnlineUserUpdater] = None):
         """
         Initialise le filtre collaboratif.
         
         Args:
             data_loader: Chargeur de données
+            model_dir: Répertoire du modèle de factorisation (optionnel) ; sans
+                modèle, ou pour les utilisateurs absents du modèle, les
+                similarités sont calculées à partir des feedbacks
+            reload_interval: Intervalle (secondes) de vérification d'un
+                nouveau modèle sur disque
+            online_updater: Mises à jour en ligne des vecteurs utilisateurs
+                entre deux entraînements (optionnel)
         """
         self.data_loader = data_loader
         self.user_vectors = {}  # Cache des vecteurs utilisateurs
         self.similarity_cache = {}  # Cache des similarités entre utilisateurs
         
-    def _build_user_vector(self, user_id: str) -> np.ndarray:
+        self.model_dir = model_dir
+        self.reload_interval = reload_interval
+        self.model: Optional[ImplicitALS] = None
+        self.online_updater = online_updater
+        self._model_mtime = None
+        self._model_checked_at = 0.0
+        
+    def _get_model(self) -> Optional[ImplicitALS]:
+        """
+        Modèle de factorisation courant (rechargé lorsqu'un nouveau modèle a
+        été enregistré dans model_dir)
+        """
+        if not self.model_dir:
+            return None
+        
+        now = time.monotonic()
+        if self.model is not None and now - self._model_checked_at < self.reload_interval:
+            return self.model
+        self._model_checked_at = now
+        
+        try:
+            mtime = os.path.getmtime(os.path.join(self.model_dir, META_FILE))
+        except OSError:
+            return self.model
+        
+        if mtime != self._model_mtime:
+            try:
+                self.model = ImplicitALS.load(self.model_dir)
+                self._model_mtime = mtime
+                logger.info(f"Modèle de factorisation chargé: {self.model.meta.get('n_users')} utilisateurs, "
+                            f"{self.model.meta.get('n_items')} items")
+            except Exception as e:
+                logger.error(f"Erreur lors du chargement du modèle de factorisation: {str(e)}", exc_info=True)
+        
+        return self.model
+    
+    def _model_user_vector(self, model: ImplicitALS, user_id: str) -> Optional[np.ndarray]:
+        """Vecteur de l'utilisateur dans l'espace du modèle (avec les mises à jour en ligne)"""
+        if self.online_updater is not None:
+            return self.online_updater.user_vector(model, user_id)
+        return model.user_vector(user_id)
+    
+    def _trim_caches(self) -> None:
+        """Vide les caches lorsqu'ils dépassent MAX_CACHE_ENTRIES"""
+        if len(self.user_vectors) > MAX_CACHE_ENTRIES:
+            self.user_vectors.clear()
+        if len(self.similarity_cache) > MAX_CACHE_ENTRIES:
+            self.similarity_cache.clear()
+        
+    def _build_user_vector(self, user_id: str, user_feedback: Optional[List[Dict[str, Any]]] = None,
+                           jobs: Optional[Dict[int, Dict[str, Any]]] = None) -> np.ndarray:
         """
         Construit un vecteur de caractéristiques pour un utilisateur.
         
         Args:
             user_id: ID de l'utilisateur
+            user_feedback: Feedbacks de l'utilisateur déjà chargés (optionnel)
+            jobs: Offres déjà chargées, par ID (optionnel)
             
         Returns:
             np.ndarray: Vecteur de caractéristiques
         """
         # Récupérer l'historique de feedback de l'utilisateur
-        user_feedback = self.data_loader.get_user_feedback(user_id)
+        if user_feedback is None:
+            user_feedback = self.data_loader.get_user_feedback(user_id)
         
         if not user_feedback:
             return np.zeros(20)  # Vecteur vide si pas de feedback
         
+        # Charger en une fois les offres concernées (au lieu d'une requête par feedback)
+        if jobs is None:
+            jobs = self.data_loader.get_jobs_details(
+                feedback.get('job_id') for feedback in user_feedback if feedback.get('job_id')
+            )
+        
         # Construire un vecteur basé sur les actions et les catégories
         features = {
             # Compteurs d'actions
@@ -105,7 +180,7 @@ class CollaborativeFilter:
             
             # Extraire les caractéristiques du job si disponibles
             if job_id:
-                job_data = self.data_loader.get_job_details(job_id) or {}
+                job_data = jobs.get(job_id) or {}
                 
                 # Catégorie
                 category = job_data.get('category', '').lower()
@@ -174,6 +249,8 @@ class CollaborativeFilter:
         if cache_key in self.similarity_cache:
             return self.similarity_cache[cache_key]
         
+        self._trim_caches()
+        
         # Récupérer ou construire les vecteurs utilisateurs
         if user_id1 not in self.user_vectors:
             self.user_vectors[user_id1] = self._build_user_vector(user_id1)
@@ -213,9 +290,33 @@ class CollaborativeFilter:
         Returns:
             Liste des utilisateurs similaires triés par similarité
         """
+        # Utilisateur connu du modèle de factorisation : top-K vectorisé sur les facteurs
+        model = self._get_model()
+        vector = self._model_user_vector(model, user_id) if model is not None else None
+        if vector is not None:
+            return [
+                {'user_id': other_id, 'similarity': similarity}
+                for other_id, similarity in model.similar_users(user_id, limit, min_similarity, vector=vector)
+            ]
+        
         # Récupérer tous les IDs utilisateurs
         all_user_ids = self.data_loader.get_all_user_ids()
         
+        # Construire les vecteurs manquants à partir de feedbacks et d'offres
+        # chargés en deux requêtes groupées
+        missing = [uid for uid in set(all_user_ids) | {user_id} if uid not in self.user_vectors]
+        if missing:
+            self._trim_caches()
+            feedback_by_user = self.data_loader.get_user_feedback_bulk(missing)
+            jobs = self.data_loader.get_jobs_details(
+                feedback.get('job_id')
+                for feedbacks in feedback_by_user.values()
+                for feedback in feedbacks
+                if feedback.get('job_id')
+            )
+            for uid in missing:
+                self.user_vectors[uid] = self._build_user_vector(uid, feedback_by_user.get(uid, []), jobs)
+        
         # Calculer la similarité avec chaque utilisateur
         similar_users = []
         for other_id in all_user_ids:
@@ -316,6 +417,12 @@ class CollaborativeFilter:
         if not results:
             return []
         
+        # Utilisateur connu du modèle de factorisation : affinité = produit scalaire des facteurs
+        model = self._get_model()
+        vector = self._model_user_vector(model, user_id) if model is not None else None
+        if vector is not None:
+            return self._rerank_with_model(model, user_id, vector, results)
+        
         # Trouver les utilisateurs similaires
         similar_users = self.get_similar_users(user_id, limit=5, min_similarity=0.3)
         
@@ -376,16 +483,62 @@ class CollaborativeFilter:
         reranked_results.sort(key=lambda x: x['score'], reverse=True)
         return [item['result'] for item in reranked_results]
     
-    def update_from_feedback(self, feedback_data: Dict[str, Any]) -> None:
+    def _rerank_with_model(self, model: ImplicitALS, user_id: str, vector: np.ndarray,
+                           results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Réordonne les résultats avec les scores du modèle de factorisation.
+        
+        Les offres inconnues du modèle conservent leur score initial.
+        """
+        affinities = model.score_items(
+            user_id, [f"job_{result['job_id']}" for result in results if result.get('job_id')], vector=vector
+        )
+        
+        reranked_results = []
+        for result in results:
+            job_id = result.get('job_id')
+            if not job_id:
+                reranked_results.append({'result': result, 'score': 0.0})
+                continue
+            
+            initial_score = result.get('score', 0.5)
+            final_score = initial_score
+            affinity = affinities.get(f"job_{job_id}")
+            if affinity is not None:
+                # Même combinaison que le calcul par utilisateurs similaires (70% initial, 30% affinité)
+                affinity = min(1.0, max(-1.0, affinity))
+                final_score = initial_score * 0.7 + (affinity + 1) / 2 * 0.3
+            
+            reranked_results.append({'result': result, 'score': final_score})
+        
+        reranked_results.sort(key=lambda x: x['score'], reverse=True)
+        return [item['result'] for item in reranked_results]
+    
+    def update_from_feedback(self, feedback_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Met à jour le modèle à partir d'un nouveau feedback.
         
+        Avec un modèle de factorisation et des mises à jour en ligne, le
+        feedback est intégré immédiatement au vecteur de l'utilisateur (sans
+        reconstruction) : les prochaines recommandations en tiennent compte.
+        
         Args:
             feedback_data: Données de feedback
+            
+        Returns:
+            Métriques de dérive du vecteur en ligne (None sans mise à jour en ligne)
         """
         user_id = feedback_data.get('user_id')
         if not user_id:
-            return
+            return None
+        
+        drift = None
+        model = self._get_model()
+        if model is not None and self.online_updater is not None:
+            try:
+                drift = self.online_updater.apply_feedback(model, feedback_data)
+            except Exception as e:
+                logger.error(f"Erreur lors de la mise à jour en ligne du vecteur utilisateur: {str(e)}", exc_info=True)
         
         # Invalider le cache de vecteur pour cet utilisateur
         if user_id in self.user_vectors:
@@ -400,3 +553,21 @@ class CollaborativeFilter:
         for key in keys_to_remove:
             if key in self.similarity_cache:
                 del self.similarity_cache[key]
+        
+        return drift
+    
+    def get_drift_metrics(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Métriques de dérive du vecteur en ligne de l'utilisateur par rapport
+        au dernier entraînement (None sans modèle ou sans mise à jour en ligne)
+        """
+        model = self._get_model()
+        if model is None or self.online_updater is None:
+            return None
+        try:
+            metrics = self.online_updater.drift_metrics(model, user_id)
+        except Exception as e:
+            logger.warning(f"Métriques de dérive indisponibles pour {user_id}: {str(e)}")
+            return None
+        metrics['model_trained_at'] = model.meta.get('trained_at')
+        return metrics
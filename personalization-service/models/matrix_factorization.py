@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Factorisation matricielle pour le filtrage collaboratif (feedback implicite).
+
+Ce module entraîne hors ligne un modèle ALS implicite (Hu, Koren & Volinsky,
+2008) sur l'ensemble des interactions et enregistre les facteurs utilisateurs
+et items dans des fichiers .npy, chargés en mémoire partagée (mmap) par le
+service. Les utilisateurs similaires et les scores d'affinité s'obtiennent
+alors par produits scalaires vectorisés, sans parcourir les interactions.
+"""
+
+import os
+import json
+import time
+import shutil
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Fichiers d'un modèle enregistré
+USER_FACTORS_FILE = "user_factors.npy"
+ITEM_FACTORS_FILE = "item_factors.npy"
+USER_NORMS_FILE = "user_norms.npy"
+USER_IDS_FILE = "user_ids.json"
+ITEM_IDS_FILE = "item_ids.json"
+META_FILE = "meta.json"
+
+
+class ImplicitALS:
+    """
+    Modèle ALS pour feedback implicite.
+
+    Chaque interaction (utilisateur, item, valeur) donne une préférence
+    binaire (valeur cumulée > 0) et une confiance 1 + alpha * |valeur| :
+    un refus compte comme une préférence nulle observée avec confiance.
+    """
+
+    def __init__(self, factors: int = 64, regularization: float = 0.05,
+                 alpha: float = 20.0, iterations: int = 15, random_state: int = 42):
+        """
+        Initialise le modèle.
+
+        Args:
+            factors: Dimension des facteurs latents
+            regularization: Régularisation L2
+            alpha: Poids de la confiance accordée aux interactions
+            iterations: Nombre d'itérations ALS
+            random_state: Graine de l'initialisation
+        """
+        self.factors = factors
+        self.regularization = regularization
+        self.alpha = alpha
+        self.iterations = iterations
+        self.random_state = random_state
+
+        self.user_factors: Optional[np.ndarray] = None
+        self.item_factors: Optional[np.ndarray] = None
+        self.user_norms: Optional[np.ndarray] = None
+        self.user_ids: List[str] = []
+        self.item_ids: List[str] = []
+        self.user_index: Dict[str, int] = {}
+        self.item_index: Dict[str, int] = {}
+        self.meta: Dict[str, Any] = {}
+
+    # ------------------------------------------------------------------
+    # Entraînement
+    # ------------------------------------------------------------------
+
+    def fit(self, interactions: Iterable[Tuple[str, str, float]]) -> "ImplicitALS":
+        """
+        Entraîne le modèle.
+
+        Args:
+            interactions: Triplets (user_id, item_id, valeur), consommés au fil
+                de l'eau (les doublons sont cumulés)
+
+        Returns:
+            Le modèle entraîné
+        """
+        started_at = time.time()
+        matrix = self._build_matrix(interactions)
+        n_users, n_items = matrix.shape
+        logger.info(f"Entraînement ALS: {n_users} utilisateurs, {n_items} items, {matrix.nnz} interactions")
+
+        rng = np.random.default_rng(self.random_state)
+        self.user_factors = (rng.standard_normal((n_users, self.factors)) * 0.01).astype(np.float32)
+        self.item_factors = (rng.standard_normal((n_items, self.factors)) * 0.01).astype(np.float32)
+
+        # Préférences et confiances (C - 1) stockées dans deux matrices creuses
+        preference = matrix.copy()
+        preference.data = (preference.data > 0).astype(np.float32)
+        confidence = matrix.copy()
+        confidence.data = (self.alpha * np.abs(confidence.data)).astype(np.float32)
+
+        preference_t = preference.T.tocsr()
+        confidence_t = confidence.T.tocsr()
+
+        for iteration in range(self.iterations):
+            self._least_squares(preference, confidence, self.user_factors, self.item_factors)
+            self._least_squares(preference_t, confidence_t, self.item_factors, self.user_factors)
+            logger.debug(f"Itération ALS {iteration + 1}/{self.iterations}")
+
+        self.user_norms = np.linalg.norm(self.user_factors, axis=1).astype(np.float32)
+        self.meta = {
+            'algorithm': 'implicit_als',
+            'factors': self.factors,
+            'regularization': self.regularization,
+            'alpha': self.alpha,
+            'iterations': self.iterations,
+            'n_users': n_users,
+            'n_items': n_items,
+            'n_interactions': int(matrix.nnz),
+            # Début de la lecture des interactions : sert de version du modèle
+            # pour la réconciliation des mises à jour en ligne
+            'trained_at': started_at
+        }
+        return self
+
+    def _build_matrix(self, interactions: Iterable[Tuple[str, str, float]]) -> sparse.csr_matrix:
+        """Matrice creuse utilisateurs x items (valeurs cumulées)"""
+        # Un nouvel entraînement repart d'index vides
+        self.user_ids, self.item_ids = [], []
+        self.user_index, self.item_index = {}, {}
+        rows = []
+        cols = []
+        values = []
+        for user_id, item_id, value in interactions:
+            if user_id is None or item_id is None or not value:
+                continue
+            user_id, item_id = str(user_id), str(item_id)
+            if user_id not in self.user_index:
+                self.user_index[user_id] = len(self.user_ids)
+                self.user_ids.append(user_id)
+            if item_id not in self.item_index:
+                self.item_index[item_id] = len(self.item_ids)
+                self.item_ids.append(item_id)
+            rows.append(self.user_index[user_id])
+            cols.append(self.item_index[item_id])
+            values.append(value)
+
+        matrix = sparse.coo_matrix(
+            (np.asarray(values, dtype=np.float32),
+             (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32))),
+            shape=(len(self.user_ids), len(self.item_ids))
+        ).tocsr()
+        matrix.sum_duplicates()
+        matrix.eliminate_zeros()
+        return matrix
+
+    def _least_squares(self, preference: sparse.csr_matrix, confidence: sparse.csr_matrix,
+                       x: np.ndarray, y: np.ndarray) -> None:
+        """
+        Met à jour les lignes de `x` à `y` fixé.
+
+        Pour chaque ligne u : (YtY + Yu^T (Cu - I) Yu + λI) xu = Yu^T Cu pu.
+        YtY est commun à toutes les lignes ; seules les colonnes observées
+        interviennent dans la correction.
+        """
+        yty = y.T @ y
+        regularization = self.regularization * np.eye(self.factors, dtype=np.float32)
+        base = yty + regularization
+
+        indptr = preference.indptr
+        for u in range(x.shape[0]):
+            start, end = indptr[u], indptr[u + 1]
+            if start == end:
+                x[u] = 0.0
+                continue
+
+            columns = preference.indices[start:end]
+            confidence_u = confidence.data[start:end]  # C - 1
+            preference_u = preference.data[start:end]
+            y_u = y[columns]
+
+            a = base + (y_u.T * confidence_u) @ y_u
+            b = y_u.T @ ((1.0 + confidence_u) * preference_u)
+            x[u] = np.linalg.solve(a, b)
+
+    # ------------------------------------------------------------------
+    # Persistance
+    # ------------------------------------------------------------------
+
+    def save(self, path: str) -> None:
+        """
+        Enregistre le modèle dans le répertoire `path`.
+
+        Le modèle est écrit dans un répertoire temporaire puis substitué à
+        l'ancien, pour qu'un service en cours de rechargement ne lise jamais
+        un modèle incomplet.
+        """
+        if self.user_factors is None:
+            raise ValueError("Modèle non entraîné")
+
+        path = os.path.abspath(path)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        old_path = f"{path}.old-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        np.save(os.path.join(tmp_path, USER_FACTORS_FILE), self.user_factors)
+        np.save(os.path.join(tmp_path, ITEM_FACTORS_FILE), self.item_factors)
+        np.save(os.path.join(tmp_path, USER_NORMS_FILE), self.user_norms)
+        with open(os.path.join(tmp_path, USER_IDS_FILE), 'w') as f:
+            json.dump(self.user_ids, f)
+        with open(os.path.join(tmp_path, ITEM_IDS_FILE), 'w') as f:
+            json.dump(self.item_ids, f)
+        with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+            json.dump(self.meta, f, indent=2)
+
+        if os.path.exists(path):
+            os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        logger.info(f"Modèle de factorisation enregistré dans {path}")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "ImplicitALS":
+        """
+        Charge un modèle enregistré.
+
+        Args:
+            path: Répertoire du modèle
+            mmap: Projeter les matrices en mémoire (partagées entre processus)
+                au lieu de les lire entièrement
+        """
+        mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+
+        model = cls(
+            factors=meta.get('factors', 64),
+            regularization=meta.get('regularization', 0.05),
+            alpha=meta.get('alpha', 20.0),
+            iterations=meta.get('iterations', 15)
+        )
+        model.meta = meta
+        model.user_factors = np.load(os.path.join(path, USER_FACTORS_FILE), mmap_mode=mmap_mode)
+        model.item_factors = np.load(os.path.join(path, ITEM_FACTORS_FILE), mmap_mode=mmap_mode)
+        model.user_norms = np.load(os.path.join(path, USER_NORMS_FILE), mmap_mode=mmap_mode)
+        with open(os.path.join(path, USER_IDS_FILE)) as f:
+            model.user_ids = json.load(f)
+        with open(os.path.join(path, ITEM_IDS_FILE)) as f:
+            model.item_ids = json.load(f)
+        model.user_index = {user_id: i for i, user_id in enumerate(model.user_ids)}
+        model.item_index = {item_id: i for i, item_id in enumerate(model.item_ids)}
+        return model
+
+    # ------------------------------------------------------------------
+    # Prédiction
+    # ------------------------------------------------------------------
+
+    def has_user(self, user_id: str) -> bool:
+        return str(user_id) in self.user_index
+
+    def user_vector(self, user_id: str) -> Optional[np.ndarray]:
+        """Facteurs appris pour un utilisateur (None s'il est inconnu du modèle)"""
+        index = self.user_index.get(str(user_id))
+        if index is None:
+            return None
+        return np.asarray(self.user_factors[index])
+
+    def similar_users(self, user_id: str, limit: int = 10, min_similarity: float = 0.0,
+                      vector: Optional[np.ndarray] = None) -> List[Tuple[str, float]]:
+        """
+        Utilisateurs les plus proches (similarité cosinus des facteurs).
+
+        Args:
+            user_id: ID de l'utilisateur (exclu du résultat)
+            limit: Nombre maximum d'utilisateurs
+            min_similarity: Similarité minimum
+            vector: Vecteur à utiliser à la place des facteurs appris
+                (vecteur mis à jour en ligne, utilisateur absent du modèle)
+
+        Returns:
+            Liste de (user_id, similarité) triée par similarité décroissante
+        """
+        index = self.user_index.get(str(user_id))
+        if vector is None:
+            vector = self.user_vector(user_id)
+        if vector is None or limit <= 0:
+            return []
+
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return []
+
+        norms = np.asarray(self.user_norms)
+        scores = np.asarray(self.user_factors) @ vector
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, scores / (norms * norm), 0.0)
+        if index is not None:
+            scores[index] = -np.inf  # Exclure l'utilisateur lui-même
+
+        return self._top_k(scores, self.user_ids, limit, min_similarity)
+
+    def similar_items(self, item_id: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Items les plus proches d'un item (similarité cosinus des facteurs)"""
+        index = self.item_index.get(str(item_id))
+        if index is None or limit <= 0:
+            return []
+
+        item_factors = np.asarray(self.item_factors)
+        norms = np.linalg.norm(item_factors, axis=1)
+        if norms[index] == 0:
+            return []
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, (item_factors @ item_factors[index]) / (norms * norms[index]), 0.0)
+        scores[index] = -np.inf
+
+        return self._top_k(scores, self.item_ids, limit)
+
+    def score_items(self, user_id: str, item_ids: Sequence[str],
+                    vector: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Scores d'affinité (produits scalaires) d'un utilisateur pour des items.
+
+        Args:
+            user_id: ID de l'utilisateur
+            item_ids: Items à noter
+            vector: Vecteur à utiliser à la place des facteurs appris (optionnel)
+
+        Returns:
+            Scores des items connus du modèle (les autres sont absents)
+        """
+        if vector is None:
+            vector = self.user_vector(user_id)
+        if vector is None:
+            return {}
+
+        known = [(item_id, self.item_index[str(item_id)]) for item_id in item_ids if str(item_id) in self.item_index]
+        if not known:
+            return {}
+
+        rows = np.fromiter((i for _, i in known), dtype=np.int64, count=len(known))
+        scores = np.asarray(self.item_factors[rows]) @ vector
+        return {item_id: float(score) for (item_id, _), score in zip(known, scores)}
+
+    def recommend(self, user_id: str, limit: int = 10,
+                  exclude: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """Items les mieux notés pour un utilisateur"""
+        index = self.user_index.get(str(user_id))
+        if index is None or limit <= 0:
+            return []
+
+        scores = np.asarray(self.item_factors) @ np.asarray(self.user_factors[index])
+        for item_id in exclude or ():
+            item_index = self.item_index.get(str(item_id))
+            if item_index is not None:
+                scores[item_index] = -np.inf
+
+        return self._top_k(scores, self.item_ids, limit)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, ids: List[str], limit: int,
+               threshold: float = -np.inf) -> List[Tuple[str, float]]:
+        """Les `limit` meilleurs scores (argpartition puis tri de ces seuls éléments)"""
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        if limit < len(scores):
+            candidates = np.argpartition(-scores, limit - 1)[:limit]
+        else:
+            candidates = np.arange(len(scores))
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(ids[i], float(scores[i])) for i in candidates
+                if np.isfinite(scores[i]) and scores[i] >= threshold]
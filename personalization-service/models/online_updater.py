@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Mise à jour en ligne des vecteurs utilisateurs du filtrage collaboratif.
+
+Entre deux entraînements du modèle de factorisation, chaque feedback est
+intégré immédiatement au vecteur de l'utilisateur : une correction (delta)
+est ajoutée aux facteurs appris hors ligne, par un pas de gradient normalisé
+en O(facteurs). La correction décroît exponentiellement avec le temps et
+est abandonnée lorsqu'un modèle entraîné après le dernier feedback la rend
+inutile (réconciliation).
+
+Les corrections sont stockées dans Redis pour être partagées par tous les
+processus du service.
+"""
+
+import time
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from models.matrix_factorization import ImplicitALS
+
+logger = logging.getLogger(__name__)
+
+# Valeur des actions (mêmes échelles que l'entraînement, voir utils.data_loader)
+ACTION_VALUES = {
+    'like': 1.0,
+    'apply': 2.0,
+    'bookmark': 1.5,
+    'view': 0.5,
+    'dislike': -0.5,
+    'ignore': -0.2
+}
+
+
+class OnlineUserUpdater:
+    """
+    Corrections en ligne des facteurs utilisateurs.
+
+    Pour un feedback (utilisateur u, offre i, valeur v) :
+        x_u = base_u + delta_u
+        erreur = p - x_u . y_i                  (p = 1 si v > 0, 0 sinon)
+        delta_u += pas * min(1, |v|) * erreur * y_i / |y_i|²
+    Le pas normalisé rapproche la prédiction x_u . y_i de p d'une fraction
+    `learning_rate` de l'erreur, quelle que soit la norme de y_i.
+    """
+
+    def __init__(self, redis_client, learning_rate: float = 0.3, half_life_hours: float = 72.0,
+                 ttl_days: int = 30, key_prefix: str = "online_vector"):
+        """
+        Initialise le gestionnaire de mises à jour en ligne.
+
+        Args:
+            redis_client: Client Redis (réponses binaires)
+            learning_rate: Fraction de l'erreur corrigée par feedback (0-1)
+            half_life_hours: Demi-vie de la correction en ligne
+            ttl_days: Durée de conservation d'une correction sans nouveau feedback
+            key_prefix: Préfixe des clés Redis
+        """
+        self.redis_client = redis_client
+        self.learning_rate = learning_rate
+        self.half_life = half_life_hours * 3600
+        self.ttl = ttl_days * 86400
+        self.key_prefix = key_prefix
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.key_prefix}:{user_id}"
+
+    def _decay(self, elapsed: float) -> float:
+        if self.half_life <= 0:
+            return 1.0
+        return 0.5 ** (max(0.0, elapsed) / self.half_life)
+
+    def _load_state(self, model: ImplicitALS, user_id: str, now: float) -> Optional[Dict[str, Any]]:
+        """
+        État en ligne de l'utilisateur, décru jusqu'à `now` et réconcilié avec le modèle
+        (None si aucune correction en cours)
+        """
+        raw = self.redis_client.hgetall(self._key(user_id))
+        if not raw:
+            return None
+        raw = {(k.decode() if isinstance(k, bytes) else k): v for k, v in raw.items()}
+
+        delta = np.frombuffer(raw['delta'], dtype=np.float32)
+        if delta.shape[0] != model.factors:
+            return None  # Correction calculée pour un modèle d'une autre dimension
+
+        updated_at = float(raw['updated_at'])
+        state = {
+            'delta': delta * np.float32(self._decay(now - updated_at)),
+            'updated_at': updated_at,
+            'events': int(raw.get('events', 0)),
+            'model_version': float(raw.get('model_version', 0))
+        }
+
+        # Réconciliation : un modèle entraîné après le dernier feedback intègre
+        # déjà tous les feedbacks de la correction
+        trained_at = float(model.meta.get('trained_at', 0))
+        if state['model_version'] != trained_at:
+            if updated_at <= trained_at:
+                return None
+            state['model_version'] = trained_at
+        return state
+
+    def apply_feedback(self, model: ImplicitALS, feedback_data: Dict[str, Any]) -> Optional[Dict[str, float]]:
+        """
+        Intègre un feedback au vecteur de l'utilisateur.
+
+        Args:
+            model: Modèle de factorisation courant
+            feedback_data: Données de feedback (user_id, job_id, action)
+
+        Returns:
+            Métriques de dérive après mise à jour (None si le feedback ne
+            concerne pas une offre connue du modèle)
+        """
+        user_id = feedback_data.get('user_id')
+        job_id = feedback_data.get('job_id')
+        value = ACTION_VALUES.get(feedback_data.get('action', ''), 0.0)
+        if not user_id or not job_id or value == 0.0:
+            return None
+
+        item_index = model.item_index.get(f"job_{job_id}")
+        if item_index is None:
+            return None  # Offre apparue depuis l'entraînement : prise en compte au prochain
+
+        now = time.time()
+        state = self._load_state(model, user_id, now) or {
+            'delta': np.zeros(model.factors, dtype=np.float32),
+            'events': 0,
+            'model_version': float(model.meta.get('trained_at', 0))
+        }
+
+        base = self._base_vector(model, user_id)
+        item = np.asarray(model.item_factors[item_index], dtype=np.float32)
+        item_norm = float(item @ item)
+        if item_norm == 0:
+            return None
+
+        preference = 1.0 if value > 0 else 0.0
+        error = preference - float((base + state['delta']) @ item)
+        step = self.learning_rate * min(1.0, abs(value))
+        delta = state['delta'] + np.float32(step * error / item_norm) * item
+
+        key = self._key(user_id)
+        pipe = self.redis_client.pipeline()
+        pipe.hset(key, mapping={
+            'delta': delta.astype(np.float32).tobytes(),
+            'updated_at': repr(now),
+            'events': state['events'] + 1,
+            'model_version': repr(state['model_version'])
+        })
+        pipe.expire(key, self.ttl)
+        pipe.execute()
+
+        return self._metrics(base, delta, state['events'] + 1)
+
+    def user_vector(self, model: ImplicitALS, user_id: str) -> Optional[np.ndarray]:
+        """
+        Vecteur courant de l'utilisateur (facteurs appris + correction en ligne).
+
+        Returns:
+            None si l'utilisateur n'est ni dans le modèle ni dans les corrections
+        """
+        try:
+            state = self._load_state(model, user_id, time.time())
+        except Exception as e:
+            logger.warning(f"Correction en ligne indisponible pour {user_id}: {str(e)}")
+            state = None
+
+        if state is None:
+            return model.user_vector(user_id)
+        return self._base_vector(model, user_id) + state['delta']
+
+    def drift_metrics(self, model: ImplicitALS, user_id: str) -> Dict[str, Any]:
+        """
+        Écart entre le vecteur en ligne et les facteurs du dernier entraînement.
+
+        Returns:
+            delta_norm (norme de la correction), relative_drift (norme relative
+            aux facteurs appris), cosine_to_base, events (feedbacks intégrés),
+            seconds_since_update
+        """
+        now = time.time()
+        state = self._load_state(model, user_id, now)
+        if state is None:
+            return {'delta_norm': 0.0, 'relative_drift': 0.0, 'cosine_to_base': 1.0,
+                    'events': 0, 'seconds_since_update': None}
+        metrics = self._metrics(self._base_vector(model, user_id), state['delta'], state['events'])
+        metrics['seconds_since_update'] = round(now - state['updated_at'], 1)
+        return metrics
+
+    @staticmethod
+    def _base_vector(model: ImplicitALS, user_id: str) -> np.ndarray:
+        index = model.user_index.get(str(user_id))
+        if index is None:
+            return np.zeros(model.factors, dtype=np.float32)
+        return np.asarray(model.user_factors[index], dtype=np.float32)
+
+    @staticmethod
+    def _metrics(base: np.ndarray, delta: np.ndarray, events: int) -> Dict[str, Any]:
+        base_norm = float(np.linalg.norm(base))
+        delta_norm = float(np.linalg.norm(delta))
+        current = base + delta
+        current_norm = float(np.linalg.norm(current))
+        cosine = float(base @ current) / (base_norm * current_norm) if base_norm and current_norm else 0.0
+        return {
+            'delta_norm': round(delta_norm, 6),
+            'relative_drift': round(delta_norm / base_norm, 6) if base_norm else None,
+            'cosine_to_base': round(cosine, 6),
+            'events': events,
+            'seconds_since_update': 0.0
+        }
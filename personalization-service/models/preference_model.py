@@ -25,14 +25,17 @@ class PreferenceModel:
     pour personnaliser les résultats de matching.
     """
     
-    def __init__(self, data_loader):
+    def __init__(self, data_loader, drift_detector=None):
         """
         Initialise le modèle de préférences.
         
         Args:
             data_loader: Chargeur de données
+            drift_detector: Détecteur de dérive temporelle maintenant le profil
+                décroissant de l'utilisateur (optionnel)
         """
         self.data_loader = data_loader
+        self.drift_detector = drift_detector
         self.user_segments = {}  # Cache des segments utilisateurs
         self.MAX_HISTORY = 100  # Nombre maximum d'actions à conserver dans l'historique
         
@@ -298,6 +301,14 @@ class PreferenceModel:
         # Mise à jour des préférences d'emploi
         self._update_job_preferences(preferences, feedback_data)
         
+        # Mise à jour incrémentale du profil décroissant
+        if self.drift_detector is not None:
+            job_id = feedback_data.get('job_id')
+            job_data = (self.data_loader.get_job_details(job_id) or {}) if job_id else {}
+            self.drift_detector.update_decayed_profile(
+                preferences, job_data, feedback_data.get('action', ''), feedback_data.get('timestamp')
+            )
+        
         # Sauvegarder les préférences mises à jour
         self.save_user_preferences(user_id, preferences)
         
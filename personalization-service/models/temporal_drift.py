@@ -23,14 +23,16 @@ class TemporalDriftDetector:
     et détecte quand elles changent significativement.
     """
     
-    def __init__(self, max_age_days: int = 30):
+    def __init__(self, max_age_days: int = 30, half_life_days: float = 30):
         """
         Initialise le détecteur de dérive temporelle.
         
         Args:
             max_age_days: Âge maximum en jours avant de considérer un modèle comme obsolète
+            half_life_days: Demi-vie des poids du profil décroissant
         """
         self.max_age_days = max_age_days
+        self.half_life_days = half_life_days
         self.drift_thresholds = {
             'interaction_count': 50,  # Nombre d'interactions pour détecter une dérive
             'new_category_ratio': 0.3,  # Ratio de nouvelles catégories pour détecter une dérive
@@ -239,6 +241,8 @@ class TemporalDriftDetector:
             'interaction_history': recent_history,
             'last_updated': datetime.now().isoformat()
         }
+        if preferences.get('decayed_profile'):
+            reset_preferences['decayed_profile'] = preferences['decayed_profile']
         
         # Reconstruire les préférences basées sur l'historique récent
         self._rebuild_preferences_from_history(reset_preferences)
@@ -247,13 +251,94 @@ class TemporalDriftDetector:
         
         return reset_preferences
     
+    def update_decayed_profile(self, preferences: Dict[str, Any], job_data: Dict[str, Any],
+                               action: str, timestamp: Optional[str] = None) -> None:
+        """
+        Intègre un feedback au profil décroissant de l'utilisateur.
+        
+        Le profil (preferences['decayed_profile']) contient des poids par
+        catégorie, type de contrat, lieu et action, multipliés par
+        0.5 ** (âge / demi-vie) à chaque feedback : la mise à jour ne dépend
+        que du nombre de valeurs suivies, pas de la longueur de l'historique.
+        
+        Args:
+            preferences: Préférences à mettre à jour
+            job_data: Données de l'offre concernée (peut être vide)
+            action: Action de l'utilisateur
+            timestamp: Date du feedback (ISO 8601, maintenant par défaut)
+        """
+        try:
+            event_date = datetime.fromisoformat(timestamp) if timestamp else datetime.now()
+        except (ValueError, TypeError):
+            event_date = datetime.now()
+        
+        profile = preferences.setdefault('decayed_profile', {
+            'categories': {}, 'contract_types': {}, 'locations': {}, 'actions': {},
+            'remote': [0.0, 0.0], 'updated_at': event_date.isoformat()
+        })
+        
+        # Décroissance des poids existants jusqu'à la date du feedback
+        try:
+            elapsed_days = (event_date - datetime.fromisoformat(profile['updated_at'])).total_seconds() / 86400
+        except (ValueError, TypeError, KeyError):
+            elapsed_days = 0.0
+        factor = self._decay_factor(elapsed_days)
+        if factor < 1.0:
+            for name in ('categories', 'contract_types', 'locations', 'actions'):
+                weights = profile[name]
+                for key in list(weights):
+                    weights[key] *= factor
+                    if weights[key] < 0.01:
+                        del weights[key]
+            profile['remote'] = [profile['remote'][0] * factor, profile['remote'][1] * factor]
+        if elapsed_days > 0:
+            profile['updated_at'] = event_date.isoformat()
+        
+        # Feedback antérieur à la dernière mise à jour : son poids a déjà décru
+        weight = self._decay_factor(-elapsed_days)
+        
+        profile['actions'][action] = profile['actions'].get(action, 0.0) + weight
+        
+        # Attributs de l'offre : actions positives uniquement
+        if action in ['like', 'apply', 'bookmark'] and job_data:
+            for name, field in (('categories', 'category'), ('contract_types', 'contract_type'),
+                                ('locations', 'location')):
+                value = job_data.get(field)
+                if value:
+                    profile[name][value] = profile[name].get(value, 0.0) + weight
+            if job_data.get('remote') is not None:
+                profile['remote'][0] += weight
+                profile['remote'][1] += weight if job_data['remote'] else 0.0
+    
+    def _decay_factor(self, elapsed_days: float) -> float:
+        """Facteur de décroissance du profil après `elapsed_days` jours (1 si négatif)"""
+        if self.half_life_days <= 0:
+            return 1.0
+        return 0.5 ** (max(0.0, elapsed_days) / self.half_life_days)
+    
     def _rebuild_preferences_from_history(self, preferences: Dict[str, Any]) -> None:
         """
         Reconstruit les préférences à partir de l'historique récent.
         
+        Si un profil décroissant est disponible, les préférences en sont
+        directement déduites, sans parcourir l'historique.
+        
         Args:
             preferences: Préférences à mettre à jour
         """
+        profile = preferences.get('decayed_profile')
+        if profile:
+            job_preferences = preferences.get('job_preferences', {})
+            for name, size in (('categories', 3), ('contract_types', 2), ('locations', 3)):
+                weights = profile.get(name) or {}
+                if weights:
+                    job_preferences[name] = [key for key, _ in sorted(weights.items(), key=lambda x: x[1], reverse=True)[:size]]
+            remote_weight, remote_sum = profile.get('remote', [0.0, 0.0])
+            if remote_weight > 0:
+                job_preferences['remote'] = remote_sum / remote_weight
+            preferences['job_preferences'] = job_preferences
+            return
+        
         interaction_history = preferences.get('interaction_history', [])
         
         if not interaction_history:
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Entraînement hors ligne du modèle de factorisation matricielle (ALS implicite)
+utilisé par CollaborativeFilter.
+
+Toutes les interactions (user_interactions) et tous les feedbacks
+(user_feedback) sont lus par lots depuis PostgreSQL, sans limite ; les
+facteurs sont enregistrés dans MF_MODEL_DIR et rechargés automatiquement par
+le service (voir MF_RELOAD_INTERVAL).
+
+Avec --loop, le modèle est réentraîné toutes les MF_RETRAIN_INTERVAL
+secondes : chaque entraînement complet intègre les feedbacks déjà appliqués
+en ligne (OnlineUserUpdater), dont les corrections sont alors abandonnées.
+
+Usage:
+    python scripts/train_matrix_factorization.py [--output data/mf_model] [--factors 64]
+                                                 [--iterations 15] [--alpha 20] [--regularization 0.05]
+                                                 [--loop] [--interval 86400]
+"""
+
+import sys
+import os
+import time
+import argparse
+import logging
+
+import redis
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from models.matrix_factorization import ImplicitALS
+from utils.data_loader import DataLoader
+
+logger = logging.getLogger(__name__)
+
+
+def train(output: str, factors: int, iterations: int, alpha: float, regularization: float,
+          batch_size: int) -> ImplicitALS:
+    redis_client = redis.Redis(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        db=config.REDIS_DB,
+        password=config.REDIS_PASSWORD
+    )
+    data_loader = DataLoader(config.DATABASE_URL, redis_client)
+
+    interactions = (
+        (interaction['user_id'], interaction['item_id'], interaction['value'])
+        for interaction in data_loader.iter_interactions_for_collaborative_filtering(batch_size)
+    )
+
+    start = time.perf_counter()
+    model = ImplicitALS(factors=factors, regularization=regularization, alpha=alpha, iterations=iterations)
+    model.fit(interactions)
+    model.save(output)
+    data_loader.close()
+
+    logger.info(f"Modèle entraîné en {time.perf_counter() - start:.1f}s: "
+                f"{model.meta['n_users']} utilisateurs, {model.meta['n_items']} items, "
+                f"{model.meta['n_interactions']} interactions")
+    return model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement du modèle ALS de filtrage collaboratif")
+    parser.add_argument("--output", default=config.MF_MODEL_DIR)
+    parser.add_argument("--factors", type=int, default=config.MF_FACTORS)
+    parser.add_argument("--iterations", type=int, default=config.MF_ITERATIONS)
+    parser.add_argument("--alpha", type=float, default=config.MF_ALPHA)
+    parser.add_argument("--regularization", type=float, default=config.MF_REGULARIZATION)
+    parser.add_argument("--batch-size", type=int, default=10000, help="Lignes lues par lot")
+    parser.add_argument("--loop", action="store_true", help="Réentraîner périodiquement")
+    parser.add_argument("--interval", type=int, default=config.MF_RETRAIN_INTERVAL,
+                        help="Intervalle entre deux entraînements avec --loop (secondes)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    while True:
+        started = time.monotonic()
+        try:
+            train(args.output, args.factors, args.iterations, args.alpha, args.regularization, args.batch_size)
+        except Exception as e:
+            if not args.loop:
+                raise
+            logger.error(f"Erreur lors de l'entraînement du modèle: {str(e)}", exc_info=True)
+        if not args.loop:
+            break
+        time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
@@ -11,30 +11,151 @@ utilisateur, les interactions, et les données de CV et d'offres d'emploi.
 
 import logging
 import json
+import threading
+import contextvars
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import redis
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, Iterator, List, Any, Optional, Union
 from datetime import datetime
 import requests
 
 logger = logging.getLogger(__name__)
 
+# Requêtes préparées une fois par connexion du pool (PREPARE), puis exécutées
+# par leur nom (EXECUTE) : le plan n'est pas recalculé à chaque appel
+PREPARED_STATEMENTS = {
+    "get_user_preferences": (
+        "(varchar)",
+        "SELECT preferences FROM user_preferences WHERE user_id = $1"
+    ),
+    "get_user_interactions": (
+        "(varchar)",
+        """SELECT action_type, details, created_at
+           FROM user_interactions
+           WHERE user_id = $1
+           ORDER BY created_at DESC
+           LIMIT 100"""
+    ),
+    "get_jobs_details": (
+        "(int[])",
+        """SELECT id, title, description, location, company, job_type, company_size, industry,
+                  skills, experience_years, education_level, certifications, parsed_data
+           FROM jobs
+           WHERE id = ANY($1)"""
+    ),
+    "get_candidate_data": (
+        "(int)",
+        """SELECT name, title, experience, experience_years, education, education_level,
+                  skills, certifications, location, parsed_data
+           FROM candidates
+           WHERE id = $1"""
+    ),
+    # Feedbacks les plus récents de plusieurs utilisateurs (500 au plus par utilisateur)
+    "get_user_feedback_bulk": (
+        "(varchar[])",
+        """SELECT user_id, job_id, candidate_id, action, context, created_at
+           FROM (
+               SELECT user_id, job_id, candidate_id, action, context, created_at,
+                      ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC) AS rank
+               FROM user_feedback
+               WHERE user_id = ANY($1)
+           ) recent
+           WHERE rank <= 500
+           ORDER BY user_id, created_at DESC"""
+    ),
+    "get_user_feedback_count": (
+        "(varchar)",
+        "SELECT COUNT(*) FROM user_feedback WHERE user_id = $1"
+    ),
+    "get_all_user_ids": (
+        "",
+        "SELECT DISTINCT user_id FROM user_feedback"
+    ),
+    "get_popular_jobs": (
+        "(int)",
+        """SELECT job_id, COUNT(*) AS feedback_count
+           FROM user_feedback
+           WHERE job_id IS NOT NULL AND action IN ('view', 'like', 'bookmark', 'apply')
+           GROUP BY job_id
+           ORDER BY feedback_count DESC
+           LIMIT $1"""
+    ),
+}
+
+# Valeur des interactions pour le filtrage collaboratif
+INTERACTION_ACTION_VALUES = {
+    'view_job': 0.5,
+    'bookmark_job': 1.5,
+    'apply_job': 2.0,
+    'dislike_job': -0.5,
+    'view_candidate': 0.5,
+    'bookmark_candidate': 1.5,
+    'contact_candidate': 2.0,
+    'dislike_candidate': -0.5
+}
+COLLABORATIVE_ACTION_TYPES = "(" + ", ".join(f"'{action}'" for action in INTERACTION_ACTION_VALUES) + ")"
+
+# Valeur des feedbacks explicites (mêmes échelles que les interactions)
+FEEDBACK_ACTION_VALUES = {
+    'like': 1.0,
+    'apply': 2.0,
+    'bookmark': 1.5,
+    'view': 0.5,
+    'dislike': -0.5,
+    'ignore': -0.2
+}
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """Connexion du pool mémorisant les requêtes déjà préparées sur la session"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+# Identity map de la requête en cours : chaque objet (offre, feedbacks d'un
+# utilisateur...) n'est chargé qu'une fois par requête HTTP
+_request_scope: contextvars.ContextVar = contextvars.ContextVar("data_loader_request_scope", default=None)
+
 class DataLoader:
     """
     Classe pour charger et sauvegarder les données du service de personnalisation
+    
+    Les connexions PostgreSQL viennent d'un pool partagé par les threads du
+    service. Entre `begin_request()` et `end_request()` (ou dans un bloc
+    `request_scope()`), les objets lus sont conservés dans une identity map
+    propre à la requête.
     """
     
-    def __init__(self, db_url: str, redis_client: redis.Redis):
+    def __init__(self, db_url: str, redis_client: redis.Redis,
+                 min_connections: int = 1, max_connections: int = 10,
+                 pool_timeout: float = 30.0):
         """
         Initialise le chargeur de données
         
         Args:
             db_url: URL de connexion à la base de données PostgreSQL
             redis_client: Instance de client Redis
+            min_connections: Connexions maintenues ouvertes dans le pool
+            max_connections: Nombre maximal de connexions du pool
+            pool_timeout: Attente maximale (secondes) d'une connexion libre
         """
         self.db_url = db_url
         self.redis_client = redis_client
         
+        # Pool créé à la première requête (le service peut démarrer sans la base)
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        
+        # ThreadedConnectionPool lève PoolError dès que le pool est épuisé :
+        # les threads en trop attendent qu'une connexion soit rendue
+        self.pool_timeout = pool_timeout
+        self._pool_slots = threading.BoundedSemaphore(max_connections)
+        
         # Configuration du cache Redis
         self.cache_ttl = 3600  # 1 heure en secondes
         
@@ -44,6 +165,112 @@ class DataLoader:
         # URL du service de matching
         self.matching_service_url = "http://matching-api:5000"
     
+    # ------------------------------------------------------------------
+    # Pool de connexions et requêtes préparées
+    # ------------------------------------------------------------------
+    
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        self.min_connections, self.max_connections, self.db_url,
+                        connection_factory=PreparedConnection
+                    )
+        return self._pool
+    
+    @contextmanager
+    def _cursor(self, commit: bool = False, name: Optional[str] = None) -> Iterator[psycopg2.extensions.cursor]:
+        """
+        Curseur sur une connexion empruntée au pool (rendue à la sortie du bloc)
+        
+        Avec `name`, le curseur est un curseur serveur : les lignes sont
+        transférées par lots au fil de l'itération.
+        
+        Si toutes les connexions sont empruntées, attend au plus
+        `pool_timeout` secondes qu'une connexion soit rendue.
+        """
+        if not self._pool_slots.acquire(timeout=self.pool_timeout):
+            raise psycopg2.pool.PoolError(
+                f"Aucune connexion libre après {self.pool_timeout}s ({self.max_connections} connexions)"
+            )
+        try:
+            pool = self._get_pool()
+            conn = pool.getconn()
+        except Exception:
+            self._pool_slots.release()
+            raise
+        broken = False
+        try:
+            cursor = conn.cursor(name=name) if name else conn.cursor()
+            try:
+                yield cursor
+                if commit:
+                    conn.commit()
+                else:
+                    conn.rollback()  # Ne pas garder de transaction ouverte dans le pool
+            finally:
+                cursor.close()
+        except Exception:
+            broken = conn.closed != 0
+            if not broken:
+                conn.rollback()
+            raise
+        finally:
+            try:
+                pool.putconn(conn, close=broken)
+            finally:
+                self._pool_slots.release()
+    
+    def _execute_prepared(self, cursor, name: str, params: tuple = ()) -> None:
+        """Exécute une requête de PREPARED_STATEMENTS (préparée à la première utilisation sur la connexion)"""
+        conn = cursor.connection
+        if name not in conn.prepared:
+            arg_types, statement = PREPARED_STATEMENTS[name]
+            cursor.execute(f"PREPARE {name} {arg_types} AS {statement}")
+            conn.prepared.add(name)
+        
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+    
+    def close(self) -> None:
+        """Ferme toutes les connexions du pool"""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+    
+    # ------------------------------------------------------------------
+    # Identity map par requête
+    # ------------------------------------------------------------------
+    
+    def begin_request(self) -> contextvars.Token:
+        """Ouvre l'identity map de la requête en cours"""
+        return _request_scope.set({})
+    
+    def end_request(self, token: contextvars.Token) -> None:
+        """Ferme l'identity map ouverte par begin_request"""
+        _request_scope.reset(token)
+    
+    @contextmanager
+    def request_scope(self) -> Iterator[None]:
+        """Bloc dans lequel chaque objet n'est chargé qu'une fois"""
+        token = self.begin_request()
+        try:
+            yield
+        finally:
+            self.end_request(token)
+    
+    @staticmethod
+    def _scope_map(name: str) -> Optional[Dict[Any, Any]]:
+        """Table `name` de l'identity map (None hors d'une requête)"""
+        scope = _request_scope.get()
+        if scope is None:
+            return None
+        return scope.setdefault(name, {})
+    
     def get_user_preferences(self, user_id: str) -> Optional[Dict[str, Any]]:
         """
         Récupère les préférences d'un utilisateur
@@ -66,17 +293,9 @@ class DataLoader:
         
         # Si pas en cache, chercher dans la base de données
         try:
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT preferences FROM user_preferences WHERE user_id = %s
-            """
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_user_preferences", (user_id,))
+                result = cursor.fetchone()
             
             if result and result[0]:
                 preferences = result[0]
@@ -105,9 +324,6 @@ class DataLoader:
             # Convertir les préférences en JSON pour stockage
             preferences_json = json.dumps(preferences)
             
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
             # Insertion ou mise à jour (upsert) avec ON CONFLICT
             query = """
                 INSERT INTO user_preferences (user_id, preferences, updated_at)
@@ -115,11 +331,8 @@ class DataLoader:
                 ON CONFLICT (user_id) DO UPDATE
                 SET preferences = EXCLUDED.preferences, updated_at = EXCLUDED.updated_at
             """
-            cursor.execute(query, (user_id, preferences_json, datetime.now()))
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(query, (user_id, preferences_json, datetime.now()))
             
             # Mettre à jour le cache Redis
             cache_key = f"user_preferences:{user_id}"
@@ -153,21 +366,9 @@ class DataLoader:
         
         # Si pas en cache, chercher dans la base de données
         try:
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT action_type, details, created_at
-                FROM user_interactions
-                WHERE user_id = %s
-                ORDER BY created_at DESC
-                LIMIT 100
-            """
-            cursor.execute(query, (user_id,))
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_user_interactions", (user_id,))
+                rows = cursor.fetchall()
             
             interactions = []
             for row in rows:
@@ -204,18 +405,12 @@ class DataLoader:
             # Convertir les détails en JSON pour stockage
             details_json = json.dumps(details)
             
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
             query = """
                 INSERT INTO user_interactions (user_id, action_type, details, created_at)
                 VALUES (%s, %s, %s, %s)
             """
-            cursor.execute(query, (user_id, action_type, details_json, datetime.now()))
-            conn.commit()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(query, (user_id, action_type, details_json, datetime.now()))
             
             # Invalider le cache des interactions
             cache_key = f"user_interactions:{user_id}"
@@ -248,18 +443,17 @@ class DataLoader:
                 logger.warning("Données de feedback incomplètes")
                 return False
             
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
             query = """
                 INSERT INTO user_feedback (user_id, job_id, candidate_id, action, context, created_at)
                 VALUES (%s, %s, %s, %s, %s, %s)
             """
-            cursor.execute(query, (user_id, job_id, candidate_id, action, json.dumps(context), datetime.now()))
-            conn.commit()
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(query, (user_id, job_id, candidate_id, action, json.dumps(context), datetime.now()))
             
-            cursor.close()
-            conn.close()
+            # Les feedbacks de cet utilisateur déjà chargés dans la requête sont périmés
+            feedback_map = self._scope_map("feedback")
+            if feedback_map is not None:
+                feedback_map.pop(user_id, None)
             
             # Enregistrer également comme interaction
             interaction_details = {
@@ -286,66 +480,111 @@ class DataLoader:
         Returns:
             Dict: Données de l'offre ou None si non trouvée
         """
-        # Vérifier d'abord dans le cache Redis
-        cache_key = f"job_data:{job_id}"
-        cached_job = self.redis_client.get(cache_key)
+        if not job_id:
+            return None
+        # get_jobs_details indexe les offres par int(job_id) ("42" comme 42)
+        return self.get_jobs_details([job_id]).get(int(job_id))
+    
+    def get_job_details(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Alias de get_job_data utilisé par les modèles de personnalisation"""
+        return self.get_job_data(job_id)
+    
+    def get_jobs_details(self, job_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Récupère les données de plusieurs offres d'emploi en une fois
+        
+        Ordre de recherche : identity map de la requête, cache Redis (MGET),
+        base de données (une seule requête pour toutes les offres manquantes),
+        puis service de matching pour les offres introuvables.
+        
+        Args:
+            job_ids: IDs des offres d'emploi
+            
+        Returns:
+            Dict: Données des offres trouvées, par ID
+        """
+        ids = list(dict.fromkeys(int(job_id) for job_id in job_ids if job_id))
+        job_map = self._scope_map("jobs")
+        
+        jobs: Dict[int, Optional[Dict[str, Any]]] = {}
+        if job_map is not None:
+            jobs.update({job_id: job_map[job_id] for job_id in ids if job_id in job_map})
+        missing = [job_id for job_id in ids if job_id not in jobs]
         
-        if cached_job:
+        # Cache Redis
+        if missing:
             try:
-                return json.loads(cached_job)
+                cached = self.redis_client.mget([f"job_data:{job_id}" for job_id in missing])
+                for job_id, cached_job in zip(missing, cached):
+                    if cached_job:
+                        try:
+                            jobs[job_id] = json.loads(cached_job)
+                        except Exception as e:
+                            logger.warning(f"Erreur de décodage du cache de job: {str(e)}")
             except Exception as e:
-                logger.warning(f"Erreur de décodage du cache de job: {str(e)}")
+                logger.warning(f"Cache Redis des jobs indisponible: {str(e)}")
+            missing = [job_id for job_id in missing if job_id not in jobs]
         
-        try:
-            # Récupérer depuis la base de données
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT title, description, location, company, job_type, company_size, industry,
-                       skills, experience_years, education_level, certifications, parsed_data
-                FROM jobs
-                WHERE id = %s
-            """
-            cursor.execute(query, (job_id,))
-            row = cursor.fetchone()
-            
-            cursor.close()
-            conn.close()
-            
-            if not row:
-                # Si pas dans la base de données, essayer de récupérer via l'API du service de matching
-                return self._get_job_from_matching_service(job_id)
-            
-            # Construire l'objet job
-            title, description, location, company, job_type, company_size, industry, \
-            skills, experience_years, education_level, certifications, parsed_data = row
-            
-            job_data = {
-                'id': job_id,
-                'title': title,
-                'description': description,
-                'location': location,
-                'company': company,
-                'job_type': job_type,
-                'company_size': company_size,
-                'industry': industry,
-                'skills': skills.split(',') if isinstance(skills, str) else skills or [],
-                'experience_years': experience_years,
-                'education_level': education_level,
-                'certifications': certifications.split(',') if isinstance(certifications, str) else certifications or [],
-                'parsed_data': parsed_data if isinstance(parsed_data, dict) else json.loads(parsed_data) if parsed_data else {}
-            }
-            
-            # Mettre en cache pour les prochaines requêtes
-            self.redis_client.setex(cache_key, self.cache_ttl, json.dumps(job_data))
-            
-            return job_data
-            
-        except Exception as e:
-            logger.error(f"Erreur lors de la récupération des données de l'offre: {str(e)}", exc_info=True)
-            # Essayer de récupérer via l'API du service de matching en cas d'erreur
-            return self._get_job_from_matching_service(job_id)
+        # Base de données
+        if missing:
+            try:
+                with self._cursor() as cursor:
+                    self._execute_prepared(cursor, "get_jobs_details", (missing,))
+                    rows = cursor.fetchall()
+                
+                loaded = {}
+                for row in rows:
+                    job_data = self._job_from_row(row)
+                    loaded[job_data['id']] = job_data
+                jobs.update(loaded)
+                
+                if loaded:
+                    # Mettre en cache pour les prochaines requêtes
+                    pipe = self.redis_client.pipeline()
+                    for job_id, job_data in loaded.items():
+                        pipe.setex(f"job_data:{job_id}", self.cache_ttl, json.dumps(job_data))
+                    pipe.execute()
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération des données des offres: {str(e)}", exc_info=True)
+            missing = [job_id for job_id in missing if job_id not in jobs]
+        
+        # Si pas dans la base de données, essayer de récupérer via l'API du service de matching
+        for job_id in missing:
+            jobs[job_id] = self._get_job_from_matching_service(job_id)
+        
+        if job_map is not None:
+            job_map.update(jobs)
+        
+        return {job_id: job_data for job_id, job_data in jobs.items() if job_data}
+    
+    @staticmethod
+    def _job_from_row(row) -> Dict[str, Any]:
+        """Construit l'objet job à partir d'une ligne de la table jobs"""
+        job_id, title, description, location, company, job_type, company_size, industry, \
+        skills, experience_years, education_level, certifications, parsed_data = row
+        
+        parsed_data = parsed_data if isinstance(parsed_data, dict) else json.loads(parsed_data) if parsed_data else {}
+        
+        return {
+            'id': job_id,
+            'title': title,
+            'description': description,
+            'location': location,
+            'company': company,
+            'job_type': job_type,
+            'company_size': company_size,
+            'industry': industry,
+            'skills': skills.split(',') if isinstance(skills, str) else skills or [],
+            'experience_years': experience_years,
+            'education_level': education_level,
+            'certifications': certifications.split(',') if isinstance(certifications, str) else certifications or [],
+            'parsed_data': parsed_data,
+            # Attributs lus par les modèles de personnalisation
+            'category': parsed_data.get('category') or industry or '',
+            'experience_level': parsed_data.get('experience_level') or '',
+            'work_mode': parsed_data.get('work_mode') or '',
+            'contract_type': parsed_data.get('contract_type') or job_type or ''
+        }
     
     def _get_job_from_matching_service(self, job_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -399,20 +638,9 @@ class DataLoader:
         
         try:
             # Récupérer depuis la base de données
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT name, title, experience, experience_years, education, education_level,
-                       skills, certifications, location, parsed_data
-                FROM candidates
-                WHERE id = %s
-            """
-            cursor.execute(query, (candidate_id,))
-            row = cursor.fetchone()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_candidate_data", (candidate_id,))
+                row = cursor.fetchone()
             
             if not row:
                 # Si pas dans la base de données, essayer de récupérer via l'API du service de matching
@@ -478,7 +706,11 @@ class DataLoader:
     
     def get_all_interactions_for_collaborative_filtering(self) -> List[Dict[str, Any]]:
         """
-        Récupère toutes les interactions pertinentes pour le filtrage collaboratif
+        Récupère les interactions récentes pertinentes pour le filtrage collaboratif
+        
+        Limité aux 10 000 interactions les plus récentes (résultat mis en cache
+        dans Redis) ; l'entraînement du modèle de factorisation utilise
+        iter_interactions_for_collaborative_filtering, sans limite.
         
         Returns:
             List: Liste des interactions formatées pour le filtrage collaboratif
@@ -495,87 +727,241 @@ class DataLoader:
                     logger.warning(f"Erreur de décodage du cache des interactions: {str(e)}")
             
             # Si pas en cache, récupérer depuis la base de données
-            conn = psycopg2.connect(self.db_url)
-            cursor = conn.cursor()
-            
-            query = """
+            query = f"""
                 SELECT user_id, action_type, details, created_at
                 FROM user_interactions
-                WHERE action_type IN ('view_job', 'bookmark_job', 'apply_job', 'dislike_job',
-                                      'view_candidate', 'bookmark_candidate', 'contact_candidate', 'dislike_candidate')
+                WHERE action_type IN {COLLABORATIVE_ACTION_TYPES}
                 ORDER BY created_at DESC
                 LIMIT 10000
             """
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            cursor.close()
-            conn.close()
+            with self._cursor() as cursor:
+                cursor.execute(query)
+                rows = cursor.fetchall()
             
             # Transformer les données au format requis pour le filtrage collaboratif
-            interactions = []
+            interactions = [interaction for interaction in map(self._interaction_from_row, rows) if interaction]
             
-            for row in rows:
-                user_id, action_type, details, timestamp = row
-                
-                if isinstance(details, str):
-                    try:
-                        details = json.loads(details)
-                    except:
-                        details = {}
-                
-                # Déterminer l'item_id et la valeur de l'interaction
-                item_id = None
-                value = 0.0
-                
-                if action_type in ['view_job', 'bookmark_job', 'apply_job', 'dislike_job']:
-                    job_id = details.get('job_id')
-                    if job_id:
-                        item_id = f"job_{job_id}"
-                        item_type = 'job'
-                        
-                        # Valeur de l'interaction en fonction de l'action
-                        if action_type == 'view_job':
-                            value = 0.5
-                        elif action_type == 'bookmark_job':
-                            value = 1.5
-                        elif action_type == 'apply_job':
-                            value = 2.0
-                        elif action_type == 'dislike_job':
-                            value = -0.5
-                
-                elif action_type in ['view_candidate', 'bookmark_candidate', 'contact_candidate', 'dislike_candidate']:
-                    candidate_id = details.get('candidate_id')
-                    if candidate_id:
-                        item_id = f"candidate_{candidate_id}"
-                        item_type = 'candidate'
-                        
-                        # Valeur de l'interaction en fonction de l'action
-                        if action_type == 'view_candidate':
-                            value = 0.5
-                        elif action_type == 'bookmark_candidate':
-                            value = 1.5
-                        elif action_type == 'contact_candidate':
-                            value = 2.0
-                        elif action_type == 'dislike_candidate':
-                            value = -0.5
-                
-                if item_id and value != 0.0:
-                    interaction = {
+            # Mettre en cache pour les prochaines requêtes
+            self.redis_client.setex(cache_key, 3600, json.dumps(interactions))  # 1 heure de TTL
+            
+            return interactions
+            
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des interactions pour le filtrage collaboratif: {str(e)}", exc_info=True)
+            return []
+    
+    def iter_interactions_for_collaborative_filtering(self, batch_size: int = 10000) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt toutes les interactions et tous les feedbacks utilisables par
+        le filtrage collaboratif, sans limite ni mise en cache
+        
+        Les lignes sont lues par lots de `batch_size` via des curseurs serveur :
+        la mémoire utilisée ne dépend pas du nombre d'interactions.
+        
+        Yields:
+            Dict: Interaction au format de get_all_interactions_for_collaborative_filtering
+        """
+        query = f"""
+            SELECT user_id, action_type, details, created_at
+            FROM user_interactions
+            WHERE action_type IN {COLLABORATIVE_ACTION_TYPES}
+        """
+        with self._cursor(name="collab_interactions") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(query)
+            for row in cursor:
+                interaction = self._interaction_from_row(row)
+                if interaction:
+                    yield interaction
+        
+        query = """
+            SELECT user_id, job_id, candidate_id, action, created_at
+            FROM user_feedback
+        """
+        with self._cursor(name="collab_feedback") as cursor:
+            cursor.itersize = batch_size
+            cursor.execute(query)
+            for user_id, job_id, candidate_id, action, timestamp in cursor:
+                value = FEEDBACK_ACTION_VALUES.get(action, 0.0)
+                if job_id:
+                    item_id, item_type = f"job_{job_id}", 'job'
+                elif candidate_id:
+                    item_id, item_type = f"candidate_{candidate_id}", 'candidate'
+                else:
+                    continue
+                if value != 0.0:
+                    yield {
                         'user_id': user_id,
                         'item_id': item_id,
                         'item_type': item_type,
-                        'action': action_type,
+                        'action': action,
                         'value': value,
                         'timestamp': timestamp.isoformat() if timestamp else None
                     }
-                    interactions.append(interaction)
+    
+    @staticmethod
+    def _interaction_from_row(row) -> Optional[Dict[str, Any]]:
+        """Convertit une ligne de user_interactions en interaction (None si inexploitable)"""
+        user_id, action_type, details, timestamp = row
+        
+        if isinstance(details, str):
+            try:
+                details = json.loads(details)
+            except:
+                details = {}
+        details = details or {}
+        
+        # Déterminer l'item_id et la valeur de l'interaction
+        value = INTERACTION_ACTION_VALUES.get(action_type, 0.0)
+        if action_type.endswith('_job'):
+            item_type, item_key = 'job', details.get('job_id')
+        else:
+            item_type, item_key = 'candidate', details.get('candidate_id')
+        
+        if not item_key or value == 0.0:
+            return None
+        
+        return {
+            'user_id': user_id,
+            'item_id': f"{item_type}_{item_key}",
+            'item_type': item_type,
+            'action': action_type,
+            'value': value,
+            'timestamp': timestamp.isoformat() if timestamp else None
+        }
+    
+    # ------------------------------------------------------------------
+    # Feedbacks
+    # ------------------------------------------------------------------
+    
+    def get_user_feedback(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Récupère les feedbacks d'un utilisateur (les plus récents d'abord)
+        
+        Args:
+            user_id: ID de l'utilisateur
             
-            # Mettre en cache pour les prochaines requêtes
-            self.redis_client.setex(cache_key, 3600, json.dumps(interactions))  # 1 heure de TTL
+        Returns:
+            List: Liste des feedbacks
+        """
+        return self.get_user_feedback_bulk([user_id]).get(user_id, [])
+    
+    def get_user_feedback_bulk(self, user_ids: Iterable[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Récupère les feedbacks de plusieurs utilisateurs en une seule requête
+        
+        Args:
+            user_ids: IDs des utilisateurs
             
-            return interactions
+        Returns:
+            Dict: Feedbacks par utilisateur (liste vide si aucun)
+        """
+        ids = list(dict.fromkeys(str(user_id) for user_id in user_ids if user_id))
+        feedback_map = self._scope_map("feedback")
+        
+        feedback: Dict[str, List[Dict[str, Any]]] = {}
+        if feedback_map is not None:
+            feedback.update({user_id: feedback_map[user_id] for user_id in ids if user_id in feedback_map})
+        missing = [user_id for user_id in ids if user_id not in feedback]
+        
+        if missing:
+            loaded = {user_id: [] for user_id in missing}
+            try:
+                with self._cursor() as cursor:
+                    self._execute_prepared(cursor, "get_user_feedback_bulk", (missing,))
+                    rows = cursor.fetchall()
+                
+                for user_id, job_id, candidate_id, action, context, timestamp in rows:
+                    loaded.setdefault(user_id, []).append({
+                        'user_id': user_id,
+                        'job_id': job_id,
+                        'candidate_id': candidate_id,
+                        'action': action,
+                        'context': context if isinstance(context, dict) else json.loads(context) if context else {},
+                        'timestamp': timestamp.isoformat() if timestamp else None
+                    })
+            except Exception as e:
+                logger.error(f"Erreur lors de la récupération des feedbacks: {str(e)}", exc_info=True)
+                # Ne pas mémoriser un résultat vide dû à une erreur
+                return {**feedback, **loaded}
+            
+            feedback.update(loaded)
+            if feedback_map is not None:
+                feedback_map.update(loaded)
+        
+        return feedback
+    
+    def get_user_job_feedback(self, user_id: str, job_id: int) -> List[Dict[str, Any]]:
+        """
+        Récupère les feedbacks d'un utilisateur pour une offre
+        
+        S'appuie sur get_user_feedback : dans une requête, les feedbacks de
+        l'utilisateur ne sont chargés qu'une fois, quel que soit le nombre d'offres.
+        """
+        return [feedback for feedback in self.get_user_feedback(user_id) if feedback.get('job_id') == job_id]
+    
+    def get_user_feedback_count(self, user_id: str) -> int:
+        """
+        Compte les feedbacks d'un utilisateur
+        
+        Args:
+            user_id: ID de l'utilisateur
+            
+        Returns:
+            int: Nombre de feedbacks
+        """
+        feedback_map = self._scope_map("feedback")
+        if feedback_map is not None and user_id in feedback_map and len(feedback_map[user_id]) < 500:
+            return len(feedback_map[user_id])
+        
+        try:
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_user_feedback_count", (user_id,))
+                return cursor.fetchone()[0]
+        except Exception as e:
+            logger.error(f"Erreur lors du comptage des feedbacks: {str(e)}", exc_info=True)
+            return 0
+    
+    def get_all_user_ids(self) -> List[str]:
+        """
+        Récupère les IDs des utilisateurs ayant donné au moins un feedback
+        
+        Returns:
+            List: IDs des utilisateurs
+        """
+        scope = _request_scope.get()
+        if scope is not None and "all_user_ids" in scope:
+            return scope["all_user_ids"]
+        
+        try:
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_all_user_ids")
+                user_ids = [row[0] for row in cursor.fetchall()]
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération des utilisateurs: {str(e)}", exc_info=True)
+            return []
+        
+        if scope is not None:
+            scope["all_user_ids"] = user_ids
+        return user_ids
+    
+    def get_popular_jobs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Récupère les offres ayant reçu le plus de feedbacks positifs
+        
+        Args:
+            limit: Nombre maximum d'offres
             
+        Returns:
+            List: Données des offres, de la plus populaire à la moins populaire
+        """
+        try:
+            with self._cursor() as cursor:
+                self._execute_prepared(cursor, "get_popular_jobs", (limit,))
+                job_ids = [row[0] for row in cursor.fetchall()]
         except Exception as e:
-            logger.error(f"Erreur lors de la récupération des interactions pour le filtrage collaboratif: {str(e)}", exc_info=True)
+            logger.error(f"Erreur lors de la récupération des offres populaires: {str(e)}", exc_info=True)
             return []
+        
+        jobs = self.get_jobs_details(job_ids)
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
@@ -4,7 +4,7 @@ Gestion des variables d'environnement et paramètres
 """
 
 import os
-from typing import List
+from typing import Dict, List
 from functools import lru_cache
 from pydantic import BaseSettings, validator
 
@@ -32,6 +32,9 @@ class Settings(BaseSettings):
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 100
     RATE_LIMIT_BURST: int = 20
+    # Jetons prélevés d'avance par instance (0 = un appel Redis par requête)
+    RATE_LIMIT_LEASE_SIZE: int = 0
+    RATE_LIMIT_LEASE_TTL: float = 1.0
     
     # Infrastructure
     REDIS_URL: str = "redis://redis:6379"
@@ -50,6 +53,18 @@ class Settings(BaseSettings):
     CIRCUIT_BREAKER_TIMEOUT: int = 60
     CIRCUIT_BREAKER_THRESHOLD: int = 5
     
+    # Proxy : pool de connexions par service et réponses en flux
+    PROXY_MAX_CONNECTIONS: int = 100
+    PROXY_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    PROXY_KEEPALIVE_EXPIRY: float = 30.0
+    # Surcharges par service (clés: max_connections, max_keepalive_connections, keepalive_expiry)
+    PROXY_SERVICE_LIMITS: Dict[str, Dict[str, float]] = {
+        "cv_parser": {"max_connections": 20, "max_keepalive_connections": 10},
+        "job_parser": {"max_connections": 20, "max_keepalive_connections": 10},
+        "matching": {"max_connections": 100, "max_keepalive_connections": 40}
+    }
+    PROXY_STREAM_CHUNK_SIZE: int = 64 * 1024
+    
     # Monitoring
     METRICS_ENABLED: bool = True
     LOG_LEVEL: str = "INFO"
@@ -1,23 +1,23 @@
 """
 Middleware de rate limiting pour l'API Gateway
-Protection contre les abus et surcharge avec Redis
+Protection contre les abus et surcharge avec Redis (GCRA, client asynchrone)
 """
 
-import time
-import redis
 import logging
-from typing import Dict, Optional
+import redis.asyncio as redis
+from typing import Any, Dict, Optional
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
 from config.settings import get_settings
+from utils.rate_limiter import GCRARateLimiter, RateLimitResult
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Connection Redis pour le rate limiting
+# Connection Redis (asynchrone) pour le rate limiting
 try:
     redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
     logger.info("Connexion Redis pour rate limiting établie")
@@ -25,6 +25,13 @@ except Exception as e:
     logger.error(f"Erreur connexion Redis rate limiting: {e}")
     redis_client = None
 
+rate_limiter = GCRARateLimiter(
+    redis_client,
+    burst=settings.RATE_LIMIT_BURST,
+    lease_size=settings.RATE_LIMIT_LEASE_SIZE,
+    lease_ttl=settings.RATE_LIMIT_LEASE_TTL
+) if redis_client else None
+
 class RateLimitConfig:
     """Configuration du rate limiting"""
     
@@ -64,7 +71,7 @@ class RateLimitConfig:
         self.burst_allowance = settings.RATE_LIMIT_BURST
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Middleware de rate limiting avec algorithme token bucket"""
+    """Middleware de rate limiting avec algorithme GCRA (équivalent token bucket)"""
     
     def __init__(self, app: ASGIApp):
         super().__init__(app)
@@ -88,30 +95,26 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
             # Obtenir les limites pour cette requête
             limit, window = self._get_limits_for_request(request)
             
-            # Vérifier les limites
-            allowed = await self._check_rate_limit(client_id, limit, window, request.url.path)
+            # Vérifier les limites (un seul appel atomique, ou jeton d'un lease local)
+            result = await self._check_rate_limit(client_id, limit, window, request.url.path)
             
-            if not allowed:
-                # Préparer les headers de rate limiting
-                headers = await self._get_rate_limit_headers(client_id, limit, window, request.url.path)
-                
+            if not result.allowed:
                 return JSONResponse(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     content={
                         "error": True,
                         "message": "Trop de requêtes",
                         "code": "RATE_LIMIT_EXCEEDED",
-                        "retry_after": window
+                        "retry_after": max(1, int(result.retry_after + 0.999))
                     },
-                    headers=headers
+                    headers=result.headers(window)
                 )
             
             # Traiter la requête
             response = await call_next(request)
             
             # Ajouter les headers de rate limiting à la réponse
-            headers = await self._get_rate_limit_headers(client_id, limit, window, request.url.path)
-            for key, value in headers.items():
+            for key, value in result.headers(window).items():
                 response.headers[key] = value
             
             return response
@@ -161,85 +164,14 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
         # Limite par défaut
         return self.config.default_limit, self.config.default_window
     
-    async def _check_rate_limit(self, client_id: str, limit: int, window: int, path: str) -> bool:
-        """Vérifier si le client dépasse les limites (token bucket algorithm)"""
+    async def _check_rate_limit(self, client_id: str, limit: int, window: int, path: str) -> RateLimitResult:
+        """Vérifier si le client dépasse les limites (GCRA, script Redis atomique)"""
         
         try:
-            current_time = int(time.time())
-            key = f"rate_limit:{client_id}:{path}"
-            
-            # Obtenir les données actuelles
-            pipe = redis_client.pipeline()
-            pipe.hgetall(key)
-            result = pipe.execute()
-            
-            bucket_data = result[0] if result and result[0] else {}
-            
-            # Initialiser le bucket s'il n'existe pas
-            if not bucket_data:
-                bucket_data = {
-                    "tokens": str(limit),
-                    "last_refill": str(current_time)
-                }
-            
-            tokens = float(bucket_data.get("tokens", limit))
-            last_refill = int(bucket_data.get("last_refill", current_time))
-            
-            # Calculer les tokens à ajouter depuis le dernier refill
-            time_passed = current_time - last_refill
-            tokens_to_add = (time_passed / window) * limit
-            
-            # Refill du bucket (max = limit + burst)
-            max_tokens = limit + self.config.burst_allowance
-            tokens = min(max_tokens, tokens + tokens_to_add)
-            
-            # Vérifier si on peut consommer un token
-            if tokens >= 1:
-                tokens -= 1
-                allowed = True
-            else:
-                allowed = False
-            
-            # Mettre à jour le bucket dans Redis
-            pipe = redis_client.pipeline()
-            pipe.hset(key, mapping={
-                "tokens": str(tokens),
-                "last_refill": str(current_time)
-            })
-            pipe.expire(key, window * 2)  # TTL = 2 * window
-            pipe.execute()
-            
-            return allowed
-            
+            return await rate_limiter.acquire(f"{client_id}:{path}", limit, window)
         except Exception as e:
             logger.error(f"Erreur vérification rate limit: {e}")
-            return True  # Fail open
-    
-    async def _get_rate_limit_headers(self, client_id: str, limit: int, window: int, path: str) -> Dict[str, str]:
-        """Obtenir les headers de rate limiting pour la réponse"""
-        
-        try:
-            key = f"rate_limit:{client_id}:{path}"
-            bucket_data = redis_client.hgetall(key)
-            
-            if bucket_data:
-                tokens = float(bucket_data.get("tokens", limit))
-                remaining = max(0, int(tokens))
-            else:
-                remaining = limit
-            
-            reset_time = int(time.time()) + window
-            
-            return {
-                "X-RateLimit-Limit": str(limit),
-                "X-RateLimit-Remaining": str(remaining),
-                "X-RateLimit-Reset": str(reset_time),
-                "X-RateLimit-Window": str(window)
-            }
-            
-        except Exception as e:
-            logger.error(f"Erreur headers rate limit: {e}")
-            return {}
+            return RateLimitResult(allowed=True, limit=limit, remaining=limit)  # Fail open
 
 class RateLimitManager:
     """Gestionnaire pour les opérations de rate limiting"""
@@ -252,9 +184,9 @@ class RateLimitManager:
         
         try:
             pattern = f"rate_limit:user:{user_id}:*"
-            keys = redis_client.keys(pattern)
+            keys = [key async for key in redis_client.scan_iter(match=pattern)]
             if keys:
-                redis_client.delete(*keys)
+                await redis_client.delete(*keys)
             return True
         except Exception as e:
             logger.error(f"Erreur reset limits utilisateur: {e}")
@@ -267,16 +199,15 @@ class RateLimitManager:
             return {}
         
         try:
-            pattern = f"rate_limit:user:{user_id}:*"
-            keys = redis_client.keys(pattern)
+            prefix = f"user:{user_id}:"
+            pattern = f"rate_limit:{prefix}*"
             
             stats = {}
-            for key in keys:
-                bucket_data = redis_client.hgetall(key)
+            async for key in redis_client.scan_iter(match=pattern):
                 endpoint = key.split(":")[-1]
+                reset_after = await rate_limiter.peek(key[len("rate_limit:"):])
                 stats[endpoint] = {
-                    "tokens_remaining": float(bucket_data.get("tokens", 0)),
-                    "last_refill": int(bucket_data.get("last_refill", 0))
+                    "reset_after": round(reset_after or 0.0, 3)
                 }
             
             return stats
@@ -292,7 +223,7 @@ class RateLimitManager:
         
         try:
             key = f"blocked_ip:{ip}"
-            redis_client.setex(key, duration, "1")
+            await redis_client.setex(key, duration, "1")
             return True
         except Exception as e:
             logger.error(f"Erreur blocage IP: {e}")
@@ -306,7 +237,7 @@ class RateLimitManager:
         
         try:
             key = f"blocked_ip:{ip}"
-            return redis_client.exists(key) > 0
+            return await redis_client.exists(key) > 0
         except Exception as e:
             logger.error(f"Erreur vérification IP bloquée: {e}")
             return False
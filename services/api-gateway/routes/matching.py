@@ -91,13 +91,13 @@ async def match_batch(
                 detail="Seuls les recruteurs et admins peuvent faire du matching en lot"
             )
         
-        body = await request.body()
-        
+        # Corps transmis et résultats relayés en flux (lots volumineux)
         response = await forward_to_service(
             service_name="matching",
             path="api/v1/match/batch",
             request=request,
-            body=body
+            stream=True,
+            stream_body=True
         )
         
         logger.info(f"Matching batch réussi pour {current_user['email']}")
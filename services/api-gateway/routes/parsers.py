@@ -161,13 +161,13 @@ async def parse_job_batch(
                 detail="Seuls les recruteurs et admins peuvent faire du parsing en lot"
             )
         
-        body = await request.body()
-        
+        # Corps transmis et résultats relayés en flux (lots volumineux)
         response = await forward_to_service(
             service_name="job_parser",
             path="api/parse-job/batch",
             request=request,
-            body=body
+            stream=True,
+            stream_body=True
         )
         
         logger.info(f"Batch jobs parsé avec succès pour {current_user['email']}")
@@ -222,8 +222,7 @@ async def forward_to_service_with_files(
     """
     Fonction spécialisée pour rediriger des requêtes avec fichiers
     """
-    from utils.proxy import proxy_manager
-    import httpx
+    from utils.proxy import proxy_manager, filter_response_headers
     
     proxy = proxy_manager.get_proxy(service_name)
     url = proxy.get_next_url()
@@ -239,19 +238,18 @@ async def forward_to_service_with_files(
         headers.pop("host", None)
         headers.pop("content-length", None)
         
-        # Faire la requête avec fichiers
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                url=full_url,
-                headers=headers,
-                files=files,
-                data=data
-            )
+        # Faire la requête avec fichiers (client du service : connexions réutilisées)
+        response = await proxy.client.post(
+            url=full_url,
+            headers=headers,
+            files=files,
+            data=data
+        )
         
         return Response(
             content=response.content,
             status_code=response.status_code,
-            headers=dict(response.headers),
+            headers=filter_response_headers(response.headers, decoded=True),
             media_type=response.headers.get("content-type")
         )
         
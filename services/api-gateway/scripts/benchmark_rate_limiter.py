@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark de charge du rate limiting contre un Redis local :
+- ancienne séquence lecture puis écriture (HGETALL / HSET / EXPIRE) ;
+- script GCRA atomique (un aller-retour par requête) ;
+- script GCRA avec prélèvement local de jetons (leases).
+
+Pour chaque variante : débit, latence p50 / p99 d'une vérification, et
+nombre de requêtes admises comparé au maximum autorisé par la limite
+(un dépassement révèle une condition de course).
+
+Usage:
+    python scripts/benchmark_rate_limiter.py [--redis-url redis://localhost:6379/15]
+        [--requests 20000] [--concurrency 200] [--keys 20] [--limit 500] [--lease-size 20]
+"""
+
+import sys
+import os
+import time
+import asyncio
+import argparse
+
+import redis.asyncio as redis
+
+# Ajouter le répertoire parent au path pour les imports
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.rate_limiter import GCRARateLimiter
+
+WINDOW = 60
+
+
+class LegacyLimiter:
+    """Ancien algorithme du middleware : lecture puis écriture non atomiques"""
+
+    def __init__(self, client, burst):
+        self.client = client
+        self.burst = burst
+
+    async def acquire(self, key, limit, window):
+        current_time = int(time.time())
+        redis_key = f"bench_legacy:{key}"
+        bucket_data = await self.client.hgetall(redis_key)
+        tokens = float(bucket_data.get("tokens", limit)) if bucket_data else float(limit)
+        last_refill = int(bucket_data.get("last_refill", current_time)) if bucket_data else current_time
+        tokens = min(limit + self.burst, tokens + (current_time - last_refill) / window * limit)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        pipe = self.client.pipeline()
+        pipe.hset(redis_key, mapping={"tokens": str(tokens), "last_refill": str(current_time)})
+        pipe.expire(redis_key, window * 2)
+        await pipe.execute()
+        return allowed
+
+
+async def run_variant(name, limiter, args):
+    keys = [f"client{index}" for index in range(args.keys)]
+    latencies = []
+    admitted = 0
+    counter = iter(range(args.requests))
+
+    async def worker():
+        nonlocal admitted
+        for index in counter:
+            start = time.perf_counter()
+            result = await limiter.acquire(keys[index % len(keys)], args.limit, WINDOW)
+            latencies.append(time.perf_counter() - start)
+            allowed = result if isinstance(result, bool) else result.allowed
+            admitted += int(allowed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    max_allowed = args.keys * (args.limit + args.burst + int(elapsed * args.limit / WINDOW) + 1)
+    print(f"{name:>12} {args.requests / elapsed:>10.0f} {latencies[len(latencies) // 2] * 1000:>9.3f} "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:>9.3f} {admitted:>9} {max_allowed:>9}"
+          f"{'  <- dépassement' if admitted > max_allowed else ''}")
+
+
+async def main(args):
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    await client.ping()
+    await client.flushdb()
+
+    variants = [
+        ("lect./écrit.", LegacyLimiter(client, args.burst)),
+        ("gcra", GCRARateLimiter(client, burst=args.burst, key_prefix="bench_gcra")),
+        ("gcra+lease", GCRARateLimiter(client, burst=args.burst, lease_size=args.lease_size,
+                                       key_prefix="bench_lease")),
+    ]
+    print(f"{'variante':>12} {'req/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} {'admises':>9} {'max':>9}")
+    for name, limiter in variants:
+        await run_variant(name, limiter, args)
+
+    await client.flushdb()
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du rate limiting Redis")
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15",
+                        help="Base Redis dédiée (vidée avant et après le benchmark)")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--keys", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=500, help="Requêtes par minute et par clé")
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--lease-size", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -1,24 +1,58 @@
 """
 Proxy HTTP intelligent pour rediriger les requêtes vers les microservices
 Avec circuit breaker, retry automatique et load balancing
+
+Deux modes de transfert, choisis route par route :
+- bufferisé (défaut) : la réponse amont est lue entièrement puis renvoyée ;
+- en flux (stream=True) : la réponse amont est relayée morceau par morceau
+  dans une StreamingResponse, sans être chargée en mémoire ; le corps de la
+  requête peut lui aussi être transmis en flux (stream_body=True).
 """
 
 import asyncio
 import logging
 import time
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
 import httpx
 from fastapi import HTTPException, Request, status
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
 
 from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# En-têtes propres à une connexion, jamais relayés tels quels
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade"
+}
+
+def filter_response_headers(headers: httpx.Headers, decoded: bool) -> Dict[str, str]:
+    """
+    En-têtes de la réponse amont à renvoyer au client
+
+    Args:
+        headers: En-têtes de la réponse amont
+        decoded: Le corps a été décompressé par httpx (mode bufferisé) :
+            content-encoding et content-length ne correspondent plus
+    """
+    excluded = HOP_BY_HOP_HEADERS | ({"content-encoding", "content-length"} if decoded else set())
+    return {name: value for name, value in headers.items() if name.lower() not in excluded}
+
+def build_limits(service_key: str) -> httpx.Limits:
+    """Limites du pool de connexions d'un service (réglages globaux + surcharges du service)"""
+    overrides = settings.PROXY_SERVICE_LIMITS.get(service_key, {})
+    return httpx.Limits(
+        max_connections=int(overrides.get("max_connections", settings.PROXY_MAX_CONNECTIONS)),
+        max_keepalive_connections=int(overrides.get("max_keepalive_connections", settings.PROXY_MAX_KEEPALIVE_CONNECTIONS)),
+        keepalive_expiry=float(overrides.get("keepalive_expiry", settings.PROXY_KEEPALIVE_EXPIRY))
+    )
+
 class CircuitState(Enum):
     """États du circuit breaker"""
     CLOSED = "closed"      # Fonctionnement normal
@@ -83,14 +117,16 @@ class CircuitBreaker:
 class ServiceProxy:
     """Proxy pour un service avec load balancing et résilience"""
     
-    def __init__(self, service_name: str, urls: List[str]):
+    def __init__(self, service_name: str, urls: List[str], limits: Optional[httpx.Limits] = None):
         self.service_name = service_name
         self.urls = urls
         self.current_url_index = 0
         self.circuit_breakers = {url: CircuitBreaker() for url in urls}
+        # Client partagé par toutes les requêtes vers le service : les connexions
+        # sont réutilisées (keep-alive) dans la limite du pool
         self.client = httpx.AsyncClient(
             timeout=httpx.Timeout(settings.HTTP_TIMEOUT),
-            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            limits=limits or httpx.Limits(max_connections=100, max_keepalive_connections=20)
         )
     
     def get_next_url(self) -> Optional[str]:
@@ -115,15 +151,27 @@ class ServiceProxy:
         method: str, 
         headers: Dict[str, str] = None,
         params: Dict[str, Any] = None,
-        data: bytes = None,
+        data: Union[bytes, AsyncIterator[bytes]] = None,
         files: Dict = None,
-        json: Dict = None
+        json: Dict = None,
+        stream: bool = False
     ) -> Response:
-        """Rediriger une requête vers le service avec retry automatique"""
+        """
+        Rediriger une requête vers le service avec retry automatique
+
+        Args:
+            data: Corps de la requête, en bytes ou en flux (itérateur asynchrone) ;
+                un corps en flux ne peut être envoyé qu'une fois : pas de nouvelle
+                tentative sur une autre instance après son envoi
+            stream: Relayer la réponse en flux (StreamingResponse) au lieu de la
+                lire entièrement
+        """
         
         last_exception = None
+        body_is_stream = data is not None and not isinstance(data, (bytes, bytearray, str))
+        attempts = 1 if body_is_stream else len(self.urls)
         
-        for attempt in range(len(self.urls)):
+        for attempt in range(attempts):
             url = self.get_next_url()
             if not url:
                 break
@@ -139,6 +187,13 @@ class ServiceProxy:
                 # Supprimer les headers problématiques
                 request_headers.pop("host", None)
                 request_headers.pop("content-length", None)
+                for name in [name for name in request_headers if name.lower() in HOP_BY_HOP_HEADERS]:
+                    request_headers.pop(name)
+                
+                if stream:
+                    return await self._forward_streaming(
+                        method, full_url, request_headers, params, data, files, json, circuit_breaker
+                    )
                 
                 # Faire la requête
                 response = await self.client.request(
@@ -152,16 +207,16 @@ class ServiceProxy:
                     follow_redirects=False
                 )
                 
-                # Enregistrer le succès
-                circuit_breaker.record_success()
+                # Enregistrer le résultat (une erreur 5xx compte comme un échec)
+                self._record_status(circuit_breaker, response.status_code)
                 
-                logger.debug(f"Succès: {method} {full_url} -> {response.status_code}")
+                logger.debug(f"Réponse: {method} {full_url} -> {response.status_code}")
                 
-                # Retourner la réponse
+                # Retourner la réponse (corps décompressé par httpx)
                 return Response(
                     content=response.content,
                     status_code=response.status_code,
-                    headers=dict(response.headers),
+                    headers=filter_response_headers(response.headers, decoded=True),
                     media_type=response.headers.get("content-type")
                 )
                 
@@ -182,7 +237,7 @@ class ServiceProxy:
                     return Response(
                         content=e.response.content,
                         status_code=e.response.status_code,
-                        headers=dict(e.response.headers)
+                        headers=filter_response_headers(e.response.headers, decoded=True)
                     )
                     
             except Exception as e:
@@ -211,6 +266,67 @@ class ServiceProxy:
                 detail=f"Service {self.service_name} indisponible"
             )
     
+    async def _forward_streaming(
+        self,
+        method: str,
+        full_url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]],
+        data: Any,
+        files: Optional[Dict],
+        json: Optional[Dict],
+        circuit_breaker: CircuitBreaker
+    ) -> StreamingResponse:
+        """
+        Relayer la réponse amont en flux
+
+        Seuls les en-têtes sont attendus avant de répondre ; le corps est lu
+        morceau par morceau au rythme où le client le consomme (chaque morceau
+        n'est demandé à l'amont qu'une fois le précédent envoyé), puis la
+        connexion est rendue au pool. Les octets sont relayés tels quels
+        (sans décompression), avec leurs en-têtes content-encoding / content-length.
+        """
+        upstream_request = self.client.build_request(
+            method=method,
+            url=full_url,
+            headers=headers,
+            params=params,
+            content=data,
+            files=files,
+            json=json
+        )
+        response = await self.client.send(upstream_request, stream=True, follow_redirects=False)
+        
+        self._record_status(circuit_breaker, response.status_code)
+        logger.debug(f"Réponse (flux): {method} {full_url} -> {response.status_code}")
+        
+        async def relay() -> AsyncIterator[bytes]:
+            try:
+                async for chunk in response.aiter_raw(settings.PROXY_STREAM_CHUNK_SIZE):
+                    yield chunk
+            except httpx.HTTPError as e:
+                # Les en-têtes sont déjà partis : la réponse est tronquée
+                logger.warning(f"Flux interrompu depuis {full_url}: {e}")
+                circuit_breaker.record_failure()
+            finally:
+                await response.aclose()
+        
+        return StreamingResponse(
+            relay(),
+            status_code=response.status_code,
+            headers=filter_response_headers(response.headers, decoded=False),
+            media_type=response.headers.get("content-type"),
+            background=BackgroundTask(response.aclose)
+        )
+    
+    @staticmethod
+    def _record_status(circuit_breaker: CircuitBreaker, status_code: int) -> None:
+        """Une réponse 5xx compte comme un échec de l'instance, toute autre réponse comme un succès"""
+        if status_code >= 500:
+            circuit_breaker.record_failure()
+        else:
+            circuit_breaker.record_success()
+    
     async def health_check(self) -> Dict[str, Any]:
         """Vérifier l'état de santé du service"""
         results = {}
@@ -253,19 +369,22 @@ class ProxyManager:
         # CV Parser Service
         self.proxies["cv_parser"] = ServiceProxy(
             service_name="CV Parser",
-            urls=[settings.CV_PARSER_URL]
+            urls=[settings.CV_PARSER_URL],
+            limits=build_limits("cv_parser")
         )
         
         # Job Parser Service  
         self.proxies["job_parser"] = ServiceProxy(
             service_name="Job Parser",
-            urls=[settings.JOB_PARSER_URL]
+            urls=[settings.JOB_PARSER_URL],
+            limits=build_limits("job_parser")
         )
         
         # Matching Service
         self.proxies["matching"] = ServiceProxy(
             service_name="Matching Service",
-            urls=[settings.MATCHING_SERVICE_URL]
+            urls=[settings.MATCHING_SERVICE_URL],
+            limits=build_limits("matching")
         )
     
     def get_proxy(self, service_name: str) -> ServiceProxy:
@@ -307,10 +426,18 @@ async def forward_to_service(
     service_name: str,
     path: str,
     request: Request,
-    body: bytes = None
+    body: bytes = None,
+    stream: bool = False,
+    stream_body: bool = False
 ) -> Response:
     """
     Fonction utilitaire pour rediriger une requête vers un service
+
+    Args:
+        stream: Relayer la réponse en flux (gros résultats, téléchargements)
+        stream_body: Transmettre le corps de la requête en flux à partir de
+            `request.stream()` (ignoré si `body` est fourni ; la route ne doit
+            pas avoir lu le corps auparavant)
     """
     proxy = proxy_manager.get_proxy(service_name)
     
@@ -320,10 +447,15 @@ async def forward_to_service(
     # Préparer les paramètres
     params = dict(request.query_params) if request.query_params else None
     
+    data = body
+    if data is None and stream_body:
+        data = request.stream()
+    
     return await proxy.forward_request(
         path=path,
         method=request.method,
         headers=headers,
         params=params,
-        data=body
+        data=data,
+        stream=stream
     )
@@ -0,0 +1,218 @@
+"""
+Rate limiter GCRA (Generic Cell Rate Algorithm) partagé via Redis
+Vérification atomique côté serveur et prélèvement local de quota (leases)
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Script exécuté atomiquement par Redis : lecture, calcul et mise à jour de
+# l'instant théorique d'arrivée (TAT) en un seul aller-retour, avec l'horloge
+# de Redis (commune à toutes les instances du gateway).
+#
+# KEYS[1] : clé du client
+# ARGV[1] : intervalle d'émission en µs (fenêtre / limite)
+# ARGV[2] : capacité (limite + burst)
+# ARGV[3] : nombre de jetons demandés
+# ARGV[4] : 1 = accorder les jetons disponibles si la demande ne peut être
+#           entièrement satisfaite (prélèvement d'un lease)
+#
+# Retour : {jetons accordés, jetons restants, attente avant le prochain jeton (µs),
+#           délai avant remise à plein (µs)}
+GCRA_SCRIPT = """
+-- Réplication par effets : implicite depuis Redis 5, à activer avant
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) * 1000000 + tonumber(now_parts[2])
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local partial = tonumber(ARGV[4]) == 1
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local horizon = now + capacity * interval
+local available = math.floor((horizon - tat) / interval)
+local granted = requested
+if available < requested then
+    if partial and available > 0 then
+        granted = available
+    else
+        granted = 0
+    end
+end
+
+if granted > 0 then
+    tat = tat + granted * interval
+    redis.call('SET', KEYS[1], string.format('%.0f', tat), 'PX', math.max(1, math.ceil((tat - now) / 1000)))
+end
+
+local remaining = math.floor((horizon - tat) / interval)
+local retry_after = 0
+if remaining < 1 then
+    retry_after = tat - now - (capacity - 1) * interval
+end
+return {granted, remaining, retry_after, tat - now}
+"""
+
+# Nombre d'entrées locales au-delà duquel les leases expirés sont purgés
+MAX_LOCAL_ENTRIES = 10000
+
+@dataclass
+class RateLimitResult:
+    """Résultat d'une vérification de rate limit"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0  # secondes avant le prochain jeton
+    reset_after: float = 0.0  # secondes avant remise à plein du quota
+
+    def headers(self, window: int) -> Dict[str, str]:
+        """Headers X-RateLimit-* correspondants"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+            "X-RateLimit-Reset": str(int(time.time() + self.reset_after)),
+            "X-RateLimit-Window": str(window)
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, int(self.retry_after + 0.999)))
+        return headers
+
+@dataclass
+class _Lease:
+    """Jetons prélevés d'avance pour une clé, consommés localement"""
+    tokens: int = 0
+    expires_at: float = 0.0
+    remaining: int = 0
+    reset_after: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+class GCRARateLimiter:
+    """
+    Rate limiter GCRA partagé entre les instances du gateway
+
+    Chaque vérification est un unique appel au script GCRA_SCRIPT (pas de
+    séquence lecture / écriture concurrente). En mode lease (lease_size > 1),
+    une instance prélève plusieurs jetons à la fois et les consomme localement
+    pendant au plus `lease_ttl` secondes : un aller-retour Redis pour
+    `lease_size` requêtes. Les jetons non consommés à l'expiration du lease
+    sont perdus (le quota global n'est jamais dépassé, mais un client peut
+    être limité légèrement plus tôt).
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        burst: int = 0,
+        lease_size: int = 0,
+        lease_ttl: float = 1.0,
+        key_prefix: str = "rate_limit"
+    ):
+        """
+        Args:
+            redis_client: Client redis.asyncio
+            burst: Jetons supplémentaires autorisés au-delà de la limite
+            lease_size: Jetons prélevés par aller-retour (0 ou 1 = pas de lease)
+            lease_ttl: Durée de validité d'un lease (secondes)
+            key_prefix: Préfixe des clés Redis
+        """
+        self.redis = redis_client
+        self.burst = burst
+        self.lease_size = lease_size
+        self.lease_ttl = lease_ttl
+        self.key_prefix = key_prefix
+        self._script = redis_client.register_script(GCRA_SCRIPT)
+        self._leases: Dict[str, _Lease] = {}
+
+    def redis_key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    async def acquire(self, key: str, limit: int, window: int) -> RateLimitResult:
+        """Consommer un jeton pour la clé (limite de `limit` requêtes par `window` secondes)"""
+        lease_size = self._lease_size_for(limit)
+        if lease_size <= 1:
+            result, _ = await self._call(key, limit, window, 1)
+            return result
+        return await self._acquire_leased(key, limit, window, lease_size)
+
+    def _lease_size_for(self, limit: int) -> int:
+        # Un lease ne dépasse pas 10% de la limite, pour que plusieurs instances
+        # se partagent le quota des endpoints à faible limite
+        return min(self.lease_size, limit // 10)
+
+    async def _call(self, key: str, limit: int, window: int, requested: int,
+                    partial: bool = False) -> Tuple[RateLimitResult, int]:
+        """Exécuter le script GCRA ; retourne le résultat et le nombre de jetons accordés"""
+        interval = max(1, int(window * 1_000_000 / limit))
+        capacity = limit + self.burst
+        granted, remaining, retry_after, reset_after = await self._script(
+            keys=[self.redis_key(key)],
+            args=[interval, capacity, requested, 1 if partial else 0]
+        )
+        return RateLimitResult(
+            allowed=int(granted) > 0,
+            limit=limit,
+            remaining=int(remaining),
+            retry_after=int(retry_after) / 1_000_000,
+            reset_after=int(reset_after) / 1_000_000
+        ), int(granted)
+
+    async def _acquire_leased(self, key: str, limit: int, window: int, lease_size: int) -> RateLimitResult:
+        lease = self._leases.get(key)
+        if lease is None:
+            self._purge_expired()
+            lease = self._leases.setdefault(key, _Lease())
+
+        if not self._take(lease):
+            # Un seul prélèvement à la fois par clé : les requêtes concurrentes
+            # attendent le lease en cours plutôt que d'en prélever chacune un
+            async with lease.lock:
+                if not self._take(lease):
+                    result, granted = await self._call(key, limit, window, lease_size, partial=True)
+                    if not granted:
+                        return result
+                    lease.tokens = granted - 1
+                    lease.expires_at = time.monotonic() + self.lease_ttl
+                    lease.remaining = result.remaining
+                    lease.reset_after = result.reset_after
+
+        return RateLimitResult(
+            allowed=True,
+            limit=limit,
+            remaining=lease.remaining + lease.tokens,
+            reset_after=lease.reset_after
+        )
+
+    @staticmethod
+    def _take(lease: _Lease) -> bool:
+        if lease.tokens > 0 and lease.expires_at > time.monotonic():
+            lease.tokens -= 1
+            return True
+        return False
+
+    def _purge_expired(self):
+        if len(self._leases) < MAX_LOCAL_ENTRIES:
+            return
+        now = time.monotonic()
+        for key in [key for key, lease in self._leases.items()
+                    if lease.expires_at <= now and not lease.lock.locked()]:
+            del self._leases[key]
+
+    async def peek(self, key: str) -> Optional[float]:
+        """Délai (secondes) avant remise à plein du quota de la clé, None si inconnue"""
+        value = await self.redis.get(self.redis_key(key))
+        if value is None:
+            return None
+        seconds, microseconds = await self.redis.time()
+        return max(0.0, (float(value) - (seconds * 1_000_000 + microseconds)) / 1_000_000)
@@ -0,0 +1,83 @@
+"""Utilitaires communs aux tests : import des modules des services par chemin.
+
+Les services vivent dans des répertoires qui ne sont pas des paquets Python
+importables (noms avec des tirets, paquets dont le __init__ dépend de modules
+absents du dépôt) : les tests chargent donc les modules par leur chemin.
+"""
+
+import importlib.util
+import os
+import sys
+import types
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def add_path(*parts: str) -> Path:
+    """Ajoute un répertoire du dépôt au sys.path et le renvoie."""
+    path = REPO_ROOT.joinpath(*parts)
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+    return path
+
+
+def load_module(name: str, *parts: str) -> types.ModuleType:
+    """Charge un fichier du dépôt comme module `name` (une seule fois)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    path = REPO_ROOT.joinpath(*parts)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def namespace_package(name: str, *parts: str) -> types.ModuleType:
+    """
+    Déclare un paquet sans exécuter son __init__, pour importer ses modules
+    autonomes quand le __init__ importe des modules absents du dépôt.
+    """
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [str(REPO_ROOT.joinpath(*parts))]
+        sys.modules[name] = package
+    return sys.modules[name]
+
+
+def import_from_service(module: str, *parts: str) -> types.ModuleType:
+    """
+    Importe `module` depuis le répertoire d'un service.
+
+    Les paquets de premier niveau du service (utils, config, app...) portent
+    souvent le même nom d'un service à l'autre : ils sont retirés de
+    sys.modules le temps de l'import, puis les modules précédents sont
+    restaurés. Le module renvoyé garde ses propres dépendances.
+
+    L'import se fait depuis le répertoire du service, comme dans son image
+    Docker : sa configuration lit son propre .env et non celui du dépôt.
+    """
+    root = REPO_ROOT.joinpath(*parts)
+    local = {path.stem for path in root.iterdir()
+             if path.suffix == ".py" or (path / "__init__.py").exists()}
+
+    def owned(name: str) -> bool:
+        return name.split(".")[0] in local
+
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if owned(name)}
+    sys.path.insert(0, str(root))
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        return importlib.import_module(module)
+    finally:
+        os.chdir(cwd)
+        sys.path.remove(str(root))
+        for name in [name for name in sys.modules if owned(name)]:
+            del sys.modules[name]
+        sys.modules.update(saved)
@@ -0,0 +1,107 @@
+"""Tests du proxy de l'API Gateway : circuit breaker en modes bufferisé et en flux."""
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("fastapi")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+try:
+    proxy_module = import_from_service("utils.proxy", "services", "api-gateway")
+except ImportError as error:
+    # config/settings.py utilise BaseSettings de pydantic 1
+    pytest.skip(f"Configuration du gateway non importable: {error}", allow_module_level=True)
+
+CircuitState = proxy_module.CircuitState
+ServiceProxy = proxy_module.ServiceProxy
+
+URL = "http://upstream"
+
+
+def make_proxy(handler, urls=(URL,)):
+    proxy = ServiceProxy("test", list(urls))
+    proxy.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return proxy
+
+
+def reply(status_code, content=b"payload"):
+    async def body():
+        # Corps en flux, comme une vraie réponse amont
+        yield content
+
+    return lambda request: httpx.Response(status_code, content=body())
+
+
+async def read_streaming(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_server_errors_count_as_failures(stream):
+    async def scenario():
+        proxy = make_proxy(reply(503))
+        breaker = proxy.circuit_breakers[URL]
+
+        response = await proxy.forward_request("/matches", "GET", stream=stream)
+        assert response.status_code == 503
+        if stream:
+            assert await read_streaming(response) == b"payload"
+        assert breaker.failure_count == 1
+
+        for _ in range(breaker.config.failure_threshold - 1):
+            await proxy.forward_request("/matches", "GET", stream=stream)
+        assert breaker.state == CircuitState.OPEN
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("status_code", [200, 206, 404])
+def test_other_responses_count_as_successes(stream, status_code):
+    async def scenario():
+        proxy = make_proxy(reply(status_code))
+        breaker = proxy.circuit_breakers[URL]
+        breaker.failure_count = 3
+
+        response = await proxy.forward_request("/matches", "GET", stream=stream)
+        assert response.status_code == status_code
+        if stream:
+            assert await read_streaming(response) == b"payload"
+        assert breaker.failure_count == 0
+        assert breaker.state == CircuitState.CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_half_open_breaker_reopens_on_streamed_server_error():
+    async def scenario():
+        proxy = make_proxy(reply(500))
+        breaker = proxy.circuit_breakers[URL]
+        breaker.state = CircuitState.HALF_OPEN
+
+        await proxy.forward_request("/matches", "GET", stream=True)
+        assert breaker.state == CircuitState.OPEN
+
+    asyncio.run(scenario())
+
+
+def test_open_breaker_skips_instance():
+    async def scenario():
+        seen = []
+
+        def handler(request):
+            seen.append(request.url.host)
+            return httpx.Response(200, content=b"ok")
+
+        proxy = make_proxy(handler, urls=("http://a", "http://b"))
+        proxy.circuit_breakers["http://a"].state = CircuitState.OPEN
+        proxy.circuit_breakers["http://a"].last_failure_time = float("inf")
+
+        for _ in range(3):
+            await proxy.forward_request("/health", "GET")
+        assert seen == ["b", "b", "b"]
+
+    asyncio.run(scenario())
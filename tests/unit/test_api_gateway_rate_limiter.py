@@ -0,0 +1,170 @@
+"""Tests du rate limiter GCRA de l'API Gateway (script Lua exécuté par fakeredis)."""
+
+import asyncio
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from tests.helpers import load_module  # noqa: E402
+
+rate_limiter = load_module("api_gateway_rate_limiter", "services", "api-gateway", "utils", "rate_limiter.py")
+GCRARateLimiter = rate_limiter.GCRARateLimiter
+
+
+class CountingLimiter(GCRARateLimiter):
+    """Compte les allers-retours Redis (appels du script)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    async def _call(self, *args, **kwargs):
+        self.calls += 1
+        return await super()._call(*args, **kwargs)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def acquire_many(limiter, count, key="client:/api", limit=10, window=60):
+    return [await limiter.acquire(key, limit, window) for _ in range(count)]
+
+
+def test_limit_plus_burst_then_denied():
+    async def scenario():
+        limiter = GCRARateLimiter(fakeredis.FakeAsyncRedis(), burst=2)
+        results = await acquire_many(limiter, 13)
+
+        assert [result.allowed for result in results] == [True] * 12 + [False]
+        assert [result.remaining for result in results[:12]] == list(range(11, -1, -1))
+        denied = results[-1]
+        # Un jeton toutes les window / limit = 6 s
+        assert denied.retry_after == pytest.approx(6, abs=0.1)
+        assert denied.reset_after == pytest.approx(72, abs=0.1)
+        headers = denied.headers(60)
+        assert headers["Retry-After"] == "6"
+        assert headers["X-RateLimit-Remaining"] == "0"
+        assert headers["X-RateLimit-Limit"] == "10"
+
+    run(scenario())
+
+
+def test_tokens_refill_at_emission_interval():
+    async def scenario():
+        limiter = GCRARateLimiter(fakeredis.FakeAsyncRedis())
+        # 20 requêtes par seconde : un jeton toutes les 50 ms
+        results = await acquire_many(limiter, 21, limit=20, window=1)
+        assert not results[-1].allowed
+
+        await asyncio.sleep(0.12)
+        refilled = await acquire_many(limiter, 3, limit=20, window=1)
+        assert [result.allowed for result in refilled] == [True, True, False]
+
+    run(scenario())
+
+
+def test_keys_are_independent_and_expire():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        limiter = GCRARateLimiter(redis)
+        await acquire_many(limiter, 10, key="a")
+
+        assert (await limiter.acquire("a", 10, 60)).allowed is False
+        assert (await limiter.acquire("b", 10, 60)).allowed is True
+        assert 0 < await redis.pttl("rate_limit:a") <= 60_000
+        assert await limiter.peek("a") == pytest.approx(60, abs=0.1)
+        assert await limiter.peek("inconnue") is None
+
+    run(scenario())
+
+
+def test_instances_share_the_quota():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        first, second = GCRARateLimiter(redis), GCRARateLimiter(redis)
+        allowed = 0
+        for _ in range(10):
+            allowed += (await first.acquire("k", 10, 60)).allowed
+            allowed += (await second.acquire("k", 10, 60)).allowed
+        assert allowed == 10
+
+    run(scenario())
+
+
+def test_leases_batch_redis_round_trips():
+    async def scenario():
+        limiter = CountingLimiter(fakeredis.FakeAsyncRedis(), lease_size=10, lease_ttl=60)
+        results = await acquire_many(limiter, 200, limit=200)
+
+        assert all(result.allowed for result in results)
+        assert limiter.calls == 20
+        assert not (await limiter.acquire("client:/api", 200, 60)).allowed
+
+    run(scenario())
+
+
+def test_leases_never_exceed_global_quota():
+    async def scenario():
+        redis = fakeredis.FakeAsyncRedis()
+        instances = [GCRARateLimiter(redis, lease_size=10, lease_ttl=60) for _ in range(3)]
+        allowed = 0
+        for _ in range(100):
+            for instance in instances:
+                allowed += (await instance.acquire("k", 100, 60)).allowed
+        assert allowed == 100
+
+    run(scenario())
+
+
+def test_lease_takes_partial_remainder():
+    async def scenario():
+        limiter = CountingLimiter(fakeredis.FakeAsyncRedis(), lease_size=10, lease_ttl=60)
+        # 105 jetons : dix leases complets puis un lease partiel de 5
+        results = await acquire_many(limiter, 106, limit=105)
+
+        assert [result.allowed for result in results] == [True] * 105 + [False]
+        assert limiter.calls == 12
+
+    run(scenario())
+
+
+def test_concurrent_requests_share_one_lease():
+    async def scenario():
+        limiter = CountingLimiter(fakeredis.FakeAsyncRedis(), lease_size=10, lease_ttl=60)
+        results = await asyncio.gather(*(limiter.acquire("k", 100, 60) for _ in range(10)))
+
+        assert all(result.allowed for result in results)
+        assert limiter.calls == 1
+
+    run(scenario())
+
+
+def test_expired_lease_is_not_used():
+    async def scenario():
+        limiter = CountingLimiter(fakeredis.FakeAsyncRedis(), lease_size=10, lease_ttl=0.05)
+        await limiter.acquire("k", 1000, 60)
+        await asyncio.sleep(0.06)
+        await limiter.acquire("k", 1000, 60)
+
+        assert limiter.calls == 2
+
+    run(scenario())
+
+
+def test_low_limits_are_not_leased():
+    limiter = GCRARateLimiter(fakeredis.FakeAsyncRedis(), lease_size=10)
+    assert limiter._lease_size_for(1000) == 10
+    assert limiter._lease_size_for(50) == 5
+    assert limiter._lease_size_for(9) == 0
+
+
+def test_allowed_result_headers_have_no_retry_after():
+    result = rate_limiter.RateLimitResult(allowed=True, limit=10, remaining=-1, reset_after=5)
+    headers = result.headers(60)
+
+    assert "Retry-After" not in headers
+    assert headers["X-RateLimit-Remaining"] == "0"
+    assert int(headers["X-RateLimit-Reset"]) == pytest.approx(time.time() + 5, abs=1)
@@ -0,0 +1,182 @@
+"""Tests of the assignment solver backends against linear_sum_assignment."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+sp = pytest.importorskip("scipy.sparse")
+from scipy.optimize import linear_sum_assignment  # noqa: E402
+
+from tests.helpers import namespace_package  # noqa: E402
+
+namespace_package("matching", "matching")
+
+from matching.assignment_solvers import (  # noqa: E402
+    AssignmentSolver, AuctionSolver, AutoSolver, LinearSumAssignmentSolver, assignment_cost, get_solver
+)
+
+
+def exact_auction(shape):
+    """Auction exact on integer costs: epsilon below 1 / (rows + cols)."""
+    return AuctionSolver(top_k=None, epsilon_final=0.5 / (sum(shape) + 1))
+
+
+def brute_force(cost_matrix):
+    """(assigned pairs, cost): most feasible pairs first, then lowest cost."""
+    num_rows, num_cols = cost_matrix.shape
+    best = (0, 0.0)
+    for choice in itertools.product(range(-1, num_cols), repeat=num_rows):
+        cols = [col for col in choice if col >= 0]
+        if len(cols) != len(set(cols)):
+            continue
+        costs = [cost_matrix[row, col] for row, col in enumerate(choice) if col >= 0]
+        if not np.all(np.isfinite(costs)):
+            continue
+        candidate = (len(costs), float(np.sum(costs)))
+        if candidate[0] > best[0] or (candidate[0] == best[0] and candidate[1] < best[1]):
+            best = candidate
+    return best
+
+
+def check_assignment(rows, cols, shape, capacities=None):
+    assert rows.size == cols.size
+    assert np.all(np.diff(rows) > 0), "rows must be unique and sorted"
+    assert np.all((cols >= 0) & (cols < shape[1]))
+    counts = np.bincount(cols, minlength=shape[1])
+    assert np.all(counts <= (1 if capacities is None else np.asarray(capacities)))
+
+
+@pytest.mark.parametrize("shape", [(40, 40), (25, 60), (60, 25), (1, 7), (7, 1)])
+@pytest.mark.parametrize("solver_name", ["lsa", "auction"])
+def test_integer_costs_match_linear_sum_assignment(solver_name, shape):
+    rng = np.random.default_rng(sum(shape))
+    cost_matrix = rng.integers(0, 100, shape).astype(float)
+    solver = LinearSumAssignmentSolver() if solver_name == "lsa" else exact_auction(shape)
+
+    rows, cols = solver.solve(cost_matrix)
+
+    check_assignment(rows, cols, shape)
+    ref_rows, ref_cols = linear_sum_assignment(cost_matrix)
+    assert rows.size == ref_rows.size == min(shape)
+    assert assignment_cost(cost_matrix, rows, cols) == pytest.approx(cost_matrix[ref_rows, ref_cols].sum())
+
+
+@pytest.mark.parametrize("shape", [(50, 50), (30, 70)])
+def test_default_auction_is_within_epsilon_bound(shape):
+    rng = np.random.default_rng(7)
+    cost_matrix = rng.random(shape)
+    solver = AuctionSolver(top_k=None)
+
+    rows, cols = solver.solve(cost_matrix)
+
+    ref_rows, ref_cols = linear_sum_assignment(cost_matrix)
+    # (rows + cols) * epsilon_final, with the default epsilon_final
+    bound = (cost_matrix.max() - cost_matrix.min()) / 10
+    assert rows.size == min(shape)
+    assert assignment_cost(cost_matrix, rows, cols) - cost_matrix[ref_rows, ref_cols].sum() <= bound + 1e-9
+    assert solver.iterations > 0 and solver.num_edges == cost_matrix.size
+
+
+@pytest.mark.parametrize("seed", range(12))
+@pytest.mark.parametrize("solver_name", ["lsa", "auction"])
+def test_forbidden_pairs_maximize_feasible_pairs(solver_name, seed):
+    rng = np.random.default_rng(seed)
+    shape = tuple(rng.integers(1, 6, 2))
+    cost_matrix = rng.integers(0, 20, shape).astype(float)
+    cost_matrix[rng.random(shape) < 0.5] = np.inf
+    cost_matrix[rng.random(shape) < 0.1] = np.nan
+    solver = LinearSumAssignmentSolver() if solver_name == "lsa" else exact_auction(shape)
+
+    rows, cols = solver.solve(cost_matrix)
+
+    check_assignment(rows, cols, shape)
+    assert np.all(np.isfinite(cost_matrix[rows, cols]))
+    expected_pairs, expected_cost = brute_force(cost_matrix)
+    assert rows.size == expected_pairs
+    assert assignment_cost(cost_matrix, rows, cols) == pytest.approx(expected_cost)
+
+
+@pytest.mark.parametrize("solver_name", ["lsa", "auction"])
+def test_sparse_input_matches_dense_with_forbidden_pairs(solver_name):
+    rng = np.random.default_rng(3)
+    sparse = sp.random(30, 40, density=0.15, format="csr", random_state=3,
+                       data_rvs=lambda size: rng.integers(1, 50, size).astype(float))
+    dense = np.full(sparse.shape, np.inf)
+    coo = sparse.tocoo()
+    dense[coo.row, coo.col] = coo.data
+    solver = LinearSumAssignmentSolver() if solver_name == "lsa" else exact_auction(sparse.shape)
+
+    rows, cols = solver.solve(sparse)
+
+    check_assignment(rows, cols, sparse.shape)
+    ref_rows, ref_cols = LinearSumAssignmentSolver().solve(dense)
+    assert rows.size == ref_rows.size
+    assert assignment_cost(sparse, rows, cols) == pytest.approx(assignment_cost(dense, ref_rows, ref_cols))
+
+
+@pytest.mark.parametrize("solver_name", ["lsa", "auction"])
+def test_capacities_match_repeated_columns(solver_name):
+    rng = np.random.default_rng(11)
+    cost_matrix = rng.integers(0, 50, (30, 8)).astype(float)
+    capacities = np.array([1, 2, 3, 0, 4, 1, 2, 5])
+    slots = np.repeat(np.arange(8), capacities)
+    solver = LinearSumAssignmentSolver() if solver_name == "lsa" else exact_auction((30, slots.size))
+
+    rows, cols = solver.solve(cost_matrix, capacities)
+
+    check_assignment(rows, cols, cost_matrix.shape, capacities)
+    ref_rows, ref_cols = linear_sum_assignment(cost_matrix[:, slots])
+    assert rows.size == ref_rows.size == capacities.sum()
+    assert assignment_cost(cost_matrix, rows, cols) == pytest.approx(cost_matrix[:, slots][ref_rows, ref_cols].sum())
+
+
+def test_top_k_prunes_edges():
+    cost_matrix = np.random.default_rng(5).random((20, 30))
+    graph = AuctionSolver(top_k=4).sparse_graph(cost_matrix)
+
+    assert graph.nnz == 20 * 4
+    for row in range(20):
+        kept = np.sort(graph.getrow(row).data)
+        np.testing.assert_allclose(kept, np.sort(cost_matrix[row])[:4])
+
+
+def test_empty_and_fully_forbidden_problems():
+    for solver in (LinearSumAssignmentSolver(), AuctionSolver()):
+        for cost_matrix in (np.zeros((0, 3)), np.full((3, 2), np.inf)):
+            rows, cols = solver.solve(cost_matrix)
+            assert rows.size == cols.size == 0
+
+
+def test_capacities_must_match_columns():
+    with pytest.raises(ValueError):
+        LinearSumAssignmentSolver().solve(np.zeros((2, 3)), capacities=[1, 1])
+    with pytest.raises(ValueError):
+        LinearSumAssignmentSolver().solve(np.zeros((2, 2)), capacities=[1, -1])
+
+
+def test_get_solver_and_auto_selection():
+    assert isinstance(get_solver("lsa"), LinearSumAssignmentSolver)
+    assert get_solver("auction", top_k=3).top_k == 3
+    instance = AuctionSolver()
+    assert get_solver(instance) is instance
+    with pytest.raises(ValueError):
+        get_solver("simplex")
+
+    solver = AutoSolver(dense_limit=100, top_k=None)
+    solver.solve(np.random.default_rng(0).random((10, 10)))
+    assert solver.last_solver is solver.dense_solver
+    solver.solve(np.random.default_rng(0).random((10, 11)))
+    assert solver.last_solver is solver.auction_solver
+    assert solver.select(np.zeros((10, 5)), capacities=[3] * 5) is solver.auction_solver
+
+
+def test_assignment_solver_is_abstract():
+    with pytest.raises(TypeError):
+        AssignmentSolver()
+
+    class Incomplete(AssignmentSolver):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
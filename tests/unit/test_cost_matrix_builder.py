@@ -0,0 +1,208 @@
+"""Tests of the vectorized cost matrix builder against a pairwise reference."""
+
+import math
+
+import numpy as np
+import pytest
+
+from tests.helpers import add_path
+
+add_path("optimizers")
+
+from cost_matrix_builder import DEFAULT_COST_WEIGHTS, VectorizedCostMatrixBuilder  # noqa: E402
+
+SKILLS = ["python", "sql", "docker", "react", "java", "excel", "spark", "aws"]
+
+
+def reference_similarity(resource, task, similarity):
+    """Skill similarity of one pair, computed skill by skill."""
+    if similarity == "coverage":
+        if not task:
+            return 1.0
+        top = max(resource.values()) if resource else 1.0
+        total = sum(task.values())
+        value = sum(resource[name] / top * weight / total for name, weight in task.items() if name in resource)
+    else:
+        if not resource or not task:
+            return 0.0
+        norm = math.sqrt(sum(w * w for w in resource.values())) * math.sqrt(sum(w * w for w in task.values()))
+        value = sum(resource[name] * weight for name, weight in task.items() if name in resource) / norm
+    return min(max(value, 0.0), 1.0)
+
+
+def haversine(a, b):
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * 6371.0088 * math.asin(math.sqrt(h))
+
+
+def reference_costs(resources, tasks, preferences=None, context=None, similarity="coverage",
+                    max_distance_km=100.0, weights=DEFAULT_COST_WEIGHTS):
+    """Cost of every pair, one pair at a time."""
+    context = context or {}
+    workloads = context.get("workloads")
+    costs = np.zeros((len(resources), len(tasks)))
+    for i, resource in enumerate(resources):
+        for j, task in enumerate(tasks):
+            cost = weights["skill_match"] * (1 - reference_similarity(resource, task, similarity))
+            if preferences is not None:
+                row = preferences[i]
+                span = max(row) - min(row)
+                normalized = (row[j] - min(row)) / span if span > 0 else 0.5
+                cost += weights["preference_match"] * (1 - normalized)
+            if workloads is not None:
+                span = max(workloads) - min(workloads)
+                normalized = (workloads[i] - min(workloads)) / span if span > 0 else 0.5
+                cost += weights["workload_balance"] * normalized
+            if "resource_locations" in context:
+                a, b = context["resource_locations"][i], context["task_locations"][j]
+                location = 0.5 if a is None or b is None else min(haversine(a, b) / max_distance_km, 1.0)
+                cost += weights["location_match"] * location
+            if "salary_expectations" in context:
+                expectation = context["salary_expectations"][i]
+                salary_range = context["salary_ranges"][j]
+                maximum = max(salary_range) if isinstance(salary_range, tuple) else salary_range
+                if expectation and maximum is not None:
+                    cost += weights["salary_match"] * min(max(1 - maximum / expectation, 0.0), 1.0)
+            costs[i, j] = cost
+    return costs
+
+
+def random_skill_sets(rng, count, empty_share=0.1):
+    skill_sets = []
+    for _ in range(count):
+        if rng.random() < empty_share:
+            skill_sets.append({})
+            continue
+        names = rng.choice(SKILLS, size=rng.integers(1, 5), replace=False)
+        skill_sets.append({str(name): float(rng.integers(1, 6)) for name in names})
+    return skill_sets
+
+
+@pytest.mark.parametrize("similarity", ["coverage", "cosine"])
+def test_skill_costs_match_pairwise_reference(similarity):
+    rng = np.random.default_rng(0)
+    resources, tasks = random_skill_sets(rng, 30), random_skill_sets(rng, 20)
+
+    costs = VectorizedCostMatrixBuilder(similarity=similarity, cache_size=0).build(resources, tasks)
+
+    np.testing.assert_allclose(costs, reference_costs(resources, tasks, similarity=similarity), atol=1e-12)
+
+
+def test_all_terms_match_pairwise_reference():
+    rng = np.random.default_rng(1)
+    resources, tasks = random_skill_sets(rng, 12), random_skill_sets(rng, 9)
+    preferences = rng.random((12, 9)).tolist()
+    preferences[3] = [0.4] * 9  # Flat row
+    context = {
+        "workloads": rng.integers(0, 10, 12).tolist(),
+        "resource_locations": [(48.85 + rng.random(), 2.35 + rng.random()) for _ in range(11)] + [None],
+        "task_locations": [(45.76 + 3 * rng.random(), 4.83 - 3 * rng.random()) for _ in range(9)],
+        "salary_expectations": [float(rng.integers(30, 60)) * 1000 for _ in range(11)] + [None],
+        "salary_ranges": [(35000.0, float(rng.integers(35, 65)) * 1000) for _ in range(8)] + [None],
+    }
+
+    costs = VectorizedCostMatrixBuilder(cache_size=0).build(resources, tasks, preferences, context)
+
+    np.testing.assert_allclose(costs, reference_costs(resources, tasks, preferences, context), atol=1e-9)
+
+
+def test_skill_set_formats_are_equivalent():
+    class Skill:
+        def __init__(self, name, level):
+            self.name, self.level = name, level
+
+    class SkillSet:
+        def __init__(self, skills):
+            self.skills = skills
+
+    builder = VectorizedCostMatrixBuilder(cache_size=0)
+    as_dicts = builder.build([{"Python": 3, "SQL": 1}], [{"python": 1, "docker": 1}])
+    as_tuples = builder.build([[("python", 3), ("sql", 1)]], [["python", "docker"]])
+    as_objects = builder.build([SkillSet([Skill("python", 3), Skill("sql", 1)])],
+                               [SkillSet([Skill("python", 1), Skill("docker", 1)])])
+
+    np.testing.assert_allclose(as_dicts, as_tuples)
+    np.testing.assert_allclose(as_dicts, as_objects)
+    np.testing.assert_allclose(as_dicts, [[0.6 * 0.5]])
+
+
+class Profile:
+    """Skill set of a stored candidate or job: identifier and version."""
+
+    def __init__(self, id, skills, version=1):
+        self.id, self.skills, self.version = id, skills, version
+
+
+def test_unidentified_skill_sets_are_not_cached():
+    builder = VectorizedCostMatrixBuilder()
+
+    builder.build([{"a": 1}], [{"a": 1}])
+    builder.build([Profile(1, {"a": 1}, version=None)], [Profile(2, {"a": 1})])
+    builder.build([{"a": 1}], [{"a": 1}], context={"resource_ids": ["r1"]})
+    builder.build([{"a": 1}], [{"a": 1}], context={"resource_ids": ["r1", "r2"], "task_ids": ["t1"]})
+
+    assert builder.cache_info()["size"] == 0
+
+
+def test_cache_hits_skip_skill_encoding(monkeypatch):
+    builder = VectorizedCostMatrixBuilder()
+    encodings = []
+    encode = builder._encode_skills
+    monkeypatch.setattr(builder, "_encode_skills", lambda *args: encodings.append(1) or encode(*args))
+    resources, tasks = [Profile(1, {"a": 1}), Profile(2, {"b": 1})], [Profile(10, {"a": 1})]
+    # Explicit identifiers, e.g. (candidate_id, updated_at), work for plain skill mappings too
+    context = {"resource_ids": [(1, "2026-01-01"), (2, "2026-01-01")], "task_ids": [(10, "2026-01-01")]}
+
+    first = builder.build(resources, tasks)
+    from_ids = builder.build([{"a": 1}, {"b": 1}], [{"a": 1}], context=context)
+    np.testing.assert_allclose(builder.build(resources, tasks), first)
+    np.testing.assert_allclose(builder.build([{"a": 1}, {"b": 1}], [{"a": 1}], context=context), from_ids)
+
+    np.testing.assert_allclose(from_ids, first)
+    assert len(encodings) == 2
+    assert builder.cache_info()["size"] == 2
+
+
+def test_new_version_invalidates_cached_similarity():
+    builder = VectorizedCostMatrixBuilder()
+    tasks = [Profile(10, {"a": 1})]
+    builder.build([Profile(1, {"a": 1})], tasks)
+
+    updated = builder.build([Profile(1, {"b": 1}, version=2)], tasks)
+
+    np.testing.assert_allclose(updated, [[0.6]])
+
+
+def test_cache_distinguishes_context_terms():
+    builder = VectorizedCostMatrixBuilder()
+    resources, tasks = [Profile(1, {"a": 1}), Profile(2, {"b": 1})], [Profile(10, {"a": 1})]
+
+    first = builder.build(resources, tasks, context={"workloads": [0, 1]})
+    second = builder.build(resources, tasks, context={"workloads": [1, 0]})
+
+    np.testing.assert_allclose(first[:, 0], [0.0, 0.7])
+    np.testing.assert_allclose(second[:, 0], [0.1, 0.6])
+    assert builder.cache_info()["size"] == 1
+
+
+def test_cache_hits_return_copies_and_are_bounded():
+    builder = VectorizedCostMatrixBuilder(cache_size=2)
+    resources, tasks = [Profile(1, {"a": 1})], [Profile(10, {"a": 1}), Profile(11, {"b": 1})]
+
+    first = builder.build(resources, tasks)
+    first[0, 0] = 99.0
+    np.testing.assert_allclose(builder.build(resources, tasks), [[0.0, 0.6]])
+
+    builder.build([Profile(2, {"b": 1})], tasks)
+    builder.build([Profile(3, {"c": 1})], tasks)
+    assert builder.cache_info() == {"size": 2, "max_size": 2}
+    builder.clear_cache()
+    assert builder.cache_info()["size"] == 0
+
+
+def test_empty_problems():
+    builder = VectorizedCostMatrixBuilder()
+    assert builder.build([], [{"a": 1}]).shape == (0, 1)
+    assert builder.build([{"a": 1}], []).shape == (1, 0)
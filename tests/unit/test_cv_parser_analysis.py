@@ -0,0 +1,208 @@
+"""Tests de l'analyse LLM du parser CV : décodage et mise en cache des réponses, analyse des CV longs par sections."""
+
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+with pytest.MonkeyPatch.context() as patch:
+    # Le paquet app crée le client OpenAI à l'import
+    patch.setenv("OPENAI_API_KEY", "sk-test")
+    parser = import_from_service("app.services.parser", "cv-parser-service")
+
+llm_cache = parser.cached_llm_call.__globals__
+cv_chunking = parser.build_cv_chunks.__globals__
+settings = parser.settings
+
+CV_TEXT = "Jean Dupont\nDéveloppeur Python\nExpérience : 5 ans chez Acme, Django et PostgreSQL.\n" * 2
+
+
+class ScriptedBackend:
+    """Backend LLM renvoyant des réponses prédéfinies, dans l'ordre."""
+
+    name = "scripted"
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def complete(self, prompt, mock_response, usage, **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setitem(llm_cache, "_redis_client", fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setitem(llm_cache, "llm_metrics", llm_cache["LLMMetrics"]())
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "CV_CHUNKED_PARSING", False)
+
+    def install(*responses):
+        scripted = ScriptedBackend(*responses)
+        monkeypatch.setitem(llm_cache, "get_llm_backend", lambda: scripted)
+        return scripted
+
+    return install
+
+
+def cached_keys():
+    return llm_cache["_redis_client"].keys(f"{llm_cache['CACHE_KEY_PREFIX']}:*")
+
+
+@pytest.mark.parametrize("response, expected", [
+    ('{"position": "Dev"}', {"position": "Dev"}),
+    ('Voici le résultat : {"position": "Dev"} en espérant avoir aidé.', {"position": "Dev"}),
+    ('```json\n{"position": "Dev"}\n```', {"position": "Dev"}),
+    ('["Dev"]', None),
+    ('{"position": "Dev"', None),
+    ("Désolé, je ne peux pas répondre.", None),
+])
+def test_parse_json_response(response, expected):
+    assert parser.parse_json_response(response) == expected
+
+
+def test_invalid_response_is_not_cached(backend):
+    scripted = backend("Désolé, je ne peux pas répondre.", '{"position": "Dev"}')
+
+    first = parser.analyze_cv_with_gpt(CV_TEXT)
+    assert first["error"] == "Format JSON invalide dans la réponse"
+    assert cached_keys() == []
+
+    # Le second appel interroge de nouveau le modèle au lieu de resservir l'erreur
+    assert parser.analyze_cv_with_gpt(CV_TEXT) == {"position": "Dev"}
+    assert scripted.calls == 2
+    assert len(cached_keys()) == 1
+
+
+def test_valid_response_is_served_from_cache(backend):
+    scripted = backend('```json\n{"position": "Dev"}\n```')
+
+    assert parser.analyze_cv_with_gpt(CV_TEXT) == {"position": "Dev"}
+    assert parser.analyze_cv_with_gpt(CV_TEXT) == {"position": "Dev"}
+    assert scripted.calls == 1
+
+
+def test_batch_response_with_wrong_count_is_not_cached(backend):
+    texts = [CV_TEXT, CV_TEXT.replace("Jean", "Marie")]
+    individual = [json.dumps({"position": f"Dev {i}"}) for i in range(2)]
+    scripted = backend(json.dumps([{"position": "Dev"}]), *individual)
+
+    # Réponse groupée incohérente : repli sur l'analyse individuelle
+    assert parser.analyze_cv_batch_with_gpt(texts) == [{"position": "Dev 0"}, {"position": "Dev 1"}]
+    assert scripted.calls == 3
+    assert not any(":cv_batch:" in key for key in cached_keys())
+    assert len(cached_keys()) == 2
+
+
+# ----------------------------------------------------------------------
+# CV longs : découpage par sections et fusion
+# ----------------------------------------------------------------------
+
+LONG_CV = "\n".join([
+    "Marie Curie",
+    "marie@example.com - 06 12 34 56 78",
+    "Expériences professionnelles",
+    *[f"Poste {i} - Entreprise {i} - 20{10 + i} : " + "missions " * 12 for i in range(6)],
+    "Formation",
+    "Master Physique - Sorbonne",
+    "Compétences",
+    "Python, Django, PostgreSQL",
+    "Langues :",
+    "Anglais courant (C1), allemand intermédiaire (B1), espagnol notions",
+])
+
+
+def test_split_cv_sections_keeps_document_order():
+    sections = cv_chunking["split_cv_sections"](LONG_CV)
+
+    assert [name for name, _ in sections] == ["header", "experience", "education", "skills", "languages"]
+    assert sections[0][1] == ["Marie Curie", "marie@example.com - 06 12 34 56 78"]
+    assert sections[1][1][0] == "Expériences professionnelles" and len(sections[1][1]) == 7
+    # Une ligne longue qui commence comme un titre n'en est pas un
+    assert cv_chunking["_section_of_heading"]("Formation continue en gestion de projet, management et leadership "
+                                              "d'équipes pluridisciplinaires") == ""
+
+
+def test_build_cv_chunks_respects_budget_and_loses_nothing():
+    chunks = parser.build_cv_chunks(LONG_CV, 400)
+
+    assert len(chunks) > 2 and all(len(chunk) <= 400 for chunk in chunks)
+    assert chunks[0].startswith("Marie Curie\n")
+    # La section d'expériences découpée répète son titre
+    assert sum(chunk.count("Expériences professionnelles") for chunk in chunks) > 1
+    lines = [line for chunk in chunks for line in chunk.split("\n")
+             if line and not line.endswith("(suite)")]
+    assert [line for line in lines if line != "Expériences professionnelles"] == \
+        [line for line in LONG_CV.split("\n") if line != "Expériences professionnelles"]
+
+    # Budget suffisant : un seul morceau, sections séparées par une ligne vide
+    [single] = parser.build_cv_chunks(LONG_CV, 2 * len(LONG_CV))
+    assert [line for line in single.split("\n") if line] == LONG_CV.split("\n")
+
+
+def test_merge_partial_results_deduplicates_in_document_order():
+    partials = [
+        {"personal_info": {"name": "Marie Curie", "email": ""}, "position": "",
+         "skills": ["Python", {"name": "django"}], "experience": []},
+        {"error": "Format JSON invalide dans la réponse", "skills": ["Fortran"]},
+        {"personal_info": {"name": "M. Curie", "email": "marie@example.com"}, "position": "Physicienne",
+         "skills": [" python ", "Django", "PostgreSQL"],
+         "experience": [{"title": "Poste 1", "company": "Entreprise 1", "start_date": "2011"},
+                        {"title": "poste 1", "company": "ENTREPRISE 1", "start_date": "2011"}]},
+    ]
+
+    merged = parser.merge_partial_results(partials)
+
+    assert merged["personal_info"] == {"name": "Marie Curie", "email": "marie@example.com"}
+    assert merged["position"] == "Physicienne"
+    assert merged["skills"] == ["Python", {"name": "django"}, "PostgreSQL"]
+    assert merged["experience"] == [{"title": "Poste 1", "company": "Entreprise 1", "start_date": "2011"}]
+    assert parser.merge_partial_results(partials[1:2]) == partials[1]
+
+
+def test_long_cv_is_analyzed_by_chunk_when_enabled(backend, monkeypatch):
+    monkeypatch.setattr(settings, "CV_CHUNKED_PARSING", True)
+    monkeypatch.setattr(settings, "CV_CHUNK_THRESHOLD", 500)
+    monkeypatch.setattr(settings, "CV_CHUNK_MAX_CHARS", 400)
+    chunks = parser.build_cv_chunks(LONG_CV, 400)
+    responses = {chunk: json.dumps({"skills": [f"s{i}", "commun"]}) for i, chunk in enumerate(chunks)}
+
+    class PerChunkBackend(ScriptedBackend):
+        def complete(self, prompt, mock_response, usage, **kwargs):
+            self.calls += 1
+            return next(response for chunk, response in responses.items() if chunk in prompt)
+
+    monkeypatch.setitem(llm_cache, "get_llm_backend", lambda: PerChunkBackend())
+
+    merged = parser.analyze_cv_with_gpt(LONG_CV)
+
+    assert len(chunks) == 4
+    # Fusion dans l'ordre du document, doublons retirés
+    assert merged["skills"] == ["s0", "commun", "s1", "s2", "s3"]
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_short_cv_path_is_unchanged(backend, monkeypatch, chunked):
+    monkeypatch.setattr(settings, "CV_CHUNKED_PARSING", chunked)
+    prompts = []
+
+    class RecordingBackend(ScriptedBackend):
+        def complete(self, prompt, mock_response, usage, **kwargs):
+            prompts.append(prompt)
+            return '{"position": "Dev"}'
+
+    monkeypatch.setitem(llm_cache, "get_llm_backend", lambda: RecordingBackend())
+
+    assert parser.analyze_cv_with_gpt(LONG_CV) == {"position": "Dev"}
+    # Sous le seuil, un seul appel avec le prompt complet, que l'option soit active ou non
+    assert prompts == [parser.render_prompt(parser.CV_PROMPT_TEMPLATE, cv_text=LONG_CV)]
+    assert len(LONG_CV) < settings.CV_CHUNK_THRESHOLD
+
+
+def test_chunked_parsing_is_disabled_by_default():
+    assert type(settings).model_fields["CV_CHUNKED_PARSING"].default is False
@@ -0,0 +1,122 @@
+"""Tests de la progression des batchs du parser CV : compteurs idempotents quand RQ rejoue un groupe."""
+
+import sys
+import types
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("rq")
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+with pytest.MonkeyPatch.context() as patch:
+    # Le paquet app crée le client OpenAI à l'import
+    patch.setenv("OPENAI_API_KEY", "sk-test")
+    tasks = import_from_service("app.workers.tasks", "cv-parser-service")
+
+settings = tasks.settings
+
+BATCH_ID = "batch-1"
+
+
+def documents(*job_ids):
+    return [
+        {"job_id": job_id, "file_path": f"{job_id}.pdf", "file_name": f"{job_id}.pdf", "file_format": ".pdf"}
+        for job_id in job_ids
+    ]
+
+
+class Worker:
+    """Dépendances de parse_cv_batch_task : extraction, analyse, stockage et webhook."""
+
+    def __init__(self):
+        self.failing = set()
+        self.stored = {}
+        self.webhooks = []
+
+    def extract_texts_parallel(self, documents):
+        return [
+            {"text": f"CV {document['job_id']}",
+             "error": "PDF illisible" if document["job_id"] in self.failing else None}
+            for document in documents
+        ]
+
+    def analyze_texts(self, texts, file_names):
+        return [{"position": text} for text in texts]
+
+    def store(self, job_id, result, status, **kwargs):
+        self.stored[job_id] = status
+        return True
+
+    def send_webhook(self, job_id, url, data, secret=""):
+        self.webhooks.append((job_id, data))
+        return True
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = Worker()
+    redis_conn = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    monkeypatch.setattr(tasks, "redis_conn", redis_conn)
+    monkeypatch.setattr(tasks, "store_result_multi_tier_sync", worker.store)
+    monkeypatch.setattr(tasks, "send_webhook", worker.send_webhook)
+    monkeypatch.setattr(settings, "CLEANUP_TEMP_FILES", False)
+    monkeypatch.setitem(sys.modules, "app.services.batch_parser", types.SimpleNamespace(
+        extract_texts_parallel=worker.extract_texts_parallel,
+        analyze_texts=worker.analyze_texts
+    ))
+    # État initial posé par POST /batch
+    redis_conn.hset(f"cv:batch:{BATCH_ID}", mapping={"status": "queued", "total": 4, "completed": 0, "failed": 0})
+    worker.redis = redis_conn
+    return worker
+
+
+def run(group):
+    return tasks.parse_cv_batch_task(BATCH_ID, group, webhook_url="https://example.com/hook")
+
+
+def progress(worker):
+    stored = worker.redis.hgetall(f"cv:batch:{BATCH_ID}")
+    return {key.decode(): value.decode() for key, value in stored.items()}
+
+
+def test_retried_group_is_counted_once(worker):
+    run(documents("a", "b"))
+    # RQ rejoue le groupe (timeout, worker arrêté après la mise à jour de la progression)
+    run(documents("a", "b"))
+
+    assert tasks.update_batch_progress(BATCH_ID)["completed"] == 2
+    assert progress(worker)["completed"] == "2"
+    assert worker.webhooks == []
+
+    run(documents("c", "d"))
+
+    state = progress(worker)
+    assert (state["completed"], state["failed"], state["status"]) == ("4", "0", "done")
+    assert len(worker.webhooks) == 1
+
+
+def test_retry_moves_document_from_failed_to_completed(worker):
+    worker.failing = {"b"}
+    assert run(documents("a", "b")) == {"batch_id": BATCH_ID, "succeeded": 1, "failed": 1}
+    assert (progress(worker)["completed"], progress(worker)["failed"]) == ("1", "1")
+
+    worker.failing = set()
+    run(documents("a", "b"))
+
+    assert (progress(worker)["completed"], progress(worker)["failed"]) == ("2", "0")
+    assert worker.stored == {"a": "completed", "b": "completed"}
+
+
+def test_batch_is_closed_once_when_last_group_is_replayed(worker):
+    run(documents("a", "b"))
+    run(documents("c", "d"))
+    finished_at = progress(worker)["finished_at"]
+
+    run(documents("c", "d"))
+
+    assert progress(worker)["finished_at"] == finished_at
+    assert len(worker.webhooks) == 1
+    assert worker.webhooks[0][1]["completed"] == 4
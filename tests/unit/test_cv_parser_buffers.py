@@ -0,0 +1,187 @@
+"""Tests de l'extraction de texte en mémoire (cv-parser-service, backend) face à l'extraction d'origine par fichier."""
+
+import io
+import json
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+with pytest.MonkeyPatch.context() as patch:
+    # Le paquet app crée le client OpenAI à l'import
+    patch.setenv("OPENAI_API_KEY", "sk-test")
+    parser = import_from_service("app.services.parser", "cv-parser-service")
+
+EXTRACTION_IO_STATS = parser.EXTRACTION_IO_STATS
+
+# ----------------------------------------------------------------------
+# Documents de test
+# ----------------------------------------------------------------------
+
+TXT_CONTENT = "Jeanne Dupont\r\nComptable confirmée à Nantes\r\nExpérience : 5 ans\rSAP, Excel\r\n".encode("latin-1")
+
+RTF_CONTENT = (b"{\\rtf1\\ansi\\deff0 {\\fonttbl {\\f0 Times;}}\r\n"
+               b"\\f0 Jeanne Dupont\\par\r\nComptable \\b confirm\\'e9e\\b0\\par\r\n}")
+
+
+def build_pdf(lines):
+    """PDF minimal d'une page (police Helvetica), table xref aux bons décalages"""
+    stream = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        "/Resources << /Font << /F1 5 0 R >> >> >>",
+        f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    content = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(content))
+        content += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(content)
+    content += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    content += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    content += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return content
+
+
+def build_docx():
+    docx = pytest.importorskip("docx")
+    document = docx.Document()
+    document.add_paragraph("Jeanne Dupont")
+    document.add_paragraph("Comptable confirmée à Nantes")
+    table = document.add_table(rows=2, cols=2)
+    for row, values in zip(table.rows, [("Logiciel", "Niveau"), ("SAP", "Expert")]):
+        for cell, value in zip(row.cells, values):
+            cell.text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.fixture(params=[".pdf", ".docx", ".txt", ".rtf"])
+def document(request, tmp_path):
+    if request.param == ".pdf":
+        pytest.importorskip("PyPDF2")
+        content = build_pdf(["Jeanne Dupont", "Comptable confirmee a Nantes", "SAP, Excel"])
+    elif request.param == ".docx":
+        content = build_docx()
+    elif request.param == ".txt":
+        content = TXT_CONTENT
+    else:
+        pytest.importorskip("striprtf")
+        content = RTF_CONTENT
+    path = tmp_path / f"cv{request.param}"
+    path.write_bytes(content)
+    return request.param, content, str(path)
+
+
+# ----------------------------------------------------------------------
+# Extracteurs d'origine : lecture depuis un fichier
+# ----------------------------------------------------------------------
+
+def legacy_extract(file_format, file_path):
+    if file_format == ".pdf":
+        from PyPDF2 import PdfReader
+        with open(file_path, "rb") as file:
+            text = ""
+            for page in PdfReader(file).pages:
+                extracted_text = page.extract_text()
+                if extracted_text:
+                    text += extracted_text + "\n"
+            return text
+    if file_format == ".docx":
+        import docx
+        doc = docx.Document(file_path)
+        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    text += cell.text + " "
+                text += "\n"
+        return text
+    if file_format == ".txt":
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                return file.read()
+        except UnicodeDecodeError:
+            with open(file_path, "r", encoding="latin-1") as file:
+                return file.read()
+    from striprtf.striprtf import rtf_to_text
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
+        return rtf_to_text(file.read())
+
+
+# ----------------------------------------------------------------------
+# Même texte depuis un buffer, un flux ou un chemin
+# ----------------------------------------------------------------------
+
+def test_in_memory_extraction_matches_file_extraction(document):
+    file_format, content, path = document
+    expected = legacy_extract(file_format, path)
+    assert expected.strip()
+
+    assert parser.extract_text_from_file(content, file_format) == expected
+    assert parser.extract_text_from_file(io.BytesIO(content), file_format) == expected
+    assert parser.extract_text_from_file(path, file_format) == expected
+
+
+def test_in_memory_extraction_writes_no_temp_file(document):
+    file_format, content, _ = document
+    before = dict(EXTRACTION_IO_STATS)
+
+    parser.extract_text_from_file(content, file_format)
+
+    assert EXTRACTION_IO_STATS["temp_files_written"] == before["temp_files_written"]
+    assert EXTRACTION_IO_STATS["in_memory_documents"] == before["in_memory_documents"] + 1
+    assert EXTRACTION_IO_STATS["in_memory_bytes"] == before["in_memory_bytes"] + len(content)
+
+
+def test_text_line_endings_are_normalized_like_text_mode():
+    text = parser.extract_text_from_file(TXT_CONTENT, ".txt")
+
+    assert "\r" not in text
+    assert text.splitlines()[1] == "Comptable confirmée à Nantes"
+
+
+def test_in_memory_source_requires_format():
+    with pytest.raises(ValueError):
+        parser.extract_text_from_file(TXT_CONTENT)
+
+
+# ----------------------------------------------------------------------
+# Backend : AdaptiveParser.extract_text_from_buffer
+# ----------------------------------------------------------------------
+
+@pytest.fixture
+def adaptive_parser(monkeypatch):
+    pytest.importorskip("magic")
+    pytest.importorskip("bs4")
+    pytest.importorskip("spacy")
+    module = import_from_service("app.nlp.adaptive_parser", "backend")
+    # Le classifieur (modèle spaCy) n'intervient pas dans l'extraction de texte
+    monkeypatch.setitem(module.AdaptiveParser.__init__.__globals__, "DocumentClassifier", lambda: None)
+    return module.AdaptiveParser()
+
+
+@pytest.mark.parametrize("file_name, content", [
+    ("cv.txt", TXT_CONTENT),
+    ("cv.html", b"<html><head><title>CV</title></head><body><p>Jeanne Dupont</p>\r\n"
+                b"<script>var x = 1;</script><p>Comptable</p></body></html>"),
+    ("cv.json", json.dumps({"nom": "Jeanne Dupont", "competences": ["SAP", "Excel"]},
+                           ensure_ascii=False).encode("utf-8")),
+    ("cv.xml", b"<cv><nom>Jeanne Dupont</nom>\n<poste>Comptable</poste></cv>"),
+])
+def test_adaptive_parser_buffer_matches_file(adaptive_parser, tmp_path, file_name, content):
+    path = tmp_path / file_name
+    path.write_bytes(content)
+    file_format = adaptive_parser.detect_file_format(str(path))
+
+    assert adaptive_parser.detect_buffer_format(content, file_name) == file_format
+    assert adaptive_parser.extract_text_from_buffer(content, file_name) == \
+        adaptive_parser.extract_text_from_file(str(path))
+    assert adaptive_parser.extract_text_from_buffer(content, format_name=file_format).strip()
@@ -0,0 +1,232 @@
+"""Tests du stockage multi-niveaux des résultats du parser CV : écriture durable, lots PostgreSQL et repli MinIO."""
+
+import json
+import threading
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("rq")
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+with pytest.MonkeyPatch.context() as patch:
+    # Le paquet app crée le client OpenAI à l'import
+    patch.setenv("OPENAI_API_KEY", "sk-test")
+    tasks = import_from_service("app.workers.tasks", "cv-parser-service")
+
+# Module storage importé par tasks (même instance que celle qu'il utilise)
+storage = tasks.write_result_tiers.__globals__
+settings = tasks.settings
+PostgresResultBatcher = storage["PostgresResultBatcher"]
+
+
+class FakeDatabase:
+    """Remplace upsert_results_postgres : journalise les lots, échoue à la demande."""
+
+    def __init__(self):
+        self.batches = []
+        self.failures = 0
+
+    def upsert(self, records):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.batches.append(list(records))
+        return True
+
+    @property
+    def rows(self):
+        return {record["job_id"]: record for batch in self.batches for record in batch}
+
+
+class FailingMinio:
+    def bucket_exists(self, bucket_name):
+        return True
+
+    def put_object(self, **kwargs):
+        raise ConnectionError("MinIO indisponible")
+
+
+class RecordingMinio(FailingMinio):
+    def __init__(self):
+        self.objects = {}
+
+    def put_object(self, bucket_name, object_name, data, length, content_type):
+        self.objects[object_name] = data.read()
+
+
+@pytest.fixture
+def database(monkeypatch):
+    db = FakeDatabase()
+    monkeypatch.setitem(storage, "upsert_results_postgres", db.upsert)
+    monkeypatch.setitem(storage, "SessionLocal", object())
+    monkeypatch.setitem(storage, "redis_client", fakeredis.FakeRedis())
+    monkeypatch.setitem(storage, "_batching_enabled", False)
+    monkeypatch.setattr(settings, "STORE_RESULTS_IN_POSTGRES", True)
+    monkeypatch.setattr(settings, "STORE_RESULTS_IN_REDIS", True)
+    monkeypatch.setattr(settings, "USE_MINIO_FOR_FILES", True)
+    monkeypatch.setattr(settings, "LARGE_RESULT_THRESHOLD", 100)
+    return db
+
+
+@pytest.fixture
+def batcher(monkeypatch, database):
+    # Intervalle long : seuls la taille de lot et les flush explicites déclenchent l'écriture
+    batcher = PostgresResultBatcher(batch_size=2, flush_interval=60, max_pending=3)
+    monkeypatch.setitem(storage, "postgres_batcher", batcher)
+    return batcher
+
+
+SMALL = {"data": {"name": "Ada"}}
+LARGE = {"data": {"summary": "x" * 500}}
+
+
+# ----------------------------------------------------------------------
+# Écriture durable avant la fin du job
+# ----------------------------------------------------------------------
+
+def test_classic_worker_writes_row_before_returning(database):
+    assert tasks.write_result_tiers("job-1", SMALL, processing_time=1.5)
+
+    assert len(database.batches) == 1
+    row = database.rows["job-1"]
+    assert json.loads(row["result_json"]) == SMALL
+    assert row["file_path"] is None and row["processing_time"] == 1.5
+    assert json.loads(storage["redis_client"].get("cv:result:job-1")) == SMALL
+
+
+def test_concurrent_jobs_share_one_upsert(batcher, database):
+    storage["set_result_batching"](True)
+    results = {}
+
+    def job(job_id):
+        results[job_id] = tasks.write_result_tiers(job_id, SMALL)
+
+    threads = [threading.Thread(target=job, args=(f"job-{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    # Chaque job n'a rendu la main qu'une fois le lot commun écrit
+    assert results == {"job-0": True, "job-1": True}
+    assert [sorted(r["job_id"] for r in batch) for batch in database.batches] == [["job-0", "job-1"]]
+
+
+def test_disabling_batching_flushes_pending_rows(batcher, database):
+    storage["set_result_batching"](True)
+    future = batcher.add({"job_id": "job-1"})
+    assert not future.done() and database.batches == []
+
+    storage["set_result_batching"](False)
+
+    assert future.result(0) is True
+    assert list(database.rows) == ["job-1"]
+    assert storage["_batching_enabled"] is False
+
+
+# ----------------------------------------------------------------------
+# Échec de l'upsert
+# ----------------------------------------------------------------------
+
+def test_failed_upsert_requeues_rows(batcher, database):
+    database.failures = 1
+    first = batcher.add({"job_id": "job-1", "status": "processing"})
+    second = batcher.add({"job_id": "job-1", "status": "completed"})
+
+    assert batcher.flush() is False
+    assert first.result(0) is False and second.result(0) is False
+    assert database.batches == []
+
+    later = batcher.add({"job_id": "job-2"})
+    assert batcher.flush() is True
+    assert later.result(0) is True
+    # Lignes remises avant les plus récentes : la dernière écriture d'un job gagne
+    assert [r["job_id"] for r in database.batches[0]] == ["job-1", "job-1", "job-2"]
+
+
+def test_requeue_is_bounded(batcher, database):
+    database.failures = 2
+    for i in range(2):
+        batcher.add({"job_id": f"ancien-{i}"})
+    batcher.flush()
+    for i in range(2):
+        batcher.add({"job_id": f"recent-{i}"})
+    batcher.flush()
+
+    # max_pending=3 : les plus anciens sont abandonnés en premier
+    assert [record["job_id"] for record, _ in batcher._pending] == ["ancien-1", "recent-0", "recent-1"]
+
+
+def test_failed_upsert_fails_the_store(database):
+    database.failures = 1
+    redis_conn = fakeredis.FakeRedis()
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(tasks, "redis_conn", redis_conn)
+        assert tasks.store_result_multi_tier_sync("job-1", SMALL) is False
+        assert redis_conn.exists("cv:meta:job-1") == 0
+
+        assert tasks.store_result_multi_tier_sync("job-1", SMALL) is True
+        assert redis_conn.hget("cv:meta:job-1", "status") == b"completed"
+
+
+def test_redis_alone_is_not_durable_when_postgres_is_configured(database):
+    database.failures = 1
+
+    assert tasks.write_result_tiers("job-1", SMALL) is False
+    assert storage["redis_client"].exists("cv:result:job-1")
+
+
+# ----------------------------------------------------------------------
+# Résultats volumineux et MinIO
+# ----------------------------------------------------------------------
+
+def test_large_result_row_points_to_minio_object(monkeypatch, database):
+    minio = RecordingMinio()
+    monkeypatch.setitem(storage, "minio_client", minio)
+
+    assert tasks.write_result_tiers("job-1", LARGE)
+
+    row = database.rows["job-1"]
+    assert row["result_json"] is None and row["file_path"] == "results/job-1.json"
+    assert json.loads(minio.objects["results/job-1.json"]) == LARGE
+
+
+def test_minio_failure_keeps_result_in_row(monkeypatch, database):
+    monkeypatch.setitem(storage, "minio_client", FailingMinio())
+
+    assert tasks.write_result_tiers("job-1", LARGE)
+
+    row = database.rows["job-1"]
+    assert row["file_path"] is None
+    assert json.loads(row["result_json"]) == LARGE
+
+
+def test_minio_failure_without_postgres_is_not_durable(monkeypatch, database):
+    monkeypatch.setitem(storage, "minio_client", FailingMinio())
+    monkeypatch.setattr(settings, "STORE_RESULTS_IN_POSTGRES", False)
+
+    assert tasks.write_result_tiers("job-1", LARGE) is False
+    assert database.batches == []
+
+
+# ----------------------------------------------------------------------
+# Job de parsing
+# ----------------------------------------------------------------------
+
+def test_storage_failure_retries_without_reparsing(monkeypatch):
+    parses, stores = [], []
+    monkeypatch.setattr(tasks, "redis_conn", fakeredis.FakeRedis())
+    monkeypatch.setattr(tasks, "get_file_from_storage", lambda path: path)
+    monkeypatch.setattr(tasks, "parse_cv", lambda source, fmt, file_name=None: parses.append(source) or SMALL)
+    monkeypatch.setattr(tasks, "store_result_multi_tier_sync", lambda **kwargs: stores.append(kwargs) or len(stores) > 1)
+    monkeypatch.setattr(tasks.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(settings, "CLEANUP_TEMP_FILES", False)
+
+    result = tasks.parse_cv_task("job-1", "/tmp/cv.pdf", "cv.pdf", "pdf")
+
+    assert result["data"] == SMALL["data"]
+    assert parses == ["/tmp/cv.pdf"]
+    assert len(stores) == 2 and stores[0]["result"] is stores[1]["result"]
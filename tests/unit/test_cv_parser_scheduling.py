@@ -0,0 +1,316 @@
+"""Tests du worker concurrent du parser CV : partage pondéré des queues, pool CPU et limiteur LLM."""
+
+import os
+import sys
+import threading
+import time
+import types
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("rq")
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+with pytest.MonkeyPatch.context() as patch:
+    # Le paquet app crée le client OpenAI à l'import
+    patch.setenv("OPENAI_API_KEY", "sk-test")
+    rate_limiter = import_from_service("app.services.rate_limiter", "cv-parser-service")
+    scheduler = import_from_service("app.workers.scheduler", "cv-parser-service")
+    resilience = import_from_service("app.services.resilience", "cv-parser-service")
+    parser = import_from_service("app.services.parser", "cv-parser-service")
+    executors_module = import_from_service("app.services.executors", "cv-parser-service")
+
+LLMRateLimiter = rate_limiter.LLMRateLimiter
+WeightedQueueSelector = scheduler.WeightedQueueSelector
+executors = vars(executors_module)
+
+PREMIUM, STANDARD, BATCH = "cv_parsing_premium", "cv_parsing_standard", "cv_parsing_batch"
+WEIGHTS = {PREMIUM: 6, STANDARD: 3, BATCH: 1}
+
+
+@pytest.fixture
+def redis_client():
+    return fakeredis.FakeRedis()
+
+
+def make_limiter(redis_client, rate=0.001, burst=10, reserves=None):
+    return LLMRateLimiter(rate, burst, reserves or {"premium": 0, "standard": 2, "batch": 5},
+                          key="test:rate_limit", client=redis_client)
+
+
+def drain(limiter, priority):
+    """Nombre de jetons obtenus sans attendre."""
+    count = 0
+    while limiter.acquire(priority, timeout=0):
+        count += 1
+    return count
+
+
+# ----------------------------------------------------------------------
+# Partage pondéré des queues
+# ----------------------------------------------------------------------
+
+def test_weighted_round_robin_shares():
+    selector = WeightedQueueSelector(WEIGHTS)
+    picks = [selector.order()[0] for _ in range(100)]
+
+    for start in range(0, 100, 10):
+        assert Counter(picks[start:start + 10]) == {PREMIUM: 6, STANDARD: 3, BATCH: 1}
+    # Lissage : jamais plus de deux tours premium de suite
+    assert all(picks[i:i + 3] != [PREMIUM] * 3 for i in range(98))
+
+
+def test_fallbacks_by_decreasing_weight():
+    selector = WeightedQueueSelector(WEIGHTS)
+    for _ in range(10):
+        order = selector.order()
+        assert sorted(order) == sorted(WEIGHTS)
+        assert order[1:] == sorted(order[1:], key=WEIGHTS.get, reverse=True)
+
+
+def test_only_eligible_queues_are_served():
+    selector = WeightedQueueSelector(WEIGHTS)
+    picks = Counter(selector.order([PREMIUM, STANDARD])[0] for _ in range(90))
+
+    assert picks == {PREMIUM: 60, STANDARD: 30}
+    assert selector.order([]) == []
+    assert WeightedQueueSelector({"a": 0, "b": -3}).weights == {"a": 1, "b": 1}
+
+
+def test_batch_queue_is_capped(redis_client):
+    worker = scheduler.ConcurrentWorker(redis_client, list(WEIGHTS), weights=WEIGHTS,
+                                        max_concurrent_jobs=4, cpu_processes=0)
+    assert worker.batch_max_slots == 2
+
+    worker._in_flight[BATCH] = 1
+    assert BATCH in worker._eligible_queues()
+    worker._in_flight[BATCH] = 2
+    assert worker._eligible_queues() == [PREMIUM, STANDARD]
+
+
+def test_dequeue_falls_back_to_non_empty_queues(redis_client):
+    worker = scheduler.ConcurrentWorker(redis_client, list(WEIGHTS), weights=WEIGHTS,
+                                        max_concurrent_jobs=4, cpu_processes=0)
+    for name in (STANDARD, BATCH, BATCH):
+        worker.queues[name].enqueue("os.getcwd")
+
+    origins = [worker._dequeue().origin for _ in range(3)]
+
+    assert sorted(origins) == sorted([STANDARD, BATCH, BATCH])
+    assert origins[0] == STANDARD
+    assert worker._dequeue() is None
+
+
+@pytest.mark.parametrize("args, status", [((), "finished"), ((1,), "failed")])
+def test_execute_records_job_outcome(redis_client, args, status):
+    worker = scheduler.ConcurrentWorker(redis_client, list(WEIGHTS), weights=WEIGHTS,
+                                        max_concurrent_jobs=1, cpu_processes=0)
+    worker.queues[PREMIUM].enqueue("os.getpid", *args)
+    job = worker._dequeue()
+    worker._slots.acquire()
+    worker._in_flight[job.origin] += 1
+
+    worker._execute(job)
+
+    assert job.get_status(refresh=True) == status
+    assert worker._in_flight[PREMIUM] == 0
+    assert worker._slots.acquire(blocking=False)
+    assert job.id not in worker.queues[PREMIUM].started_job_registry.get_job_ids()
+
+
+# ----------------------------------------------------------------------
+# Pool de processus pour l'extraction
+# ----------------------------------------------------------------------
+
+def square(x):
+    return x * x
+
+
+LOCAL_FAILURES = []
+
+
+def fail(message):
+    LOCAL_FAILURES.append(os.getpid())  # Reste dans le processus qui exécute
+    raise ValueError(message)
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    # Les fonctions envoyées au pool sont sérialisées par nom de module
+    monkeypatch.setitem(sys.modules, "app", types.ModuleType("app"))
+    monkeypatch.setitem(sys.modules, "app.services", types.ModuleType("app.services"))
+    monkeypatch.setitem(sys.modules, "app.services.executors", executors_module)
+    pool = ProcessPoolExecutor(max_workers=1)
+    executors["set_cpu_executor"](pool)
+    yield pool
+    executors["set_cpu_executor"](None)
+    pool.shutdown()
+
+
+class BrokenPool:
+    """Pool dont le processus est mort."""
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("processus du pool terminé"))
+        return future
+
+
+def test_cpu_bound_runs_in_pool(process_pool):
+    assert executors["run_cpu_bound"](square, 7) == 49
+    assert executors["run_cpu_bound"](os.getpid) != os.getpid()
+
+
+def test_cpu_bound_errors_are_raised_without_local_rerun(process_pool):
+    LOCAL_FAILURES.clear()
+
+    with pytest.raises(ValueError, match="format illisible"):
+        executors["run_cpu_bound"](fail, "format illisible")
+    assert LOCAL_FAILURES == []
+
+
+def test_unpicklable_call_falls_back_to_local_execution(process_pool):
+    calls = []
+
+    def local(x):
+        calls.append(os.getpid())
+        return x + 1
+
+    assert executors["run_cpu_bound"](local, 1) == 2
+    assert calls == [os.getpid()]
+
+
+def test_broken_pool_falls_back_to_local_execution():
+    executors["set_cpu_executor"](BrokenPool())
+    try:
+        assert executors["run_cpu_bound"](square, 3) == 9
+        with pytest.raises(ValueError):
+            executors["run_cpu_bound"](fail, "erreur locale")
+    finally:
+        executors["set_cpu_executor"](None)
+
+
+def test_io_stats_from_pool_process_are_reported(monkeypatch):
+    stats = parser.EXTRACTION_IO_STATS
+    before = dict(stats)
+
+    def in_child(func, *args):
+        # Processus enfant simulé : ses incréments ne touchent pas les compteurs du parent
+        snapshot = dict(stats)
+        text, io_stats, _ = func(*args)
+        stats.update(snapshot)
+        return text, io_stats, -1
+
+    monkeypatch.setattr(parser, "run_cpu_bound", in_child)
+    text, io_stats = parser.extract_text_with_io_stats("Jean Dupont, développeur".encode("utf-8"), ".txt")
+
+    assert text == "Jean Dupont, développeur"
+    assert io_stats["in_memory_documents"] == 1 and io_stats["in_memory_bytes"] == 25
+    assert stats["in_memory_documents"] == before["in_memory_documents"] + 1
+    assert stats["in_memory_bytes"] == before["in_memory_bytes"] + 25
+
+    # Exécution locale : les compteurs ne sont pas comptés deux fois
+    monkeypatch.setattr(parser, "run_cpu_bound", lambda func, *args: func(*args))
+    parser.extract_text_with_io_stats(b"abc", ".txt")
+    assert stats["in_memory_documents"] == before["in_memory_documents"] + 2
+
+
+# ----------------------------------------------------------------------
+# Token bucket partagé (script Lua)
+# ----------------------------------------------------------------------
+
+def test_bucket_starts_full_then_waits(redis_client):
+    limiter = make_limiter(redis_client)
+
+    assert drain(limiter, "premium") == 10
+    wait = float(limiter._get_script()(keys=[limiter.key], args=[limiter.rate, limiter.burst, 0]))
+    assert wait == pytest.approx(1 / limiter.rate, rel=0.01)
+    assert 0 < redis_client.ttl(limiter.key) <= 10 / limiter.rate + 1
+
+
+def test_lower_priorities_leave_a_reserve(redis_client):
+    limiter = make_limiter(redis_client)
+
+    assert drain(limiter, "batch") == 5
+    assert drain(limiter, "standard") == 3
+    assert drain(limiter, "premium") == 2
+
+
+def test_shared_between_workers(redis_client):
+    first, second = make_limiter(redis_client), make_limiter(redis_client)
+
+    assert drain(first, "premium") + drain(second, "premium") == 10
+
+
+def test_tokens_refill_over_time(redis_client):
+    limiter = make_limiter(redis_client, rate=50, burst=2)
+    drain(limiter, "premium")
+
+    start = time.time()
+    assert limiter.acquire("premium", timeout=1)
+    assert time.time() - start < 0.5
+
+
+def test_timeout_expires(redis_client):
+    limiter = make_limiter(redis_client, rate=0.001, burst=1)
+    drain(limiter, "premium")
+
+    start = time.time()
+    assert not limiter.acquire("premium", timeout=0.05)
+    assert time.time() - start < 1
+
+
+def test_reserve_larger_than_bucket_is_clamped(redis_client):
+    limiter = make_limiter(redis_client, burst=3, reserves={"batch": 10})
+
+    assert limiter.reserves == {"batch": 2}
+    assert drain(limiter, "batch") == 1
+
+
+def test_priority_comes_from_current_job(redis_client):
+    limiter = make_limiter(redis_client)
+    # Même module executors que celui lu par le limiteur
+    set_current_priority = rate_limiter.get_current_priority.__globals__["set_current_priority"]
+    counts = {}
+
+    def job(priority):
+        set_current_priority(priority)
+        try:
+            counts[priority] = drain(limiter, None)
+        finally:
+            set_current_priority(None)
+
+    thread = threading.Thread(target=job, args=("batch",))
+    thread.start()
+    thread.join()
+    assert counts == {"batch": 5}
+
+
+def test_unavailable_redis_or_disabled_limiter_does_not_block(monkeypatch):
+    limiter = make_limiter(fakeredis.FakeRedis(server=fakeredis.FakeServer()), burst=1)
+    limiter.acquire("premium", timeout=0)
+    limiter._client.connection_pool.connection_kwargs["server"].connected = False
+    limiter._script = None
+    assert limiter.acquire("premium", timeout=0)
+
+    monkeypatch.setattr(rate_limiter.settings, "LLM_RATE_LIMIT_ENABLED", False)
+    assert make_limiter(fakeredis.FakeRedis(), burst=1).acquire("batch", timeout=0)
+
+
+def test_limiter_timeout_does_not_open_circuit(monkeypatch):
+    monkeypatch.setattr(resilience.settings, "CIRCUIT_BREAKER_ENABLED", True)
+    monkeypatch.setattr(resilience.llm_rate_limiter, "acquire", lambda *args, **kwargs: False)
+    monkeypatch.setattr(resilience, "circuit_state", resilience.CircuitBreakerState())
+
+    for _ in range(resilience.circuit_state.threshold + 1):
+        with pytest.raises(resilience.RateLimitTimeout, match="limiteur"):
+            resilience.resilient_openai_call("prompt")
+
+    assert resilience.circuit_state.state == "CLOSED"
+    assert resilience.circuit_state.failure_count == 0
@@ -0,0 +1,85 @@
+"""Tests des requêtes partielles et conditionnelles du service de documents."""
+
+import pytest
+
+from tests.helpers import load_module
+
+content_range = load_module("document_service_content_range", "document-service", "content_range.py")
+
+RangeNotSatisfiable = content_range.RangeNotSatisfiable
+parse_range_header = content_range.parse_range_header
+
+ETAG = content_range.build_etag("ab12")
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=990-5000", (990, 999)),
+    ("bytes=999-999", (999, 999)),
+    ("BYTES = 10-19", (10, 19)),
+])
+def test_single_ranges(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", [
+    None, "", "items=0-10", "bytes=", "bytes=10", "bytes=0-10,20-30", "bytes=a-b", "bytes=5-3", "bytes=-",
+])
+def test_absent_invalid_or_multipart_ranges_are_ignored(header):
+    assert parse_range_header(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=1000-2000", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=0-", 0),
+    ("bytes=-10", 0),
+])
+def test_unsatisfiable_ranges(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, size)
+
+
+def test_etag_is_strong_and_quoted():
+    assert ETAG == '"ab12"'
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    (None, False), ("", False), ("*", True), ('"ab12"', True), ('W/"ab12"', True),
+    ('"old", "ab12"', True), ('"old"', False), ("ab12", False),
+])
+def test_if_none_match_uses_weak_comparison(if_none_match, expected):
+    assert content_range.etag_matches(if_none_match, ETAG) is expected
+
+
+@pytest.mark.parametrize("if_range, expected", [
+    (None, True), ("", True), ('"ab12"', True), (' "ab12" ', True),
+    ('W/"ab12"', False), ('"old"', False), ("Wed, 21 Oct 2026 07:28:00 GMT", False),
+])
+def test_if_range_uses_strong_comparison(if_range, expected):
+    assert content_range.if_range_matches(if_range, ETAG) is expected
+
+
+@pytest.mark.parametrize("length, expected", [
+    (0, 64 * 1024),
+    (100, 64 * 1024),
+    (64 * 64 * 1024, 64 * 1024),
+    (64 * 200 * 1024, 200 * 1024),
+    (10 ** 9, 1024 * 1024),
+])
+def test_chunk_size_is_bounded(length, expected):
+    assert content_range.select_chunk_size(length, 64 * 1024, 1024 * 1024) == expected
+
+
+def test_range_slices_reassemble_document():
+    content = bytes(range(256)) * 4
+    size = len(content)
+    parts = []
+    for header in ("bytes=0-99", "bytes=100-599", "bytes=600-"):
+        start, end = parse_range_header(header, size)
+        parts.append(content[start:end + 1])
+    assert b"".join(parts) == content
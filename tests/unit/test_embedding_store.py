@@ -0,0 +1,186 @@
+"""Tests des embeddings de documents du backend : cache LRU, magasin sur disque et encodage par lots."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+advanced_nlp = import_from_service("app.nlp.advanced_nlp", "backend")
+embedding_store = advanced_nlp.BERTExtractor.get_document_embeddings_batch.__globals__["embedding_key"].__globals__
+settings = advanced_nlp.settings
+
+EmbeddingLRUCache = embedding_store["EmbeddingLRUCache"]
+DiskEmbeddingStore = embedding_store["DiskEmbeddingStore"]
+embedding_key = embedding_store["embedding_key"]
+split_in_batches = embedding_store["split_in_batches"]
+
+WORDS = "python django sql docker paris lyon ingénieur développeur données projet équipe".split()
+TEXTS = [
+    "python django",
+    " ".join(WORDS * 3),  # Plusieurs séquences pour un même document
+    "",
+    "docker paris lyon ingénieur",
+    "python django",
+]
+
+
+def vector(value, size=10):
+    return np.full(size, value, dtype=np.float64)  # 80 octets
+
+
+# ----------------------------------------------------------------------
+# Cache mémoire
+# ----------------------------------------------------------------------
+
+def test_lru_cache_respects_byte_bound():
+    cache = EmbeddingLRUCache(max_bytes=200)
+
+    for index in range(5):
+        cache.put(f"k{index}", vector(index))
+        assert cache.stats()["bytes"] <= 200
+
+    assert len(cache) == 2
+    assert cache.get("k0") is None and cache.get("k4")[0] == 4
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = EmbeddingLRUCache(max_bytes=200)
+    cache.put("a", vector(1))
+    cache.put("b", vector(2))
+
+    cache.get("a")
+    cache.put("c", vector(3))
+
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == 1 and cache.get("c")[0] == 3
+    # Remplacer une entrée ne compte pas deux fois sa taille
+    cache.put("a", vector(5))
+    assert cache.stats()["bytes"] == 160 and len(cache) == 2
+
+
+def test_lru_cache_ignores_vectors_larger_than_bound():
+    cache = EmbeddingLRUCache(max_bytes=100)
+    cache.put("a", vector(1))
+
+    cache.put("big", vector(2, size=20))
+
+    assert cache.get("big") is None and cache.get("a") is not None
+
+
+# ----------------------------------------------------------------------
+# Magasin sur disque
+# ----------------------------------------------------------------------
+
+def test_disk_store_round_trips_across_instances(tmp_path):
+    path = str(tmp_path / "store" / "embeddings.sqlite3")
+    vectors = {f"k{index}": np.random.default_rng(index).random(8).astype(np.float32) for index in range(1200)}
+    DiskEmbeddingStore(path).put_many(vectors)
+
+    reopened = DiskEmbeddingStore(path)
+    found = reopened.get_many([*vectors, "absente"])
+
+    assert reopened.count() == 1200
+    assert found.keys() == vectors.keys()
+    for key, stored in found.items():
+        assert stored.dtype == np.float32
+        np.testing.assert_array_equal(stored, vectors[key])
+
+
+def test_embedding_key_depends_on_model():
+    assert embedding_key("python", "camembert-base") != embedding_key("python", "autre-modele")
+    assert embedding_key("python", "camembert-base") == embedding_key("python", "camembert-base")
+
+
+def test_split_in_batches_keeps_every_sequence_once():
+    lengths = [5, 50, 7, 49, 6, 51, 3]
+
+    batches = split_in_batches(lengths, max_batch_size=3, max_batch_tokens=110)
+
+    assert sorted(index for batch in batches for index in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= 110
+
+
+# ----------------------------------------------------------------------
+# Encodage par lots
+# ----------------------------------------------------------------------
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    """Petit BERT aléatoire, vocabulaire en mots entiers (20 positions, séquences de 10 tokens)."""
+    transformers = pytest.importorskip("transformers")
+    torch = pytest.importorskip("torch")
+
+    path = tmp_path_factory.mktemp("bert")
+    vocab = path / "vocab.txt"
+    vocab.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *WORDS]), encoding="utf-8")
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab), do_lower_case=False,
+                                               strip_accents=False, model_max_length=20)
+    torch.manual_seed(0)
+    config = transformers.BertConfig(vocab_size=len(WORDS) + 5, hidden_size=16, num_hidden_layers=1,
+                                     num_attention_heads=2, intermediate_size=32, max_position_embeddings=32)
+    transformers.BertModel(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return str(path)
+
+
+@pytest.fixture
+def extractor(model_path, monkeypatch, tmp_path):
+    if not (advanced_nlp.HAS_TORCH and advanced_nlp.HAS_TRANSFORMERS):
+        pytest.skip("transformers ou PyTorch manquant")
+    monkeypatch.setattr(settings, "BERT_INFERENCE_BACKEND", "pytorch")
+    monkeypatch.setattr(settings, "BERT_EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "BERT_EMBEDDING_STORE_PATH", str(tmp_path / "embeddings.sqlite3"))
+
+    def build():
+        extractor = advanced_nlp.BERTExtractor(model_dir=str(tmp_path))
+        extractor.embedder_model_name = model_path
+        return extractor
+
+    return build
+
+
+def reference_embedding(tokenizer, model, text):
+    """Encodage d'avant les lots : une passe du modèle par séquence, puis moyenne des [CLS]."""
+    torch = pytest.importorskip("torch")
+    max_length = tokenizer.model_max_length - 10
+    tokens = tokenizer.tokenize(text)
+    chunks = [tokenizer.convert_tokens_to_string(tokens[i:i + max_length])
+              for i in range(0, len(tokens), max_length)]
+    if not chunks:
+        return np.zeros(768)
+    embeddings = []
+    for chunk in chunks:
+        inputs = tokenizer(chunk, return_tensors="pt", padding=True, truncation=True)
+        with torch.no_grad():
+            outputs = model(**inputs)
+        embeddings.append(outputs.last_hidden_state[:, 0, :].numpy())
+    return np.mean(embeddings, axis=0).squeeze()
+
+
+def test_batched_embeddings_match_per_sequence_encoding(extractor):
+    bert = extractor()
+
+    embeddings = bert.get_document_embeddings_batch(TEXTS)
+
+    expected = [reference_embedding(bert.embedder_tokenizer, bert._embedder, text) for text in TEXTS]
+    assert len(embeddings) == len(TEXTS)
+    for embedding, reference in zip(embeddings, expected):
+        np.testing.assert_allclose(embedding, reference, rtol=1e-4, atol=1e-5)
+    assert bert.get_document_embeddings(TEXTS[3]) is embeddings[3]
+
+
+def test_stored_embeddings_are_served_without_the_model(extractor, monkeypatch):
+    first = extractor().get_document_embeddings_batch(TEXTS)
+
+    restarted = extractor()
+    monkeypatch.setattr(restarted, "_load_embedder", lambda model_name=None: pytest.fail("modèle rechargé"))
+    again = restarted.get_document_embeddings_batch([text for text in TEXTS if text])
+
+    for embedding, reference in zip(again, [vector for text, vector in zip(TEXTS, first) if text]):
+        np.testing.assert_allclose(embedding, reference, rtol=1e-6)
+    # Le texte vide n'a pas d'embedding et n'est ni mis en cache ni stocké
+    assert restarted.embedding_store.count() == 3
@@ -0,0 +1,140 @@
+"""Tests de l'analyse par lots du service de feedback : lots, reprise et rollback (SQLite en mémoire)."""
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from tests.helpers import add_path, load_module  # noqa: E402
+
+add_path()
+# Le paquet feedback_service/models/ masque le module models.py qui définit Sentiment
+models = load_module("feedback_service.models", "feedback_service", "models.py")
+
+from feedback_service.analyzer import FeedbackAnalyzer  # noqa: E402
+from feedback_service.sentiment import LexiconSentimentModel, SentimentModel  # noqa: E402
+
+Feedback, FeedbackAnalysis = models.Feedback, models.FeedbackAnalysis
+FeedbackChannel, FeedbackType, Sentiment = models.FeedbackChannel, models.FeedbackType, models.Sentiment
+
+CONTENTS = [
+    (FeedbackChannel.COMMENT, "Super outil, le matching propose des offres pertinentes"),
+    (FeedbackChannel.COMMENT, "Recherche lente et résultats décevants, recherche inutile"),
+    (FeedbackChannel.RATING, None),
+    (FeedbackChannel.SUGGESTION, "Ajouter un filtre par salaire"),
+    (FeedbackChannel.COMMENT, "rien"),
+]
+
+
+@pytest.fixture
+def session():
+    engine = sqlalchemy.create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    for index in range(12):
+        channel, content = CONTENTS[index % len(CONTENTS)]
+        db.add(Feedback(user_id=index % 4, feedback_type=FeedbackType.EXPLICIT, channel=channel,
+                        content=content, rating=index % 5 + 1))
+    db.commit()
+    yield db
+    db.close()
+
+
+def analyses(session, analysis_type):
+    rows = session.query(FeedbackAnalysis).filter_by(analysis_type=analysis_type).order_by(FeedbackAnalysis.feedback_id)
+    return {row.feedback_id: row.result for row in rows}
+
+
+def processed_ids(session):
+    return [row.id for row in session.query(Feedback.id).filter(Feedback.processed.is_(True)).order_by(Feedback.id)]
+
+
+def test_sentiment_model_requires_polarity():
+    class Incomplete(SentimentModel):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_analyze_chunk_matches_single_text_analysis(session):
+    analyzer = FeedbackAnalyzer(session, LexiconSentimentModel())
+    rows = session.query(Feedback.id, Feedback.channel, Feedback.content).order_by(Feedback.id).limit(5).all()
+
+    analyzer._analyze_chunk(rows)
+    session.flush()
+
+    sentiments = analyses(session, "sentiment")
+    assert sorted(sentiments) == [1, 2, 4, 5]  # Le feedback sans contenu n'a pas d'analyse
+    for feedback_id in sentiments:
+        expected = analyzer.analyze_sentiment(session.get(Feedback, feedback_id).content)
+        assert sentiments[feedback_id] == {"sentiment": expected["sentiment"].value,
+                                           "score": pytest.approx(expected["score"]),
+                                           "confidence": pytest.approx(expected["confidence"])}
+        assert session.get(Feedback, feedback_id).sentiment == expected["sentiment"]
+
+    # Mots clés pour les seuls commentaires
+    assert analyses(session, "topic") == {
+        1: {"topics": analyzer.extract_topics(CONTENTS[0][1])},
+        2: {"topics": ["recherche", "lente", "résultats"]},
+        5: {"topics": ["rien"]},
+    }
+    assert sentiments[1]["sentiment"] == "positive" and sentiments[2]["sentiment"] == "negative"
+    assert processed_ids(session) == [1, 2, 3, 4, 5]
+    assert session.get(Feedback, 3).sentiment == Sentiment.UNKNOWN
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 12, 50])
+def test_chunk_size_does_not_change_results(session, chunk_size):
+    analyzer = FeedbackAnalyzer(session, LexiconSentimentModel())
+
+    assert analyzer.analyze_new_feedback(chunk_size=chunk_size) == 12
+
+    assert processed_ids(session) == list(range(1, 13))
+    assert len(analyses(session, "sentiment")) == 10 and len(analyses(session, "topic")) == 8
+    first = analyses(session, "topic")[1]
+    assert all(analyses(session, "topic")[i] == first for i in (6, 11))
+    assert analyzer.analyze_new_feedback(chunk_size=chunk_size) == 0
+
+
+def test_interrupted_run_resumes_at_first_unprocessed(session):
+    analyzer = FeedbackAnalyzer(session, LexiconSentimentModel())
+
+    assert analyzer.analyze_new_feedback(chunk_size=5, max_chunks=1) == 5
+    assert processed_ids(session) == [1, 2, 3, 4, 5]
+
+    assert analyzer.analyze_new_feedback(chunk_size=5) == 7
+    assert processed_ids(session) == list(range(1, 13))
+    # Aucun feedback analysé deux fois
+    assert sorted(analyses(session, "sentiment")) == [i for i in range(1, 13) if i % 5 != 3]
+    assert session.query(FeedbackAnalysis).count() == 18
+
+
+def test_failing_chunk_is_rolled_back(session, monkeypatch):
+    analyzer = FeedbackAnalyzer(session, LexiconSentimentModel())
+    commit = session.commit
+    commits = []
+
+    def failing_commit():
+        # Le 2e lot échoue après ses écritures groupées, au moment de valider
+        commits.append(1)
+        if len(commits) == 2:
+            raise sqlalchemy.exc.OperationalError("COMMIT", {}, Exception("connexion perdue"))
+        commit()
+
+    monkeypatch.setattr(session, "commit", failing_commit)
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        analyzer.analyze_new_feedback(chunk_size=5)
+
+    # Le premier lot reste validé, le lot en échec ne laisse aucune écriture
+    assert processed_ids(session) == [1, 2, 3, 4, 5]
+    assert max(analyses(session, "sentiment")) == 5
+    assert session.query(FeedbackAnalysis).count() == 7
+
+    monkeypatch.setattr(session, "commit", commit)
+    assert analyzer.analyze_new_feedback(chunk_size=5) == 7
+    assert processed_ids(session) == list(range(1, 13))
+    assert session.query(FeedbackAnalysis).count() == 18
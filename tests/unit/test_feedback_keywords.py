@@ -0,0 +1,69 @@
+"""Tests de l'extraction de mots clés par lots du service de feedback."""
+
+import re
+
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("sqlalchemy")
+
+from tests.helpers import add_path, load_module  # noqa: E402
+
+add_path()
+# Le paquet feedback_service/models/ masque le module models.py qui définit Sentiment
+load_module("feedback_service.models", "feedback_service", "models.py")
+
+from feedback_service.sentiment import extract_keywords  # noqa: E402
+
+TEXTS = [
+    "zeta alpha beta beta gamma",
+    "matching matching offres offres candidature",
+    "recherche lente, filtres confus",
+    "the search results were great and the filters useful",
+    "rien",
+    "",
+    "offres offres matching matching pertinentes pertinentes",
+    "upload broken upload broken again",
+] * 3
+
+
+def reference_topics(text, num_topics=3):
+    """Extraction historique, un texte à la fois (FeedbackAnalyzer.extract_topics avant le traitement par lots)."""
+    words = [word for word in re.sub(r"[^\w\s]", "", text.lower()).split() if len(word) > 3]
+    word_counts = {}
+    for word in words:
+        word_counts[word] = word_counts.get(word, 0) + 1
+    return [word for word, _ in sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:num_topics]]
+
+
+def test_ties_keep_first_occurrence_order():
+    assert extract_keywords(["Le matching propose des offres avec pertinence"], 3) == [["matching", "propose", "offres"]]
+    assert extract_keywords(["zeta alpha beta beta gamma"], 3) == [["beta", "zeta", "alpha"]]
+    assert extract_keywords(["delta gamma beta alpha"], 2) == [["delta", "gamma"]]
+
+
+@pytest.mark.parametrize("num_topics", [1, 3, 5])
+def test_keywords_match_historical_extraction(num_topics):
+    texts = TEXTS + [
+        "Le matching propose des offres avec pertinence, mais les offres restent lentes.",
+        "Recherche: OFFRES offres, Matching!! matching; candidature_rapide 2024 2024",
+        "Très bien, très utile ; l'équipe répond vite et bien.",
+    ]
+
+    assert extract_keywords(texts, num_topics) == [reference_topics(text or "", num_topics) for text in texts]
+
+
+def test_keywords_do_not_depend_on_chunk_size():
+    expected = [extract_keywords([text], 3)[0] for text in TEXTS]
+
+    for chunk_size in (1, 2, 3, 5, len(TEXTS)):
+        keywords = []
+        for start in range(0, len(TEXTS), chunk_size):
+            keywords.extend(extract_keywords(TEXTS[start:start + chunk_size], 3))
+        assert keywords == expected
+
+
+def test_short_words_and_punctuation_are_ignored():
+    assert extract_keywords(["a b c d", "l'offre, l'offre !"], 3) == [[], ["loffre"]]
+    assert extract_keywords(["le la un"], 3) == [[]]
+    assert extract_keywords([], 3) == []
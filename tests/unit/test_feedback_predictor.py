@@ -0,0 +1,198 @@
+"""Tests du prédicteur de satisfaction : features agrégées par lots et écriture groupée (SQLite en mémoire)."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("sklearn")
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from tests.helpers import add_path, load_module  # noqa: E402
+
+add_path()
+# Le paquet feedback_service/models/ masque le module models.py
+models = load_module("feedback_service.models", "feedback_service", "models.py")
+
+from feedback_service.predictor import FEATURE_COLUMNS, SatisfactionPredictor  # noqa: E402
+
+Feedback, UserSatisfactionModel = models.Feedback, models.UserSatisfactionModel
+FeedbackChannel, FeedbackType, Sentiment = models.FeedbackChannel, models.FeedbackType, models.Sentiment
+
+# Identifiants non contigus : la pagination se fait sur user_id, pas sur un rang
+USER_IDS = [1, 2, 5, 10, 11, 40, 41]
+UNRATED_USER_ID = 10
+
+
+@pytest.fixture
+def session():
+    engine = sqlalchemy.create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    # Dates à midi passé de N jours : le nombre de jours ne bascule pas pendant le test
+    now = datetime.utcnow() - timedelta(hours=12)
+    channels, types, sentiments = list(FeedbackChannel), list(FeedbackType), list(Sentiment)
+    index = 0
+    for position, user_id in enumerate(USER_IDS):
+        for n in range(position + 1):
+            index += 1
+            db.add(Feedback(
+                user_id=user_id,
+                channel=channels[index % len(channels)],
+                feedback_type=types[index % len(types)],
+                sentiment=sentiments[index % len(sentiments)],
+                rating=None if user_id == UNRATED_USER_ID or index % 3 == 0 else index % 5 + 1,
+                created_at=now - timedelta(days=3 * index + n),
+            ))
+    db.commit()
+    yield db
+    db.close()
+
+
+def reference_user_features(user_id, feedbacks):
+    """Extraction par utilisateur d'avant le passage aux agrégats SQL."""
+    features = {"user_id": user_id, **{column: 0 for column in FEATURE_COLUMNS}}
+    for feedback in feedbacks:
+        features[f"count_{feedback.channel.value}"] += 1
+        features[f"count_{feedback.feedback_type.value}"] += 1
+        features[f"count_{feedback.sentiment.value}"] += 1
+
+    ratings = [f.rating for f in feedbacks if f.rating is not None]
+    if ratings:
+        features["avg_rating"] = sum(ratings) / len(ratings)
+
+    dates = [f.created_at for f in feedbacks]
+    now = datetime.utcnow()
+    features["days_since_first"] = (now - min(dates)).days
+    features["days_since_last"] = (now - max(dates)).days
+    if features["days_since_first"] > 0:
+        features["feedback_frequency"] = len(feedbacks) / features["days_since_first"]
+    return features
+
+
+def reference_frame(session):
+    rows = []
+    for user_id in USER_IDS:
+        feedbacks = session.query(Feedback).filter_by(user_id=user_id).all()
+        rows.append(reference_user_features(user_id, feedbacks))
+    return pd.DataFrame(rows, columns=["user_id", *FEATURE_COLUMNS])
+
+
+def chunked_frame(predictor, **kwargs):
+    return pd.concat(list(predictor._iter_feature_frames(**kwargs)), ignore_index=True)
+
+
+class SumModel:
+    """Modèle factice : somme des features normalisées, importances fixes."""
+
+    def __init__(self, n_features):
+        self.feature_importances_ = np.linspace(1, 0, n_features)
+
+    def predict(self, X):
+        return np.asarray(X).sum(axis=1)
+
+
+def fitted_predictor(session):
+    predictor = SatisfactionPredictor(session)
+    frame = chunked_frame(predictor)
+    predictor.feature_names = list(FEATURE_COLUMNS)
+    predictor.scaler = StandardScaler().fit(frame[FEATURE_COLUMNS])
+    predictor.model = SumModel(len(FEATURE_COLUMNS))
+    return predictor
+
+
+# ----------------------------------------------------------------------
+# Features agrégées
+# ----------------------------------------------------------------------
+
+def test_chunked_features_match_per_user_extraction(session):
+    predictor = SatisfactionPredictor(session)
+
+    frame = chunked_frame(predictor, chunk_size=3)
+
+    pd.testing.assert_frame_equal(frame, reference_frame(session), check_dtype=False)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 6, 7, 100])
+def test_chunk_boundaries_lose_no_users(session, chunk_size):
+    predictor = SatisfactionPredictor(session)
+
+    frames = list(predictor._iter_feature_frames(chunk_size=chunk_size))
+
+    assert [len(frame) for frame in frames[:-1]] == [chunk_size] * (len(frames) - 1)
+    assert pd.concat(frames)["user_id"].tolist() == USER_IDS
+    # Aucun lot vide, même quand le total tombe pile sur la taille de lot
+    assert len(frames) == -(-len(USER_IDS) // chunk_size)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_training_data_skips_unrated_users_across_chunks(session, chunk_size):
+    predictor = SatisfactionPredictor(session)
+    expected = reference_frame(session)
+    expected = expected[expected["user_id"] != UNRATED_USER_ID].reset_index(drop=True)
+
+    training_data = predictor._prepare_training_data(chunk_size=chunk_size)
+
+    assert training_data["user_id"].tolist() == expected["user_id"].tolist()
+    assert training_data["target_satisfaction"].tolist() == pytest.approx(expected["avg_rating"].tolist())
+
+
+def test_load_feature_frame_for_selected_users(session):
+    predictor = SatisfactionPredictor(session)
+    expected = reference_frame(session).set_index("user_id").loc[[5, 41]].reset_index()
+
+    frame = predictor._load_feature_frame([41, 5, 999])
+
+    pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+    assert predictor._load_feature_frame([999]).empty
+
+
+# ----------------------------------------------------------------------
+# Écriture groupée des prédictions
+# ----------------------------------------------------------------------
+
+def predictions(session):
+    rows = session.query(UserSatisfactionModel).order_by(UserSatisfactionModel.user_id).all()
+    return {row.user_id: row for row in rows}
+
+
+def test_bulk_save_updates_existing_rows_without_duplicates(session):
+    predictor = SatisfactionPredictor(session)
+    session.add(UserSatisfactionModel(user_id=2, satisfaction_score=1.0, confidence=0.1, factors={"ancien": 1.0}))
+    session.commit()
+    existing_id = predictions(session)[2].id
+
+    predictor._save_predictions_bulk([1, 2, 5], [4.0, 3.5, 2.0], [1.0, 0.5, 0.2], {"avg_rating": 0.9})
+    predictor._save_predictions_bulk([2, 5], np.array([4.5, 2.5]), np.array([0.6, 0.3]), {"avg_rating": 0.8})
+
+    saved = predictions(session)
+    assert session.query(UserSatisfactionModel).count() == 3
+    assert saved[2].id == existing_id
+    assert {user_id: row.satisfaction_score for user_id, row in saved.items()} == {1: 4.0, 2: 4.5, 5: 2.5}
+    assert saved[5].confidence == pytest.approx(0.3) and saved[5].factors == {"avg_rating": 0.8}
+    assert saved[1].factors == {"avg_rating": 0.9}
+
+
+def test_update_all_predictions_matches_single_user_predictions(session):
+    predictor = fitted_predictor(session)
+
+    result = predictor.update_all_predictions(min_confidence=0.5, chunk_size=3)
+    # Deuxième passage : mises à jour, pas de nouvelles lignes
+    predictor.update_all_predictions(min_confidence=0.5, chunk_size=2)
+
+    saved = predictions(session)
+    assert result["total_users"] == len(USER_IDS)
+    assert sorted(saved) == USER_IDS
+    assert session.query(UserSatisfactionModel).count() == len(USER_IDS)
+    # Confiance : nombre de feedbacks / 10, plafonné à 1
+    assert result["predictions_made"] == sum(position + 1 >= 5 for position in range(len(USER_IDS)))
+
+    for user_id in USER_IDS:
+        single = predictor.predict_satisfaction(user_id)
+        assert saved[user_id].satisfaction_score == pytest.approx(single["satisfaction_score"])
+        assert saved[user_id].confidence == pytest.approx(single["confidence"])
+    assert session.query(UserSatisfactionModel).count() == len(USER_IDS)
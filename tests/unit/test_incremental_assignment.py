@@ -0,0 +1,221 @@
+"""Tests of warm-started re-optimization against cold solves."""
+
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+from tests.helpers import namespace_package  # noqa: E402
+
+namespace_package("matching", "matching")
+
+from matching.assignment_solvers import LinearSumAssignmentSolver, assignment_cost  # noqa: E402
+from matching.incremental_assignment import IncrementalAssignment  # noqa: E402
+
+
+class Pool:
+    """Cost matrix with stable row/column ids, edited like a live pool."""
+
+    def __init__(self, rng, num_rows, num_cols, forbidden=0.0):
+        self.rng = rng
+        self.forbidden = forbidden
+        self.costs = self.random((num_rows, num_cols))
+        self.row_ids = [f"c{i}" for i in range(num_rows)]
+        self.col_ids = [f"j{j}" for j in range(num_cols)]
+        self.next_id = 0
+
+    def random(self, shape):
+        costs = self.rng.random(shape) * 10
+        costs[self.rng.random(shape) < self.forbidden] = np.inf
+        return costs
+
+    def new_id(self, prefix):
+        self.next_id += 1
+        return f"{prefix}new{self.next_id}"
+
+    def edit(self):
+        """Apply one random edit: add, remove or re-weight a row or a column."""
+        num_rows, num_cols = self.costs.shape
+        edit = self.rng.integers(6)
+        if edit == 0 and num_rows > 1:
+            index = self.rng.integers(num_rows)
+            self.costs = np.delete(self.costs, index, axis=0)
+            del self.row_ids[index]
+        elif edit == 1 and num_cols > 1:
+            index = self.rng.integers(num_cols)
+            self.costs = np.delete(self.costs, index, axis=1)
+            del self.col_ids[index]
+        elif edit == 2:
+            index = self.rng.integers(num_rows + 1)
+            self.costs = np.insert(self.costs, index, self.random(num_cols), axis=0)
+            self.row_ids.insert(index, self.new_id("c"))
+        elif edit == 3:
+            index = self.rng.integers(num_cols + 1)
+            self.costs = np.insert(self.costs, index, self.random(num_rows), axis=1)
+            self.col_ids.insert(index, self.new_id("j"))
+        elif edit == 4:
+            self.costs = self.costs.copy()
+            self.costs[self.rng.integers(num_rows)] = self.random(num_cols)
+        else:
+            self.costs = self.costs.copy()
+            self.costs[:, self.rng.integers(num_cols)] = self.random(num_rows)
+
+
+def assert_optimal(cost_matrix, rows, cols, capacities=None):
+    """Same number of pairs and same cost as a cold solve."""
+    ref_rows, ref_cols = LinearSumAssignmentSolver().solve(cost_matrix, capacities)
+    assert rows.size == ref_rows.size
+    assert np.all(np.diff(rows) > 0)
+    counts = np.bincount(cols, minlength=cost_matrix.shape[1])
+    assert np.all(counts <= (1 if capacities is None else np.asarray(capacities)))
+    assert np.all(np.isfinite(cost_matrix[rows, cols]))
+    assert assignment_cost(cost_matrix, rows, cols) == pytest.approx(assignment_cost(cost_matrix, ref_rows, ref_cols))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_single_edits_match_cold_solve(seed):
+    rng = np.random.default_rng(seed)
+    pool = Pool(rng, *rng.integers(1, 15, 2), forbidden=0.2 if seed % 2 else 0.0)
+    incremental = IncrementalAssignment(change_threshold=1.0)
+    incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+
+    for _ in range(10):
+        pool.edit()
+        rows, cols = incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+        assert_optimal(pool.costs, rows, cols)
+
+    assert incremental.repairs > 0
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_batched_edits_match_cold_solve(seed):
+    rng = np.random.default_rng(100 + seed)
+    pool = Pool(rng, *rng.integers(60, 120, 2), forbidden=0.2)
+    incremental = IncrementalAssignment()
+    incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+
+    for _ in range(8):
+        for _ in range(rng.integers(1, 5)):
+            pool.edit()
+        rows, cols = incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+        assert_optimal(pool.costs, rows, cols)
+
+
+def test_row_and_column_edits_release_only_affected_pairs():
+    rng = np.random.default_rng(1)
+    pool = Pool(rng, 200, 200)
+    incremental = IncrementalAssignment()
+    incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+
+    pool.costs = pool.costs.copy()
+    pool.costs[17] = rng.random(200) * 10
+    rows, cols = incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+    assert_optimal(pool.costs, rows, cols)
+    assert incremental.augmentations == 1
+
+    pool.costs = pool.costs.copy()
+    pool.costs[:, 42] = rng.random(200) * 10
+    rows, cols = incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+    assert_optimal(pool.costs, rows, cols)
+    assert incremental.augmentations == 2
+    assert incremental.full_solves == 1
+
+
+def test_unchanged_matrix_keeps_assignment():
+    costs = np.random.default_rng(2).random((30, 20))
+    incremental = IncrementalAssignment()
+    first = incremental.update(costs)
+    second = incremental.update(costs.copy())
+
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+    assert incremental.stats()["augmentations"] == 0
+
+
+def test_changes_past_threshold_solve_from_scratch():
+    rng = np.random.default_rng(3)
+    costs = rng.random((50, 50))
+    incremental = IncrementalAssignment(change_threshold=0.1)
+    incremental.update(costs)
+
+    costs = costs.copy()
+    costs[:10] = rng.random((10, 50))
+    rows, cols = incremental.update(costs)
+
+    assert_optimal(costs, rows, cols)
+    assert incremental.full_solves == 2
+
+
+def test_costs_outside_penalty_range_solve_from_scratch():
+    rng = np.random.default_rng(4)
+    costs = rng.random((20, 20))
+    incremental = IncrementalAssignment()
+    incremental.update(costs)
+
+    costs = costs.copy()
+    costs[3] = 1000.0 + rng.random(20)
+    rows, cols = incremental.update(costs)
+
+    assert_optimal(costs, rows, cols)
+    assert incremental.full_solves == 2
+
+
+def test_growing_pool_reuses_and_adds_slots():
+    rng = np.random.default_rng(5)
+    pool = Pool(rng, 10, 10)
+    incremental = IncrementalAssignment(change_threshold=1.0)
+    incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+
+    for _ in range(8):
+        pool.costs = np.vstack((pool.costs, rng.random((1, pool.costs.shape[1])) * 10))
+        pool.row_ids.append(pool.new_id("c"))
+        rows, cols = incremental.update(pool.costs, pool.row_ids, pool.col_ids)
+        assert_optimal(pool.costs, rows, cols)
+
+    assert incremental.size > 10
+    assert incremental.full_solves == 1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_capacities_match_cold_solve(seed):
+    rng = np.random.default_rng(200 + seed)
+    costs = rng.random((30, 6)) * 10
+    capacities = rng.integers(1, 4, 6)
+    incremental = IncrementalAssignment(change_threshold=0.5)
+    incremental.update(costs, capacities=capacities)
+
+    for step in range(5):
+        costs = costs.copy()
+        costs[rng.integers(30)] = rng.random(6) * 10
+        if step == 3:
+            capacities = capacities.copy()
+            capacities[0] += 1
+        rows, cols = incremental.update(costs, capacities=capacities)
+        assert_optimal(costs, rows, cols, capacities)
+
+
+def test_sparse_input_and_reset():
+    sp = pytest.importorskip("scipy.sparse")
+    sparse = sp.random(20, 25, density=0.3, format="csr", random_state=6)
+    dense = np.full(sparse.shape, np.inf)
+    coo = sparse.tocoo()
+    dense[coo.row, coo.col] = coo.data
+
+    incremental = IncrementalAssignment()
+    rows, cols = incremental.update(sparse)
+    assert_optimal(dense, rows, cols)
+
+    incremental.reset()
+    assert incremental.size == 0
+    rows, cols = incremental.update(sparse)
+    assert_optimal(dense, rows, cols)
+    assert incremental.full_solves == 2
+
+
+def test_ids_must_match_and_be_unique():
+    incremental = IncrementalAssignment()
+    with pytest.raises(ValueError):
+        incremental.update(np.zeros((2, 2)), row_ids=["a"])
+    incremental.update(np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        incremental.update(np.zeros((2, 2)), row_ids=["a", "a"])
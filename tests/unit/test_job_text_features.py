@@ -0,0 +1,208 @@
+"""Tests de la normalisation en une passe des fiches de poste (job-parser-service) face aux passes successives d'origine."""
+
+import importlib
+import re
+import sys
+
+import pytest
+
+from tests.helpers import namespace_package
+
+
+def load_job_parser_modules():
+    """
+    Importe text_features et mock_parser sans exécuter app/__init__.py, qui
+    construit l'application FastAPI (routes, client MinIO).
+    """
+    saved = {name: sys.modules.pop(name) for name in list(sys.modules) if name.split(".")[0] == "app"}
+    namespace_package("app", "job-parser-service", "app")
+    namespace_package("app.utils", "job-parser-service", "app", "utils")
+    namespace_package("app.services", "job-parser-service", "app", "services")
+    try:
+        return (importlib.import_module("app.utils.text_features"),
+                importlib.import_module("app.services.mock_parser"))
+    finally:
+        for name in [name for name in sys.modules if name.split(".")[0] == "app"]:
+            del sys.modules[name]
+        sys.modules.update(saved)
+
+
+text_features, mock_parser = load_job_parser_modules()
+
+# ----------------------------------------------------------------------
+# Implémentations d'origine : une passe par motif
+# ----------------------------------------------------------------------
+
+LEGACY_PDF_ARTIFACTS = [
+    r'\d+ \d+ obj', r'endobj', r'xref', r'trailer', r'startxref', r'stream', r'endstream',
+    r'<<.*?>>', r'%PDF-\d+\.\d+', r'%[\s\n]*\d+', r'/[A-Za-z]+\s+\d+',
+    r'\[\s*\d+\s+\d+\s+\d+\s+\d+\s*\]',
+]
+
+LEGACY_CONTRACT_PATTERNS = [
+    r'(?i)\b(CDI|contrat à durée indéterminée)\b',
+    r'(?i)\b(CDD|contrat à durée déterminée)\b',
+    r'(?i)\b(stage|internship)\b',
+    r'(?i)\b(freelance|indépendant)\b',
+    r'(?i)\b(alternance|apprentissage)\b',
+    r'(?i)\b(temps partiel|part[ -]time)\b',
+    r'(?i)\b(temps plein|full[ -]time)\b'
+]
+
+COMMON_SKILLS = [
+    'Comptabilité générale', 'Comptabilité analytique', 'Comptabilité clients',
+    'Comptabilité fournisseurs', 'Fiscalité', 'Audit', 'Contrôle de gestion',
+    'Gestion de trésorerie', 'Finance d\'entreprise', 'Normes IFRS', 'Normes US GAAP',
+    'Consolidation', 'Reporting', 'Budget', 'Prévisions', 'Analyse financière',
+    'Clôture comptable', 'Rapprochement bancaire', 'Liasse fiscale', 'Bilan',
+    'SAP', 'Oracle', 'Sage', 'Excel', 'Power BI', 'Anglais'
+]
+
+LEGACY_TITLE_PATTERNS = [
+    r"(?:recherch(?:e|ons)|offre d'emploi)[^\n.]*?([^\n.]+?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|pour)",
+    r"(?:poste de|profil)[^\n.]*?([^\n.]+?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*?)(?:$|\n|\.|h/f)",
+    r"([^\n.]*?(?:développeur|ingénieur|comptable|auditeur|consultant|chef de projet|manager|directeur)[^\n.]*)(?:\s*\(h/f\)|\s*h/f)"
+]
+
+
+def legacy_preprocess(text):
+    for pattern in LEGACY_PDF_ARTIFACTS:
+        text = re.sub(pattern, '', text)
+    text = '\n'.join(line for line in text.split('\n') if not re.match(r'^[\d\s\W]+$', line.strip()))
+    text = re.sub(r' +', ' ', text)
+    return re.sub(r'\n+', '\n', text)
+
+
+def legacy_contract_type(text):
+    for pattern in LEGACY_CONTRACT_PATTERNS:
+        match = re.search(pattern, text)
+        if match:
+            return match.group(0).capitalize()
+    return ""
+
+
+def legacy_skills(text):
+    return [skill for skill in COMMON_SKILLS if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE)]
+
+
+def legacy_mock_info(job_text):
+    """extract_job_info_from_text d'origine (hors type de contrat, jamais trouvé : voir plus bas)"""
+    extracted = {}
+    job_text_lower = job_text.lower()
+    for sector, keywords in mock_parser.SectorExtractor.SECTORS_KEYWORDS.items():
+        if any(keyword in job_text_lower for keyword in keywords):
+            extracted["sector"] = sector
+            break
+    for pattern in LEGACY_TITLE_PATTERNS:
+        matches = re.findall(pattern, job_text_lower)
+        if matches:
+            extracted["title"] = " ".join(word.capitalize() for word in matches[0].strip().split())
+            break
+    location_pattern = r"(?:lieu|localisation|basé à|site de travail|poste basé).*?(?:à|en|au)\s+([A-Za-zÀ-ÿ\s-]+?)(?:\s|\.|\n|$)"
+    location_matches = re.findall(location_pattern, job_text_lower)
+    if location_matches:
+        location = location_matches[0].strip().capitalize()
+        extracted["location"] = next((known for known in mock_parser.MOCK_LOCATIONS
+                                      if known.lower() in location.lower()), location)
+    salary_matches = re.findall(r"(?:salaire|rémunération)[^\n.]*?(\d+[^\n.]*?(?:€|euros|k€|k))", job_text_lower)
+    if salary_matches:
+        extracted["salary_info"] = salary_matches[0].strip()
+    experience_matches = re.findall(r"(?:expérience)[^\n.]*?(\d+[^\n.]*?(?:an|année|ans|mois))", job_text_lower)
+    if experience_matches:
+        extracted["experience"] = experience_matches[0].strip()
+    return extracted
+
+
+JOB_TEXTS = [
+    "%PDF-1.4\n1 0 obj << /Type /Page >> endobj\n"
+    "Offre d'emploi : nous recherchons un Comptable général (H/F)\n"
+    "Poste basé à Lyon. Type de contrat : CDI.\n"
+    "Rémunération : 40 à 45 k€ selon profil.\n"
+    "Expérience : 3 ans minimum en cabinet.\n"
+    "Maîtrise de SAP, Excel et Power BI ; anglais courant.\n\n\n"
+    "   Clôture comptable   et rapprochement bancaire.\n12 34\n",
+
+    "Stage de 6 mois en contrôle de gestion\n"
+    "Localisation : site de travail à Paris\n"
+    "Contrat à durée déterminée possible ensuite, temps plein.\n"
+    "Normes IFRS, consolidation, reporting mensuel et prévisions.",
+
+    "Mission freelance : audit fiscal, liasse fiscale et bilan annuel.\n"
+    "Profil : consultant indépendant (H/F), 5 ans d'expérience.\n"
+    "/Font 12\n[ 0 0 612 792 ]\n"
+    "Salaire : 550 euros par jour.",
+
+    "Le poste de Développeur Python H/F rejoint l'équipe data.\n"
+    "Lieu : poste basé à Toulouse. Alternance acceptée.\n"
+    "Budget, analyse financière, gestion de trésorerie et Oracle.",
+]
+
+
+@pytest.fixture(params=range(len(JOB_TEXTS)), ids=lambda index: f"fiche-{index}")
+def job_text(request):
+    return JOB_TEXTS[request.param]
+
+
+# ----------------------------------------------------------------------
+# Même résultat que les passes successives
+# ----------------------------------------------------------------------
+
+def test_cleaning_matches_pass_per_pattern(job_text):
+    assert text_features.clean_job_text(job_text) == legacy_preprocess(job_text)
+    assert text_features.NormalizedText(job_text).text == legacy_preprocess(job_text)
+
+
+def test_contract_type_matches_pattern_priority(job_text):
+    doc = text_features.NormalizedText(job_text)
+
+    assert (text_features.ContractTypeExtractor().extract(doc) or "") == legacy_contract_type(doc.text)
+
+
+def test_skills_match_per_skill_search(job_text):
+    doc = text_features.NormalizedText(job_text)
+
+    assert text_features.SkillsExtractor(COMMON_SKILLS).extract(doc) == legacy_skills(doc.text)
+
+
+def test_mock_parser_matches_original_extraction(job_text):
+    cleaned = legacy_preprocess(job_text)
+
+    extracted = mock_parser.extract_job_info_from_text(cleaned)
+    extracted.pop("contract_type", None)
+
+    assert extracted == legacy_mock_info(cleaned)
+    # Texte déjà normalisé par le parser : même résultat
+    assert mock_parser.extract_job_info_from_text(cleaned, text_features.NormalizedText(job_text)) == \
+        mock_parser.extract_job_info_from_text(cleaned)
+
+
+def test_extractors_share_one_normalized_text():
+    doc = text_features.NormalizedText(JOB_TEXTS[0])
+    features = text_features.JobFeatureExtractor([
+        text_features.ContractTypeExtractor(),
+        text_features.SkillsExtractor(COMMON_SKILLS),
+        text_features.SalaryExtractor(),
+    ])
+
+    assert features.extract(doc) == {
+        "contract_type": "Cdi",
+        "skills": legacy_skills(doc.text),
+        "salary": "40 à 45 k€",
+    }
+    assert features.extract(doc, names=["salary", "absent"]) == {"salary": "40 à 45 k€"}
+
+
+# ----------------------------------------------------------------------
+# Écarts voulus avec l'implémentation d'origine
+# ----------------------------------------------------------------------
+
+def test_mock_contract_type_is_now_found():
+    # Le motif d'origine, en majuscules, était appliqué au texte en minuscules
+    assert "contract_type" not in legacy_mock_info(JOB_TEXTS[0])
+    assert mock_parser.extract_job_info_from_text(JOB_TEXTS[0])["contract_type"] == "CDI"
+
+
+def test_long_pdf_keywords_are_removed_whole():
+    # Les passes successives retiraient "xref" de "startxref" et laissaient "start"
+    assert legacy_preprocess("Poste à pourvoir startxref\nendstream") == "Poste à pourvoir start\nend"
+    assert text_features.clean_job_text("Poste à pourvoir startxref\nendstream") == "Poste à pourvoir \n"
@@ -0,0 +1,194 @@
+"""Tests du cache des réponses LLM (copies cv-parser-service et job-parser-service)."""
+
+import json
+import sys
+import types
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from tests.helpers import REPO_ROOT, load_module  # noqa: E402
+
+SERVICES = ("cv-parser-service", "job-parser-service")
+
+
+def load_copy(service):
+    """
+    Charge llm_cache.py d'un service avec une configuration de test.
+
+    Le module importe app.core.config (qui lit le .env du dépôt) et
+    app.services.resilience (client OpenAI) : ils sont remplacés le temps
+    de l'import.
+    """
+    settings = types.SimpleNamespace(
+        REDIS_HOST="localhost", REDIS_PORT=6379, REDIS_DB=0, REDIS_PASSWORD=None,
+        LLM_BACKEND="mock", LLM_MOCK_LATENCY=0.0, OPENAI_MODEL="gpt-4o-mini",
+        LLM_CACHE_ENABLED=True, LLM_CACHE_TTL=60,
+    )
+    config = types.ModuleType("app.core.config")
+    config.settings = settings
+    resilience = types.ModuleType("app.services.resilience")
+    resilience.resilient_openai_call = None
+
+    names = ("app", "app.core", "app.core.config", "app.services", "app.services.resilience")
+    saved = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+    sys.modules.update({
+        "app": types.ModuleType("app"), "app.core": types.ModuleType("app.core"),
+        "app.core.config": config, "app.services": types.ModuleType("app.services"),
+        "app.services.resilience": resilience,
+    })
+    try:
+        return load_module(f"{service.replace('-', '_')}_llm_cache", service, "app", "services", "llm_cache.py")
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+COPIES = {service: load_copy(service) for service in SERVICES}
+
+
+@pytest.fixture(params=SERVICES)
+def llm_cache(request, monkeypatch):
+    module = COPIES[request.param]
+    monkeypatch.setattr(module, "_redis_client", fakeredis.FakeRedis(decode_responses=True))
+    monkeypatch.setattr(module, "llm_metrics", module.LLMMetrics())
+    monkeypatch.setattr(module.settings, "LLM_CACHE_ENABLED", True)
+    monkeypatch.setattr(module.settings, "LLM_BACKEND", "mock")
+    return module
+
+
+class Responder:
+    """Réponse simulée comptant ses appels."""
+
+    def __init__(self, response='{"skills": ["python"]}'):
+        self.response = response
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+def is_json_object(response_text):
+    return isinstance(json.loads(response_text), dict)
+
+
+def call(llm_cache, responder, text="Développeur Python", version="v1", model=None, validate=is_json_object):
+    return llm_cache.cached_llm_call("cv", text, f"Analyse: {text}", version, responder, validate=validate, model=model)
+
+
+def test_copies_differ_only_by_service_names():
+    # Seuls l'en-tête, les préfixes de clés Redis et l'exemple de namespace diffèrent
+    cv, job = (REPO_ROOT.joinpath(service, "app", "services", "llm_cache.py").read_text(encoding="utf-8").splitlines()
+               for service in SERVICES)
+    assert len(cv) == len(job)
+    allowed = ("# ", "CACHE_KEY_PREFIX = ", "METRICS_KEY = ", "        namespace: ")
+    for cv_line, job_line in zip(cv, job):
+        if cv_line != job_line:
+            assert cv_line.startswith(allowed) and job_line.startswith(allowed), (cv_line, job_line)
+
+
+def test_service_key_prefixes_do_not_collide():
+    cv, job = (COPIES[service] for service in SERVICES)
+    assert cv.CACHE_KEY_PREFIX != job.CACHE_KEY_PREFIX
+    assert cv.METRICS_KEY != job.METRICS_KEY
+
+
+def test_cache_key_uses_normalized_text(llm_cache):
+    key = llm_cache.cache_key("cv", "Café  Python\n\n dev ", "v1", "mock:m")
+
+    assert key == llm_cache.cache_key("cv", "Café Python dev", "v1", "mock:m")
+    assert key.startswith(f"{llm_cache.CACHE_KEY_PREFIX}:cv:mock:m:v1:")
+    assert key != llm_cache.cache_key("cv", "Café Python dev", "v2", "mock:m")
+    assert key != llm_cache.cache_key("cv", "Café Python dev", "v1", "mock:autre")
+    assert key != llm_cache.cache_key("job", "Café Python dev", "v1", "mock:m")
+
+
+def test_template_version_tracks_template_content(llm_cache):
+    version = llm_cache.template_version("Analyse {text}")
+    assert version == llm_cache.template_version("Analyse {text}")
+    assert version != llm_cache.template_version("Analyse du CV {text}")
+    assert len(version) == 12
+
+
+def test_second_call_is_served_from_cache(llm_cache):
+    responder = Responder()
+
+    assert call(llm_cache, responder) == responder.response
+    assert call(llm_cache, responder, text="  Développeur   Python ") == responder.response
+    assert responder.calls == 1
+
+    metrics = llm_cache.llm_metrics.snapshot()
+    assert metrics["calls"] == metrics["cache_hits"] == metrics["cache_misses"] == 1
+    assert metrics["cv:cache_hits"] == 1
+    assert llm_cache.llm_metrics.snapshot(aggregated=False)["tokens_out"] > 0
+
+
+def test_template_or_model_change_misses_cache(llm_cache):
+    responder = Responder()
+
+    call(llm_cache, responder)
+    call(llm_cache, responder, version="v2")
+    call(llm_cache, responder, model="gpt-4o")
+    assert responder.calls == 3
+
+
+@pytest.mark.parametrize("response", [
+    "Désolé, je ne peux pas répondre.",  # Le validateur lève une exception
+    '{"skills": ["python"',  # JSON tronqué
+    '[{"skills": []}]',  # Forme inattendue
+])
+def test_responses_rejected_by_validator_are_not_cached(llm_cache, response):
+    responder = Responder(response)
+
+    assert call(llm_cache, responder) == response
+    call(llm_cache, responder)
+    assert responder.calls == 2
+    assert llm_cache._redis_client.keys(f"{llm_cache.CACHE_KEY_PREFIX}:*") == []
+
+
+def test_responses_without_validator_are_not_cached(llm_cache):
+    responder = Responder()
+
+    call(llm_cache, responder, validate=None)
+    call(llm_cache, responder, validate=None)
+    assert responder.calls == 2
+
+
+def test_disabled_cache_always_calls_backend(llm_cache, monkeypatch):
+    monkeypatch.setattr(llm_cache.settings, "LLM_CACHE_ENABLED", False)
+    responder = Responder()
+
+    call(llm_cache, responder)
+    call(llm_cache, responder)
+    assert responder.calls == 2
+    assert llm_cache._redis_client.keys(f"{llm_cache.CACHE_KEY_PREFIX}:*") == []
+
+
+def test_errors_are_counted_and_not_cached(llm_cache):
+    with pytest.raises(RuntimeError):
+        call(llm_cache, Responder(RuntimeError("quota")))
+
+    responder = Responder()
+    call(llm_cache, responder)
+    assert responder.calls == 1
+    assert llm_cache.llm_metrics.snapshot()["errors"] == 1
+    assert json.loads(llm_cache._redis_client.get(llm_cache._redis_client.keys("*:cache:*")[0])) == {"skills": ["python"]}
+
+
+def test_metrics_fall_back_to_process_counters(llm_cache, monkeypatch):
+    class Unavailable:
+        def __getattr__(self, name):
+            raise ConnectionError("redis indisponible")
+
+    monkeypatch.setattr(llm_cache, "_redis_client", Unavailable())
+    responder = Responder()
+
+    call(llm_cache, responder)
+    call(llm_cache, responder)
+    assert responder.calls == 2
+    assert llm_cache.llm_metrics.snapshot()["calls"] == 2
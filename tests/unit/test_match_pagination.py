@@ -0,0 +1,256 @@
+"""Tests de la pagination par curseur et des totaux des listes de matches.
+
+Les tests des compteurs maintenus par trigger et de la lecture par curseur
+s'exécutent sur PostgreSQL lorsque TEST_DATABASE_URL désigne une base jetable
+(chaque test est annulé par rollback) ; ils sont ignorés sinon.
+"""
+
+import os
+import random
+from collections import Counter
+from decimal import Decimal
+
+import pytest
+
+from tests.helpers import REPO_ROOT, load_module
+
+pagination = load_module("matching_pagination", "matching-service", "app", "utils", "pagination.py")
+
+FILTERS = {"owner": ["job_id", 7], "statuses": [], "min_score": 0.0, "max_score": None}
+STATUSES = ["pending", "viewed", "interested", "not_interested"]
+
+
+@pytest.fixture(autouse=True)
+def clear_count_cache():
+    pagination._count_cache.clear()
+    yield
+    pagination._count_cache.clear()
+
+
+# ----------------------------------------------------------------------
+# Curseurs
+# ----------------------------------------------------------------------
+
+def test_cursor_round_trip_keeps_exact_score():
+    fingerprint = pagination.filters_fingerprint(FILTERS)
+    cursor = pagination.encode_cursor(Decimal("87.50"), 42, fingerprint)
+
+    assert "=" not in cursor
+    assert pagination.decode_cursor(cursor, fingerprint) == (Decimal("87.50"), 42)
+
+
+def test_fingerprint_ignores_key_order_but_not_values():
+    reordered = dict(reversed(list(FILTERS.items())))
+
+    assert pagination.filters_fingerprint(reordered) == pagination.filters_fingerprint(FILTERS)
+    assert pagination.filters_fingerprint({**FILTERS, "min_score": 50.0}) != pagination.filters_fingerprint(FILTERS)
+
+
+def test_cursor_from_other_filters_is_rejected():
+    cursor = pagination.encode_cursor(Decimal("90"), 1, pagination.filters_fingerprint(FILTERS))
+    other = pagination.filters_fingerprint({**FILTERS, "statuses": ["viewed"]})
+
+    with pytest.raises(pagination.InvalidCursor, match="current filters"):
+        pagination.decode_cursor(cursor, other)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJzIjoiYWJjIiwiaSI6MX0", "!!"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(pagination.InvalidCursor, match="Invalid cursor"):
+        pagination.decode_cursor(cursor, "abc")
+
+
+def test_page_results_returns_cursor_only_when_more_rows():
+    rows = [(10 - i, None, None, Decimal(90 - i)) for i in range(4)]
+
+    page, next_cursor = pagination.page_results(rows, 3, "f")
+    assert page == rows[:3]
+    assert pagination.decode_cursor(next_cursor, "f") == (Decimal(88), 8)
+
+    page, next_cursor = pagination.page_results(rows, 4, "f")
+    assert page == rows and next_cursor is None
+
+
+# ----------------------------------------------------------------------
+# Filtres et totaux
+# ----------------------------------------------------------------------
+
+def test_build_match_filters():
+    assert pagination.build_match_filters("job_id", 7) == (["m.job_id = %s"], [7])
+
+    conditions, params = pagination.build_match_filters("candidate_id", 3, ["viewed", "pending"], 50, 80)
+    assert conditions == ["m.candidate_id = %s", "m.status = ANY(%s)", "m.match_score >= %s", "m.match_score <= %s"]
+    assert params == [3, ["viewed", "pending"], 50, 80]
+
+    with pytest.raises(ValueError):
+        pagination.build_match_filters("id; DROP TABLE", 1)
+
+
+def test_keyset_condition():
+    assert pagination.keyset_condition(None) == (None, [])
+    assert pagination.keyset_condition((Decimal("75.25"), 9)) == (
+        "(m.match_score, m.id) < (%s::numeric, %s)", ["75.25", 9]
+    )
+
+
+class FakeConnection:
+    """Retourne un total fixe et journalise les requêtes."""
+
+    def __init__(self, total):
+        self.total = total
+        self.queries = []
+
+    def execute(self, query, params):
+        self.queries.append((query, params))
+        return self
+
+    def fetchone(self):
+        return (self.total,)
+
+
+def test_total_without_score_filter_reads_counters():
+    conn = FakeConnection(12)
+
+    assert pagination.cached_match_total(conn, "job_id", 7, ["viewed"]) == (12, True)
+    query, params = conn.queries[0]
+    assert "matching.match_counts" in query
+    assert params == ["job", 7, ["viewed"]]
+
+
+def test_score_filtered_total_is_cached(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(pagination.time, "time", lambda: clock[0])
+    conn = FakeConnection(5)
+
+    assert pagination.cached_match_total(conn, "candidate_id", 3, min_score=60) == (5, False)
+    conn.total = 6
+    assert pagination.cached_match_total(conn, "candidate_id", 3, min_score=60) == (5, False)
+    assert len(conn.queries) == 1
+    assert "COUNT(*)" in conn.queries[0][0]
+
+    clock[0] += pagination.COUNT_CACHE_TTL
+    assert pagination.cached_match_total(conn, "candidate_id", 3, min_score=60) == (6, False)
+
+
+# ----------------------------------------------------------------------
+# PostgreSQL : trigger des compteurs et lecture par curseur
+# ----------------------------------------------------------------------
+
+MATCHES_TABLE = """
+CREATE SCHEMA IF NOT EXISTS matching;
+CREATE TABLE matching.matches (
+    id SERIAL PRIMARY KEY,
+    candidate_id INTEGER NOT NULL,
+    job_id INTEGER NOT NULL,
+    match_score DECIMAL(5,2) NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'viewed', 'interested', 'not_interested')),
+    match_details JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT unique_candidate_job UNIQUE (candidate_id, job_id)
+);
+"""
+
+
+class Connection:
+    """Interface conn.execute(...).fetchall() utilisée par les routes de matches."""
+
+    def __init__(self, raw):
+        self.raw = raw
+
+    def execute(self, query, params=()):
+        cursor = self.raw.cursor()
+        cursor.execute(query, params)
+        return cursor
+
+
+@pytest.fixture
+def db():
+    url = os.environ.get("TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("TEST_DATABASE_URL non définie")
+    psycopg2 = pytest.importorskip("psycopg2")
+
+    raw = psycopg2.connect(url)
+    conn = Connection(raw)
+    try:
+        conn.execute(MATCHES_TABLE)
+        # Lignes existantes avant la migration : reprises par l'initialisation des compteurs
+        conn.execute("INSERT INTO matching.matches (candidate_id, job_id, match_score) VALUES (1, 1, 50), (2, 1, 60)")
+        conn.execute((REPO_ROOT / "database" / "17_match_pagination.sql").read_text())
+        yield conn
+    finally:
+        raw.rollback()
+        raw.close()
+
+
+def stored_counts(conn):
+    rows = conn.execute("SELECT owner_type, owner_id, status, total FROM matching.match_counts WHERE total > 0")
+    return {(owner_type, owner_id, status): total for owner_type, owner_id, status, total in rows.fetchall()}
+
+
+def expected_counts(conn):
+    rows = conn.execute("SELECT candidate_id, job_id, status FROM matching.matches").fetchall()
+    counts = Counter()
+    for candidate_id, job_id, status in rows:
+        counts["job", job_id, status] += 1
+        counts["candidate", candidate_id, status] += 1
+    return dict(counts)
+
+
+def test_migration_backfills_counters(db):
+    assert stored_counts(db) == {("job", 1, "pending"): 2, ("candidate", 1, "pending"): 1,
+                                 ("candidate", 2, "pending"): 1}
+
+
+def test_trigger_keeps_counters_in_sync(db):
+    rng = random.Random(0)
+    pairs = [(candidate_id, job_id) for candidate_id in range(3, 15) for job_id in range(1, 6)]
+    for candidate_id, job_id in rng.sample(pairs, 40):
+        db.execute("INSERT INTO matching.matches (candidate_id, job_id, match_score, status) VALUES (%s, %s, %s, %s)",
+                   (candidate_id, job_id, rng.randint(0, 100), rng.choice(STATUSES)))
+    assert stored_counts(db) == expected_counts(db)
+
+    for _ in range(30):
+        db.execute("UPDATE matching.matches SET status = %s WHERE id = (SELECT id FROM matching.matches "
+                   "ORDER BY random() LIMIT 1)", (rng.choice(STATUSES),))
+    db.execute("UPDATE matching.matches SET match_score = match_score / 2")
+    db.execute("UPDATE matching.matches SET job_id = 9 WHERE job_id = 5")
+    db.execute("DELETE FROM matching.matches WHERE id %% 3 = 0")
+    assert stored_counts(db) == expected_counts(db)
+
+    total, exact = pagination.cached_match_total(db, "job_id", 1, ["pending", "viewed"])
+    actual = db.execute("SELECT COUNT(*) FROM matching.matches WHERE job_id = 1 "
+                        "AND status IN ('pending', 'viewed')").fetchone()[0]
+    assert (total, exact) == (actual, True)
+
+
+@pytest.mark.parametrize("statuses, min_score", [(None, 0), (["viewed", "interested"], 30)])
+def test_cursor_pages_match_offset_order(db, statuses, min_score):
+    rng = random.Random(1)
+    for candidate_id in range(3, 60):
+        # Scores à deux décimales avec de nombreux ex æquo
+        db.execute("INSERT INTO matching.matches (candidate_id, job_id, match_score, status) VALUES (%s, 1, %s, %s)",
+                   (candidate_id, Decimal(rng.randint(0, 20)) * Decimal("2.25"), rng.choice(STATUSES)))
+
+    conditions, params = pagination.build_match_filters("job_id", 1, statuses, min_score)
+    full = db.execute(f"SELECT m.id FROM matching.matches m WHERE {' AND '.join(conditions)} "
+                      "ORDER BY m.match_score DESC, m.id DESC", params).fetchall()
+
+    fingerprint = pagination.filters_fingerprint({"statuses": statuses, "min_score": min_score})
+    seen, cursor = [], ""
+    while cursor is not None:
+        conditions, params = pagination.build_match_filters("job_id", 1, statuses, min_score)
+        if cursor:
+            keyset, keyset_params = pagination.keyset_condition(pagination.decode_cursor(cursor, fingerprint))
+            conditions.append(keyset)
+            params.extend(keyset_params)
+        rows = db.execute(
+            "SELECT m.id, m.candidate_id, m.job_id, m.match_score FROM matching.matches m "
+            f"WHERE {' AND '.join(conditions)} ORDER BY m.match_score DESC, m.id DESC LIMIT %s",
+            params + [7 + 1]
+        ).fetchall()
+        page, cursor = pagination.page_results(rows, 7, fingerprint)
+        seen.extend(row[0] for row in page)
+
+    assert seen == [row[0] for row in full]
@@ -0,0 +1,177 @@
+"""Tests de l'ALS implicite du service de personnalisation : entraînement, enregistrement et chargement mmap."""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("pandas")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+collaborative_filter = import_from_service("models.collaborative_filter", "personalization-service")
+CollaborativeFilter = collaborative_filter.CollaborativeFilter
+ImplicitALS = collaborative_filter.ImplicitALS
+
+
+def clustered_interactions(users_per_group=6, jobs_per_group=5):
+    """Deux groupes d'utilisateurs aimant chacun leurs propres offres, avec quelques refus croisés."""
+    interactions = []
+    for group in range(2):
+        for u in range(users_per_group):
+            user_id = f"u{group}_{u}"
+            for j in range(jobs_per_group):
+                if (u + j) % 4 != 0:  # Chaque utilisateur laisse quelques offres de son groupe
+                    interactions.append((user_id, f"job_{group}_{j}", 1.0))
+            interactions.append((user_id, f"job_{1 - group}_{u % jobs_per_group}", -0.5))
+    return interactions
+
+
+@pytest.fixture(scope="module")
+def model():
+    return ImplicitALS(factors=8, regularization=0.1, alpha=10.0, iterations=10).fit(clustered_interactions())
+
+
+def dense_least_squares(model, matrix, y):
+    """Résolution directe (Y^T C_u Y + λI) x_u = Y^T C_u p_u, avec C_u pleine."""
+    x = np.zeros((matrix.shape[0], model.factors))
+    dense = matrix.toarray()
+    for u, row in enumerate(dense):
+        confidence = 1.0 + model.alpha * np.abs(row)
+        preference = (row > 0).astype(float)
+        a = y.T @ (confidence[:, None] * y) + model.regularization * np.eye(model.factors)
+        x[u] = np.linalg.solve(a, y.T @ (confidence * preference))
+    return x
+
+
+def test_least_squares_matches_dense_solution():
+    als = ImplicitALS(factors=4, regularization=0.1, alpha=5.0)
+    matrix = als._build_matrix([("a", "x", 1.0), ("a", "y", 2.0), ("b", "y", -0.5), ("c", "z", 0.0),
+                                ("c", "x", 1.0), ("c", "x", 1.0)])
+    assert matrix.shape == (3, 2)
+    rng = np.random.default_rng(0)
+    y = rng.standard_normal((matrix.shape[1], 4)).astype(np.float32)
+    x = np.zeros((matrix.shape[0], 4), dtype=np.float32)
+
+    preference = matrix.copy()
+    preference.data = (preference.data > 0).astype(np.float32)
+    confidence = matrix.copy()
+    confidence.data = (als.alpha * np.abs(confidence.data)).astype(np.float32)
+    als._least_squares(preference, confidence, x, y)
+
+    np.testing.assert_allclose(x, dense_least_squares(als, matrix, y), rtol=1e-4, atol=1e-5)
+
+
+def test_build_matrix_sums_duplicates_and_drops_empty_values():
+    als = ImplicitALS()
+    matrix = als._build_matrix([("a", "x", 1.0), ("a", "x", 0.5), ("b", "x", 0), (None, "y", 1.0), ("c", "y", -1.0)])
+
+    assert als.user_ids == ["a", "c"] and als.item_ids == ["x", "y"]
+    assert matrix.toarray().tolist() == [[1.5, 0.0], [0.0, -1.0]]
+
+
+def test_refit_starts_from_fresh_indexes():
+    als = ImplicitALS(factors=4, iterations=2).fit([("a", "x", 1.0), ("b", "y", 1.0)])
+    als.fit([("c", "z", 1.0)])
+
+    assert als.user_ids == ["c"] and als.item_ids == ["z"]
+    assert als.user_factors.shape == (1, 4)
+
+
+def test_similar_users_and_recommendations_follow_groups(model):
+    similar = model.similar_users("u0_0", limit=5)
+
+    assert len(similar) == 5
+    assert all(user_id.startswith("u0_") for user_id, _ in similar)
+    assert [score for _, score in similar] == sorted((score for _, score in similar), reverse=True)
+    assert "u0_0" not in dict(model.similar_users("u0_0", limit=100))
+
+    recommended = model.recommend("u1_2", limit=3, exclude=["job_1_0", "job_1_1"])
+    assert all(item_id.startswith("job_1_") for item_id, _ in recommended)
+    assert not {"job_1_0", "job_1_1"} & {item_id for item_id, _ in recommended}
+
+    scores = model.score_items("u0_1", ["job_0_0", "job_1_0", "job_inconnu"])
+    assert set(scores) == {"job_0_0", "job_1_0"}
+    assert scores["job_0_0"] > scores["job_1_0"]
+
+    assert model.similar_users("inconnu") == [] and model.score_items("inconnu", ["job_0_0"]) == {}
+
+
+def test_top_k_matches_full_sort():
+    rng = np.random.default_rng(3)
+    scores = rng.standard_normal(50)
+    ids = [f"i{i}" for i in range(50)]
+    expected = sorted(zip(ids, scores), key=lambda pair: -pair[1])
+
+    assert ImplicitALS._top_k(scores.copy(), ids, 7) == [(i, float(s)) for i, s in expected[:7]]
+    assert len(ImplicitALS._top_k(scores.copy(), ids, 100)) == 50
+    assert all(s >= 0.5 for _, s in ImplicitALS._top_k(scores.copy(), ids, 50, threshold=0.5))
+
+
+def test_save_then_mmap_load_round_trip(model, tmp_path):
+    path = tmp_path / "mf_model"
+    model.save(str(path))
+    loaded = ImplicitALS.load(str(path))
+
+    assert isinstance(loaded.user_factors, np.memmap) and not loaded.user_factors.flags.writeable
+    np.testing.assert_array_equal(loaded.user_factors, model.user_factors)
+    np.testing.assert_array_equal(loaded.item_factors, model.item_factors)
+    assert loaded.user_ids == model.user_ids and loaded.meta == model.meta
+    assert loaded.factors == model.factors
+    assert loaded.similar_users("u1_3", limit=4) == model.similar_users("u1_3", limit=4)
+    assert loaded.recommend("u0_2", limit=3) == model.recommend("u0_2", limit=3)
+
+    in_memory = ImplicitALS.load(str(path), mmap=False)
+    assert not isinstance(in_memory.user_factors, np.memmap)
+
+
+def test_save_replaces_previous_model(model, tmp_path):
+    path = tmp_path / "mf_model"
+    ImplicitALS(factors=4, iterations=1).fit([("a", "x", 1.0)]).save(str(path))
+    mapped = ImplicitALS.load(str(path))
+
+    model.save(str(path))
+
+    assert sorted(os.listdir(tmp_path)) == ["mf_model"]
+    assert ImplicitALS.load(str(path)).user_ids == model.user_ids
+    # Un processus qui projette encore l'ancien modèle continue de le lire
+    assert mapped.user_ids == ["a"] and mapped.user_factors.shape == (1, 4)
+
+    with pytest.raises(ValueError):
+        ImplicitALS().save(str(tmp_path / "vide"))
+
+
+class NoFeedbackLoader:
+    """Chargeur sans données : le repli par feedbacks ne trouve aucun utilisateur."""
+
+    def get_all_user_ids(self):
+        return []
+
+    def get_user_feedback_bulk(self, user_ids):
+        return {}
+
+    def get_jobs_details(self, job_ids):
+        return {}
+
+
+def test_filter_reloads_model_when_meta_changes(model, tmp_path):
+    path = tmp_path / "mf_model"
+    cf = CollaborativeFilter(NoFeedbackLoader(), model_dir=str(path), reload_interval=0)
+    assert cf.get_similar_users("u0_0") == []
+
+    model.save(str(path))
+    similar = cf.get_similar_users("u0_0", limit=3, min_similarity=-1)
+    assert [entry["user_id"] for entry in similar] == [user_id for user_id, _ in model.similar_users("u0_0", 3)]
+
+    first = cf.model
+    assert cf._get_model() is first  # meta.json inchangé : pas de rechargement
+
+    ImplicitALS(factors=4, iterations=1).fit([("u0_0", "job_0_0", 1.0), ("b", "job_0_0", 1.0)]).save(str(path))
+    assert cf._get_model().user_ids == ["u0_0", "b"]
+
+    results = [{"job_id": "1_0", "score": 0.5}, {"job_id": "0_0", "score": 0.5}, {"score": 0.9}]
+    cf.model = model
+    cf.reload_interval = 3600
+    reranked = cf.rerank_results("u0_1", results)
+    assert [r.get("job_id") for r in reranked] == ["0_0", "1_0", None]
@@ -0,0 +1,232 @@
+"""Tests des mises à jour en ligne du service de personnalisation : corrections des vecteurs, décroissance et réconciliation."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+pytest.importorskip("pandas")
+fakeredis = pytest.importorskip("fakeredis")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+collaborative_filter = import_from_service("models.collaborative_filter", "personalization-service")
+temporal_drift = import_from_service("models.temporal_drift", "personalization-service")
+CollaborativeFilter = collaborative_filter.CollaborativeFilter
+ImplicitALS = collaborative_filter.ImplicitALS
+OnlineUserUpdater = collaborative_filter.OnlineUserUpdater
+TemporalDriftDetector = temporal_drift.TemporalDriftDetector
+
+HOUR = 3600.0
+TRAINED_AT = 1_000_000.0
+
+
+class FakeClock:
+    """Remplace le module time du gestionnaire de mises à jour en ligne."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock(TRAINED_AT + HOUR)
+    monkeypatch.setitem(OnlineUserUpdater.apply_feedback.__globals__, "time", fake)
+    return fake
+
+
+def train(trained_at=TRAINED_AT, factors=6):
+    interactions = [(f"u{group}_{u}", f"job_{group}_{j}", 1.0)
+                    for group in range(2) for u in range(4) for j in range(4) if (u + j) % 3]
+    model = ImplicitALS(factors=factors, regularization=0.1, alpha=10.0, iterations=8).fit(interactions)
+    model.meta["trained_at"] = trained_at
+    return model
+
+
+@pytest.fixture(scope="module")
+def trained():
+    return train()
+
+
+@pytest.fixture
+def model(trained):
+    # Copie superficielle : chaque test peut changer la version du modèle
+    model = ImplicitALS(factors=trained.factors)
+    model.__dict__.update(trained.__dict__, meta=dict(trained.meta))
+    return model
+
+
+@pytest.fixture
+def updater(clock):
+    return OnlineUserUpdater(fakeredis.FakeRedis(server=fakeredis.FakeServer()), learning_rate=0.3, half_life_hours=24)
+
+
+def prediction(updater, model, user_id, item_id):
+    return float(updater.user_vector(model, user_id) @ model.item_factors[model.item_index[item_id]])
+
+
+# ----------------------------------------------------------------------
+# Pas de gradient normalisé
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize("action, target, fraction", [("like", 1.0, 0.3), ("view", 1.0, 0.15), ("dislike", 0.0, 0.15)])
+def test_feedback_moves_prediction_by_fraction_of_error(model, updater, action, target, fraction):
+    before = prediction(updater, model, "u0_0", "job_1_2")
+
+    metrics = updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": action})
+
+    after = prediction(updater, model, "u0_0", "job_1_2")
+    assert after == pytest.approx(before + fraction * (target - before), rel=1e-4)
+    assert metrics["events"] == 1 and metrics["delta_norm"] > 0
+
+
+def test_repeated_likes_converge_to_preference(model, updater):
+    for _ in range(30):
+        updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_1", "action": "apply"})
+
+    assert prediction(updater, model, "u0_0", "job_1_1") == pytest.approx(1.0, abs=1e-3)
+    metrics = updater.drift_metrics(model, "u0_0")
+    assert metrics["events"] == 30
+    assert metrics["cosine_to_base"] < 1.0
+    assert metrics["relative_drift"] == pytest.approx(metrics["delta_norm"] / np.linalg.norm(model.user_vector("u0_0")),
+                                                      rel=1e-4)
+
+
+@pytest.mark.parametrize("feedback", [
+    {"user_id": "u0_0", "job_id": "inconnue", "action": "like"},
+    {"user_id": "u0_0", "job_id": "0_1", "action": "share"},
+    {"user_id": "", "job_id": "0_1", "action": "like"},
+])
+def test_ignored_feedback_stores_nothing(model, updater, feedback):
+    assert updater.apply_feedback(model, feedback) is None
+    assert updater.redis_client.keys("*") == []
+    np.testing.assert_array_equal(updater.user_vector(model, "u0_0"), model.user_vector("u0_0"))
+
+
+def test_correction_is_shared_and_expires(model, updater):
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    other_worker = OnlineUserUpdater(updater.redis_client, half_life_hours=24)
+
+    np.testing.assert_array_equal(other_worker.user_vector(model, "u0_0"), updater.user_vector(model, "u0_0"))
+    assert 0 < updater.redis_client.ttl("online_vector:u0_0") <= 30 * 86400
+
+
+def test_new_user_gets_vector_from_corrections_only(model, updater, tmp_path):
+    assert updater.user_vector(model, "nouveau") is None
+
+    updater.apply_feedback(model, {"user_id": "nouveau", "job_id": "1_0", "action": "like"})
+
+    vector = updater.user_vector(model, "nouveau")
+    assert prediction(updater, model, "nouveau", "job_1_0") == pytest.approx(0.3, rel=1e-4)
+    assert updater.drift_metrics(model, "nouveau")["relative_drift"] is None
+
+    model.save(str(tmp_path / "mf_model"))
+    cf = CollaborativeFilter(data_loader=None, model_dir=str(tmp_path / "mf_model"), online_updater=updater)
+    similar = cf.get_similar_users("nouveau", limit=3, min_similarity=-1)
+    assert [entry["user_id"] for entry in similar] == [user_id for user_id, _ in model.similar_users("", 3, -1, vector)]
+    assert all(entry["user_id"].startswith("u1_") for entry in similar)
+
+
+# ----------------------------------------------------------------------
+# Décroissance et réconciliation
+# ----------------------------------------------------------------------
+
+def test_correction_halves_every_half_life(model, updater, clock):
+    base = model.user_vector("u0_0")
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    delta = updater.user_vector(model, "u0_0") - base
+
+    clock.now += 24 * HOUR
+    np.testing.assert_allclose(updater.user_vector(model, "u0_0") - base, delta / 2, rtol=1e-4, atol=1e-7)
+    clock.now += 48 * HOUR
+    np.testing.assert_allclose(updater.user_vector(model, "u0_0") - base, delta / 8, rtol=1e-4, atol=1e-7)
+    assert updater.drift_metrics(model, "u0_0")["seconds_since_update"] == 72 * HOUR
+
+    # Le feedback suivant part de la correction décrue
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    assert updater.drift_metrics(model, "u0_0")["events"] == 2
+
+
+def test_newer_model_drops_older_corrections(model, updater, clock):
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    clock.now += HOUR
+    model.meta["trained_at"] = clock.now - 1  # Entraîné après le dernier feedback
+
+    np.testing.assert_array_equal(updater.user_vector(model, "u0_0"), model.user_vector("u0_0"))
+    assert updater.drift_metrics(model, "u0_0")["events"] == 0
+
+    # Les feedbacks suivants repartent d'une correction nulle pour ce modèle
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    assert updater.drift_metrics(model, "u0_0")["events"] == 1
+
+
+def test_model_older_than_last_feedback_keeps_correction(model, updater, clock):
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    model.meta["trained_at"] = clock.now - 10  # Entraînement commencé avant le feedback
+
+    assert updater.drift_metrics(model, "u0_0")["events"] == 1
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    stored = updater.redis_client.hget("online_vector:u0_0", "model_version")
+    assert float(stored) == clock.now - 10
+
+
+def test_correction_for_other_dimension_is_ignored(model, updater):
+    updater.apply_feedback(model, {"user_id": "u0_0", "job_id": "1_2", "action": "like"})
+    wider = train(factors=8)
+
+    np.testing.assert_array_equal(updater.user_vector(wider, "u0_0"), wider.user_vector("u0_0"))
+
+
+def test_unavailable_redis_falls_back_to_trained_vector(model, updater):
+    updater.redis_client.connection_pool.connection_kwargs["server"].connected = False
+
+    np.testing.assert_array_equal(updater.user_vector(model, "u0_0"), model.user_vector("u0_0"))
+
+
+# ----------------------------------------------------------------------
+# Profil décroissant des préférences
+# ----------------------------------------------------------------------
+
+def feed(detector, preferences, when, category, action="like"):
+    detector.update_decayed_profile(preferences, {"category": category, "remote": True}, action, when.isoformat())
+
+
+def test_decayed_profile_weights_follow_half_life():
+    detector = TemporalDriftDetector(half_life_days=10)
+    preferences = {}
+    start = datetime(2026, 1, 1)
+
+    feed(detector, preferences, start, "tech")
+    feed(detector, preferences, start + timedelta(days=10), "finance")
+    profile = preferences["decayed_profile"]
+    assert profile["categories"] == pytest.approx({"tech": 0.5, "finance": 1.0})
+    assert profile["actions"] == pytest.approx({"like": 1.5})
+    assert profile["updated_at"] == (start + timedelta(days=10)).isoformat()
+
+    # Feedback arrivé en retard : compté avec le poids de son âge
+    feed(detector, preferences, start, "marketing")
+    assert profile["categories"]["marketing"] == pytest.approx(0.5)
+    assert profile["remote"] == pytest.approx([2.0, 2.0])
+    assert profile["updated_at"] == (start + timedelta(days=10)).isoformat()
+
+
+def test_old_weights_are_pruned_and_preferences_rebuilt():
+    detector = TemporalDriftDetector(half_life_days=1)
+    preferences = {}
+    start = datetime(2026, 1, 1)
+    for day, category in enumerate(["tech", "tech", "finance", "marketing", "marketing"]):
+        feed(detector, preferences, start + timedelta(days=day), category)
+    feed(detector, preferences, start + timedelta(days=4), "legal", action="dislike")
+
+    assert "tech" in preferences["decayed_profile"]["categories"]
+    feed(detector, preferences, start + timedelta(days=12), "marketing", action="view")
+    assert preferences["decayed_profile"]["categories"] == {}
+
+    preferences["decayed_profile"]["categories"] = {"a": 0.2, "b": 3.0, "c": 1.0, "d": 0.5}
+    detector._rebuild_preferences_from_history(preferences)
+    assert preferences["job_preferences"]["categories"] == ["b", "c", "d"]
+    assert preferences["job_preferences"]["remote"] == pytest.approx(1.0)
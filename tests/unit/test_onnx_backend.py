@@ -0,0 +1,138 @@
+"""Tests du backend ONNX (copies backend et matching-service), sans onnxruntime."""
+
+import ast
+
+import numpy as np
+import pytest
+
+from tests.helpers import REPO_ROOT, load_module
+
+PATHS = {
+    "backend": ("backend", "app", "nlp", "onnx_backend.py"),
+    "matching-service": ("matching-service", "app", "onnx_backend.py"),
+}
+COPIES = {
+    service: load_module(f"{service.replace('-', '_')}_onnx_backend", *parts)
+    for service, parts in PATHS.items()
+}
+
+# Définitions propres à une copie (noms de modèles, fabrique du matching-service)
+SERVICE_SPECIFIC = {"_hub_model_id", "load_sentence_encoder"}
+
+HIDDEN_SIZE = 4
+
+
+@pytest.fixture(params=sorted(COPIES))
+def onnx_backend(request):
+    return COPIES[request.param]
+
+
+class FakeTokenizer:
+    """Un token par mot (identifiant = longueur du mot), padding à droite."""
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        tokens = [[len(word) for word in text.split()][:max_length] or [0] for text in texts]
+        width = max(len(row) for row in tokens)
+        input_ids = np.zeros((len(texts), width), dtype=np.int64)
+        attention_mask = np.zeros_like(input_ids)
+        for row, ids in enumerate(tokens):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+def make_encoder(module, **options):
+    """ONNXEncoder dont la session ONNX est remplacée par un calcul déterministe."""
+    encoder = object.__new__(module.ONNXEncoder)
+    encoder.pooling = options.get("pooling", "mean")
+    encoder.normalize = options.get("normalize", False)
+    encoder.max_length = options.get("max_length", 128)
+    encoder.tokenizer = FakeTokenizer()
+    encoder.batches = []
+
+    def run(inputs):
+        encoder.batches.append(inputs["input_ids"].shape)
+        ids = inputs["input_ids"].astype(np.float32)[..., None]
+        # Les positions de padding reçoivent une valeur non nulle : le pooling doit les masquer
+        return np.concatenate([ids + k for k in range(HIDDEN_SIZE)], axis=-1)
+
+    encoder.run = run
+    return encoder
+
+
+def shared_definitions(path):
+    """Définitions de premier niveau, docstrings retirées."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    definitions = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)) and node.name not in SERVICE_SPECIFIC:
+            for child in ast.walk(node):
+                if isinstance(child, (ast.FunctionDef, ast.ClassDef)) and ast.get_docstring(child) is not None:
+                    child.body = child.body[1:]
+            definitions[node.name] = ast.dump(node)
+    return definitions
+
+
+def test_copies_share_the_same_engine():
+    backend, matching = (shared_definitions(REPO_ROOT.joinpath(*parts)) for parts in PATHS.values())
+    assert backend.keys() == matching.keys()
+    for name in backend:
+        assert backend[name] == matching[name], name
+
+
+def test_model_names():
+    backend, matching = COPIES["backend"], COPIES["matching-service"]
+
+    assert backend._hub_model_id("camembert-base") == "camembert-base"
+    assert matching._hub_model_id("all-MiniLM-L6-v2") == "sentence-transformers/all-MiniLM-L6-v2"
+    assert matching._hub_model_id("org/model") == "org/model"
+    assert matching._hub_model_id(str(REPO_ROOT)) == str(REPO_ROOT)
+
+
+def test_onnx_model_dir(onnx_backend, tmp_path):
+    assert onnx_backend.onnx_model_dir("org/model", str(tmp_path)) == str(tmp_path / "org__model")
+    assert onnx_backend.onnx_model_dir("/org/model/", str(tmp_path)) == str(tmp_path / "org__model")
+
+
+def test_mean_pooling_ignores_padding_and_keeps_order(onnx_backend):
+    texts = ["a bb ccc dddd eeeee", "python", "", "machine learning sur cpu", "x y"]
+    encoder = make_encoder(onnx_backend)
+
+    batched = encoder.encode(texts, batch_size=2)
+    alone = np.stack([encoder.encode(text) for text in texts])
+
+    np.testing.assert_allclose(batched, alone, rtol=1e-6)
+    word_lengths = [np.mean([len(word) for word in text.split()] or [0]) for text in texts]
+    np.testing.assert_allclose(batched[:, 0], word_lengths, rtol=1e-6)
+    assert batched.shape == (len(texts), HIDDEN_SIZE)
+
+
+def test_batches_are_sorted_by_length(onnx_backend):
+    texts = ["un deux trois quatre", "un", "un deux trois", "un deux"]
+    encoder = make_encoder(onnx_backend)
+
+    encoder.encode(texts, batch_size=2)
+
+    # Textes de longueur voisine regroupés : peu de padding
+    assert encoder.batches == [(2, 2), (2, 4)]
+
+
+def test_cls_pooling_and_normalization(onnx_backend):
+    encoder = make_encoder(onnx_backend, pooling="cls", normalize=True)
+
+    vectors = encoder.encode(["abc de", "a"])
+
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+    np.testing.assert_allclose(vectors[0], np.arange(3, 3 + HIDDEN_SIZE) / np.linalg.norm(np.arange(3, 7)))
+    raw = encoder.encode("abc de", normalize_embeddings=False)
+    np.testing.assert_allclose(raw, np.arange(3, 3 + HIDDEN_SIZE))
+
+
+def test_empty_input(onnx_backend):
+    assert make_encoder(onnx_backend).encode([]).shape == (0, 0)
+
+
+def test_encoder_requires_onnxruntime(onnx_backend, monkeypatch):
+    monkeypatch.setattr(onnx_backend, "HAS_ONNXRUNTIME", False)
+    with pytest.raises(ImportError):
+        onnx_backend.ONNXEncoder("org/model")
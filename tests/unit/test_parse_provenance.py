@@ -0,0 +1,118 @@
+"""Tests de la provenance des champs extraits et du re-parsing incrémental (backend)."""
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("magic")
+pytest.importorskip("spacy")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+parsing = import_from_service("app.nlp.enhanced_parsing_system", "backend")
+parsing_globals = parsing.EnhancedParsingSystem.parse_document.__globals__
+# Module parse_provenance importé par le système de parsing
+provenance = parsing_globals["ProvenanceTracker"].record.__globals__
+settings = parsing_globals["BERTExtractor"].__init__.__globals__["settings"]
+
+CV_TEXT = "Ada Lovelace\nDéveloppeuse Python et SQL\nParis, télétravail partiel\n"
+
+
+@pytest.fixture
+def system(monkeypatch, tmp_path):
+    feedback_system = parsing_globals["ParserFeedbackSystem"]
+    monkeypatch.setitem(parsing_globals, "ParserFeedbackSystem",
+                        lambda: feedback_system(tmp_path / "feedback"))
+    monkeypatch.setitem(parsing_globals, "has_advanced_nlp_capabilities", lambda: False)
+    # L'extracteur de préférences crée son propre BERTExtractor (magasin d'embeddings sur disque)
+    monkeypatch.setattr(settings, "BERT_EMBEDDING_STORE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    system = parsing.EnhancedParsingSystem(use_gpt=False, result_store_dir=tmp_path / "results")
+
+    calls = []
+
+    def step(name, fields):
+        def run(result, *args):
+            calls.append(name)
+            version = provenance["extractor_version"](name)
+            for field, value in fields.items():
+                result["extracted_data"][field] = f"{value} v{version}"
+            return result
+        return run
+
+    monkeypatch.setattr(system, "_extract_document_data", step("cv_parser", {"name": "Ada Lovelace"}))
+    monkeypatch.setattr(system, "_extract_skills", step("skills", {"skills": "Python"}))
+    monkeypatch.setattr(system, "_extract_work_preferences", step("preferences", {"remote": "partiel"}))
+    monkeypatch.setattr(system.feedback_system, "update_extraction_with_feedback", step("feedback", {}))
+    system.calls = calls
+    return system
+
+
+def parse(system):
+    result = system.parse_document(text_content=CV_TEXT, doc_type="cv")
+    system.calls.clear()
+    return result
+
+
+def test_fields_record_their_extractor_and_version(system):
+    result = parse(system)
+
+    assert {field: origin["extractor"] for field, origin in result["provenance"].items()} == {
+        "name": "cv_parser", "skills": "skills", "remote": "preferences"}
+    assert result["provenance"]["skills"]["version"] == "2"
+    assert result["provenance"]["name"]["span"] is None  # "Ada Lovelace v1" absent du texte
+    assert result["extractor_versions"] == {"cv_parser": "1", "skills": "2", "preferences": "1", "feedback": "1"}
+
+
+def test_up_to_date_document_is_not_reparsed(system):
+    result = parse(system)
+
+    assert system.reparse_document(result["id"])["extracted_data"] == result["extracted_data"]
+    assert system.calls == []
+
+
+def test_version_bump_reruns_only_that_extractor(system, monkeypatch):
+    result = parse(system)
+    monkeypatch.setitem(provenance["EXTRACTOR_VERSIONS"], "skills", "3")
+
+    updated = system.reparse_document(result["id"])
+
+    # Les corrections automatiques sont toujours ré-appliquées après un re-parsing
+    assert system.calls == ["skills", "feedback"]
+    assert updated["reparsed_extractors"] == ["skills", "feedback"]
+    assert updated["extracted_data"] == {"name": "Ada Lovelace v1", "skills": "Python v3", "remote": "partiel v1"}
+    assert updated["provenance"]["skills"]["version"] == "3"
+    assert updated["extractor_versions"]["skills"] == "3"
+    # Les champs des autres extracteurs gardent leur source, leur version et leur date
+    for field in ("name", "remote"):
+        assert updated["provenance"][field] == result["provenance"][field]
+    assert system.result_store.load(result["id"])["provenance"] == updated["provenance"]
+
+
+def test_user_correction_survives_reparse(system, monkeypatch):
+    result = parse(system)
+    system.result_store.apply_correction(result["id"], {"skills": "Python, SQL"}, "correction-1")
+    monkeypatch.setitem(provenance["EXTRACTOR_VERSIONS"], "skills", "3")
+
+    updated = system.reparse_document(result["id"])
+
+    assert updated["extracted_data"]["skills"] == "Python, SQL"
+    assert updated["provenance"]["skills"]["extractor"] == provenance["USER_CORRECTION"]
+
+
+def test_reparse_archive_counts_rerun_extractors(system, monkeypatch):
+    first, second = parse(system), parse(system)
+    monkeypatch.setitem(provenance["EXTRACTOR_VERSIONS"], "preferences", "2")
+
+    stats = system.reparse_archive()
+
+    assert {key: stats[key] for key in ("documents", "reparsed", "up_to_date", "errors")} == {
+        "documents": 2, "reparsed": 2, "up_to_date": 0, "errors": 0}
+    assert stats["extractors"] == {"preferences": 2, "feedback": 2}
+    assert system.calls == ["preferences", "feedback"] * 2
+    for result in (first, second):
+        stored = system.result_store.load(result["id"])
+        assert stored["extracted_data"]["remote"] == "partiel v2"
+        assert stored["provenance"]["skills"] == result["provenance"]["skills"]
+
+    system.calls.clear()
+    assert system.reparse_archive()["up_to_date"] == 2
+    assert system.calls == []
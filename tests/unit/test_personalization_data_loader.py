@@ -0,0 +1,232 @@
+"""Tests du DataLoader du service de personnalisation : pool de connexions et identity map."""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("psycopg2")
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("requests")
+
+import psycopg2.extensions  # noqa: E402
+import psycopg2.pool  # noqa: E402
+
+from tests.helpers import import_from_service  # noqa: E402
+
+data_loader_module = import_from_service("utils.data_loader", "personalization-service")
+DataLoader = data_loader_module.DataLoader
+
+
+class FakeDatabase:
+    """Tables en mémoire et journal des requêtes EXECUTE."""
+
+    def __init__(self, jobs=(), feedback=()):
+        self.jobs = {job[0]: job for job in jobs}
+        self.feedback = list(feedback)
+        self.executed = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def rows(self, name, params):
+        if name == "get_jobs_details":
+            return [self.jobs[job_id] for job_id in params[0] if job_id in self.jobs]
+        if name == "get_user_feedback_bulk":
+            return [row for row in self.feedback if row[0] in params[0]]
+        return []
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.results = []
+
+    def execute(self, statement, params=None):
+        if statement.startswith("EXECUTE"):
+            name = statement.split()[1]
+            database = self.connection.database
+            with database.lock:
+                database.executed.append(name)
+            self.results = database.rows(name, params)
+
+    def fetchall(self):
+        return self.results
+
+    def fetchone(self):
+        return self.results[0] if self.results else None
+
+    def close(self):
+        pass
+
+
+class FakeInfo:
+    transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self, database):
+        self.database = database
+        self.prepared = set()
+        self.closed = 0
+        self.info = FakeInfo()
+
+    def cursor(self, name=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+class FakePool(psycopg2.pool.ThreadedConnectionPool):
+    """Vrai ThreadedConnectionPool (PoolError compris) sur des connexions factices."""
+
+    def __init__(self, minconn, maxconn, database):
+        self.database = database
+        super().__init__(minconn, maxconn)
+
+    def _connect(self, key=None):
+        conn = FakeConnection(self.database)
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
+def make_loader(database, max_connections=2, pool_timeout=5.0):
+    loader = DataLoader("postgresql://test", fakeredis.FakeRedis(),
+                        max_connections=max_connections, pool_timeout=pool_timeout)
+    loader._pool = FakePool(1, max_connections, database)
+    loader._get_job_from_matching_service = lambda job_id: None
+    return loader
+
+
+def job_row(job_id, title):
+    return (job_id, title, "", "Paris", "Nexten", "CDI", None, "tech",
+            "python,sql", 3, None, None, {"category": "dev"})
+
+
+def test_threads_wait_for_a_free_connection():
+    database = FakeDatabase()
+    loader = make_loader(database, max_connections=2)
+    errors = []
+
+    def worker():
+        try:
+            with loader._cursor():
+                with database.lock:
+                    database.active += 1
+                    database.max_active = max(database.max_active, database.active)
+                time.sleep(0.02)
+                with database.lock:
+                    database.active -= 1
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert database.max_active == 2
+    assert loader._pool._used == {}
+
+
+def test_exhausted_pool_times_out():
+    loader = make_loader(FakeDatabase(), max_connections=1, pool_timeout=0.05)
+    errors = []
+
+    def worker():
+        try:
+            with loader._cursor():
+                pass
+        except psycopg2.pool.PoolError as error:
+            errors.append(error)
+
+    with loader._cursor():
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+    assert len(errors) == 1
+
+    # La connexion rendue est de nouveau disponible
+    with loader._cursor():
+        pass
+
+
+def test_connection_is_returned_on_error():
+    loader = make_loader(FakeDatabase(), max_connections=1, pool_timeout=0.05)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            with loader._cursor():
+                raise RuntimeError("requête en échec")
+
+    with loader._cursor():
+        assert len(loader._pool._used) == 1
+    assert loader._pool._used == {}
+
+
+def test_get_job_data_accepts_string_ids():
+    loader = make_loader(FakeDatabase(jobs=[job_row(42, "Data engineer")]))
+
+    assert loader.get_job_data("42")["title"] == "Data engineer"
+    # Deuxième lecture depuis le cache Redis, toujours avec un ID texte
+    assert loader.get_job_data("42")["title"] == "Data engineer"
+    assert loader.get_job_data(42)["id"] == 42
+    assert loader.get_job_data(None) is None
+
+
+def test_request_scope_loads_each_job_once():
+    database = FakeDatabase(jobs=[job_row(1, "A"), job_row(2, "B")])
+    loader = make_loader(database)
+
+    with loader.request_scope():
+        assert set(loader.get_jobs_details([1, 2])) == {1, 2}
+        loader.redis_client.flushall()
+        assert loader.get_job_data(1)["title"] == "A"
+        assert loader.get_job_details("2")["title"] == "B"
+    assert database.executed == ["get_jobs_details"]
+
+    # Hors requête, chaque appel repasse par le cache puis la base
+    loader.redis_client.flushall()
+    loader.get_job_data(1)
+    assert database.executed == ["get_jobs_details"] * 2
+
+
+def test_request_scope_is_isolated_per_request():
+    database = FakeDatabase(feedback=[("u1", 1, None, "like", {}, None)])
+    loader = make_loader(database)
+
+    with loader.request_scope():
+        assert len(loader.get_user_feedback("u1")) == 1
+        assert loader.get_user_job_feedback("u1", 1)[0]["action"] == "like"
+        assert loader.get_user_feedback_bulk(["u1", "u2"]) == {
+            "u1": loader.get_user_feedback("u1"), "u2": []
+        }
+    assert database.executed == ["get_user_feedback_bulk"] * 2
+
+    with loader.request_scope():
+        loader.get_user_feedback("u1")
+    assert database.executed == ["get_user_feedback_bulk"] * 3
+
+
+def test_saved_feedback_invalidates_request_scope():
+    database = FakeDatabase(feedback=[("u1", 1, None, "like", {}, None)])
+    loader = make_loader(database)
+
+    with loader.request_scope():
+        loader.get_user_feedback("u1")
+        assert loader.save_feedback({"user_id": "u1", "job_id": 2, "action": "apply"})
+        database.feedback.append(("u1", 2, None, "apply", {}, None))
+        assert len(loader.get_user_feedback("u1")) == 2
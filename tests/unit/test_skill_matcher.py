@@ -0,0 +1,121 @@
+"""Tests de l'automate de compétences (copies backend et job-parser-service)."""
+
+import random
+
+import pytest
+
+from tests.helpers import REPO_ROOT, load_module
+
+PATHS = {
+    "backend": ("backend", "app", "nlp", "skill_matcher.py"),
+    "job-parser-service": ("job-parser-service", "app", "utils", "skill_matcher.py"),
+}
+COPIES = {
+    service: load_module(f"{service.replace('-', '_')}_skill_matcher", *parts)
+    for service, parts in PATHS.items()
+}
+
+TERMS = {
+    "Python": "python", "C": "c", "C++": "cpp", "C#": "csharp", ".NET": "dotnet",
+    "machine learning": "ml", "learning": "learning", "Node.js": "node", "SQL": "sql",
+    "Gestion de projet": "gestion_projet", "travail d'équipe": "equipe", "R": "r",
+}
+
+
+@pytest.fixture(params=sorted(COPIES))
+def skill_matcher(request):
+    return COPIES[request.param]
+
+
+def reference_matches(module, terms, text, overlapping=False):
+    """Recherche naïve : chaque forme à chaque position, puis la plus à gauche et la plus longue."""
+    folded = module.fold_text(text)
+    candidates = []
+    seen = set()
+    for term, value in terms.items():
+        key = module.fold_text(term).strip()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        for start in range(len(folded) - len(key) + 1):
+            end = start + len(key)
+            if folded[start:end] != key:
+                continue
+            if module._is_word_char(key[0]) and start > 0 and module._is_word_char(folded[start - 1]):
+                continue
+            if module._is_word_char(key[-1]) and end < len(folded) and module._is_word_char(folded[end]):
+                continue
+            candidates.append((start, -end, term, value))
+
+    matches = []
+    last_end = 0
+    for start, negative_end, term, value in sorted(candidates):
+        if not overlapping and start < last_end:
+            continue
+        matches.append((start, -negative_end, term, value))
+        last_end = max(last_end, -negative_end)
+    return matches
+
+
+def test_copies_are_identical():
+    # Seule la mention « Même moteur que ... » distingue la copie du job parser
+    original = REPO_ROOT.joinpath(*PATHS["backend"]).read_text(encoding="utf-8")
+    copy = REPO_ROOT.joinpath(*PATHS["job-parser-service"]).read_text(encoding="utf-8")
+    copy = copy.replace(
+        "\n\nMême moteur que backend/app/nlp/skill_matcher.py (le service est construit et\n"
+        "déployé indépendamment du backend).", ""
+    )
+    assert copy == original
+
+
+def test_fold_text_keeps_positions(skill_matcher):
+    for text in ("Élève ÉNERGIQUE", "travail d’équipe", "ﬁnance İstanbul", "`quote`"):
+        assert len(skill_matcher.fold_text(text)) == len(text)
+    assert skill_matcher.fold_text("Équipe d’Été") == "equipe d'ete"
+
+
+def test_word_boundaries_and_symbols(skill_matcher):
+    matcher = skill_matcher.SkillMatcher(TERMS)
+
+    text = "Python, C++ et C# sous .NET ; pas de Cython ni de CRM, mais du C."
+    assert matcher.find_values(text) == ["python", "cpp", "csharp", "dotnet", "c"]
+    assert [text[m.start:m.end] for m in matcher.find_all(text)] == ["Python", "C++", "C#", ".NET", "C"]
+
+
+def test_leftmost_longest_and_overlapping(skill_matcher):
+    matcher = skill_matcher.SkillMatcher(TERMS)
+    text = "Expert en Machine Learning et en gestion de projet"
+
+    assert [m.value for m in matcher.find_all(text)] == ["ml", "gestion_projet"]
+    assert [m.value for m in matcher.find_all(text, overlapping=True)] == ["ml", "learning", "gestion_projet"]
+
+
+def test_accents_case_and_apostrophes(skill_matcher):
+    matcher = skill_matcher.SkillMatcher(TERMS)
+
+    assert matcher.find_values("Bon TRAVAIL D’EQUIPE") == ["equipe"]
+    assert "travail d'equipe" in matcher and "Travail d’Équipe" in matcher
+    assert "Java" not in matcher
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_naive_search(skill_matcher, seed):
+    rng = random.Random(seed)
+    alphabet = "ab c+#.é'"
+    terms = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))): i for i in range(rng.randint(1, 12))}
+    text = "".join(rng.choice(alphabet + "AÉ") for _ in range(rng.randint(0, 80)))
+    matcher = skill_matcher.SkillMatcher(terms)
+
+    for overlapping in (False, True):
+        found = [tuple(match) for match in matcher.find_all(text, overlapping=overlapping)]
+        assert found == reference_matches(skill_matcher, terms, text, overlapping)
+
+
+def test_incremental_add_and_first_value_kept(skill_matcher):
+    matcher = skill_matcher.SkillMatcher({"Docker": "docker"})
+    matcher.add("DOCKER", "autre")
+    matcher.add("Kubernetes")
+
+    assert len(matcher) == 2
+    assert matcher.find_values("docker et kubernetes") == ["docker", "Kubernetes"]
+    assert skill_matcher.SkillMatcher().find_all("docker") == []
@@ -0,0 +1,108 @@
+"""Tests du serveur de modèles spaCy partagé du backend (pipeline de test enregistré sur disque)."""
+
+import re
+
+import pytest
+
+spacy = pytest.importorskip("spacy")
+pytest.importorskip("pydantic_settings")
+
+from tests.helpers import import_from_service  # noqa: E402
+
+document_classifier = import_from_service("app.nlp.document_classifier", "backend")
+DocumentClassifier = document_classifier.DocumentClassifier
+model_server = DocumentClassifier.__init__.__globals__["get_model_server"].__globals__
+SpacyModelServer = model_server["SpacyModelServer"]
+
+TEXTS = [
+    "Marie Curie\nIngénieure Python chez Acme à Paris.",
+    "Offre d'emploi : développeur Django à Lyon, poste en CDI.",
+    "Alan Turing, data scientist.  Compétences : Python, SQL.",
+]
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    """Pipeline français minimal : règles d'entités ("ner") et découpage en phrases ("parser")."""
+    nlp = spacy.blank("fr")
+    ruler = nlp.add_pipe("entity_ruler", name="ner")
+    ruler.add_patterns([
+        {"label": "PER", "pattern": [{"LOWER": "marie"}, {"LOWER": "curie"}]},
+        {"label": "PER", "pattern": [{"LOWER": "alan"}, {"LOWER": "turing"}]},
+        {"label": "LOC", "pattern": [{"LOWER": {"IN": ["paris", "lyon"]}}]},
+    ])
+    nlp.add_pipe("sentencizer", name="parser")
+    path = tmp_path_factory.mktemp("spacy") / "fr_test"
+    nlp.to_disk(path)
+    return str(path)
+
+
+def entities(doc):
+    return [(ent.text, ent.label_, ent.start_char, ent.end_char) for ent in doc.ents]
+
+
+def tokens(doc):
+    return [token.text for token in doc]
+
+
+def test_only_requested_components_are_loaded(model_path):
+    server = SpacyModelServer(profile=False)
+
+    nlp = server.load(model_path, ["ner"])
+
+    assert nlp.pipe_names == ["ner"]
+    assert server.load(model_path, ["ner"]) is nlp
+    # Un composant supplémentaire recharge une fois le modèle avec l'ensemble élargi
+    assert server.load(model_path, ["parser"]).pipe_names == ["ner", "parser"]
+    assert server.load(model_path, ["ner"]).pipe_names == ["ner", "parser"]
+
+
+@pytest.mark.parametrize("profile", [False, True])
+def test_server_matches_direct_model(model_path, profile):
+    reference = spacy.load(model_path)
+    server = SpacyModelServer(batch_size=2, n_process=1, profile=profile)
+    server.load(model_path, ["ner"])
+
+    processed = server.process(TEXTS[0], model_path)
+    piped = list(server.pipe(TEXTS, model_path))
+
+    expected = [reference(text) for text in TEXTS]
+    assert entities(processed) == entities(expected[0])
+    assert [entities(doc) for doc in piped] == [entities(doc) for doc in expected]
+    assert [tokens(doc) for doc in piped] == [tokens(doc) for doc in expected]
+
+    stats = server.stats()[model_path]
+    assert stats["documents"] == len(TEXTS) + 1
+    assert ("ner" in stats["component_times"]) is profile
+
+
+def reference_preprocess(classifier, nlp, text):
+    """Prétraitement d'avant le serveur partagé : un appel spaCy complet par document."""
+    text = text.replace('\xa0', ' ')
+    text = re.sub(r'\s+', ' ', text)
+    language = nlp(text[:1000]).lang_
+    text = classifier._clean_text(text)
+    return {
+        "text": text,
+        "doc_type": classifier.detect_document_type(text),
+        "language": language,
+        "spacy_doc": nlp(text[:100000]),
+    }
+
+
+def test_batched_preprocessing_matches_per_document(model_path, monkeypatch, tmp_path):
+    server = SpacyModelServer(batch_size=2, n_process=1)
+    monkeypatch.setitem(DocumentClassifier.__init__.__globals__, "get_model_server", lambda: server)
+    monkeypatch.setattr(DocumentClassifier, "SPACY_MODEL", model_path)
+    classifier = DocumentClassifier(model_path=str(tmp_path / "absent.joblib"))
+    reference = spacy.load(model_path)
+
+    results = classifier.preprocess_documents(TEXTS)
+
+    assert len(results) == len(TEXTS)
+    for text, result in zip(TEXTS, results):
+        expected = reference_preprocess(classifier, reference, text)
+        assert {key: result[key] for key in ("text", "doc_type", "language")} == \
+            {key: expected[key] for key in ("text", "doc_type", "language")}
+        assert entities(result["spacy_doc"]) == entities(expected["spacy_doc"])
+    assert classifier.preprocess_document(TEXTS[1])["doc_type"] == results[1]["doc_type"]
@@ -0,0 +1,136 @@
+"""Tests de la sérialisation JSON en flux (copies data-adapter et backend)."""
+
+import itertools
+import json
+
+import pytest
+
+from tests.helpers import REPO_ROOT, load_module
+
+COPIES = {
+    "data-adapter": load_module("data_adapter_streaming_json", "data-adapter", "streaming_json.py"),
+    "backend": load_module("backend_streaming_json", "backend", "streaming_json.py"),
+}
+
+
+@pytest.fixture(params=sorted(COPIES))
+def streaming_json(request):
+    return COPIES[request.param]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_copies_are_identical():
+    # Seule la mention « Copie de ... » distingue la copie du backend
+    original = (REPO_ROOT / "data-adapter" / "streaming_json.py").read_text(encoding="utf-8")
+    copy = (REPO_ROOT / "backend" / "streaming_json.py").read_text(encoding="utf-8")
+    copy = copy.replace("\nCopie de data-adapter/streaming_json.py (les services sont construits séparément).\n", "")
+    assert copy == original
+
+
+@pytest.mark.parametrize("items", [[], [{"id": 1}], [{"id": i, "score": i / 7, "nom": "é"} for i in range(50)]])
+def test_json_document_matches_classic_response(streaming_json, items):
+    envelope = {"status": "ok", "count": len(items)}
+
+    body = b"".join(streaming_json.iter_json_document(envelope, ("results",), iter(items), chunk_size=64))
+
+    assert json.loads(body) == {**envelope, "results": items}
+
+
+def test_nested_array_and_footer_splice(streaming_json):
+    envelope = {"matching_results": {"job_id": 3}, "meta": {"v": 1}}
+    items = [{"id": i} for i in range(5)]
+    seen = []
+
+    def footer():
+        return {"processed": len(seen), "stats": {"kept": 5}}
+
+    def produce():
+        for item in items:
+            seen.append(item)
+            yield item
+
+    body = b"".join(streaming_json.iter_json_document(
+        envelope, ("matching_results", "matches"), produce(), footer=footer
+    ))
+
+    document = json.loads(body)
+    assert document == {
+        "matching_results": {"job_id": 3, "matches": items},
+        "meta": {"v": 1},
+        "processed": 5,
+        "stats": {"kept": 5},
+    }
+    assert list(document)[-2:] == ["processed", "stats"]
+    assert envelope == {"matching_results": {"job_id": 3}, "meta": {"v": 1}}
+
+
+@pytest.mark.parametrize("extra", [None, {}])
+def test_empty_footer_leaves_document_unchanged(streaming_json, extra):
+    body = b"".join(streaming_json.iter_json_document({}, ("results",), iter([1, 2]), footer=lambda: extra))
+    assert json.loads(body) == {"results": [1, 2]}
+
+
+def test_first_item_is_sent_without_waiting(streaming_json):
+    produced = []
+
+    def produce():
+        for i in itertools.count():
+            produced.append(i)
+            yield {"id": i}
+
+    chunks = streaming_json.iter_json_document({}, ("results",), produce(), flush_interval=3600)
+    first = next(chunks)
+
+    assert produced == [0]
+    assert first == b'{"results":[{"id":0}'
+
+
+def test_buffer_is_flushed_on_time_bound(streaming_json, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(streaming_json, "time", clock)
+
+    def produce():
+        for i in range(6):
+            # Deux éléments par intervalle de flush
+            clock.now += 0.5
+            yield i
+
+    chunks = list(streaming_json.iter_json_document({}, ("r",), produce(), flush_interval=1.0))
+
+    assert chunks == [b'{"r":[0', b",1,2", b",3,4", b",5]}"]
+
+
+def test_buffer_is_flushed_on_size(streaming_json, monkeypatch):
+    monkeypatch.setattr(streaming_json, "time", FakeClock())
+    items = ["x" * 10] * 20
+
+    chunks = list(streaming_json.iter_json_document({}, ("r",), iter(items), chunk_size=40, flush_interval=3600))
+
+    assert json.loads(b"".join(chunks)) == {"r": items}
+    assert all(len(chunk) < 40 + 13 for chunk in chunks)
+    assert len(chunks) > 4
+
+
+def test_ndjson_lines(streaming_json):
+    lines = list(streaming_json.iter_ndjson(iter([{"id": 1}, {"id": 2}]), header={"total": 2},
+                                            footer=lambda: {"done": True}))
+
+    assert [json.loads(line) for line in lines] == [{"total": 2}, {"id": 1}, {"id": 2}, {"done": True}]
+    assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+
+
+def test_negotiate_mode(streaming_json):
+    negotiate = streaming_json.negotiate_mode
+    assert negotiate(format="jsonl") == streaming_json.MODE_NDJSON
+    assert negotiate(format="stream", accept="application/x-ndjson") == streaming_json.MODE_JSON_STREAM
+    assert negotiate(format="json", default=streaming_json.MODE_JSON_STREAM) is None
+    assert negotiate(accept="application/x-ndjson, */*") == streaming_json.MODE_NDJSON
+    assert negotiate(accept="application/json", default="x") == "x"
+    assert streaming_json.media_type_for(streaming_json.MODE_NDJSON) == "application/x-ndjson"